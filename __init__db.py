@@ -2,8 +2,13 @@
 Script d'initialisation de la base de données
 Crée toutes les tables définies dans les modèles SQLAlchemy
 """
-from src.database import engine, Base
-from src.business_objects.models import Utilisateur, Activite, Commentaire, follows
+import sys
+from pathlib import Path
+
+# Les modules de src/ sont importés comme dans l'API (database, business_objects...)
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+
+from database.migrations import migrer
 
 def init_database():
     """
@@ -11,8 +16,8 @@ def init_database():
     """
     print("Création des tables...")
     
-    # Créer toutes les tables définies dans Base.metadata
-    Base.metadata.create_all(bind=engine)
+    # Créer toutes les tables définies dans Base.metadata, puis appliquer les migrations
+    migrer()
     
     print("✓ Tables créées avec succès!")
     print("\nTables créées:")
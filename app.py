@@ -4,6 +4,7 @@ Lancez avec : streamlit run app.py
 """
 import streamlit as st
 import requests
+import time
 from datetime import date, datetime, timedelta
 import pandas as pd
 import plotly.express as px
@@ -170,7 +171,19 @@ def upload_gpx(user_id, nom, type_sport, description, gpx_file):
             data=data,
             files=files
         )
-        return response.status_code == 201, response.json()
+        if response.status_code != 202:
+            return False, response.json()
+
+        # L'analyse se fait en arrière-plan : on suit la tâche jusqu'à sa fin
+        tache = response.json()
+        for _ in range(60):
+            if tache["statut"] == "terminee":
+                return True, tache
+            if tache["statut"] == "echec":
+                return False, tache.get("erreur")
+            time.sleep(0.5)
+            tache = requests.get(f"{API_URL}/activites/gpx/taches/{tache['id']}").json()
+        return False, "Analyse du GPX trop longue, réessayez plus tard"
     except Exception as e:
         return False, str(e)
 
@@ -508,7 +521,7 @@ def page_activites():
             type_sport = st.selectbox("Sport", 
                 ["Course", "Vélo", "Natation", "Marche", "Randonnée"], key="gpx_sport")
             description = st.text_area("Description", key="gpx_desc")
-            gpx_file = st.file_uploader("Fichier GPX", type=['gpx'])
+            gpx_file = st.file_uploader("Fichier GPX, TCX ou FIT", type=['gpx', 'tcx', 'fit'])
             
             submit = st.form_submit_button("📤 Upload")
             
@@ -1,91 +1,204 @@
 """
 Router pour les activités (F1)
 """
+import asyncio
 import os
+import tempfile
 from datetime import date
-from typing import Optional, List
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query
+from typing import Literal, Optional, List, Tuple, Union
+from fastapi import (
+    APIRouter, BackgroundTasks, Depends, UploadFile, File, Form, Header, HTTPException, Query, Request, Response
+)
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from api.schemas import (
-    ActiviteOut, ActiviteCreate, ActiviteUpdate, MessageResponse
+    ActiviteOut, ActiviteCreate, ActiviteUpdate, MessageResponse, TacheIngestionOut,
+    ImportArchiveOut, TraceSimplifieeOut, TraceEncodeeOut, SplitOut, CapteursOut, ParcoursOut
 )
 from api.lien_dbapi import get_db
 from service.activite_service import ActiviteService
+from service.ingestion_service import IngestionService
+from service.import_service import ImportService
+from service.parcours_service import ParcoursService
+from utils.formulaire_flux import FormulaireInvalide, lire_formulaire
+from utils.stockage_gpx import EnregistrementGPX, TAILLE_MORCEAU
+from utils.validation_trace import TAILLE_MAX_TRACE, TraceRefusee, ValidateurTrace
 
 router = APIRouter(prefix="/activites", tags=["activités"])
 
 UPLOAD_DIR = "uploads/gpx"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+# Corps maximal d'un envoi de trace : le fichier et les champs du formulaire
+TAILLE_MAX_ENVOI_TRACE = TAILLE_MAX_TRACE + 64 * 1024
 
-def _safe_filename(s: str) -> str:
-    """Crée un nom de fichier sécurisé"""
-    return "".join(c if c.isalnum() or c in ("_", "-", ".", "@") else "_" for c in s)
+# Type négocié (en-tête Accept) pour recevoir une trace en polyligne encodée
+TYPE_POLYLIGNE = "application/vnd.polyline+json"
 
 
 # ========== CRÉATION ==========
 
-@router.post("/gpx", response_model=ActiviteOut, status_code=201)
+# Formulaire d'envoi de trace, lu en flux par la route : décrit ici pour la documentation
+FORMULAIRE_TRACE = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "required": ["utilisateur_id", "nom", "type_sport", "gpx"],
+            "properties": {
+                "utilisateur_id": {"type": "integer"},
+                "nom": {"type": "string"},
+                "type_sport": {"type": "string"},
+                "description": {"type": "string", "default": ""},
+                "gpx": {"type": "string", "format": "binary"},
+            },
+        }}},
+    }
+}
+
+
+def _champs_trace(champs: dict) -> Tuple[int, str, str, str]:
+    """Champs texte du formulaire d'envoi de trace, vérifiés et typés"""
+    manquants = [nom for nom in ("utilisateur_id", "nom", "type_sport") if not champs.get(nom)]
+    if manquants:
+        raise FormulaireInvalide(f"Champ(s) manquant(s) : {', '.join(manquants)}")
+    try:
+        utilisateur_id = int(champs["utilisateur_id"])
+    except ValueError:
+        raise FormulaireInvalide("utilisateur_id doit être un entier")
+    return utilisateur_id, champs["nom"], champs["type_sport"], champs.get("description", "")
+
+
+@router.post("/gpx", response_model=TacheIngestionOut, status_code=202, openapi_extra=FORMULAIRE_TRACE)
 async def creer_activite_gpx(
-    utilisateur_id: int = Form(...),
-    nom: str = Form(...),
-    type_sport: str = Form(...),
-    description: Optional[str] = Form(""),
-    gpx: UploadFile = File(...),
+    request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ):
     """
-    Créer une activité à partir d'un fichier GPX (F1)
+    Créer une activité à partir d'un fichier GPX, TCX ou FIT (F1)
+    
+    Le format est reconnu au contenu du fichier, quelle que soit son extension.
+    Le formulaire est lu en flux et le fichier vérifié morceau par morceau, à
+    mesure de sa réception : trop volumineux (50 Mo), avec trop de points
+    (250 000) ou mal formé, il est refusé (413 ou 400) dès le morceau fautif,
+    sans attendre la fin de l'envoi ni être analysé.
+    Le fichier est enregistré puis analysé en arrière-plan. La réponse (202)
+    contient l'ID d'une tâche à suivre via GET /activites/gpx/taches/{tache_id}.
     
-    Le fichier GPX est analysé pour extraire :
+    L'analyse du fichier extrait :
     - Date de l'activité
     - Durée
     - Dénivelé positif
     - Calories estimées
     
-    **Paramètres:**
+    **Paramètres (multipart/form-data):**
     - **utilisateur_id**: ID de l'utilisateur
     - **nom**: Nom de l'activité
     - **type_sport**: Type de sport (Course, Vélo, etc.)
     - **description**: Description optionnelle
-    - **gpx**: Fichier GPX
+    - **gpx**: Fichier GPX, TCX ou FIT
     """
-    # Validation du fichier
-    if not gpx.filename.lower().endswith(".gpx"):
+    # Validation au fil de la réception (taille, racine XML, nombre de points) et
+    # sauvegarde sous l'empreinte du contenu (une seule copie par contenu)
+    try:
+        with EnregistrementGPX(UPLOAD_DIR, ValidateurTrace()) as enregistrement:
+            champs = await lire_formulaire(
+                request.stream(),
+                request.headers.get("content-type", ""),
+                "gpx",
+                # Validation et écriture dans un thread : la boucle d'événements reste libre
+                lambda morceau: asyncio.to_thread(enregistrement.ecrire, morceau),
+            )
+            utilisateur_id, nom, type_sport, description = _champs_trace(champs)
+            fullpath, empreinte, taille = await asyncio.to_thread(enregistrement.terminer)
+    except TraceRefusee as e:
+        raise HTTPException(status_code=e.statut, detail=str(e))
+    except FormulaireInvalide as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    tache = await asyncio.to_thread(IngestionService.creer_tache, utilisateur_id)
+    if not tache:
+        # Fichier laissé en place, comme après un import en échec (voir nettoyer_gpx.py)
         raise HTTPException(
-            status_code=400,
-            detail="Le fichier doit être un .gpx"
+            status_code=500,
+            detail="Erreur lors de l'enregistrement de l'import GPX"
         )
     
-    # Nom de fichier unique et sûr
-    fname = _safe_filename(f"{utilisateur_id}_{nom}_{gpx.filename}")
-    fullpath = os.path.join(UPLOAD_DIR, fname)
-    
-    # Sauvegarde du fichier
-    content = await gpx.read()
-    with open(fullpath, "wb") as f:
-        f.write(content)
-    
-    # Créer l'activité depuis le GPX
-    activite = ActiviteService.creer_activite_depuis_gpx(
-        fichier_gpx=fullpath,
+    # Analyse et création de l'activité après l'envoi de la réponse
+    background_tasks.add_task(
+        IngestionService.traiter_fichier,
+        tache_id=tache.id,
+        chemin=fullpath,
+        empreinte=empreinte,
+        taille=taille,
         utilisateur_id=utilisateur_id,
         nom=nom,
         type_sport=type_sport,
         description=description
     )
     
-    if not activite:
-        # Supprimer le fichier en cas d'erreur
-        if os.path.exists(fullpath):
-            os.remove(fullpath)
+    return tache
+
+
+@router.get("/gpx/taches/{tache_id}", response_model=TacheIngestionOut)
+def obtenir_tache_gpx(
+    tache_id: str,
+    db: Session = Depends(get_db),
+):
+    """
+    Suivre un import GPX
+    
+    **statut**: en_attente, en_cours, terminee (activite_id renseigné) ou echec (erreur renseignée)
+    """
+    tache = IngestionService.obtenir_tache(tache_id)
+    
+    if not tache:
         raise HTTPException(
-            status_code=500,
-            detail="Erreur lors de la création de l'activité depuis le GPX"
+            status_code=404,
+            detail=f"Tâche {tache_id} non trouvée"
         )
     
-    return activite
+    return tache
+
+
+@router.post("/archive", response_model=ImportArchiveOut, status_code=201)
+async def importer_archive_gpx(
+    utilisateur_id: int = Form(...),
+    type_sport: str = Form(...),
+    archive: UploadFile = File(...),
+    db: Session = Depends(get_db),
+):
+    """
+    Importer en une fois une archive (zip ou tar) de traces (GPX, TCX ou FIT)
+    
+    Les fichiers sont analysés en parallèle et les activités insérées par lots.
+    Chaque activité prend le nom de son fichier. Les fichiers en erreur sont
+    listés dans **echecs** sans interrompre l'import des autres.
+    
+    **Paramètres:**
+    - **utilisateur_id**: ID de l'utilisateur
+    - **type_sport**: Type de sport des activités
+    - **archive**: Archive .zip, .tar, .tar.gz...
+    """
+    # Copie de l'archive sur le disque (lecture par morceaux)
+    descripteur, chemin_archive = tempfile.mkstemp(suffix=".archive", dir=UPLOAD_DIR)
+    try:
+        with os.fdopen(descripteur, "wb") as f:
+            while morceau := await archive.read(TAILLE_MORCEAU):
+                await asyncio.to_thread(f.write, morceau)
+        
+        # Import dans un thread : l'analyse tourne dans le pool de processus
+        rapport = await asyncio.to_thread(
+            ImportService.importer_archive, chemin_archive, utilisateur_id, type_sport, UPLOAD_DIR
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        os.remove(chemin_archive)
+    
+    return rapport
 
 
 @router.post("", response_model=ActiviteOut, status_code=201)
@@ -117,6 +230,54 @@ def creer_activite_manuelle(
 
 # ========== CONSULTATION ==========
 
+@router.get("/zone", response_model=List[ActiviteOut])
+def rechercher_activites_zone(
+    lat_min: float = Query(..., ge=-90, le=90),
+    lon_min: float = Query(..., ge=-180, le=180),
+    lat_max: float = Query(..., ge=-90, le=90),
+    lon_max: float = Query(..., ge=-180, le=180),
+    utilisateur_id: Optional[int] = Query(None, description="Limiter aux activités d'un utilisateur"),
+    type_sport: Optional[str] = Query(None, description="Filtrer par sport"),
+    limit: int = Query(100, ge=1, le=1000, description="Nombre maximum d'activités"),
+    db: Session = Depends(get_db)
+):
+    """
+    Rechercher les activités qui passent dans une vue de carte
+    
+    Le rectangle est donné par ses coins sud-ouest (**lat_min**, **lon_min**)
+    et nord-est (**lat_max**, **lon_max**), en degrés.
+    """
+    if lat_min > lat_max or lon_min > lon_max:
+        raise HTTPException(
+            status_code=400,
+            detail="Rectangle invalide (lat_min <= lat_max et lon_min <= lon_max attendus)"
+        )
+    
+    return ActiviteService.rechercher_dans_zone(
+        lat_min, lon_min, lat_max, lon_max,
+        utilisateur_id=utilisateur_id, type_sport=type_sport, limit=limit
+    )
+
+
+@router.get("/autour", response_model=List[ActiviteOut])
+def rechercher_activites_autour(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    rayon_km: float = Query(5, gt=0, le=200, description="Rayon de recherche en km"),
+    utilisateur_id: Optional[int] = Query(None, description="Limiter aux activités d'un utilisateur"),
+    type_sport: Optional[str] = Query(None, description="Filtrer par sport"),
+    limit: int = Query(100, ge=1, le=1000, description="Nombre maximum d'activités"),
+    db: Session = Depends(get_db)
+):
+    """
+    Rechercher les activités qui partent à moins de **rayon_km** d'un point
+    """
+    return ActiviteService.rechercher_autour(
+        lat, lon, rayon_km,
+        utilisateur_id=utilisateur_id, type_sport=type_sport, limit=limit
+    )
+
+
 @router.get("/{activite_id}", response_model=ActiviteOut)
 def obtenir_activite(activite_id: int, db: Session = Depends(get_db)):
     """
@@ -133,14 +294,135 @@ def obtenir_activite(activite_id: int, db: Session = Depends(get_db)):
     return activite
 
 
+@router.get(
+    "/{activite_id}/trace",
+    response_model=Union[TraceSimplifieeOut, TraceEncodeeOut],
+    responses={200: {"content": {TYPE_POLYLIGNE: {"schema": TraceEncodeeOut.model_json_schema()}}}},
+)
+def obtenir_trace_activite(
+    activite_id: int,
+    response: Response,
+    zoom: Optional[float] = Query(None, ge=0, le=22, description="Zoom de la carte (web mercator)"),
+    pixels: Optional[int] = Query(None, ge=2, description="Nombre maximal de points"),
+    format: Optional[Literal["json", "polyligne"]] = Query(None, description="Encodage des points"),
+    altitudes: bool = Query(False, description="Canal des altitudes (polyligne)"),
+    temps: bool = Query(False, description="Canal des temps (polyligne)"),
+    accept: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Récupérer la trace GPS d'une activité, simplifiée pour l'affichage
+    
+    Le niveau de détail est choisi parmi des simplifications précalculées :
+    - **zoom**: le niveau le plus léger dont l'erreur reste sous un pixel
+    - **pixels**: le niveau le plus détaillé qui tient dans ce nombre de points
+    
+    Sans paramètre, la trace est limitée à 300 points (aperçus, fil d'actualité).
+    
+    Les points sont une liste de [lat, lon], ou une polyligne encodée (format
+    de Google, environ 10 fois plus compacte) avec **format=polyligne** ou
+    l'en-tête Accept: application/vnd.polyline+json. En polyligne, les canaux
+    **altitudes** et **temps** sont encodés de la même façon.
+    """
+    if zoom is None and pixels is None:
+        pixels = 300
+    # Le paramètre de requête l'emporte sur l'en-tête Accept
+    encodee = format == "polyligne" or (format is None and TYPE_POLYLIGNE in (accept or ""))
+    
+    trace = ActiviteService.obtenir_trace_simplifiee(
+        activite_id, zoom=zoom, pixels=pixels, encodee=encodee, altitudes=altitudes, temps=temps
+    )
+    
+    if not trace:
+        raise HTTPException(
+            status_code=404,
+            detail="Trace non trouvée pour cette activité"
+        )
+    
+    if encodee:
+        return JSONResponse(
+            TraceEncodeeOut(**trace).model_dump(exclude_none=True),
+            media_type=TYPE_POLYLIGNE,
+            headers={"Vary": "Accept"},
+        )
+    response.headers["Vary"] = "Accept"
+    return trace
+
+
+@router.get("/{activite_id}/splits", response_model=List[SplitOut])
+def obtenir_splits_activite(activite_id: int, db: Session = Depends(get_db)):
+    """
+    Récupérer le temps de chaque kilomètre complet d'une activité GPX
+    
+    **duree** en secondes (c'est aussi l'allure en s/km)
+    """
+    if not ActiviteService.obtenir_activite_par_id(activite_id):
+        raise HTTPException(
+            status_code=404,
+            detail="Activité non trouvée"
+        )
+    
+    return ActiviteService.obtenir_splits(activite_id)
+
+
+@router.get("/{activite_id}/capteurs", response_model=CapteursOut)
+def obtenir_capteurs_activite(activite_id: int, db: Session = Depends(get_db)):
+    """
+    Récupérer les données des capteurs d'une activité GPX
+    
+    - Moyennes de fréquence cardiaque, cadence, puissance et température
+    - **zones_fc** : secondes passées dans les zones cardiaques 1 à 5
+      (< 60 %, 60-70 %, 70-80 %, 80-90 %, >= 90 % de la FC max 220 - âge)
+    """
+    if not ActiviteService.obtenir_activite_par_id(activite_id):
+        raise HTTPException(
+            status_code=404,
+            detail="Activité non trouvée"
+        )
+    
+    capteurs = ActiviteService.obtenir_capteurs(activite_id)
+    if capteurs is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Aucune donnée capteur pour cette activité"
+        )
+    
+    return capteurs
+
+
+@router.get("/{activite_id}/parcours", response_model=ParcoursOut)
+def obtenir_parcours_activite(activite_id: int, db: Session = Depends(get_db)):
+    """
+    Comparer une activité GPX avec les autres sorties de l'utilisateur
+    
+    - **doublon_de** : activité d'origine si celle-ci est la même sortie
+      importée une seconde fois (même parcours, même jour, même durée)
+    - **parcours_similaires** : sorties sur le même parcours, de la plus
+      récente à la plus ancienne, avec leur similarité (0 à 1)
+    """
+    if not ActiviteService.obtenir_activite_par_id(activite_id):
+        raise HTTPException(
+            status_code=404,
+            detail="Activité non trouvée"
+        )
+    
+    parcours = ParcoursService.obtenir_parcours(activite_id)
+    if parcours is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Aucune trace pour cette activité"
+        )
+    
+    return parcours
+
+
 @router.get("/utilisateur/{user_id}", response_model=List[ActiviteOut])
-def lister_activites_utilisateur(
+async def lister_activites_utilisateur(
     user_id: int,
     type_sport: Optional[str] = Query(None, description="Filtrer par sport"),
     date_debut: Optional[date] = Query(None, description="Date de début (YYYY-MM-DD)"),
     date_fin: Optional[date] = Query(None, description="Date de fin (YYYY-MM-DD)"),
-    limit: Optional[int] = Query(50, description="Nombre maximum d'activités"),
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(50, description="Nombre maximum d'activités")
 ):
     """
     Lister les activités d'un utilisateur avec filtres (F1)
@@ -153,7 +435,7 @@ def lister_activites_utilisateur(
     
     
     """
-    activites = ActiviteService.obtenir_activites_utilisateur(
+    activites = await ActiviteService.obtenir_activites_utilisateur_async(
         utilisateur_id=user_id,
         type_sport=type_sport,
         date_debut=date_debut,
@@ -0,0 +1,175 @@
+"""
+Router pour les activités en direct
+"""
+import asyncio
+import json
+from datetime import timezone
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from api.schemas import ActiviteOut, LotPointsIn, MessageResponse, SessionDirecteCreate, SessionDirecteOut
+from api.lien_dbapi import get_db
+from api.activite_router import UPLOAD_DIR
+from service.direct_service import DirectService, EN_COURS
+from utils.validation_trace import TraceRefusee
+
+router = APIRouter(prefix="/directs", tags=["direct"])
+
+INTERVALLE_FLUX = 2.0  # s entre deux vérifications de la version pour les abonnés
+
+
+def _session_ou_erreur(session_id: int) -> dict:
+    session = DirectService.obtenir(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session en direct non trouvée")
+    return session
+
+
+@router.post("", response_model=SessionDirecteOut, status_code=201)
+def demarrer_session(session_data: SessionDirecteCreate, db: Session = Depends(get_db)):
+    """
+    Démarrer une activité en direct
+
+    Les points sont ensuite envoyés par lots (POST /directs/{id}/points),
+    puis la session est terminée (POST /directs/{id}/terminer).
+    """
+    session = DirectService.demarrer(
+        utilisateur_id=session_data.utilisateur_id,
+        nom=session_data.nom,
+        type_sport=session_data.type_sport,
+        description=session_data.description or ""
+    )
+
+    if not session:
+        raise HTTPException(status_code=404, detail="Utilisateur non trouvé")
+
+    return session
+
+
+@router.post("/{session_id}/points", response_model=SessionDirecteOut)
+def ajouter_points(session_id: int, lot: LotPointsIn, db: Session = Depends(get_db)):
+    """
+    Ajouter un lot de points à une activité en direct
+
+    Les métriques sont prolongées à partir de l'état précédent, sans relire
+    la trace. Les points déjà reçus (lot renvoyé après une coupure) sont
+    ignorés. Une réponse 409 signale une session terminée ou un lot envoyé
+    en même temps qu'un autre (à renvoyer).
+    """
+    points = [
+        {
+            **point.model_dump(exclude={"temps"}),
+            # Les dates sans fuseau sont en UTC
+            "temps": (point.temps if point.temps.tzinfo else point.temps.replace(tzinfo=timezone.utc)).timestamp(),
+        }
+        for point in lot.points
+    ]
+
+    try:
+        session = DirectService.ajouter_points(session_id, points, lot.nouveau_segment)
+    except TraceRefusee as e:
+        raise HTTPException(status_code=e.statut, detail=str(e))
+    except RuntimeError as e:
+        # Réponse 5xx : l'unité de travail de la requête annule la mise à jour de l'état
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not session:
+        _session_ou_erreur(session_id)
+        raise HTTPException(status_code=409, detail="Session terminée ou modifiée en même temps : renvoyer le lot")
+
+    return session
+
+
+@router.get("/{session_id}", response_model=SessionDirecteOut)
+def obtenir_session(session_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Métriques courantes d'une activité en direct (pour un suivi par interrogation)
+
+    La réponse porte un ETag : avec l'en-tête If-None-Match, une session
+    inchangée répond 304 sans relire ses métriques.
+    """
+    version = DirectService.obtenir_version(session_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Session en direct non trouvée")
+
+    etag = f'"{version}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    session = _session_ou_erreur(session_id)
+    response.headers["ETag"] = f'"{session["version"]}"'
+    return session
+
+
+@router.get("/{session_id}/flux")
+async def suivre_session(session_id: int, request: Request):
+    """
+    S'abonner aux métriques d'une activité en direct (Server-Sent Events)
+
+    Un événement est envoyé à chaque nouveau lot de points, puis un dernier
+    à la fin de la session. Entre deux lots, seule la version de la session
+    est relue.
+    """
+    if await asyncio.to_thread(DirectService.obtenir_version, session_id) is None:
+        raise HTTPException(status_code=404, detail="Session en direct non trouvée")
+
+    async def evenements():
+        version_envoyee = None
+        while not await request.is_disconnected():
+            version = await asyncio.to_thread(DirectService.obtenir_version, session_id)
+            if version is None:
+                return
+            if version != version_envoyee:
+                session = await asyncio.to_thread(DirectService.obtenir, session_id)
+                version_envoyee = session["version"]
+                yield f"data: {json.dumps(SessionDirecteOut(**session).model_dump(mode='json'))}\n\n"
+                if session["statut"] != EN_COURS:
+                    return
+            await asyncio.sleep(INTERVALLE_FLUX)
+
+    return StreamingResponse(evenements(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.get("/suivis/{utilisateur_id}", response_model=List[SessionDirecteOut])
+def lister_sessions_suivis(utilisateur_id: int, db: Session = Depends(get_db)):
+    """
+    Activités en direct des utilisateurs suivis
+    """
+    return DirectService.lister_suivis(utilisateur_id)
+
+
+@router.post("/{session_id}/terminer", response_model=ActiviteOut, status_code=201)
+def terminer_session(session_id: int, db: Session = Depends(get_db)):
+    """
+    Terminer une activité en direct
+
+    La trace est enregistrée et l'activité créée comme après un import GPX,
+    avec des métriques recalculées sur la trace complète.
+    """
+    session = _session_ou_erreur(session_id)
+    if session["statut"] != EN_COURS:
+        raise HTTPException(status_code=409, detail="Session déjà terminée")
+    if session["nb_points"] < 2:
+        raise HTTPException(status_code=400, detail="La session doit avoir au moins deux points")
+
+    activite = DirectService.terminer(session_id, UPLOAD_DIR)
+
+    if not activite:
+        raise HTTPException(status_code=500, detail="Erreur lors de la création de l'activité")
+
+    return activite
+
+
+@router.delete("/{session_id}", response_model=MessageResponse)
+def annuler_session(session_id: int, db: Session = Depends(get_db)):
+    """
+    Abandonner une activité en direct (aucune activité n'est créée)
+    """
+    _session_ou_erreur(session_id)
+
+    if not DirectService.annuler(session_id):
+        raise HTTPException(status_code=409, detail="Session déjà terminée")
+
+    return MessageResponse(message="Session en direct annulée")
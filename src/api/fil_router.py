@@ -1,24 +1,23 @@
 """
 Router pour le fil d'actualité (F2)
+
+Routes asynchrones (interrogées en boucle par les clients) : elles attendent
+la base sans occuper un thread par requête.
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Query
 from typing import List
 
 from api.schemas import FilActualiteItem, ActiviteOut, UtilisateurOut
-from api.lien_dbapi import get_db
 from service.fil_actualite_service import FilActualiteService
-from service.activite_service import ActiviteService
 
 router = APIRouter(prefix="/fil", tags=["fil d'actualité"])
 
 
 @router.get("/{user_id}", response_model=List[FilActualiteItem])
-def obtenir_fil_actualite(
+async def obtenir_fil_actualite(
     user_id: int,
     nb_jours: int = Query(7, description="Nombre de jours à remonter"),
-    limite: int = Query(50, description="Nombre maximum d'activités"),
-    db: Session = Depends(get_db)
+    limite: int = Query(50, description="Nombre maximum d'activités")
 ):
     """
     Obtenir le fil d'actualité d'un utilisateur (F2)
@@ -32,38 +31,29 @@ def obtenir_fil_actualite(
     
     ```
     """
-    fil_data = FilActualiteService.obtenir_fil_actualite(
+    fil_data = await FilActualiteService.obtenir_fil_actualite_async(
         utilisateur_id=user_id,
         nb_jours=nb_jours,
         limite=limite
     )
     
-    # Formater la réponse avec le statut de like
-    fil_response = []
-    for item in fil_data:
-        user_has_liked = ActiviteService.utilisateur_a_like(
-            user_id,
-            item['activite'].id
-        )
-        
-        fil_response.append(
-            FilActualiteItem(
-                activite=item['activite'],
-                utilisateur=item['utilisateur'],
-                nb_likes=item['nb_likes'],
-                nb_commentaires=item['nb_commentaires'],
-                user_has_liked=user_has_liked
-            )
+    # Formater la réponse (le statut de like vient de la même requête)
+    return [
+        FilActualiteItem(
+            activite=item['activite'],
+            utilisateur=item['utilisateur'],
+            nb_likes=item['nb_likes'],
+            nb_commentaires=item['nb_commentaires'],
+            user_has_liked=item['user_has_liked']
         )
-    
-    return fil_response
+        for item in fil_data
+    ]
 
 
 @router.get("/{user_id}/recentes")
-def obtenir_activites_recentes_suivis(
+async def obtenir_activites_recentes_suivis(
     user_id: int,
-    limite: int = Query(20, description="Nombre d'activités"),
-    db: Session = Depends(get_db)
+    limite: int = Query(20, description="Nombre d'activités")
 ):
     """
     Obtenir les activités les plus récentes des utilisateurs suivis
@@ -74,7 +64,7 @@ def obtenir_activites_recentes_suivis(
     - **user_id**: ID de l'utilisateur
     - **limite**: Nombre maximum d'activités (défaut: 20)
     """
-    fil = FilActualiteService.obtenir_fil_actualite(
+    fil = await FilActualiteService.obtenir_fil_actualite_async(
         utilisateur_id=user_id,
         nb_jours=7,
         limite=limite
@@ -99,10 +89,9 @@ def obtenir_activites_recentes_suivis(
 
 
 @router.get("/{user_id}/statistiques")
-def obtenir_statistiques_fil(
+async def obtenir_statistiques_fil(
     user_id: int,
-    nb_jours: int = Query(7),
-    db: Session = Depends(get_db)
+    nb_jours: int = Query(7)
 ):
     """
     Obtenir des statistiques sur le fil d'actualité
@@ -113,7 +102,7 @@ def obtenir_statistiques_fil(
     - Répartition par sport
     - Total de likes et commentaires
     """
-    fil = FilActualiteService.obtenir_fil_actualite(
+    fil = await FilActualiteService.obtenir_fil_actualite_async(
         utilisateur_id=user_id,
         nb_jours=nb_jours,
         limite=1000
@@ -0,0 +1,49 @@
+"""
+Router pour les tuiles de carte de chaleur
+"""
+from fastapi import APIRouter, Depends, HTTPException, Path, Response
+from sqlalchemy.orm import Session
+
+from api.lien_dbapi import get_db
+from service.heatmap_service import HeatmapService
+from service.utilisateur_service import UtilisateurService
+from utils.heatmap import ZOOM_MAX
+
+router = APIRouter(prefix="/heatmap", tags=["heatmap"])
+
+
+@router.get(
+    "/{utilisateur_id}/{z}/{x}/{y}.png",
+    response_class=Response,
+    responses={200: {"content": {"image/png": {}}}}
+)
+def obtenir_tuile_heatmap(
+    utilisateur_id: int,
+    z: int = Path(..., ge=0, le=ZOOM_MAX, description="Niveau de zoom"),
+    x: int = Path(..., ge=0, description="Colonne de la tuile"),
+    y: int = Path(..., ge=0, description="Ligne de la tuile"),
+    db: Session = Depends(get_db)
+):
+    """
+    Récupérer une tuile XYZ de la carte de chaleur d'un utilisateur
+    
+    Toutes les traces de l'utilisateur y sont superposées : la couleur d'un
+    pixel dépend du nombre de passages. À utiliser comme couche de tuiles
+    (Leaflet, OpenLayers...) avec l'URL `/api/heatmap/{id}/{z}/{x}/{y}.png`.
+    """
+    if not UtilisateurService.obtenir_utilisateur_par_id(utilisateur_id):
+        raise HTTPException(
+            status_code=404,
+            detail="Utilisateur non trouvé"
+        )
+    
+    png = HeatmapService.obtenir_tuile(utilisateur_id, z, x, y)
+    
+    if png is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Tuile hors de la carte"
+        )
+    
+    # Les tuiles changent quand une activité est ajoutée : cache court côté client
+    return Response(content=png, media_type="image/png", headers={"Cache-Control": "max-age=300"})
@@ -15,12 +15,12 @@ router = APIRouter(prefix="/interactions", tags=["interactions"])
 
 
 # ========== LIKES ==========
+# Routes asynchrones : les likes suivent le rythme du fil d'actualité
 
 @router.post("/activites/{activite_id}/like/{user_id}", response_model=LikeResponse)
-def liker_activite(
+async def liker_activite(
     activite_id: int,
-    user_id: int,
-    db: Session = Depends(get_db)
+    user_id: int
 ):
     """
     Liker une activité (F3)
@@ -36,7 +36,7 @@ def liker_activite(
     
     """
     # Vérifier que l'activité existe
-    activite = ActiviteService.obtenir_activite_par_id(activite_id)
+    activite = await ActiviteService.obtenir_activite_par_id_async(activite_id)
     if not activite:
         raise HTTPException(
             status_code=404,
@@ -44,7 +44,7 @@ def liker_activite(
         )
     
     # Liker
-    resultat = ActiviteService.liker_activite(user_id, activite_id)
+    resultat = await ActiviteService.liker_activite_async(user_id, activite_id)
     
     if not resultat:
         raise HTTPException(
@@ -53,7 +53,7 @@ def liker_activite(
         )
     
     # Récupérer le nombre de likes
-    nb_likes = ActiviteService.obtenir_nombre_likes(activite_id)
+    nb_likes = await ActiviteService.obtenir_nombre_likes_async(activite_id)
     
     return LikeResponse(
         success=True,
@@ -63,10 +63,9 @@ def liker_activite(
 
 
 @router.delete("/activites/{activite_id}/like/{user_id}", response_model=LikeResponse)
-def unliker_activite(
+async def unliker_activite(
     activite_id: int,
-    user_id: int,
-    db: Session = Depends(get_db)
+    user_id: int
 ):
     """
     Retirer son like d'une activité (F3)
@@ -77,7 +76,7 @@ def unliker_activite(
     
     """
     # Vérifier que l'activité existe
-    activite = ActiviteService.obtenir_activite_par_id(activite_id)
+    activite = await ActiviteService.obtenir_activite_par_id_async(activite_id)
     if not activite:
         raise HTTPException(
             status_code=404,
@@ -85,7 +84,7 @@ def unliker_activite(
         )
     
     # Unliker
-    resultat = ActiviteService.unliker_activite(user_id, activite_id)
+    resultat = await ActiviteService.unliker_activite_async(user_id, activite_id)
     
     if not resultat:
         raise HTTPException(
@@ -94,7 +93,7 @@ def unliker_activite(
         )
     
     # Récupérer le nombre de likes
-    nb_likes = ActiviteService.obtenir_nombre_likes(activite_id)
+    nb_likes = await ActiviteService.obtenir_nombre_likes_async(activite_id)
     
     return LikeResponse(
         success=True,
@@ -104,9 +103,8 @@ def unliker_activite(
 
 
 @router.get("/activites/{activite_id}/likes")
-def obtenir_likes_activite(
-    activite_id: int,
-    db: Session = Depends(get_db)
+async def obtenir_likes_activite(
+    activite_id: int
 ):
     """
     Obtenir le nombre de likes et la liste des utilisateurs qui ont liké
@@ -123,15 +121,15 @@ def obtenir_likes_activite(
     from dao.like_dao import LikeDAO
     
     # Vérifier que l'activité existe
-    activite = ActiviteService.obtenir_activite_par_id(activite_id)
+    activite = await ActiviteService.obtenir_activite_par_id_async(activite_id)
     if not activite:
         raise HTTPException(
             status_code=404,
             detail="Activité non trouvée"
         )
     
-    nb_likes = LikeDAO.count_by_activite(activite_id)
-    utilisateurs = LikeDAO.get_users_who_liked(activite_id)
+    nb_likes = await LikeDAO.count_by_activite_async(activite_id)
+    utilisateurs = await LikeDAO.get_users_who_liked_async(activite_id)
     
     return {
         "activite_id": activite_id,
@@ -148,17 +146,16 @@ def obtenir_likes_activite(
 
 
 @router.get("/activites/{activite_id}/like/{user_id}")
-def verifier_like(
+async def verifier_like(
     activite_id: int,
-    user_id: int,
-    db: Session = Depends(get_db)
+    user_id: int
 ):
     """
     Vérifier si un utilisateur a liké une activité
     
     ```
     """
-    has_liked = ActiviteService.utilisateur_a_like(user_id, activite_id)
+    has_liked = await ActiviteService.utilisateur_a_like_async(user_id, activite_id)
     
     return {
         "activite_id": activite_id,
@@ -2,6 +2,7 @@ from database import SessionLocal
 
 
 def get_db():
+    """Session de la requête : celle de son unité de travail (api.unite_requete)"""
     db = SessionLocal()
     try:
         yield db
@@ -0,0 +1,67 @@
+"""
+Limite de taille du corps des requêtes d'envoi de fichiers
+
+Une route qui déclare ses champs avec Form/File laisse FastAPI lire tout
+le formulaire multipart avant de l'appeler : sans limite, un envoi de
+plusieurs centaines de Mo serait entièrement reçu et copié sur le disque
+avant d'être refusé. Ce middleware ASGI refuse (413) une requête dont
+l'en-tête Content-Length dépasse la limite sans lire son corps, et
+interrompt la lecture dès que les octets reçus la dépassent. Il borne
+aussi les routes qui lisent leur corps en flux (utils/formulaire_flux.py).
+"""
+from typing import Dict
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+
+def _reponse_trop_volumineuse(limite: int) -> JSONResponse:
+    return JSONResponse(
+        status_code=413,
+        content={"detail": f"Requête trop volumineuse (maximum {limite // (1024 * 1024)} Mo)"}
+    )
+
+
+class LimiteTailleCorps:
+    """
+    Middleware ASGI : taille maximale du corps, par chemin de requête POST
+
+    Args:
+        app: Application ASGI
+        limites: Chemin -> taille maximale du corps en octets
+    """
+
+    def __init__(self, app, limites: Dict[str, int]):
+        self.app = app
+        self.limites = limites
+
+    async def __call__(self, scope, receive, send):
+        limite = None
+        if scope["type"] == "http" and scope["method"] == "POST":
+            limite = self.limites.get(scope["path"].rstrip("/"))
+        if limite is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Taille annoncée : refus immédiat, le corps n'est pas lu
+        for nom, valeur in scope["headers"]:
+            if nom == b"content-length" and valeur.isdigit() and int(valeur) > limite:
+                await _reponse_trop_volumineuse(limite)(scope, receive, send)
+                return
+
+        recus = 0
+
+        async def recevoir():
+            nonlocal recus
+            message = await receive()
+            if message["type"] == "http.request":
+                recus += len(message.get("body", b""))
+                if recus > limite:
+                    # Remonte jusqu'au gestionnaire d'exceptions de FastAPI (réponse 413)
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"Requête trop volumineuse (maximum {limite // (1024 * 1024)} Mo)"
+                    )
+            return message
+
+        await self.app(scope, recevoir, send)
@@ -5,9 +5,9 @@
 """
 Schémas Pydantic pour l'API
 """
-from datetime import date
+from datetime import date, datetime
 from typing import Optional, List
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 
 # ========== UTILISATEUR ==========
@@ -42,6 +42,9 @@ class UtilisateurOut(BaseModel):
     taille: Optional[float] = None
     poids: Optional[float] = None
     telephone: Optional[str] = None
+    nb_followers: int = 0
+    nb_following: int = 0
+    nb_activites: int = 0
 
     model_config = dict(from_attributes=True)
 
@@ -85,6 +88,8 @@ class ActiviteOut(BaseModel):
     distance: Optional[float] = None  # ← AJOUT ICI
     utilisateur_id: int
     gpx_path: Optional[str] = None
+    nb_likes: int = 0
+    nb_commentaires: int = 0
 
     model_config = dict(from_attributes=True)
 
@@ -98,6 +103,89 @@ class ActiviteWithUser(ActiviteOut):
     model_config = dict(from_attributes=True)
 
 
+class TacheIngestionOut(BaseModel):
+    """Schéma de sortie pour un import GPX traité en arrière-plan"""
+    id: str
+    statut: str  # en_attente, en_cours, terminee, echec
+    utilisateur_id: int
+    activite_id: Optional[int] = None
+    erreur: Optional[str] = None
+
+    model_config = dict(from_attributes=True)
+
+
+class EchecImport(BaseModel):
+    """Fichier d'une archive qui n'a pas pu être importé"""
+    fichier: str
+    erreur: str
+
+
+class ImportArchiveOut(BaseModel):
+    """Rapport d'import d'une archive de fichiers GPX"""
+    nb_fichiers: int
+    nb_importes: int
+    activite_ids: List[int]
+    echecs: List[EchecImport]
+    duree_secondes: float
+
+
+class TraceSimplifieeOut(BaseModel):
+    """Trace GPS d'une activité à un niveau de simplification"""
+    activite_id: int
+    niveau: int  # -1 = pleine résolution
+    tolerance_m: float
+    nb_points_total: int
+    points: List[List[float]]  # [lat, lon]
+
+
+class TraceEncodeeOut(BaseModel):
+    """Trace GPS d'une activité en polyligne encodée (voir utils.polyline)"""
+    activite_id: int
+    niveau: int  # -1 = pleine résolution
+    tolerance_m: float
+    nb_points_total: int
+    nb_points: int
+    polyligne: str  # lat, lon entrelacés, précision 1e-5
+    altitudes: Optional[str] = None  # précision 0.1 m
+    temps: Optional[str] = None  # s depuis temps_debut
+    temps_debut: Optional[float] = None  # POSIX
+
+
+class SplitOut(BaseModel):
+    """Temps d'une activité sur un kilomètre"""
+    numero: int
+    duree: float  # s
+
+
+class CapteursOut(BaseModel):
+    """Résumé des capteurs d'une activité GPX"""
+    activite_id: int
+    fc_moyenne: Optional[float] = None  # bpm
+    fc_max: Optional[float] = None  # bpm
+    cadence_moyenne: Optional[float] = None  # tours/min
+    puissance_moyenne: Optional[float] = None  # W
+    temperature_moyenne: Optional[float] = None  # °C
+    fc_reference: Optional[float] = None  # FC max utilisée pour les zones
+    zones_fc: Optional[List[float]] = None  # s dans les zones 1 à 5
+
+
+class ParcoursSimilaireOut(BaseModel):
+    """Autre sortie de l'utilisateur sur le même parcours"""
+    activite_id: int
+    nom: Optional[str] = None
+    date_activite: date
+    duree_activite: Optional[int] = None  # s
+    distance: Optional[float] = None
+    similarite: float  # 0 à 1
+
+
+class ParcoursOut(BaseModel):
+    """Doublon éventuel d'une activité et sorties sur le même parcours"""
+    activite_id: int
+    doublon_de: Optional[int] = None
+    parcours_similaires: List[ParcoursSimilaireOut]
+
+
 class ActiviteUpdate(BaseModel):
     """Schéma pour modifier une activité"""
     nom: Optional[str] = None
@@ -184,6 +272,96 @@ class FilActualiteItem(BaseModel):
     user_has_liked: bool
 
 
+# ========== SEGMENTS ==========
+
+class SegmentCreate(BaseModel):
+    """Schéma pour créer un segment à partir d'une portion d'activité"""
+    nom: str
+    createur_id: int
+    activite_id: int
+    indice_debut: int  # Points de la trace de l'activité qui bornent le segment
+    indice_fin: int
+    type_sport: Optional[str] = None  # None : tous les sports
+
+
+class SegmentOut(BaseModel):
+    """Schéma de sortie pour un segment"""
+    id: int
+    nom: str
+    createur_id: int
+    type_sport: Optional[str] = None
+    distance: float  # m
+    points: List[List[float]]  # [lat, lon]
+
+
+class ClassementSegmentOut(BaseModel):
+    """Ligne du classement d'un segment"""
+    rang: int
+    utilisateur_id: int
+    pseudo: str
+    duree: float  # s
+    date: date
+    activite_id: int
+
+
+class EffortSegmentOut(BaseModel):
+    """Passage d'une activité sur un segment"""
+    segment_id: int
+    segment: str
+    duree: float  # s
+    indice_debut: int
+    indice_fin: int
+
+
+# ========== DIRECT ==========
+
+class SessionDirecteCreate(BaseModel):
+    """Schéma pour démarrer une activité en direct"""
+    utilisateur_id: int
+    nom: str
+    type_sport: str
+    description: Optional[str] = None
+
+
+class PointDirectIn(BaseModel):
+    """Point de trace envoyé pendant une activité en direct"""
+    lat: float = Field(..., ge=-90, le=90)
+    lon: float = Field(..., ge=-180, le=180)
+    temps: datetime  # Sans fuseau : UTC
+    ele: Optional[float] = None  # m
+    fc: Optional[float] = None  # bpm
+    cadence: Optional[float] = None  # tours/min
+    puissance: Optional[float] = None  # W
+    temperature: Optional[float] = None  # °C
+
+
+class LotPointsIn(BaseModel):
+    """Lot de points d'une activité en direct"""
+    points: List[PointDirectIn] = Field(..., min_length=1, max_length=3600)
+    nouveau_segment: bool = False  # Reprise après un arrêt du chronomètre
+
+
+class SessionDirecteOut(BaseModel):
+    """Activité en direct et ses métriques courantes"""
+    id: int
+    utilisateur_id: int
+    nom: str
+    type_sport: str
+    statut: str  # en_cours, terminee, annulee
+    version: int  # Change à chaque lot de points
+    date_debut: datetime
+    date_maj: datetime
+    activite_id: Optional[int] = None  # Activité créée à la fin
+    nb_points: int
+    distance: float  # km
+    denivele_positif: float  # m
+    duree_ecoulee: float  # s
+    duree_mouvement: float  # s
+    allure: Optional[float] = None  # s/km sur les derniers points, None à l'arrêt
+    lat: Optional[float] = None  # Dernière position
+    lon: Optional[float] = None
+
+
 # ========== MESSAGES ==========
 
 class MessageResponse(BaseModel):
@@ -0,0 +1,95 @@
+"""
+Router pour les segments et leurs classements
+"""
+from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from api.schemas import SegmentCreate, SegmentOut, ClassementSegmentOut, EffortSegmentOut
+from api.lien_dbapi import get_db
+from service.activite_service import ActiviteService
+from service.segment_service import SegmentService
+
+router = APIRouter(prefix="/segments", tags=["segments"])
+
+
+@router.post("", response_model=SegmentOut, status_code=201)
+def creer_segment(
+    segment_data: SegmentCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Créer un segment à partir d'une portion de la trace d'une activité
+    
+    Les activités existantes sont rattachées au segment en arrière-plan ;
+    les activités importées ensuite le sont à l'import.
+    """
+    segment = SegmentService.creer_segment_depuis_activite(
+        nom=segment_data.nom,
+        createur_id=segment_data.createur_id,
+        activite_id=segment_data.activite_id,
+        indice_debut=segment_data.indice_debut,
+        indice_fin=segment_data.indice_fin,
+        type_sport=segment_data.type_sport
+    )
+    
+    if not segment:
+        raise HTTPException(
+            status_code=400,
+            detail="Impossible de créer le segment (trace absente ou indices invalides)"
+        )
+    
+    background_tasks.add_task(SegmentService.rattacher_activites, segment.id)
+    
+    return SegmentService.obtenir_segment(segment.id)
+
+
+@router.get("/{segment_id}", response_model=SegmentOut)
+def obtenir_segment(segment_id: int, db: Session = Depends(get_db)):
+    """
+    Récupérer un segment et ses points
+    """
+    segment = SegmentService.obtenir_segment(segment_id)
+    
+    if not segment:
+        raise HTTPException(
+            status_code=404,
+            detail="Segment non trouvé"
+        )
+    
+    return segment
+
+
+@router.get("/{segment_id}/classement", response_model=List[ClassementSegmentOut])
+def obtenir_classement_segment(
+    segment_id: int,
+    limit: int = Query(50, ge=1, le=500, description="Nombre d'utilisateurs classés"),
+    db: Session = Depends(get_db)
+):
+    """
+    Classement d'un segment : meilleur temps de chaque utilisateur
+    
+    **duree** en secondes
+    """
+    if not SegmentService.obtenir_segment(segment_id):
+        raise HTTPException(
+            status_code=404,
+            detail="Segment non trouvé"
+        )
+    
+    return SegmentService.obtenir_classement(segment_id, limit)
+
+
+@router.get("/activite/{activite_id}", response_model=List[EffortSegmentOut])
+def obtenir_efforts_activite(activite_id: int, db: Session = Depends(get_db)):
+    """
+    Passages d'une activité sur les segments
+    """
+    if not ActiviteService.obtenir_activite_par_id(activite_id):
+        raise HTTPException(
+            status_code=404,
+            detail="Activité non trouvée"
+        )
+    
+    return SegmentService.obtenir_efforts_activite(activite_id)
@@ -1,19 +1,18 @@
 """
 Router pour les statistiques utilisateur (F4)
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Query
 from typing import Dict, List
 
 from api.schemas import StatistiquesResume, StatistiquesSport, StatistiquesHebdo
-from api.lien_dbapi import get_db
-from service.statistiques_service import StatistiquesService
+from database import executer_async
+from service.statistiques_service import StatistiquesService, TEMPS_ECOULE, TEMPS_MOUVEMENT
 
 router = APIRouter(prefix="/statistiques", tags=["statistiques"])
 
 
 @router.get("/{user_id}/complet")
-def obtenir_statistiques_completes(
+async def obtenir_statistiques_completes(
     user_id: int,
     nb_semaines: int = Query(12, description="Nombre de semaines à analyser"),
     sections: str = Query(
@@ -24,7 +23,11 @@ def obtenir_statistiques_completes(
         None,
         description="Sports pour la progression (séparés par virgules). Si non spécifié, analyse tous les sports"
     ),
-    db: Session = Depends(get_db)
+    temps: str = Query(
+        TEMPS_ECOULE,
+        pattern=f"^({TEMPS_ECOULE}|{TEMPS_MOUVEMENT})$",
+        description="Durée des activités : ecoule (pauses comprises) ou mouvement (pauses exclues)"
+    )
 ):
     """
     Obtenir toutes les statistiques en une seule requête avec sections sélectives
@@ -37,14 +40,31 @@ def obtenir_statistiques_completes(
     - progression: Analyse de progression (nécessite paramètre sports)
     -*tableau_bord: KPIs simplifiés (7j, 30j, totaux)
     
+    Les durées et les heures sont calculées sur le temps écoulé ou, avec
+    **temps=mouvement**, sur le temps en mouvement (pauses détectées exclues).
 
+    Les services de statistiques s'exécutent sur la connexion asynchrone de
+    la requête : l'attente de la base n'occupe pas de thread.
     """
+    return await executer_async(
+        _calculer_statistiques_completes, user_id, nb_semaines, sections, sports, temps
+    )
+
+
+def _calculer_statistiques_completes(
+    user_id: int,
+    nb_semaines: int,
+    sections: str,
+    sports: str,
+    temps: str
+) -> Dict:
+    """Sections demandées des statistiques (code synchrone, voir executer_async)"""
     sections_list = [s.strip() for s in sections.split(',')]
     result = {}
     
     # Résumé global
     if 'resume' in sections_list:
-        result['resume_global'] = StatistiquesService.obtenir_resume_global(user_id)
+        result['resume_global'] = StatistiquesService.obtenir_resume_global(user_id, temps)
     
     # Statistiques hebdomadaires
     if 'hebdo' in sections_list:
@@ -52,7 +72,7 @@ def obtenir_statistiques_completes(
             user_id, nb_semaines
         )
         stats_heures = StatistiquesService.obtenir_heures_par_semaine(
-            user_id, nb_semaines
+            user_id, nb_semaines, temps
         )
         stats_km = StatistiquesService.obtenir_kilometres_par_semaine(
             user_id, nb_semaines
@@ -80,7 +100,7 @@ def obtenir_statistiques_completes(
     # Statistiques par sport
     if 'sports' in sections_list:
         stats = StatistiquesService.obtenir_statistiques_par_sport(
-            user_id, nb_semaines
+            user_id, nb_semaines, temps
         )
         result['par_sport'] = {
             "periode_semaines": nb_semaines,
@@ -89,7 +109,7 @@ def obtenir_statistiques_completes(
     
     # Records personnels
     if 'records' in sections_list:
-        result['records'] = StatistiquesService.obtenir_records_personnels(user_id)
+        result['records'] = StatistiquesService.obtenir_records_personnels(user_id, temps)
     
     # Progression par sport
     if 'progression' in sections_list:
@@ -107,7 +127,7 @@ def obtenir_statistiques_completes(
         
         for sport in sports_list:
             progression = StatistiquesService.obtenir_progression(
-                user_id, sport, nb_semaines
+                user_id, sport, nb_semaines, temps
             )
             
             if progression['nombre_activites'] >= 2:
@@ -127,9 +147,9 @@ def obtenir_statistiques_completes(
     
     # Tableau de bord
     if 'tableau_bord' in sections_list:
-        stats_7j = StatistiquesService.obtenir_statistiques_completes(user_id, 1)
-        stats_30j = StatistiquesService.obtenir_statistiques_completes(user_id, 4)
-        resume = StatistiquesService.obtenir_resume_global(user_id)
+        stats_7j = StatistiquesService.obtenir_statistiques_completes(user_id, 1, temps)
+        stats_30j = StatistiquesService.obtenir_statistiques_completes(user_id, 4, temps)
+        resume = StatistiquesService.obtenir_resume_global(user_id, temps)
         stats_sports = StatistiquesService.obtenir_statistiques_par_sport(user_id, 12)
         
         sport_favori = None
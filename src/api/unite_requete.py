@@ -0,0 +1,58 @@
+"""
+Une unité de travail par requête (voir database.unite_de_travail)
+
+Tous les DAO et services appelés pendant une requête partagent une session,
+une connexion et une transaction. Les requêtes GET, HEAD et OPTIONS sont en
+lecture, les autres en écriture. La transaction est validée juste avant
+l'envoi de la réponse : le client qui la reçoit voit ses écritures, et un
+échec de validation devient une erreur 500 au lieu d'être perdu. Elle est
+annulée si une exception remonte de la route, ou si la réponse est une
+erreur serveur (5xx, HTTPException comprise).
+
+La fin d'une unité ne prend un thread que si la route a utilisé une session
+synchrone : celle d'une route asynchrone est validée dans la boucle.
+"""
+from typing import Iterable
+
+from database import ECRITURE, LECTURE, unite_de_travail
+
+METHODES_LECTURE = {"GET", "HEAD", "OPTIONS"}
+
+
+class UniteDeTravailRequete:
+    """
+    Middleware ASGI : ouvre une unité de travail pour chaque requête HTTP
+
+    Args:
+        app: Application ASGI
+        exclus: Chemins dont les traitements gèrent eux-mêmes leurs
+            transactions (imports par lots validés au fur et à mesure)
+    """
+
+    def __init__(self, app, exclus: Iterable[str] = ()):
+        self.app = app
+        self.exclus = set(exclus)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].rstrip("/") in self.exclus:
+            await self.app(scope, receive, send)
+            return
+
+        unite = unite_de_travail(LECTURE if scope["method"] in METHODES_LECTURE else ECRITURE)
+        jeton = unite.lier()
+
+        async def envoyer(message):
+            if message["type"] == "http.response.start" and unite.ouverte:
+                if message["status"] >= 500:
+                    await unite.annuler_async()
+                else:
+                    await unite.terminer_async()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, envoyer)
+        except BaseException:
+            await unite.annuler_async()
+            raise
+        finally:
+            unite.delier(jeton)
@@ -1,6 +1,8 @@
+from datetime import datetime
+
 from sqlalchemy import (
-    Column, Integer, String, Float,
-    Date, Text, LargeBinary, ForeignKey, Table,
+    Column, Integer, BigInteger, String, Float,
+    Date, DateTime, Text, LargeBinary, ForeignKey, Table, Index, DDL, event,
 )
 from sqlalchemy.orm import relationship
 from src.database import Base
@@ -12,6 +14,8 @@ follows = Table(
     Base.metadata,
     Column('follower_id', Integer, ForeignKey('Utilisateur.id'), primary_key=True),
     Column('followed_id', Integer, ForeignKey('Utilisateur.id'), primary_key=True), 
+    # Abonnés d'un utilisateur (la clé primaire ne sert que depuis follower_id)
+    Index('ix_follow_followed', 'followed_id'),
     extend_existing=True
 )
 
@@ -20,6 +24,8 @@ likes = Table(
     Base.metadata,
     Column('utilisateur_id', Integer, ForeignKey('Utilisateur.id'), primary_key=True),
     Column('activite_id', Integer, ForeignKey('Activite.id'), primary_key=True), 
+    # Likes d'une activité (la clé primaire ne sert que depuis utilisateur_id)
+    Index('ix_like_activite', 'activite_id'),
     extend_existing=True
 )
 
@@ -42,6 +48,11 @@ class Utilisateur(Base):
     telephone = Column(String)
     mdp = Column(String, nullable=False)
 
+    # Compteurs dénormalisés, ajustés par chaque écriture (voir dao/compteurs_dao.py)
+    nb_followers = Column(Integer, nullable=False, default=0, server_default="0")
+    nb_following = Column(Integer, nullable=False, default=0, server_default="0")
+    nb_activites = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Relations ORM - AVEC chemins complets
     followers = relationship(
         "business_objects.models.Utilisateur",  # <--- MODIFIÉ
@@ -65,7 +76,17 @@ class Utilisateur(Base):
 
 class Activite(Base):
     __tablename__ = 'Activite'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Activités d'un utilisateur par date (profil, fil, statistiques)
+        Index('ix_activite_utilisateur_date', 'utilisateur_id', 'date_activite'),
+        # Mêmes requêtes filtrées par sport
+        Index('ix_activite_utilisateur_sport_date', 'utilisateur_id', 'type_sport', 'date_activite'),
+        # Records personnels : (utilisateur, sport) trié par durée, dénivelé, calories
+        Index('ix_activite_record_duree', 'utilisateur_id', 'type_sport', 'duree_activite'),
+        Index('ix_activite_record_denivele', 'utilisateur_id', 'type_sport', 'd_plus'),
+        Index('ix_activite_record_calories', 'utilisateur_id', 'type_sport', 'calories'),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     nom = Column(String(255))
@@ -77,6 +98,10 @@ class Activite(Base):
     d_plus = Column(Integer, nullable=True)
     calories = Column(Integer, nullable=True)
     distance = Column(Float, nullable=True)  # ← AJOUT ICI (en km)
+
+    # Compteurs dénormalisés, ajustés par chaque écriture (voir dao/compteurs_dao.py)
+    nb_likes = Column(Integer, nullable=False, default=0, server_default="0")
+    nb_commentaires = Column(Integer, nullable=False, default=0, server_default="0")
     
     utilisateur_id = Column(Integer, ForeignKey('Utilisateur.id'), nullable=False)
 
@@ -92,6 +117,50 @@ class Activite(Base):
         secondary=likes,
         back_populates="liked_activites"
     )
+    meilleurs_efforts = relationship(
+        "business_objects.models.MeilleurEffort",
+        back_populates="activite",
+        cascade="all, delete-orphan"
+    )
+    splits = relationship(
+        "business_objects.models.Split",
+        back_populates="activite",
+        cascade="all, delete-orphan",
+        order_by="business_objects.models.Split.numero"
+    )
+    metriques = relationship(
+        "business_objects.models.MetriquesActivite",
+        back_populates="activite",
+        cascade="all, delete-orphan"
+    )
+    capteurs = relationship(
+        "business_objects.models.DonneesCapteurs",
+        back_populates="activite",
+        cascade="all, delete-orphan",
+        uselist=False
+    )
+    efforts_segments = relationship(
+        "business_objects.models.EffortSegment",
+        back_populates="activite",
+        cascade="all, delete-orphan"
+    )
+    emprise = relationship(
+        "business_objects.models.EmpriseActivite",
+        back_populates="activite",
+        cascade="all, delete-orphan",
+        uselist=False
+    )
+    signature_parcours = relationship(
+        "business_objects.models.SignatureParcours",
+        back_populates="activite",
+        cascade="all, delete-orphan",
+        uselist=False,
+        foreign_keys="business_objects.models.SignatureParcours.activite_id"
+    )
+    buckets_parcours = relationship(
+        "business_objects.models.BucketParcours",
+        cascade="all, delete-orphan"
+    )
 
     def __repr__(self):
         return f"<Activite(nom='{self.nom}', type='{self.type_sport}')>"
@@ -99,7 +168,10 @@ class Activite(Base):
 
 class Commentaire(Base):
     __tablename__ = 'Commentaire'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index('ix_commentaire_activite', 'activite_id'),
+        {'extend_existing': True},
+    )
 
     id = Column(Integer, primary_key=True)
     contenu = Column(Text, nullable=False)
@@ -112,4 +184,309 @@ class Commentaire(Base):
     auteur = relationship("business_objects.models.Utilisateur", back_populates="commentaires") # <--- MODIFIÉ
 
     def __repr__(self):
-        return f"<Commentaire(id={self.id}, activite_id={self.activite_id})>"
\ No newline at end of file
+        return f"<Commentaire(id={self.id}, activite_id={self.activite_id})>"
+
+class FichierGPX(Base):
+    """Fichier GPX stocké une seule fois sous l'empreinte SHA-256 de son contenu"""
+    __tablename__ = 'FichierGPX'
+    __table_args__ = {'extend_existing': True}
+
+    empreinte = Column(String(64), primary_key=True)
+    chemin = Column(String(512), nullable=False)
+    taille = Column(Integer)
+    nb_references = Column(Integer, nullable=False, default=0)  # Activités qui utilisent le fichier
+    metriques = Column(Text, nullable=True)  # Résultat d'analyse mis en cache (JSON)
+
+    def __repr__(self):
+        return f"<FichierGPX(empreinte='{self.empreinte[:12]}', references={self.nb_references})>"
+
+
+class TacheIngestion(Base):
+    """Suivi d'un import GPX traité en arrière-plan"""
+    __tablename__ = 'TacheIngestion'
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(String(32), primary_key=True)
+    utilisateur_id = Column(Integer, ForeignKey('Utilisateur.id'), nullable=False)
+    statut = Column(String(16), nullable=False, default="en_attente")  # en_attente, en_cours, terminee, echec
+    activite_id = Column(Integer, nullable=True)  # Renseigné quand la tâche est terminée
+    erreur = Column(Text, nullable=True)
+    date_creation = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TacheIngestion(id='{self.id}', statut='{self.statut}')>"
+
+
+class MeilleurEffort(Base):
+    """Meilleur temps d'une activité sur une distance de référence (1 km, 5 km...)"""
+    __tablename__ = 'MeilleurEffort'
+    __table_args__ = (
+        # Les records se lisent par index : (utilisateur, sport, distance) trié par durée
+        Index('ix_meilleur_effort_record', 'utilisateur_id', 'type_sport', 'nom', 'duree'),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    activite_id = Column(Integer, ForeignKey('Activite.id'), nullable=False, index=True)
+    utilisateur_id = Column(Integer, ForeignKey('Utilisateur.id'), nullable=False)
+    type_sport = Column(String, nullable=False)
+    nom = Column(String(32), nullable=False)  # 1km, 5km, 10km, semi_marathon
+    distance = Column(Float, nullable=False)  # m
+    duree = Column(Float, nullable=False)  # s
+    date_activite = Column(Date, nullable=False)
+    indice_debut = Column(Integer)  # Points de la trace qui bornent l'effort
+    indice_fin = Column(Integer)
+
+    activite = relationship("business_objects.models.Activite", back_populates="meilleurs_efforts")
+
+    def __repr__(self):
+        return f"<MeilleurEffort(activite_id={self.activite_id}, nom='{self.nom}', duree={self.duree})>"
+
+
+class Split(Base):
+    """Temps d'une activité sur chaque kilomètre complet"""
+    __tablename__ = 'Split'
+    __table_args__ = {'extend_existing': True}
+
+    activite_id = Column(Integer, ForeignKey('Activite.id'), primary_key=True)
+    numero = Column(Integer, primary_key=True)  # 1 pour le premier kilomètre
+    duree = Column(Float, nullable=False)  # s
+
+    activite = relationship("business_objects.models.Activite", back_populates="splits")
+
+    def __repr__(self):
+        return f"<Split(activite_id={self.activite_id}, numero={self.numero}, duree={self.duree})>"
+
+
+class MetriquesActivite(Base):
+    """Métriques d'une activité GPX calculées par une version de l'algorithme"""
+    __tablename__ = 'MetriquesActivite'
+    __table_args__ = {'extend_existing': True}
+
+    activite_id = Column(Integer, ForeignKey('Activite.id'), primary_key=True)
+    version = Column(Integer, primary_key=True, index=True)  # utils.track_metrics.VERSION_METRIQUES
+    distance = Column(Float)  # km
+    duree_secondes = Column(Float)
+    duree_mouvement = Column(Float)
+    duree_pauses = Column(Float)  # s
+    nb_pauses = Column(Integer)
+    denivele_positif = Column(Float)
+    denivele_negatif = Column(Float)
+    vitesse_max = Column(Float)  # km/h
+    vitesse_moyenne = Column(Float)  # km/h
+    calories = Column(Integer)
+    date_calcul = Column(DateTime, default=datetime.utcnow)
+
+    activite = relationship("business_objects.models.Activite", back_populates="metriques")
+
+    def __repr__(self):
+        return f"<MetriquesActivite(activite_id={self.activite_id}, version={self.version})>"
+
+
+class DonneesCapteurs(Base):
+    """Résumé des capteurs d'une activité GPX (cardio, cadence, puissance, température)"""
+    __tablename__ = 'DonneesCapteurs'
+    __table_args__ = {'extend_existing': True}
+
+    activite_id = Column(Integer, ForeignKey('Activite.id'), primary_key=True)
+    fc_moyenne = Column(Float)  # bpm
+    fc_max = Column(Float)  # bpm
+    cadence_moyenne = Column(Float)  # tours/min
+    puissance_moyenne = Column(Float)  # W
+    temperature_moyenne = Column(Float)  # °C
+    fc_reference = Column(Float)  # FC max utilisée pour les zones
+    zone_1 = Column(Float)  # s passées dans chaque zone cardiaque
+    zone_2 = Column(Float)
+    zone_3 = Column(Float)
+    zone_4 = Column(Float)
+    zone_5 = Column(Float)
+
+    activite = relationship("business_objects.models.Activite", back_populates="capteurs")
+
+    def __repr__(self):
+        return f"<DonneesCapteurs(activite_id={self.activite_id}, fc_moyenne={self.fc_moyenne})>"
+
+
+class Segment(Base):
+    """Portion de parcours nommée (une montée, une boucle...) sur laquelle les temps sont classés"""
+    __tablename__ = 'Segment'
+    __table_args__ = (
+        # Préfiltre des segments candidats pour une trace : plage de latitude
+        Index('ix_segment_emprise', 'lat_min', 'lat_max'),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    nom = Column(String, nullable=False)
+    createur_id = Column(Integer, ForeignKey('Utilisateur.id'), nullable=False)
+    type_sport = Column(String)  # None : tous les sports
+    distance = Column(Float, nullable=False)  # m
+    points = Column(LargeBinary, nullable=False)  # Latitudes puis longitudes en float64
+    lat_min = Column(Float, nullable=False)  # Degrés
+    lat_max = Column(Float, nullable=False)
+    lon_min = Column(Float, nullable=False)
+    lon_max = Column(Float, nullable=False)
+    date_creation = Column(DateTime, default=datetime.utcnow)
+
+    efforts = relationship(
+        "business_objects.models.EffortSegment",
+        back_populates="segment",
+        cascade="all, delete-orphan"
+    )
+
+    def __repr__(self):
+        return f"<Segment(nom='{self.nom}', distance={self.distance})>"
+
+
+class EffortSegment(Base):
+    """Passage d'une activité sur un segment"""
+    __tablename__ = 'EffortSegment'
+    __table_args__ = (
+        # Les classements se lisent par index : segment trié par durée
+        Index('ix_effort_segment_classement', 'segment_id', 'duree'),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    segment_id = Column(Integer, ForeignKey('Segment.id'), nullable=False)
+    activite_id = Column(Integer, ForeignKey('Activite.id'), nullable=False, index=True)
+    utilisateur_id = Column(Integer, ForeignKey('Utilisateur.id'), nullable=False)
+    duree = Column(Float, nullable=False)  # s
+    date_activite = Column(Date, nullable=False)
+    indice_debut = Column(Integer)  # Points de la trace qui bornent le passage
+    indice_fin = Column(Integer)
+
+    segment = relationship("business_objects.models.Segment", back_populates="efforts")
+    activite = relationship("business_objects.models.Activite", back_populates="efforts_segments")
+
+    def __repr__(self):
+        return f"<EffortSegment(segment_id={self.segment_id}, activite_id={self.activite_id}, duree={self.duree})>"
+
+
+class EmpriseActivite(Base):
+    """Emprise géographique d'une activité GPX : rectangle englobant, départ et arrivée"""
+    __tablename__ = 'EmpriseActivite'
+    __table_args__ = (
+        # Repli hors SQLite (pas de R*Tree) : recherche par plage de latitude
+        Index('ix_emprise_activite_lat', 'lat_min', 'lat_max'),
+        Index('ix_emprise_activite_depart', 'lat_depart', 'lon_depart'),
+        {'extend_existing': True},
+    )
+
+    activite_id = Column(Integer, ForeignKey('Activite.id'), primary_key=True)
+    lat_min = Column(Float, nullable=False)  # Degrés
+    lat_max = Column(Float, nullable=False)
+    lon_min = Column(Float, nullable=False)
+    lon_max = Column(Float, nullable=False)
+    lat_depart = Column(Float, nullable=False)
+    lon_depart = Column(Float, nullable=False)
+    lat_arrivee = Column(Float, nullable=False)
+    lon_arrivee = Column(Float, nullable=False)
+
+    activite = relationship("business_objects.models.Activite", back_populates="emprise")
+
+    def __repr__(self):
+        return f"<EmpriseActivite(activite_id={self.activite_id})>"
+
+
+# Index spatiaux SQLite (R*Tree) des emprises et des points de départ,
+# tenus à jour par triggers quel que soit le chemin d'écriture
+INDEX_SPATIAUX = {
+    'EmpriseActivite_rtree': ('new.lat_min', 'new.lat_max', 'new.lon_min', 'new.lon_max'),
+    'DepartActivite_rtree': ('new.lat_depart', 'new.lat_depart', 'new.lon_depart', 'new.lon_depart'),
+}
+
+for _index, (_lat_min, _lat_max, _lon_min, _lon_max) in INDEX_SPATIAUX.items():
+    for _instruction in (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {_index} USING rtree(id, lat_min, lat_max, lon_min, lon_max)",
+        f"CREATE TRIGGER IF NOT EXISTS {_index}_insert AFTER INSERT ON EmpriseActivite BEGIN "
+        f"INSERT INTO {_index} VALUES (new.activite_id, {_lat_min}, {_lat_max}, {_lon_min}, {_lon_max}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {_index}_update AFTER UPDATE ON EmpriseActivite BEGIN "
+        f"UPDATE {_index} SET lat_min = {_lat_min}, lat_max = {_lat_max}, lon_min = {_lon_min}, "
+        f"lon_max = {_lon_max} WHERE id = old.activite_id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {_index}_delete AFTER DELETE ON EmpriseActivite BEGIN "
+        f"DELETE FROM {_index} WHERE id = old.activite_id; END",
+    ):
+        event.listen(EmpriseActivite.__table__, "after_create", DDL(_instruction).execute_if(dialect="sqlite"))
+    event.listen(
+        EmpriseActivite.__table__, "after_drop",
+        DDL(f"DROP TABLE IF EXISTS {_index}").execute_if(dialect="sqlite")
+    )
+
+
+class SignatureParcours(Base):
+    """Signature MinHash du parcours d'une activité (utils.signature_parcours)"""
+    __tablename__ = 'SignatureParcours'
+    __table_args__ = {'extend_existing': True}
+
+    activite_id = Column(Integer, ForeignKey('Activite.id'), primary_key=True)
+    utilisateur_id = Column(Integer, ForeignKey('Utilisateur.id'), nullable=False)
+    signature = Column(LargeBinary, nullable=False)  # NB_PERMUTATIONS uint32
+    # Activité d'origine si celle-ci en est un doublon (même sortie importée deux fois)
+    doublon_de = Column(Integer, ForeignKey('Activite.id', ondelete='SET NULL'), nullable=True)
+
+    activite = relationship(
+        "business_objects.models.Activite",
+        back_populates="signature_parcours",
+        foreign_keys=[activite_id]
+    )
+
+    def __repr__(self):
+        return f"<SignatureParcours(activite_id={self.activite_id}, doublon_de={self.doublon_de})>"
+
+
+class BucketParcours(Base):
+    """Bande LSH d'une signature de parcours : les activités d'un même bucket sont candidates"""
+    __tablename__ = 'BucketParcours'
+    __table_args__ = (
+        # Recherche des candidats : un accès par bande, parmi les activités de l'utilisateur
+        Index('ix_bucket_parcours_cle', 'utilisateur_id', 'bande', 'cle'),
+        {'extend_existing': True},
+    )
+
+    activite_id = Column(Integer, ForeignKey('Activite.id'), primary_key=True)
+    bande = Column(Integer, primary_key=True)
+    utilisateur_id = Column(Integer, ForeignKey('Utilisateur.id'), nullable=False)
+    cle = Column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<BucketParcours(activite_id={self.activite_id}, bande={self.bande})>"
+
+
+class SessionDirecte(Base):
+    """Activité en cours, suivie en direct (utils.suivi_direct)"""
+    __tablename__ = 'SessionDirecte'
+    __table_args__ = (
+        # Sessions en cours des utilisateurs suivis
+        Index('ix_session_directe_statut', 'statut', 'utilisateur_id'),
+        {'extend_existing': True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    utilisateur_id = Column(Integer, ForeignKey('Utilisateur.id'), nullable=False)
+    nom = Column(String(255), nullable=False)
+    type_sport = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    statut = Column(String(16), nullable=False, default="en_cours")  # en_cours, terminee, annulee
+    version = Column(Integer, nullable=False, default=0)  # Incrémentée à chaque lot de points
+    nb_points = Column(Integer, nullable=False, default=0)  # Points valides du fichier de points
+    etat = Column(Text, nullable=False)  # EtatDirect.vers_dict() en JSON
+    activite_id = Column(Integer, ForeignKey('Activite.id'), nullable=True)  # Renseigné à la fin
+    date_debut = Column(DateTime, default=datetime.utcnow)
+    date_maj = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SessionDirecte(id={self.id}, statut='{self.statut}', nb_points={self.nb_points})>"
+
+
+class VersionSchema(Base):
+    """Migration appliquée à la base (database.migrations)"""
+    __tablename__ = 'VersionSchema'
+    __table_args__ = {'extend_existing': True}
+
+    version = Column(Integer, primary_key=True)
+    description = Column(String(255), nullable=False)
+    date_application = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<VersionSchema(version={self.version})>"
@@ -0,0 +1,103 @@
+"""
+Migration unique : compression (gzip) des fichiers GPX déjà stockés en clair
+
+Chaque fichier est compressé à côté de l'original, les chemins des
+activités et des fichiers GPX sont mis à jour dans une transaction,
+puis l'original est supprimé. Les chemins stockés sont relatifs à la
+racine du projet : le dossier donné (relatif, absolu, ./...) est ramené
+à cette forme avant de chercher les références. L'original n'est
+supprimé que si toutes ses références ont été réécrites ; un fichier
+que rien ne référence est laissé tel quel. Le script peut être relancé
+sans risque : les fichiers déjà compressés sont ignorés.
+
+Usage (depuis la racine du projet) :
+    python src/compresser_gpx.py --dossier uploads/gpx
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Les modèles importent `src.database` : la racine du projet doit être dans le chemin
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import SessionLocal, engine
+from database.migrations import migrer
+from business_objects.models import Activite, FichierGPX
+from dao.fichier_gpx_dao import formes_stockees
+from utils.stockage_gpx import compresser_fichier, est_compresse
+
+
+def compresser_dossier(dossier: str) -> dict:
+    """
+    Compresse tous les fichiers GPX en clair d'un dossier
+
+    Returns:
+        Rapport : nb_fichiers, taille_avant, taille_apres (octets),
+        non_references (fichiers laissés en clair faute de référence)
+    """
+    rapport = {"nb_fichiers": 0, "taille_avant": 0, "taille_apres": 0, "non_references": 0}
+
+    for nom in sorted(os.listdir(dossier)):
+        chemin = os.path.join(dossier, nom)
+        if nom.startswith(".") or not os.path.isfile(chemin) or est_compresse(chemin):
+            continue
+
+        formes = formes_stockees(chemin)
+        compresse = compresser_fichier(chemin)
+
+        db = SessionLocal()
+        try:
+            activites = db.query(Activite).filter(Activite.gpx_path.in_(formes))
+            fichiers = db.query(FichierGPX).filter(FichierGPX.chemin.in_(formes))
+            attendus = (activites.count(), fichiers.count())
+            if attendus == (0, 0):
+                # Rien ne pointe vers ce fichier : on garde l'original tel quel
+                db.rollback()
+                os.remove(compresse)
+                rapport["non_references"] += 1
+                print(f"⚠️ {chemin} : aucune référence en base, fichier conservé")
+                continue
+
+            # Chaque référence garde sa forme (relative ou absolue), suffixée de .gz
+            reecrits = (
+                activites.update({"gpx_path": Activite.gpx_path + ".gz"}, synchronize_session=False),
+                fichiers.update({"chemin": FichierGPX.chemin + ".gz"}, synchronize_session=False),
+            )
+            if reecrits != attendus:
+                raise RuntimeError(f"{reecrits} références réécrites sur {attendus}")
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            os.remove(compresse)
+            print(f"❌ {chemin} : {e}")
+            continue
+        finally:
+            db.close()
+
+        rapport["nb_fichiers"] += 1
+        rapport["taille_avant"] += os.path.getsize(chemin)
+        rapport["taille_apres"] += os.path.getsize(compresse)
+        os.remove(chemin)
+
+    return rapport
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compresser les fichiers GPX stockés en clair")
+    parser.add_argument("--dossier", default="uploads/gpx", help="Dossier de stockage des GPX")
+    args = parser.parse_args()
+
+    migrer(engine)
+    rapport = compresser_dossier(args.dossier)
+
+    avant, apres = rapport["taille_avant"], rapport["taille_apres"]
+    ratio = avant / apres if apres else 0
+    print(f"✓ {rapport['nb_fichiers']} fichiers compressés : "
+          f"{avant / 1e6:.1f} Mo → {apres / 1e6:.1f} Mo (x{ratio:.1f})")
+    if rapport["non_references"]:
+        print(f"⚠️ {rapport['non_references']} fichiers sans référence laissés en clair")
+
+
+if __name__ == "__main__":
+    main()
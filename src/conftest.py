@@ -0,0 +1,89 @@
+"""
+Configuration commune des tests (PYTHONPATH=src python -m pytest src/...)
+
+Les tests n'utilisent jamais la base de développement (data/app_sportive.db) :
+DATABASE_URL pointe vers une base SQLite temporaire, fixée avant le premier
+import de `database` et supprimée à la fin de la session. Les fichiers
+produits (traces, tuiles, points en direct) vont dans le dossier temporaire
+de chaque test.
+
+Fixtures partagées :
+- setup_database : tables vides avant chaque test, supprimées après
+- gpx : construit le contenu d'un fichier GPX à partir de points
+"""
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+DEBUT_TRACE = datetime(2025, 1, 1, 10, 0, 0)
+
+_dossier_base = None
+
+
+def pytest_configure(config):
+    global _dossier_base
+    _dossier_base = tempfile.mkdtemp(prefix="tests_app_sportive_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(_dossier_base) / 'tests.db'}"
+
+
+def pytest_unconfigure(config):
+    database = sys.modules.get("database")
+    if database is not None:
+        database.engine.dispose()
+    if _dossier_base is not None:
+        shutil.rmtree(_dossier_base, ignore_errors=True)
+
+
+def construire_gpx(points, debut: datetime = DEBUT_TRACE) -> bytes:
+    """
+    Contenu d'un fichier GPX 1.1 d'un seul segment
+
+    Args:
+        points: (lat, lon, secondes depuis debut) ou (lat, lon, secondes, altitude)
+        debut: Date et heure du premier point
+    """
+    trkpts = []
+    for point in points:
+        lat, lon, secondes = point[:3]
+        altitude = f"<ele>{point[3]}</ele>" if len(point) > 3 else ""
+        temps = (debut + timedelta(seconds=secondes)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        trkpts.append(f'<trkpt lat="{lat:.9f}" lon="{lon:.9f}">{altitude}<time>{temps}</time></trkpt>')
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1">'
+        f'<trk><trkseg>{"".join(trkpts)}</trkseg></trk></gpx>'
+    ).encode()
+
+
+@pytest.fixture
+def gpx():
+    """Constructeur de fichiers GPX (voir construire_gpx)"""
+    return construire_gpx
+
+
+@pytest.fixture(scope="function")
+def setup_database(tmp_path, monkeypatch):
+    """Crée des tables vides avant chaque test et les supprime après"""
+    # Importés ici : `database` ne doit être chargé qu'après pytest_configure
+    from database import Base, engine
+    from dao.session_directe_dao import SessionDirecteDAO
+    from dao.trace_dao import TraceDAO
+    from dao.tuile_dao import TuileDAO
+    from service import ingestion_service
+
+    monkeypatch.setattr(TraceDAO, "dossier", tmp_path / "traces")
+    monkeypatch.setattr(TuileDAO, "dossier", tmp_path / "tuiles")
+    monkeypatch.setattr(SessionDirecteDAO, "dossier", tmp_path / "directs")
+    monkeypatch.setattr(ingestion_service, "NB_WORKERS", 1)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield
+    ingestion_service.arreter_pool()
+    Base.metadata.drop_all(bind=engine)
@@ -8,11 +8,13 @@ from .activite_dao import ActiviteDAO
 from .commentaire_dao import CommentaireDAO
 from .follow_dao import FollowDAO
 from .like_dao import LikeDAO
+from .trace_dao import TraceDAO
 
 __all__ = [
     'UtilisateurDAO',
     'ActiviteDAO',
     'CommentaireDAO',
     'FollowDAO',
-    'LikeDAO'
+    'LikeDAO',
+    'TraceDAO'
 ]
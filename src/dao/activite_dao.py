@@ -2,14 +2,16 @@
 DAO pour la table Activite
 Gère toutes les opérations de base de données pour les activités
 """
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from datetime import date
-from sqlalchemy import and_, or_, desc
+from sqlalchemy import and_, or_, desc, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from database import SessionLocal
-from business_objects.models import Activite
+from database import SessionLocal, session_async
+from business_objects.models import Activite, Utilisateur
+from dao.emprise_activite_dao import EmpriseActiviteDAO
+from dao.compteurs_dao import CompteursDAO
 
 
 class ActiviteDAO:
@@ -62,6 +64,7 @@ class ActiviteDAO:
             )
 
             db.add(activite)
+            db.execute(CompteursDAO.activites(utilisateur_id, +1))
             db.commit()
             db.refresh(activite)
             return activite
@@ -94,6 +97,12 @@ class ActiviteDAO:
         finally:
             db.close()
 
+    @staticmethod
+    async def get_by_id_async(activite_id: int) -> Optional[Activite]:
+        """Variante asynchrone de get_by_id"""
+        async with session_async() as db:
+            return await db.get(Activite, activite_id)
+
     @staticmethod
     def get_all() -> List[Activite]:
         """
@@ -202,30 +211,39 @@ class ActiviteDAO:
 
     @staticmethod
     def get_by_filters(
-        utilisateur_id: int,
+        utilisateur_id: Optional[int],
         type_sport: Optional[str] = None,
         date_debut: Optional[date] = None,
         date_fin: Optional[date] = None,
         limit: Optional[int] = None,
-        offset: int = 0
+        offset: int = 0,
+        zone: Optional[Tuple[float, float, float, float]] = None,
+        autour: Optional[Tuple[float, float, float]] = None
     ) -> List[Activite]:
         """
         Récupère les activités avec filtres multiples
 
         Args:
-            utilisateur_id: ID de l'utilisateur
+            utilisateur_id: ID de l'utilisateur (None : tous les utilisateurs)
             type_sport: Type de sport (optionnel)
             date_debut: Date de début (optionnel)
             date_fin: Date de fin (optionnel)
             limit: Nombre maximum d'activités (optionnel)
             offset: Décalage pour pagination (optionnel)
+            zone: (lat_min, lon_min, lat_max, lon_max) : activités qui
+                passent dans ce rectangle (optionnel)
+            autour: (lat, lon, rayon en mètres) : activités qui partent
+                dans ce cercle (optionnel)
 
         Returns:
             Liste des activités filtrées
         """
         db = SessionLocal()
         try:
-            query = db.query(Activite).filter(Activite.utilisateur_id == utilisateur_id)
+            query = db.query(Activite)
+
+            if utilisateur_id is not None:
+                query = query.filter(Activite.utilisateur_id == utilisateur_id)
 
             if type_sport:
                 query = query.filter(Activite.type_sport == type_sport)
@@ -236,6 +254,13 @@ class ActiviteDAO:
             if date_fin:
                 query = query.filter(Activite.date_activite <= date_fin)
 
+            # Filtres géographiques : résolus par les index spatiaux
+            if zone:
+                query = query.filter(EmpriseActiviteDAO.filtre_zone(db, *zone))
+
+            if autour:
+                query = query.filter(EmpriseActiviteDAO.filtre_autour(db, *autour))
+
             query = query.order_by(desc(Activite.date_activite))
 
             if limit:
@@ -297,6 +322,7 @@ class ActiviteDAO:
             if not activite:
                 return False
 
+            db.execute(CompteursDAO.activites(activite.utilisateur_id, -1))
             db.delete(activite)
             db.commit()
             return True
@@ -311,7 +337,7 @@ class ActiviteDAO:
     @staticmethod
     def count_by_user(utilisateur_id: int) -> int:
         """
-        Compte le nombre d'activités d'un utilisateur
+        Compte le nombre d'activités d'un utilisateur (compteur de l'utilisateur)
 
         Args:
             utilisateur_id: ID de l'utilisateur
@@ -321,9 +347,9 @@ class ActiviteDAO:
         """
         db = SessionLocal()
         try:
-            return db.query(Activite).filter(
-                Activite.utilisateur_id == utilisateur_id
-            ).count()
+            return db.scalar(
+                select(Utilisateur.nb_activites).where(Utilisateur.id == utilisateur_id)
+            ) or 0
         finally:
             db.close()
 
@@ -3,11 +3,12 @@ DAO (Data Access Object) pour la table Commentaire
 Gère toutes les opérations de base de données pour les commentaires
 """
 from typing import Optional, List
-from sqlalchemy import desc
+from sqlalchemy import desc, select
 from sqlalchemy.exc import IntegrityError
 
 from database import SessionLocal
-from business_objects.models import Commentaire
+from business_objects.models import Activite, Commentaire
+from dao.compteurs_dao import CompteursDAO
 
 
 class CommentaireDAO:
@@ -39,6 +40,7 @@ class CommentaireDAO:
             )
 
             db.add(commentaire)
+            db.execute(CompteursDAO.commentaires(activite_id, +1))
             db.commit()
             db.refresh(commentaire)
             return commentaire
@@ -188,6 +190,7 @@ class CommentaireDAO:
             if not commentaire:
                 return False
 
+            db.execute(CompteursDAO.commentaires(commentaire.activite_id, -1))
             db.delete(commentaire)
             db.commit()
             return True
@@ -221,6 +224,7 @@ class CommentaireDAO:
             for commentaire in commentaires:
                 db.delete(commentaire)
 
+            db.execute(CompteursDAO.commentaires(activite_id, -count))
             db.commit()
             return count
 
@@ -234,7 +238,7 @@ class CommentaireDAO:
     @staticmethod
     def count_by_activite(activite_id: int) -> int:
         """
-        Compte le nombre de commentaires d'une activité
+        Compte le nombre de commentaires d'une activité (compteur de l'activité)
 
         Args:
             activite_id: ID de l'activité
@@ -244,9 +248,9 @@ class CommentaireDAO:
         """
         db = SessionLocal()
         try:
-            return db.query(Commentaire).filter(
-                Commentaire.activite_id == activite_id
-            ).count()
+            return db.scalar(
+                select(Activite.nb_commentaires).where(Activite.id == activite_id)
+            ) or 0
         finally:
             db.close()
 
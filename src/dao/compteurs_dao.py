@@ -0,0 +1,172 @@
+"""
+DAO des compteurs dénormalisés : nombres de likes et de commentaires d'une
+activité, d'abonnés, d'abonnements et d'activités d'un utilisateur
+
+Les lectures (fil, profil, follow) lisent ces colonnes au lieu de compter
+les lignes des tables de liaison. Chaque écriture exécute la requête
+d'ajustement renvoyée ici avec sa propre session, donc dans sa transaction :
+le compteur est validé ou annulé avec l'écriture. Les requêtes servent
+telles quelles aux sessions synchrones et asynchrones.
+
+reconstruire() recalcule les compteurs depuis les tables (migration, et
+réparation avec python src/reparer_compteurs.py).
+"""
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.sql.dml import Update
+
+from database import SessionLocal
+from business_objects.models import Activite, Commentaire, Utilisateur, follows, likes
+
+
+class CompteursDAO:
+    """Requêtes d'ajustement et de reconstruction des compteurs"""
+
+    @staticmethod
+    def likes(activite_id: int, delta: int = 1) -> Update:
+        """Ajuste le nombre de likes d'une activité"""
+        return (
+            update(Activite)
+            .where(Activite.id == activite_id)
+            .values(nb_likes=Activite.nb_likes + delta)
+        )
+
+    @staticmethod
+    def commentaires(activite_id: int, delta: int = 1) -> Update:
+        """Ajuste le nombre de commentaires d'une activité"""
+        return (
+            update(Activite)
+            .where(Activite.id == activite_id)
+            .values(nb_commentaires=Activite.nb_commentaires + delta)
+        )
+
+    @staticmethod
+    def follow(follower_id: int, followed_id: int, delta: int = 1) -> Update:
+        """Ajuste les abonnements du follower et les abonnés du suivi (une requête)"""
+        return (
+            update(Utilisateur)
+            .where(Utilisateur.id.in_([follower_id, followed_id]))
+            .values(
+                nb_following=Utilisateur.nb_following + case((Utilisateur.id == follower_id, delta), else_=0),
+                nb_followers=Utilisateur.nb_followers + case((Utilisateur.id == followed_id, delta), else_=0),
+            )
+        )
+
+    @staticmethod
+    def activites(utilisateur_id: int, delta: int = 1) -> Update:
+        """Ajuste le nombre d'activités d'un utilisateur"""
+        return (
+            update(Utilisateur)
+            .where(Utilisateur.id == utilisateur_id)
+            .values(nb_activites=Utilisateur.nb_activites + delta)
+        )
+
+    @staticmethod
+    def retrait_likes_utilisateur(utilisateur_id: int) -> Update:
+        """Retire les likes d'un utilisateur des compteurs (avant de supprimer ses likes)"""
+        likees = select(likes.c.activite_id).where(likes.c.utilisateur_id == utilisateur_id)
+        return (
+            update(Activite)
+            .where(Activite.id.in_(likees))
+            .values(nb_likes=Activite.nb_likes - 1)
+            .execution_options(synchronize_session="fetch")
+        )
+
+    @staticmethod
+    def retrait_follows_utilisateur(utilisateur_id: int) -> Update:
+        """
+        Retire les follows d'un utilisateur des compteurs (avant de supprimer
+        ses follows) : les siens passent à zéro, ceux des autres perdent un
+        abonné ou un abonnement
+        """
+        suivis = select(follows.c.followed_id).where(follows.c.follower_id == utilisateur_id)
+        abonnes = select(follows.c.follower_id).where(follows.c.followed_id == utilisateur_id)
+        lui_meme = Utilisateur.id == utilisateur_id
+        return (
+            update(Utilisateur)
+            .where(or_(lui_meme, Utilisateur.id.in_(suivis), Utilisateur.id.in_(abonnes)))
+            .values(
+                nb_followers=case(
+                    (lui_meme, 0),
+                    (Utilisateur.id.in_(suivis), Utilisateur.nb_followers - 1),
+                    else_=Utilisateur.nb_followers,
+                ),
+                nb_following=case(
+                    (lui_meme, 0),
+                    (Utilisateur.id.in_(abonnes), Utilisateur.nb_following - 1),
+                    else_=Utilisateur.nb_following,
+                ),
+            )
+            .execution_options(synchronize_session="fetch")
+        )
+
+    @staticmethod
+    def reconstruire(connexion) -> Dict[str, int]:
+        """
+        Recalcule les compteurs qui ne correspondent plus aux tables
+
+        Args:
+            connexion: Connexion ou session ; la transaction reste à valider
+
+        Returns:
+            Nombre d'activités et d'utilisateurs corrigés
+        """
+        activite = Activite.__table__
+        utilisateur = Utilisateur.__table__
+
+        def compter(table, condition):
+            return select(func.count()).select_from(table).where(condition).scalar_subquery()
+
+        reels_activite = {
+            "nb_likes": compter(likes, likes.c.activite_id == activite.c.id),
+            "nb_commentaires": compter(
+                Commentaire.__table__, Commentaire.__table__.c.activite_id == activite.c.id
+            ),
+        }
+        reels_utilisateur = {
+            "nb_followers": compter(follows, follows.c.followed_id == utilisateur.c.id),
+            "nb_following": compter(follows, follows.c.follower_id == utilisateur.c.id),
+            "nb_activites": compter(activite, activite.c.utilisateur_id == utilisateur.c.id),
+        }
+
+        corrections = {}
+        for nom, table, reels in (
+            ("activites", activite, reels_activite),
+            ("utilisateurs", utilisateur, reels_utilisateur),
+        ):
+            # Seules les lignes en écart sont réécrites
+            resultat = connexion.execute(
+                update(table)
+                .where(or_(*(table.c[colonne] != valeur for colonne, valeur in reels.items())))
+                .values(reels)
+            )
+            corrections[nom] = resultat.rowcount
+        return corrections
+
+    @staticmethod
+    def reparer(simulation: bool = False) -> Optional[Dict[str, int]]:
+        """
+        Tâche de réparation : recalcule les compteurs en écart
+
+        Args:
+            simulation: Compter les écarts sans rien corriger
+
+        Returns:
+            Nombre d'activités et d'utilisateurs corrigés, None en cas d'erreur
+        """
+        db = SessionLocal()
+        try:
+            corrections = CompteursDAO.reconstruire(db)
+            if simulation:
+                db.rollback()
+            else:
+                db.commit()
+            return corrections
+
+        except Exception as e:
+            db.rollback()
+            print(f"Erreur lors de la réparation des compteurs : {e}")
+            return None
+        finally:
+            db.close()
@@ -0,0 +1,62 @@
+"""
+DAO pour la table DonneesCapteurs
+Une ligne par activité GPX dont la trace porte des données de capteurs
+"""
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from business_objects.models import DonneesCapteurs
+
+
+class DonneesCapteursDAO:
+    """Classe DAO pour le résumé des capteurs des activités"""
+
+    @staticmethod
+    def ajouter(db: Session, activite_id: int, resume: Dict) -> DonneesCapteurs:
+        """
+        Ajoute le résumé des capteurs d'une activité dans la transaction de l'appelant
+
+        Args:
+            db: Session de l'appelant (le commit lui revient)
+            activite_id: ID de l'activité
+            resume: Résultat de utils.capteurs.resume_capteurs
+
+        Returns:
+            La ligne créée
+        """
+        zones = resume.get('zones_fc') or [None] * 5
+        ligne = DonneesCapteurs(
+            activite_id=activite_id,
+            fc_moyenne=resume.get('fc_moyenne'),
+            fc_max=resume.get('fc_max'),
+            cadence_moyenne=resume.get('cadence_moyenne'),
+            puissance_moyenne=resume.get('puissance_moyenne'),
+            temperature_moyenne=resume.get('temperature_moyenne'),
+            fc_reference=resume.get('fc_reference'),
+            zone_1=zones[0],
+            zone_2=zones[1],
+            zone_3=zones[2],
+            zone_4=zones[3],
+            zone_5=zones[4]
+        )
+        db.add(ligne)
+        return ligne
+
+    @staticmethod
+    def get(activite_id: int) -> Optional[DonneesCapteurs]:
+        """
+        Récupère le résumé des capteurs d'une activité
+
+        Args:
+            activite_id: ID de l'activité
+
+        Returns:
+            Le résumé ou None si l'activité n'a pas de données capteurs
+        """
+        db = SessionLocal()
+        try:
+            return db.get(DonneesCapteurs, activite_id)
+        finally:
+            db.close()
@@ -0,0 +1,138 @@
+"""
+DAO pour la table EmpriseActivite et ses index spatiaux
+
+Sous SQLite, les recherches passent par les tables R*Tree tenues à jour par
+triggers (voir business_objects.models) : seules les activités dont le
+rectangle recoupe la zone demandée sont lues. Sur un autre moteur, les
+mêmes filtres portent directement sur les colonnes de EmpriseActivite.
+"""
+import math
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, column, select, table
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from business_objects.models import Activite, EmpriseActivite
+from utils.emprise import METRES_PAR_DEGRE, rectangle_autour
+
+_COLONNES_RTREE = ("id", "lat_min", "lat_max", "lon_min", "lon_max")
+RTREE_EMPRISE = table("EmpriseActivite_rtree", *(column(nom) for nom in _COLONNES_RTREE))
+RTREE_DEPART = table("DepartActivite_rtree", *(column(nom) for nom in _COLONNES_RTREE))
+
+
+def _est_sqlite(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+
+class EmpriseActiviteDAO:
+    """Classe DAO pour l'emprise géographique des activités"""
+
+    @staticmethod
+    def ajouter(db: Session, activite_id: int, emprise: Dict[str, float]) -> EmpriseActivite:
+        """
+        Ajoute l'emprise d'une activité dans la transaction de l'appelant
+
+        Args:
+            db: Session de l'appelant (le commit lui revient)
+            activite_id: ID de l'activité
+            emprise: Résultat de utils.emprise.calculer_emprise
+
+        Returns:
+            La ligne créée
+        """
+        ligne = EmpriseActivite(activite_id=activite_id, **emprise)
+        db.add(ligne)
+        return ligne
+
+    @staticmethod
+    def get(activite_id: int) -> Optional[EmpriseActivite]:
+        """Récupère l'emprise d'une activité (None si elle n'est pas indexée)"""
+        db = SessionLocal()
+        try:
+            return db.get(EmpriseActivite, activite_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def lister_sans_emprise(apres_id: int, limite: int) -> List[Activite]:
+        """
+        Liste les activités GPX pas encore indexées, par ID croissant
+
+        Args:
+            apres_id: Ne renvoyer que les activités d'ID supérieur (reprise)
+            limite: Nombre maximal d'activités
+        """
+        db = SessionLocal()
+        try:
+            return db.query(Activite).outerjoin(EmpriseActivite).filter(
+                Activite.gpx_path.isnot(None),
+                Activite.id > apres_id,
+                EmpriseActivite.activite_id.is_(None)
+            ).order_by(Activite.id).limit(limite).all()
+        finally:
+            db.close()
+
+    @staticmethod
+    def filtre_zone(db: Session, lat_min: float, lon_min: float, lat_max: float, lon_max: float):
+        """
+        Condition sur Activite.id : l'emprise de l'activité recoupe le rectangle
+
+        Args:
+            db: Session de la requête (pour connaître le moteur)
+            lat_min, lon_min, lat_max, lon_max: Rectangle recherché (degrés)
+        """
+        if _est_sqlite(db):
+            index, identifiant = RTREE_EMPRISE.c, RTREE_EMPRISE.c.id
+        else:
+            index, identifiant = EmpriseActivite.__table__.c, EmpriseActivite.activite_id
+
+        return Activite.id.in_(
+            select(identifiant).where(
+                index.lat_max >= lat_min,
+                index.lat_min <= lat_max,
+                index.lon_max >= lon_min,
+                index.lon_min <= lon_max
+            )
+        )
+
+    @staticmethod
+    def filtre_autour(db: Session, lat: float, lon: float, rayon: float):
+        """
+        Condition sur Activite.id : l'activité part à moins de `rayon` mètres du point
+
+        Les départs sont préfiltrés par l'index sur le rectangle englobant le
+        cercle, puis la distance est vérifiée (approximation équirectangulaire,
+        précise à mieux que 1 % jusqu'à une centaine de kilomètres).
+
+        Args:
+            db: Session de la requête (pour connaître le moteur)
+            lat, lon: Centre de la recherche (degrés)
+            rayon: Rayon en mètres
+        """
+        lat_min, lon_min, lat_max, lon_max = rectangle_autour(lat, lon, rayon)
+        if _est_sqlite(db):
+            candidats = EmpriseActivite.activite_id.in_(
+                # Le R*Tree arrondit ses bornes vers l'extérieur : test de recouvrement
+                select(RTREE_DEPART.c.id).where(
+                    RTREE_DEPART.c.lat_max >= lat_min,
+                    RTREE_DEPART.c.lat_min <= lat_max,
+                    RTREE_DEPART.c.lon_max >= lon_min,
+                    RTREE_DEPART.c.lon_min <= lon_max
+                )
+            )
+        else:
+            candidats = and_(
+                EmpriseActivite.lat_depart.between(lat_min, lat_max),
+                EmpriseActivite.lon_depart.between(lon_min, lon_max)
+            )
+
+        # Distance en mètres sans fonction trigonométrique côté base
+        d_lat = (EmpriseActivite.lat_depart - lat) * METRES_PAR_DEGRE
+        d_lon = (EmpriseActivite.lon_depart - lon) * (METRES_PAR_DEGRE * math.cos(math.radians(lat)))
+        return Activite.id.in_(
+            select(EmpriseActivite.activite_id).where(
+                candidats,
+                d_lat * d_lat + d_lon * d_lon <= rayon * rayon
+            )
+        )
@@ -0,0 +1,182 @@
+"""
+DAO pour la table FichierGPX
+Gère les fichiers GPX stockés par empreinte de contenu et leur compteur de références
+
+Le compteur est ajusté par la base (UPDATE ... SET nb_references =
+nb_references + 1), jamais relu puis réécrit en Python : deux imports ou
+deux suppressions simultanés du même contenu ne perdent pas de référence.
+"""
+import json
+import os
+from datetime import datetime
+from typing import Optional, Dict
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from database import PROJECT_ROOT, SessionLocal
+from business_objects.models import Activite, FichierGPX
+from utils.track_metrics import VERSION_METRIQUES
+
+
+def serialiser_metriques(metriques: Dict) -> str:
+    """Convertit un résultat d'analyse en JSON (dates au format ISO)"""
+    return json.dumps({
+        cle: valeur.isoformat() if isinstance(valeur, datetime) else valeur
+        for cle, valeur in metriques.items()
+    })
+
+
+def deserialiser_metriques(texte: str) -> Dict:
+    """Relit un résultat d'analyse sérialisé par serialiser_metriques"""
+    metriques = json.loads(texte)
+    if metriques.get('date_debut'):
+        metriques['date_debut'] = datetime.fromisoformat(metriques['date_debut'])
+    return metriques
+
+
+def metriques_en_cache(fichier: Optional[FichierGPX]) -> Optional[Dict]:
+    """Métriques en cache du fichier, si elles viennent de la version courante de l'algorithme"""
+    if fichier is None or not fichier.metriques:
+        return None
+    metriques = deserialiser_metriques(fichier.metriques)
+    return metriques if metriques.get('version') == VERSION_METRIQUES else None
+
+
+def formes_stockees(chemin: str) -> set:
+    """Formes sous lesquelles un fichier peut être référencé en base (relative à la racine, absolue)"""
+    absolu = os.path.abspath(chemin)
+    formes = {absolu}
+    try:
+        relatif = os.path.relpath(absolu, PROJECT_ROOT)
+    except ValueError:  # Autre lecteur (Windows)
+        return formes
+    if not relatif.startswith(os.pardir):
+        formes.update({relatif, relatif.replace(os.sep, "/")})
+    return formes
+
+
+def _inserer_si_absent(db: Session, **valeurs):
+    """INSERT qui ne fait rien si l'empreinte existe déjà (import concurrent du même contenu)"""
+    dialecte = db.get_bind().dialect.name
+    if dialecte == "sqlite":
+        return sqlite.insert(FichierGPX).values(**valeurs).on_conflict_do_nothing(index_elements=["empreinte"])
+    if dialecte == "postgresql":
+        return postgresql.insert(FichierGPX).values(**valeurs).on_conflict_do_nothing(index_elements=["empreinte"])
+    return insert(FichierGPX).values(**valeurs).prefix_with("IGNORE", dialect="mysql")
+
+
+class FichierGPXDAO:
+    """Classe DAO pour les opérations sur FichierGPX"""
+
+    @staticmethod
+    def get_by_empreinte(empreinte: str) -> Optional[FichierGPX]:
+        """
+        Récupère un fichier par son empreinte
+
+        Args:
+            empreinte: Empreinte SHA-256 du contenu
+
+        Returns:
+            Le fichier ou None si inconnu
+        """
+        db = SessionLocal()
+        try:
+            return db.get(FichierGPX, empreinte)
+        finally:
+            db.close()
+
+    @staticmethod
+    def get_by_chemin(chemin: str) -> Optional[FichierGPX]:
+        """
+        Récupère un fichier par son chemin de stockage
+
+        Args:
+            chemin: Chemin du fichier
+
+        Returns:
+            Le fichier ou None si inconnu
+        """
+        db = SessionLocal()
+        try:
+            return db.query(FichierGPX).filter(FichierGPX.chemin == chemin).first()
+        finally:
+            db.close()
+
+    @staticmethod
+    def est_reference(chemin: str) -> bool:
+        """
+        Vérifie si un fichier stocké est utilisé, par un fichier suivi ou une activité
+
+        Args:
+            chemin: Chemin du fichier (relatif ou absolu)
+        """
+        formes = formes_stockees(chemin)
+        db = SessionLocal()
+        try:
+            return (
+                db.query(FichierGPX.empreinte).filter(FichierGPX.chemin.in_(formes)).first() is not None
+                or db.query(Activite.id).filter(Activite.gpx_path.in_(formes)).first() is not None
+            )
+        finally:
+            db.close()
+
+    @staticmethod
+    def ajouter_reference(
+        db: Session,
+        empreinte: str,
+        chemin: str,
+        taille: Optional[int] = None,
+        metriques: Optional[Dict] = None
+    ) -> None:
+        """
+        Ajoute une référence au fichier (le crée s'il est nouveau)
+        dans la transaction de l'appelant
+
+        Args:
+            db: Session de l'appelant (le commit lui revient)
+            empreinte: Empreinte SHA-256 du contenu
+            chemin: Chemin du fichier
+            taille: Taille en octets (optionnel)
+            metriques: Résultat d'analyse à mettre en cache (optionnel)
+        """
+        # Deux premiers imports simultanés du même contenu : un seul crée la ligne
+        db.execute(_inserer_si_absent(db, empreinte=empreinte, chemin=chemin, taille=taille, nb_references=0))
+
+        valeurs = {"nb_references": FichierGPX.nb_references + 1}
+        # Un cache d'une ancienne version de l'algorithme est remplacé
+        if metriques is not None:
+            valeurs["metriques"] = serialiser_metriques(metriques)
+        db.execute(
+            update(FichierGPX).where(FichierGPX.empreinte == empreinte).values(**valeurs),
+            execution_options={"synchronize_session": False},
+        )
+
+    @staticmethod
+    def retirer_reference(db: Session, chemin: str) -> Optional[int]:
+        """
+        Retire une référence au fichier dans la transaction de l'appelant
+        La ligne est supprimée quand plus aucune activité ne l'utilise
+
+        Args:
+            db: Session de l'appelant (le commit lui revient)
+            chemin: Chemin du fichier
+
+        Returns:
+            Nombre de références restantes, ou None si le fichier n'est pas suivi
+        """
+        db.execute(
+            update(FichierGPX)
+            .where(FichierGPX.chemin == chemin, FichierGPX.nb_references > 0)
+            .values(nb_references=FichierGPX.nb_references - 1),
+            execution_options={"synchronize_session": False},
+        )
+        # Relu après l'UPDATE, qui verrouille la ligne jusqu'à la fin de la transaction
+        restantes = db.execute(select(FichierGPX.nb_references).where(FichierGPX.chemin == chemin)).scalar()
+        if restantes == 0:
+            db.execute(
+                delete(FichierGPX).where(FichierGPX.chemin == chemin, FichierGPX.nb_references == 0),
+                execution_options={"synchronize_session": False},
+            )
+        return restantes
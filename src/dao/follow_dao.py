@@ -3,10 +3,11 @@ DAO (Data Access Object) pour la table de liaison Follow
 Gère toutes les opérations de base de données pour les relations de suivi
 """
 from typing import List
-from sqlalchemy import and_
+from sqlalchemy import and_, select
 
 from database import SessionLocal
 from business_objects.models import Utilisateur, follows
+from dao.compteurs_dao import CompteursDAO
 
 
 class FollowDAO:
@@ -51,6 +52,7 @@ class FollowDAO:
                     followed_id=followed_id
                 )
             )
+            db.execute(CompteursDAO.follow(follower_id, followed_id, +1))
             db.commit()
             return True
 
@@ -83,6 +85,8 @@ class FollowDAO:
                     )
                 )
             )
+            if result.rowcount > 0:
+                db.execute(CompteursDAO.follow(follower_id, followed_id, -1))
             db.commit()
             return result.rowcount > 0
 
@@ -209,7 +213,7 @@ class FollowDAO:
     @staticmethod
     def count_following(user_id: int) -> int:
         """
-        Compte le nombre d'utilisateurs suivis
+        Compte le nombre d'utilisateurs suivis (compteur de l'utilisateur)
 
         Args:
             user_id: ID de l'utilisateur
@@ -219,18 +223,16 @@ class FollowDAO:
         """
         db = SessionLocal()
         try:
-            result = db.execute(
-                follows.select().where(follows.c.follower_id == user_id)
-            ).fetchall()
-
-            return len(result)
+            return db.scalar(
+                select(Utilisateur.nb_following).where(Utilisateur.id == user_id)
+            ) or 0
         finally:
             db.close()
 
     @staticmethod
     def count_followers(user_id: int) -> int:
         """
-        Compte le nombre de followers
+        Compte le nombre de followers (compteur de l'utilisateur)
 
         Args:
             user_id: ID de l'utilisateur
@@ -240,11 +242,9 @@ class FollowDAO:
         """
         db = SessionLocal()
         try:
-            result = db.execute(
-                follows.select().where(follows.c.followed_id == user_id)
-            ).fetchall()
-
-            return len(result)
+            return db.scalar(
+                select(Utilisateur.nb_followers).where(Utilisateur.id == user_id)
+            ) or 0
         finally:
             db.close()
 
@@ -262,6 +262,8 @@ class FollowDAO:
         """
         db = SessionLocal()
         try:
+            db.execute(CompteursDAO.retrait_follows_utilisateur(user_id))
+
             # Supprimer où l'utilisateur est follower
             result1 = db.execute(
                 follows.delete().where(follows.c.follower_id == user_id)
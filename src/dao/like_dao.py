@@ -3,10 +3,11 @@ DAO (Data Access Object) pour la table de liaison Like
 Gère toutes les opérations de base de données pour les likes
 """
 from typing import List
-from sqlalchemy import and_
+from sqlalchemy import and_, select
 
-from database import SessionLocal
+from database import SessionLocal, session_async
 from business_objects.models import Utilisateur, Activite, likes
+from dao.compteurs_dao import CompteursDAO
 
 
 class LikeDAO:
@@ -47,6 +48,7 @@ class LikeDAO:
                     activite_id=activite_id
                 )
             )
+            db.execute(CompteursDAO.likes(activite_id, +1))
             db.commit()
             return True
 
@@ -79,6 +81,8 @@ class LikeDAO:
                     )
                 )
             )
+            if result.rowcount > 0:
+                db.execute(CompteursDAO.likes(activite_id, -1))
             db.commit()
             return result.rowcount > 0
 
@@ -207,7 +211,7 @@ class LikeDAO:
     @staticmethod
     def count_by_activite(activite_id: int) -> int:
         """
-        Compte le nombre de likes d'une activité
+        Compte le nombre de likes d'une activité (compteur de l'activité)
 
         Args:
             activite_id: ID de l'activité
@@ -217,11 +221,9 @@ class LikeDAO:
         """
         db = SessionLocal()
         try:
-            result = db.execute(
-                likes.select().where(likes.c.activite_id == activite_id)
-            ).fetchall()
-
-            return len(result)
+            return db.scalar(
+                select(Activite.nb_likes).where(Activite.id == activite_id)
+            ) or 0
         finally:
             db.close()
 
@@ -263,6 +265,7 @@ class LikeDAO:
             result = db.execute(
                 likes.delete().where(likes.c.activite_id == activite_id)
             )
+            db.execute(CompteursDAO.likes(activite_id, -result.rowcount))
             db.commit()
             return result.rowcount
 
@@ -287,6 +290,7 @@ class LikeDAO:
         """
         db = SessionLocal()
         try:
+            db.execute(CompteursDAO.retrait_likes_utilisateur(utilisateur_id))
             result = db.execute(
                 likes.delete().where(likes.c.utilisateur_id == utilisateur_id)
             )
@@ -361,3 +365,84 @@ class LikeDAO:
             return [(row.activite_id, row.nb_likes) for row in result]
         finally:
             db.close()
+
+    # ========== VARIANTES ASYNCHRONES (routes async def) ==========
+
+    @staticmethod
+    async def create_async(utilisateur_id: int, activite_id: int) -> bool:
+        """Variante asynchrone de create"""
+        try:
+            async with session_async(ecriture=True) as db:
+                existing = (await db.execute(
+                    likes.select().where(
+                        likes.c.utilisateur_id == utilisateur_id,
+                        likes.c.activite_id == activite_id
+                    )
+                )).first()
+
+                if existing:
+                    print("Le like existe déjà")
+                    return False
+
+                await db.execute(
+                    likes.insert().values(
+                        utilisateur_id=utilisateur_id,
+                        activite_id=activite_id
+                    )
+                )
+                await db.execute(CompteursDAO.likes(activite_id, +1))
+            return True
+
+        except Exception as e:
+            print(f"Erreur lors de la création du like : {e}")
+            return False
+
+    @staticmethod
+    async def delete_async(utilisateur_id: int, activite_id: int) -> bool:
+        """Variante asynchrone de delete"""
+        try:
+            async with session_async(ecriture=True) as db:
+                result = await db.execute(
+                    likes.delete().where(
+                        likes.c.utilisateur_id == utilisateur_id,
+                        likes.c.activite_id == activite_id
+                    )
+                )
+                if result.rowcount > 0:
+                    await db.execute(CompteursDAO.likes(activite_id, -1))
+            return result.rowcount > 0
+
+        except Exception as e:
+            print(f"Erreur lors de la suppression du like : {e}")
+            return False
+
+    @staticmethod
+    async def exists_async(utilisateur_id: int, activite_id: int) -> bool:
+        """Variante asynchrone de exists"""
+        async with session_async() as db:
+            result = (await db.execute(
+                likes.select().where(
+                    likes.c.utilisateur_id == utilisateur_id,
+                    likes.c.activite_id == activite_id
+                )
+            )).first()
+            return result is not None
+
+    @staticmethod
+    async def count_by_activite_async(activite_id: int) -> int:
+        """Variante asynchrone de count_by_activite"""
+        async with session_async() as db:
+            return await db.scalar(
+                select(Activite.nb_likes).where(Activite.id == activite_id)
+            ) or 0
+
+    @staticmethod
+    async def get_users_who_liked_async(activite_id: int) -> List[Utilisateur]:
+        """Variante asynchrone de get_users_who_liked"""
+        async with session_async() as db:
+            result = await db.scalars(
+                select(Utilisateur)
+                .join(likes, likes.c.utilisateur_id == Utilisateur.id)
+                .where(likes.c.activite_id == activite_id)
+            )
+            return list(result)
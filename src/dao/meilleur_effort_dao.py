@@ -0,0 +1,113 @@
+"""
+DAO pour les tables MeilleurEffort et Split
+Les meilleurs efforts sont calculés à l'import : les records se lisent ensuite par index
+"""
+from typing import Dict, List
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from business_objects.models import Activite, MeilleurEffort, Split
+
+
+class MeilleurEffortDAO:
+    """Classe DAO pour les meilleurs efforts et les splits des activités"""
+
+    @staticmethod
+    def ajouter_pour_activite(
+        db: Session,
+        activite: Activite,
+        efforts: Dict[str, Dict],
+        durees_splits: List[float]
+    ) -> None:
+        """
+        Ajoute les meilleurs efforts et les splits d'une activité
+        dans la transaction de l'appelant
+
+        Args:
+            db: Session de l'appelant (le commit lui revient)
+            activite: Activité déjà insérée (id connu)
+            efforts: Résultat de utils.meilleurs_efforts.meilleurs_efforts
+            durees_splits: Résultat de utils.meilleurs_efforts.splits
+        """
+        db.add_all([
+            MeilleurEffort(
+                activite_id=activite.id,
+                utilisateur_id=activite.utilisateur_id,
+                type_sport=activite.type_sport,
+                nom=nom,
+                date_activite=activite.date_activite,
+                **effort
+            )
+            for nom, effort in efforts.items()
+        ])
+        db.add_all([
+            Split(activite_id=activite.id, numero=numero, duree=duree)
+            for numero, duree in enumerate(durees_splits, start=1)
+        ])
+
+    @staticmethod
+    def supprimer_pour_activites(db: Session, activite_ids: List[int]) -> None:
+        """Supprime, dans la transaction de l'appelant, les meilleurs efforts et splits à recalculer"""
+        db.query(MeilleurEffort).filter(MeilleurEffort.activite_id.in_(activite_ids)).delete(synchronize_session=False)
+        db.query(Split).filter(Split.activite_id.in_(activite_ids)).delete(synchronize_session=False)
+
+    @staticmethod
+    def changer_sport(db: Session, activite_id: int, type_sport: str) -> None:
+        """
+        Reporte le sport d'une activité modifiée sur ses meilleurs efforts
+        dans la transaction de l'appelant (les records se lisent par sport)
+        """
+        db.query(MeilleurEffort).filter(MeilleurEffort.activite_id == activite_id).update(
+            {"type_sport": type_sport}, synchronize_session=False
+        )
+
+    @staticmethod
+    def get_records(utilisateur_id: int) -> List[tuple]:
+        """
+        Récupère le meilleur effort de l'utilisateur pour chaque sport et distance
+
+        Args:
+            utilisateur_id: ID de l'utilisateur
+
+        Returns:
+            Liste de (MeilleurEffort, nom de l'activité)
+        """
+        db = SessionLocal()
+        try:
+            # Classement par durée dans chaque (sport, distance), servi par l'index du record
+            rang = func.row_number().over(
+                partition_by=(MeilleurEffort.type_sport, MeilleurEffort.nom),
+                order_by=MeilleurEffort.duree
+            ).label("rang")
+            classement = (
+                select(MeilleurEffort.id, rang)
+                .where(MeilleurEffort.utilisateur_id == utilisateur_id)
+                .subquery()
+            )
+            return db.execute(
+                select(MeilleurEffort, Activite.nom)
+                .join(classement, classement.c.id == MeilleurEffort.id)
+                .join(Activite, Activite.id == MeilleurEffort.activite_id)
+                .where(classement.c.rang == 1)
+            ).all()
+        finally:
+            db.close()
+
+    @staticmethod
+    def get_splits(activite_id: int) -> List[Split]:
+        """
+        Récupère les splits d'une activité, dans l'ordre
+
+        Args:
+            activite_id: ID de l'activité
+
+        Returns:
+            Liste des splits (vide si l'activité n'en a pas)
+        """
+        db = SessionLocal()
+        try:
+            return db.query(Split).filter(Split.activite_id == activite_id).order_by(Split.numero).all()
+        finally:
+            db.close()
@@ -0,0 +1,123 @@
+"""
+DAO pour la table MetriquesActivite
+Une ligne par activité et par version de l'algorithme de calcul des métriques
+
+Une ligne sans pauses (nb_pauses NULL) a été calculée avant leur ajout au
+schéma : elle est à recalculer, comme une ligne d'une ancienne version.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import exists, func
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from business_objects.models import Activite, MetriquesActivite
+from utils.track_metrics import VERSION_METRIQUES
+
+
+class MetriquesActiviteDAO:
+    """Classe DAO pour les métriques versionnées des activités"""
+
+    @staticmethod
+    def ajouter(db: Session, activite_id: int, metriques: Dict, calories: Optional[int]) -> MetriquesActivite:
+        """
+        Ajoute les métriques d'une activité dans la transaction de l'appelant
+
+        Args:
+            db: Session de l'appelant (le commit lui revient)
+            activite_id: ID de l'activité
+            metriques: Résultat de calculer_metriques
+            calories: Calories estimées à partir de ces métriques
+
+        Returns:
+            La ligne de métriques
+        """
+        ligne = MetriquesActivite(
+            activite_id=activite_id,
+            version=metriques.get('version', VERSION_METRIQUES),
+            distance=metriques.get('distance'),
+            duree_secondes=metriques.get('duree_secondes'),
+            duree_mouvement=metriques.get('duree_mouvement'),
+            duree_pauses=metriques.get('duree_pauses'),
+            nb_pauses=metriques.get('nb_pauses'),
+            denivele_positif=metriques.get('denivele_positif'),
+            denivele_negatif=metriques.get('denivele_negatif'),
+            vitesse_max=metriques.get('vitesse_max'),
+            vitesse_moyenne=metriques.get('vitesse_moyenne'),
+            calories=calories
+        )
+        db.add(ligne)
+        return ligne
+
+    @staticmethod
+    def remplacer(db: Session, activite_ids: List[int], version: int) -> None:
+        """Supprime, dans la transaction de l'appelant, les métriques d'une version à réécrire"""
+        db.query(MetriquesActivite).filter(
+            MetriquesActivite.activite_id.in_(activite_ids),
+            MetriquesActivite.version == version
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def get(activite_id: int, version: int = VERSION_METRIQUES) -> Optional[MetriquesActivite]:
+        """
+        Récupère les métriques d'une activité pour une version
+
+        Args:
+            activite_id: ID de l'activité
+            version: Version de l'algorithme (la courante par défaut)
+
+        Returns:
+            Les métriques ou None si elles n'ont pas été calculées
+        """
+        db = SessionLocal()
+        try:
+            return db.get(MetriquesActivite, (activite_id, version))
+        finally:
+            db.close()
+
+    @staticmethod
+    def lister_a_retraiter(version: int, apres_id: int, limite: int) -> List[Activite]:
+        """
+        Liste les activités GPX sans métriques complètes pour une version, par ID croissant
+
+        Args:
+            version: Version de l'algorithme
+            apres_id: Ne renvoyer que les activités d'ID supérieur (reprise)
+            limite: Nombre maximal d'activités
+
+        Returns:
+            Liste d'activités
+        """
+        db = SessionLocal()
+        try:
+            a_jour = exists().where(
+                MetriquesActivite.activite_id == Activite.id,
+                MetriquesActivite.version == version,
+                MetriquesActivite.nb_pauses.isnot(None)
+            )
+            return db.query(Activite).filter(
+                Activite.gpx_path.isnot(None),
+                Activite.id > apres_id,
+                ~a_jour
+            ).order_by(Activite.id).limit(limite).all()
+        finally:
+            db.close()
+
+    @staticmethod
+    def compter(version: int) -> Tuple[int, int]:
+        """
+        Compte les activités GPX à jour pour une version
+
+        Returns:
+            (activités à jour, activités GPX au total)
+        """
+        db = SessionLocal()
+        try:
+            total = db.query(func.count(Activite.id)).filter(Activite.gpx_path.isnot(None)).scalar()
+            a_jour = db.query(func.count(MetriquesActivite.activite_id)).filter(
+                MetriquesActivite.version == version,
+                MetriquesActivite.nb_pauses.isnot(None)
+            ).scalar()
+            return a_jour, total
+        finally:
+            db.close()
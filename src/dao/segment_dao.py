@@ -0,0 +1,234 @@
+"""
+DAO pour les tables Segment et EffortSegment
+Les passages sont trouvés à l'import (ou par le rattachement d'un nouveau
+segment) : les classements se lisent ensuite par index
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import exists, func, or_, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from business_objects.models import Activite, EffortSegment, Segment, Utilisateur
+from dao.emprise_activite_dao import EmpriseActiviteDAO
+from utils.emprise import METRES_PAR_DEGRE
+from utils.segments import TOLERANCE_SEGMENT
+
+
+def serialiser_points(lat: np.ndarray, lon: np.ndarray) -> bytes:
+    """Points d'un segment en binaire : latitudes puis longitudes (float64)"""
+    return np.concatenate((lat, lon)).astype("<f8").tobytes()
+
+
+def deserialiser_points(points: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Inverse de serialiser_points : (latitudes, longitudes)"""
+    valeurs = np.frombuffer(points, dtype="<f8")
+    return valeurs[:len(valeurs) // 2], valeurs[len(valeurs) // 2:]
+
+
+def _marges(latitude: float) -> Tuple[float, float]:
+    """Tolérance du rapprochement convertie en degrés (latitude, longitude)"""
+    marge = TOLERANCE_SEGMENT / METRES_PAR_DEGRE
+    return marge, marge / max(np.cos(np.radians(latitude)), 1e-6)
+
+
+class SegmentDAO:
+    """Classe DAO pour les segments et les passages des activités"""
+
+    @staticmethod
+    def create(
+        nom: str,
+        createur_id: int,
+        lat: np.ndarray,
+        lon: np.ndarray,
+        distance: float,
+        type_sport: Optional[str] = None
+    ) -> Optional[Segment]:
+        """
+        Crée un segment
+
+        Args:
+            nom: Nom du segment
+            createur_id: ID de l'utilisateur qui le crée
+            lat, lon: Points du segment, dans le sens de parcours
+            distance: Longueur du segment (m)
+            type_sport: Sport concerné (None : tous)
+
+        Returns:
+            Le segment créé ou None en cas d'erreur
+        """
+        db = SessionLocal()
+        try:
+            segment = Segment(
+                nom=nom,
+                createur_id=createur_id,
+                type_sport=type_sport,
+                distance=distance,
+                points=serialiser_points(lat, lon),
+                lat_min=float(lat.min()),
+                lat_max=float(lat.max()),
+                lon_min=float(lon.min()),
+                lon_max=float(lon.max())
+            )
+            db.add(segment)
+            db.commit()
+            db.refresh(segment)
+            return segment
+
+        except Exception as e:
+            db.rollback()
+            print(f"Erreur lors de la création du segment : {e}")
+            return None
+        finally:
+            db.close()
+
+    @staticmethod
+    def get_by_id(segment_id: int) -> Optional[Segment]:
+        """Récupère un segment par son ID"""
+        db = SessionLocal()
+        try:
+            return db.get(Segment, segment_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def candidats(db: Session, emprise: Dict[str, float], type_sport: str) -> List[Segment]:
+        """
+        Segments que l'activité peut parcourir : leur rectangle recoupe l'emprise
+        de l'activité (élargie de la tolérance) et ils concernent son sport
+
+        Args:
+            db: Session de l'appelant
+            emprise: Résultat de utils.emprise.calculer_emprise
+            type_sport: Sport de l'activité
+        """
+        marge, marge_lon = _marges(emprise['lat_max'])
+        return db.query(Segment).filter(
+            Segment.lat_min <= emprise['lat_max'] + marge,
+            Segment.lat_max >= emprise['lat_min'] - marge,
+            Segment.lon_min <= emprise['lon_max'] + marge_lon,
+            Segment.lon_max >= emprise['lon_min'] - marge_lon,
+            or_(Segment.type_sport.is_(None), Segment.type_sport == type_sport)
+        ).all()
+
+    @staticmethod
+    def ajouter_efforts(db: Session, segment_id: int, activite: Activite, efforts: List[Dict]) -> None:
+        """
+        Ajoute les passages d'une activité sur un segment dans la transaction de l'appelant
+
+        Args:
+            db: Session de l'appelant (le commit lui revient)
+            segment_id: ID du segment
+            activite: Activité déjà insérée (id connu)
+            efforts: Résultat de utils.segments.trouver_efforts
+        """
+        db.add_all([
+            EffortSegment(
+                segment_id=segment_id,
+                activite_id=activite.id,
+                utilisateur_id=activite.utilisateur_id,
+                date_activite=activite.date_activite,
+                **effort
+            )
+            for effort in efforts
+        ])
+
+    @staticmethod
+    def retirer_efforts_autre_sport(db: Session, activite_id: int, type_sport: str) -> None:
+        """
+        Retire, dans la transaction de l'appelant, les passages d'une activité
+        sur les segments réservés à un autre sport (après un changement de sport)
+        """
+        autre_sport = select(Segment.id).where(
+            Segment.type_sport.isnot(None), Segment.type_sport != type_sport
+        )
+        db.query(EffortSegment).filter(
+            EffortSegment.activite_id == activite_id,
+            EffortSegment.segment_id.in_(autre_sport)
+        ).delete(synchronize_session=False)
+
+    @staticmethod
+    def lister_activites_a_rattacher(segment: Segment, apres_id: int, limite: int) -> List[Activite]:
+        """
+        Liste les activités qui peuvent parcourir un segment et n'ont encore
+        aucun passage enregistré dessus, par ID croissant
+
+        Args:
+            segment: Segment à rattacher
+            apres_id: Ne renvoyer que les activités d'ID supérieur (reprise)
+            limite: Nombre maximal d'activités
+        """
+        marge, marge_lon = _marges(segment.lat_max)
+        db = SessionLocal()
+        try:
+            # Préfiltre par l'index spatial des emprises (R*Tree sous SQLite)
+            dans_zone = EmpriseActiviteDAO.filtre_zone(
+                db,
+                segment.lat_min - marge, segment.lon_min - marge_lon,
+                segment.lat_max + marge, segment.lon_max + marge_lon
+            )
+            deja_rattachee = exists().where(
+                EffortSegment.activite_id == Activite.id,
+                EffortSegment.segment_id == segment.id
+            )
+            query = db.query(Activite).filter(dans_zone, Activite.id > apres_id, ~deja_rattachee)
+            if segment.type_sport:
+                query = query.filter(Activite.type_sport == segment.type_sport)
+            return query.order_by(Activite.id).limit(limite).all()
+        finally:
+            db.close()
+
+    @staticmethod
+    def get_classement(segment_id: int, limite: int = 50) -> List[tuple]:
+        """
+        Récupère le meilleur passage de chaque utilisateur sur un segment
+
+        Args:
+            segment_id: ID du segment
+            limite: Nombre maximal d'utilisateurs classés
+
+        Returns:
+            Liste de (EffortSegment, pseudo), du plus rapide au plus lent
+        """
+        db = SessionLocal()
+        try:
+            # Meilleur temps de chaque utilisateur, servi par l'index du classement
+            rang = func.row_number().over(
+                partition_by=EffortSegment.utilisateur_id,
+                order_by=EffortSegment.duree
+            ).label("rang")
+            meilleurs = (
+                select(EffortSegment.id, rang)
+                .where(EffortSegment.segment_id == segment_id)
+                .subquery()
+            )
+            return db.execute(
+                select(EffortSegment, Utilisateur.pseudo)
+                .join(meilleurs, meilleurs.c.id == EffortSegment.id)
+                .join(Utilisateur, Utilisateur.id == EffortSegment.utilisateur_id)
+                .where(meilleurs.c.rang == 1)
+                .order_by(EffortSegment.duree)
+                .limit(limite)
+            ).all()
+        finally:
+            db.close()
+
+    @staticmethod
+    def get_efforts_activite(activite_id: int) -> List[tuple]:
+        """
+        Récupère les passages d'une activité sur les segments
+
+        Returns:
+            Liste de (EffortSegment, nom du segment), dans l'ordre de la trace
+        """
+        db = SessionLocal()
+        try:
+            return db.execute(
+                select(EffortSegment, Segment.nom)
+                .join(Segment, Segment.id == EffortSegment.segment_id)
+                .where(EffortSegment.activite_id == activite_id)
+                .order_by(EffortSegment.indice_debut)
+            ).all()
+        finally:
+            db.close()
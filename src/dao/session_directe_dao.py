@@ -0,0 +1,193 @@
+"""
+DAO pour les sessions en direct et leurs points
+
+L'état des métriques est une ligne SessionDirecte ; les points reçus sont
+ajoutés à la fin d'un fichier binaire (uploads/directs/{id}.pts), une ligne
+de float64 par point dans l'ordre de Trace.COLONNES. Seules les nb_points
+premières lignes du fichier font foi.
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import update
+
+from database import SessionLocal
+from business_objects.models import SessionDirecte
+from utils.trace import Trace
+
+TAILLE_POINT = len(Trace.COLONNES) * 8  # Octets par point dans le fichier
+
+
+class SessionDirecteDAO:
+    """Classe DAO pour les sessions en direct"""
+
+    dossier = Path(__file__).resolve().parents[2] / "uploads" / "directs"
+
+    @staticmethod
+    def _chemin(session_id: int) -> Path:
+        return SessionDirecteDAO.dossier / f"{session_id}.pts"
+
+    @staticmethod
+    def create(utilisateur_id: int, nom: str, type_sport: str, description: str, etat: Dict) -> Optional[SessionDirecte]:
+        """
+        Crée une session en cours
+
+        Returns:
+            La session créée ou None en cas d'erreur
+        """
+        db = SessionLocal()
+        try:
+            session = SessionDirecte(
+                utilisateur_id=utilisateur_id,
+                nom=nom,
+                type_sport=type_sport,
+                description=description,
+                etat=json.dumps(etat)
+            )
+            db.add(session)
+            db.commit()
+            db.refresh(session)
+            return session
+
+        except Exception as e:
+            db.rollback()
+            print(f"Erreur lors de la création de la session en direct : {e}")
+            return None
+        finally:
+            db.close()
+
+    @staticmethod
+    def get(session_id: int) -> Optional[SessionDirecte]:
+        """Récupère une session (None si elle n'existe pas)"""
+        db = SessionLocal()
+        try:
+            return db.get(SessionDirecte, session_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def get_version(session_id: int) -> Optional[Tuple[int, str]]:
+        """Version et statut d'une session, sans lire son état (None si elle n'existe pas)"""
+        db = SessionLocal()
+        try:
+            ligne = db.query(SessionDirecte.version, SessionDirecte.statut).filter(
+                SessionDirecte.id == session_id
+            ).first()
+            return tuple(ligne) if ligne else None
+        finally:
+            db.close()
+
+    @staticmethod
+    def lister_en_cours(utilisateur_ids: List[int]) -> List[SessionDirecte]:
+        """Sessions en cours des utilisateurs donnés, des plus récentes aux plus anciennes"""
+        if not utilisateur_ids:
+            return []
+        db = SessionLocal()
+        try:
+            return db.query(SessionDirecte).filter(
+                SessionDirecte.statut == "en_cours",
+                SessionDirecte.utilisateur_id.in_(utilisateur_ids)
+            ).order_by(SessionDirecte.date_maj.desc()).all()
+        finally:
+            db.close()
+
+    @staticmethod
+    def mettre_a_jour(session_id: int, version: int, **valeurs) -> bool:
+        """
+        Met à jour une session en cours si personne ne l'a modifiée depuis sa lecture
+
+        Args:
+            session_id: ID de la session
+            version: Version lue ; la mise à jour passe la session à version + 1
+            **valeurs: Colonnes modifiées (etat, nb_points, statut...)
+
+        Returns:
+            True si mise à jour, False si la session n'est plus en cours ou a changé
+        """
+        db = SessionLocal()
+        try:
+            resultat = db.execute(
+                update(SessionDirecte)
+                .where(
+                    SessionDirecte.id == session_id,
+                    SessionDirecte.version == version,
+                    SessionDirecte.statut == "en_cours"
+                )
+                .values(version=version + 1, date_maj=datetime.utcnow(), **valeurs)
+            )
+            db.commit()
+            return resultat.rowcount == 1
+
+        except Exception as e:
+            db.rollback()
+            print(f"Erreur lors de la mise à jour de la session en direct : {e}")
+            return False
+        finally:
+            db.close()
+
+    @staticmethod
+    def renseigner(session_id: int, **valeurs) -> bool:
+        """Modifie une session sans condition (statut final, activité créée)"""
+        db = SessionLocal()
+        try:
+            db.execute(update(SessionDirecte).where(SessionDirecte.id == session_id).values(**valeurs))
+            db.commit()
+            return True
+
+        except Exception as e:
+            db.rollback()
+            print(f"Erreur lors de la mise à jour de la session en direct : {e}")
+            return False
+        finally:
+            db.close()
+
+    @staticmethod
+    def ecrire_points(session_id: int, debut: int, points: np.ndarray) -> bool:
+        """
+        Écrit des points à partir de la ligne debut (les lignes suivantes sont retirées)
+
+        Args:
+            session_id: ID de la session
+            debut: Nombre de points déjà valides dans le fichier
+            points: Tableau (n, len(Trace.COLONNES))
+
+        Returns:
+            True si écrits, False sinon
+        """
+        chemin = SessionDirecteDAO._chemin(session_id)
+        try:
+            chemin.parent.mkdir(parents=True, exist_ok=True)
+            with open(chemin, "ab") as f:
+                # Les lignes au-delà de debut (écriture interrompue) sont remplacées
+                f.truncate(min(debut * TAILLE_POINT, f.seek(0, 2)))
+                f.write(np.ascontiguousarray(points, dtype="<f8").tobytes())
+            return True
+
+        except Exception as e:
+            print(f"Erreur lors de l'écriture des points en direct : {e}")
+            return False
+
+    @staticmethod
+    def lire_points(session_id: int, nb_points: int) -> Trace:
+        """Relit les nb_points premiers points d'une session (moins si le fichier est plus court)"""
+        nb_colonnes = len(Trace.COLONNES)
+        try:
+            donnees = np.fromfile(
+                SessionDirecteDAO._chemin(session_id), dtype="<f8", count=nb_points * nb_colonnes
+            )
+        except FileNotFoundError:
+            donnees = np.empty(0)
+        donnees = donnees[:len(donnees) // nb_colonnes * nb_colonnes].reshape(-1, nb_colonnes)
+        return Trace(*donnees.T)
+
+    @staticmethod
+    def supprimer_points(session_id: int) -> bool:
+        """Supprime le fichier de points d'une session"""
+        try:
+            SessionDirecteDAO._chemin(session_id).unlink()
+            return True
+        except FileNotFoundError:
+            return False
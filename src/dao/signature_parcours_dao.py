@@ -0,0 +1,129 @@
+"""
+DAO pour les tables SignatureParcours et BucketParcours
+Les candidats d'un parcours sont trouvés par l'index des buckets LSH :
+seules les activités qui partagent au moins une bande sont relues
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from business_objects.models import Activite, BucketParcours, SignatureParcours
+
+
+def serialiser_signature(signature: np.ndarray) -> bytes:
+    return signature.astype("<u4").tobytes()
+
+
+def deserialiser_signature(signature: bytes) -> np.ndarray:
+    return np.frombuffer(signature, dtype="<u4")
+
+
+class SignatureParcoursDAO:
+    """Classe DAO pour les signatures de parcours et leurs buckets LSH"""
+
+    @staticmethod
+    def ajouter(
+        db: Session,
+        activite: Activite,
+        signature: np.ndarray,
+        cles: np.ndarray,
+        doublon_de: Optional[int] = None
+    ) -> SignatureParcours:
+        """
+        Ajoute la signature d'une activité et ses buckets dans la transaction de l'appelant
+
+        Args:
+            db: Session de l'appelant (le commit lui revient)
+            activite: Activité déjà insérée (id connu)
+            signature: Résultat de utils.signature_parcours.signature
+            cles: Résultat de utils.signature_parcours.cles_lsh
+            doublon_de: Activité d'origine si c'est un doublon
+
+        Returns:
+            La ligne créée
+        """
+        ligne = SignatureParcours(
+            activite_id=activite.id,
+            utilisateur_id=activite.utilisateur_id,
+            signature=serialiser_signature(signature),
+            doublon_de=doublon_de
+        )
+        db.add(ligne)
+        db.add_all([
+            BucketParcours(activite_id=activite.id, bande=bande, utilisateur_id=activite.utilisateur_id, cle=int(cle))
+            for bande, cle in enumerate(cles)
+        ])
+        return ligne
+
+    @staticmethod
+    def oublier_original(db: Session, activite_id: int) -> None:
+        """
+        Détache, dans la transaction de l'appelant, les doublons d'une activité
+        avant sa suppression (les bases existantes n'ont pas le ON DELETE SET NULL)
+        """
+        db.query(SignatureParcours).filter(SignatureParcours.doublon_de == activite_id).update(
+            {"doublon_de": None}, synchronize_session=False
+        )
+
+    @staticmethod
+    def candidats(db: Session, utilisateur_id: int, cles: np.ndarray) -> List[Tuple[SignatureParcours, Activite]]:
+        """
+        Activités de l'utilisateur qui partagent au moins un bucket LSH
+
+        Args:
+            db: Session de la requête
+            utilisateur_id: Propriétaire des activités
+            cles: Clés LSH du parcours recherché
+
+        Returns:
+            Liste de (SignatureParcours, Activite), par ID croissant
+        """
+        # Une recherche par bande dans l'index (utilisateur_id, bande, cle) :
+        # chaque terme du OR est complet pour que SQLite cherche bande par bande
+        dans_un_bucket = select(BucketParcours.activite_id).where(or_(*(
+            and_(
+                BucketParcours.utilisateur_id == utilisateur_id,
+                BucketParcours.bande == bande,
+                BucketParcours.cle == int(cle)
+            )
+            for bande, cle in enumerate(cles)
+        )))
+        return db.execute(
+            select(SignatureParcours, Activite)
+            .join(Activite, Activite.id == SignatureParcours.activite_id)
+            .where(SignatureParcours.activite_id.in_(dans_un_bucket))
+            .order_by(SignatureParcours.activite_id)
+        ).all()
+
+    @staticmethod
+    def get(activite_id: int) -> Optional[SignatureParcours]:
+        """Récupère la signature d'une activité (None si elle n'en a pas)"""
+        db = SessionLocal()
+        try:
+            return db.get(SignatureParcours, activite_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def lister_sans_signature(apres_id: int, limite: int) -> List[Activite]:
+        """
+        Liste les activités GPX sans signature de parcours, par ID croissant
+
+        Args:
+            apres_id: Ne renvoyer que les activités d'ID supérieur (reprise)
+            limite: Nombre maximal d'activités
+        """
+        db = SessionLocal()
+        try:
+            return db.query(Activite).outerjoin(
+                SignatureParcours, SignatureParcours.activite_id == Activite.id
+            ).filter(
+                Activite.gpx_path.isnot(None),
+                Activite.id > apres_id,
+                SignatureParcours.activite_id.is_(None)
+            ).order_by(Activite.id).limit(limite).all()
+        finally:
+            db.close()
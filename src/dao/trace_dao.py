@@ -0,0 +1,220 @@
+"""
+DAO pour le stockage en colonnes des traces GPS
+Chaque activité a un fichier binaire annexe (uploads/traces/{id}.trk)
+dont les colonnes sont relues par memory-mapping, sans copie ni parsing XML
+"""
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from utils.trace import Trace
+
+# Format du fichier :
+#   en-tête   : magic, version, nb colonnes, nb points, temps de départ (POSIX)
+#   répertoire: pour chaque colonne, nom, type NumPy et position dans le fichier
+#   données   : colonnes contiguës, alignées sur 8 octets
+MAGIC = b"TRK1"
+VERSION = 2
+# Version 1 : temps en secondes entières (int32, TEMPS_ABSENT si absent), toujours relue
+VERSIONS_LISIBLES = (1, 2)
+EN_TETE = struct.Struct("<4sHHId")
+ENTREE_COLONNE = struct.Struct("<8s4sQ")
+
+# Marqueur d'un point sans horodatage dans la colonne des temps d'un fichier
+# de version 1 (NaN depuis la version 2)
+TEMPS_ABSENT = np.iinfo(np.int32).min
+
+COLONNES = (
+    ("lat", "<f8"),
+    ("lon", "<f8"),
+    ("ele", "<f4"),
+    ("temps", "<f8"),   # Secondes écoulées depuis le premier point horodaté (fractions comprises)
+    ("segment", "<i4"),
+)
+
+# Colonne optionnelle : niveau de simplification de chaque point (utils.simplification)
+COLONNE_NIVEAU = ("niveau", "|i1")
+
+# Colonnes optionnelles des capteurs, écrites seulement si la trace en porte
+# (attribut de la Trace -> nom et type dans le fichier, NaN si pas de mesure)
+COLONNES_CAPTEURS = {
+    "fc": ("fc", "<f4"),
+    "cadence": ("cadence", "<f4"),
+    "puissance": ("watts", "<f4"),
+    "temperature": ("temp", "<f4"),
+}
+
+
+def _aligner(position: int) -> int:
+    return (position + 7) // 8 * 8
+
+
+def temps_absents(temps: np.ndarray) -> np.ndarray:
+    """Points sans horodatage d'une colonne des temps, quelle que soit la version du fichier"""
+    if np.issubdtype(temps.dtype, np.integer):
+        return temps == TEMPS_ABSENT
+    return np.isnan(temps)
+
+
+class TraceDAO:
+    """Classe DAO pour les traces stockées en colonnes"""
+
+    dossier = Path(__file__).resolve().parents[2] / "uploads" / "traces"
+
+    @staticmethod
+    def _chemin(activite_id: int) -> Path:
+        return TraceDAO.dossier / f"{activite_id}.trk"
+
+    @staticmethod
+    def create(activite_id: int, trace: Trace, niveaux: Optional[np.ndarray] = None) -> bool:
+        """
+        Écrit la trace d'une activité dans son fichier annexe
+
+        Args:
+            activite_id: ID de l'activité
+            trace: Trace à stocker
+            niveaux: Niveau de simplification de chaque point (optionnel)
+
+        Returns:
+            True si écrite, False sinon
+        """
+        horodates = ~np.isnan(trace.temps)
+        temps_debut = float(trace.temps[horodates][0]) if horodates.any() else 0.0
+        # Écarts gardés en flottants : les traces à 1 Hz et plus ont des fractions de seconde
+        temps = trace.temps - temps_debut
+
+        valeurs = {
+            "lat": trace.lat,
+            "lon": trace.lon,
+            "ele": trace.ele,
+            "temps": temps,
+            "segment": trace.segment,
+        }
+        colonnes = COLONNES
+        for attribut, colonne in COLONNES_CAPTEURS.items():
+            mesures = getattr(trace, attribut)
+            if not np.isnan(mesures).all():
+                valeurs[colonne[0]] = mesures
+                colonnes = colonnes + (colonne,)
+        if niveaux is not None:
+            valeurs[COLONNE_NIVEAU[0]] = niveaux
+            colonnes = colonnes + (COLONNE_NIVEAU,)
+
+        # Position de chaque colonne après l'en-tête et le répertoire
+        position = _aligner(EN_TETE.size + ENTREE_COLONNE.size * len(colonnes))
+        repertoire = []
+        for nom, type_colonne in colonnes:
+            repertoire.append((nom, type_colonne, position))
+            position = _aligner(position + len(trace) * np.dtype(type_colonne).itemsize)
+
+        chemin = TraceDAO._chemin(activite_id)
+        temporaire = chemin.with_suffix(".tmp")
+        try:
+            TraceDAO.dossier.mkdir(parents=True, exist_ok=True)
+            with open(temporaire, "wb") as f:
+                f.write(EN_TETE.pack(MAGIC, VERSION, len(colonnes), len(trace), temps_debut))
+                for nom, type_colonne, debut in repertoire:
+                    f.write(ENTREE_COLONNE.pack(nom.encode(), type_colonne.encode(), debut))
+                for nom, type_colonne, debut in repertoire:
+                    f.seek(debut)
+                    f.write(np.ascontiguousarray(valeurs[nom], dtype=type_colonne).tobytes())
+                f.truncate(position)
+            # Remplacement atomique : un lecteur ne voit jamais un fichier partiel
+            os.replace(temporaire, chemin)
+            return True
+
+        except Exception as e:
+            print(f"Erreur lors de l'écriture de la trace : {e}")
+            if temporaire.exists():
+                temporaire.unlink()
+            return False
+
+    @staticmethod
+    def get_colonnes(activite_id: int) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Ouvre la trace d'une activité en memory-mapping
+
+        Args:
+            activite_id: ID de l'activité
+
+        Returns:
+            Dictionnaire {nom de colonne: vue NumPy en lecture seule}
+            plus 'temps_debut' (POSIX), ou None si pas de trace
+        """
+        chemin = TraceDAO._chemin(activite_id)
+        if not chemin.exists():
+            return None
+
+        with open(chemin, "rb") as f:
+            # La projection reste valide après fermeture du descripteur
+            brut = np.frombuffer(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), dtype=np.uint8)
+        magic, version, nb_colonnes, nb_points, temps_debut = EN_TETE.unpack_from(brut, 0)
+        if magic != MAGIC or version not in VERSIONS_LISIBLES:
+            print(f"Format de trace inconnu : {chemin}")
+            return None
+
+        colonnes = {"temps_debut": temps_debut}
+        for i in range(nb_colonnes):
+            nom, type_colonne, debut = ENTREE_COLONNE.unpack_from(
+                brut, EN_TETE.size + i * ENTREE_COLONNE.size
+            )
+            type_colonne = np.dtype(type_colonne.rstrip(b"\0").decode())
+            fin = debut + nb_points * type_colonne.itemsize
+            colonnes[nom.rstrip(b"\0").decode()] = brut[debut:fin].view(type_colonne)
+        return colonnes
+
+    @staticmethod
+    def get_trace(activite_id: int) -> Optional[Trace]:
+        """
+        Reconstruit la Trace d'une activité (temps absolus, NaN si absents)
+
+        Args:
+            activite_id: ID de l'activité
+
+        Returns:
+            La trace ou None si pas de trace
+        """
+        colonnes = TraceDAO.get_colonnes(activite_id)
+        if colonnes is None:
+            return None
+
+        temps = colonnes["temps"].astype(np.float64)
+        temps[temps_absents(colonnes["temps"])] = np.nan
+        capteurs = {
+            attribut: colonnes.get(nom)
+            for attribut, (nom, _) in COLONNES_CAPTEURS.items()
+        }
+        return Trace(
+            segment=colonnes["segment"],
+            lat=colonnes["lat"],
+            lon=colonnes["lon"],
+            ele=colonnes["ele"],
+            temps=temps + colonnes["temps_debut"],
+            **capteurs
+        )
+
+    @staticmethod
+    def exists(activite_id: int) -> bool:
+        """Vérifie si une activité a une trace stockée"""
+        return TraceDAO._chemin(activite_id).exists()
+
+    @staticmethod
+    def delete(activite_id: int) -> bool:
+        """
+        Supprime la trace d'une activité
+
+        Args:
+            activite_id: ID de l'activité
+
+        Returns:
+            True si supprimée, False sinon
+        """
+        chemin = TraceDAO._chemin(activite_id)
+        if not chemin.exists():
+            return False
+        chemin.unlink()
+        return True
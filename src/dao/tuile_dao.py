@@ -0,0 +1,127 @@
+"""
+DAO pour le cache disque des tuiles de carte de chaleur
+Chaque tuile rendue est un fichier uploads/tuiles/{utilisateur}/{z}/{x}/{y}.png ;
+un fichier vide note une tuile sans aucun passage
+
+Chaque invalidation change la génération du cache de l'utilisateur
+(uploads/tuiles/.generations/{utilisateur}) avant de retirer les tuiles :
+une tuile rendue pendant une invalidation, donc peut-être à partir de
+traces périmées, n'est pas gardée (voir enregistrer).
+"""
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+
+class TuileDAO:
+    """Classe DAO pour les tuiles de carte de chaleur en cache"""
+
+    dossier = Path(__file__).resolve().parents[2] / "uploads" / "tuiles"
+
+    @staticmethod
+    def _chemin(utilisateur_id: int, zoom: int, x: int, y: int) -> Path:
+        return TuileDAO.dossier / str(utilisateur_id) / str(zoom) / str(x) / f"{y}.png"
+
+    @staticmethod
+    def _chemin_generation(utilisateur_id: int) -> Path:
+        return TuileDAO.dossier / ".generations" / str(utilisateur_id)
+
+    @staticmethod
+    def generation(utilisateur_id: int) -> Optional[str]:
+        """Génération courante du cache d'un utilisateur (None s'il n'a jamais été invalidé)"""
+        try:
+            return TuileDAO._chemin_generation(utilisateur_id).read_text()
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _changer_generation(utilisateur_id: int) -> None:
+        chemin = TuileDAO._chemin_generation(utilisateur_id)
+        # Nom propre à cet appel : les routes et tâches de fond tournent dans des threads du même processus
+        temporaire = chemin.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        chemin.parent.mkdir(parents=True, exist_ok=True)
+        temporaire.write_text(uuid.uuid4().hex)
+        os.replace(temporaire, chemin)
+
+    @staticmethod
+    def get(utilisateur_id: int, zoom: int, x: int, y: int) -> Optional[bytes]:
+        """
+        Lit une tuile en cache
+
+        Returns:
+            Le PNG (b"" pour une tuile vide) ou None si la tuile n'est pas en cache
+        """
+        try:
+            return TuileDAO._chemin(utilisateur_id, zoom, x, y).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def enregistrer(
+        utilisateur_id: int, zoom: int, x: int, y: int, png: bytes, generation: Optional[str] = None
+    ) -> bool:
+        """
+        Met une tuile en cache
+
+        Args:
+            generation: Génération lue avant le rendu ; si le cache a été
+                invalidé depuis, la tuile n'est pas gardée
+
+        Returns:
+            True si écrite, False sinon
+        """
+        chemin = TuileDAO._chemin(utilisateur_id, zoom, x, y)
+        temporaire = chemin.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        try:
+            if TuileDAO.generation(utilisateur_id) != generation:
+                return False
+            chemin.parent.mkdir(parents=True, exist_ok=True)
+            temporaire.write_bytes(png)
+            # Remplacement atomique : un lecteur ne voit jamais une tuile partielle
+            os.replace(temporaire, chemin)
+            # Invalidation survenue entre la vérification et le remplacement :
+            # elle a pu passer avant que la tuile n'existe, on la retire nous-mêmes
+            if TuileDAO.generation(utilisateur_id) != generation:
+                chemin.unlink(missing_ok=True)
+                return False
+            return True
+
+        except Exception as e:
+            print(f"Erreur lors de l'écriture de la tuile : {e}")
+            if temporaire.exists():
+                temporaire.unlink()
+            return False
+
+    @staticmethod
+    def supprimer(utilisateur_id: int, tuiles: Iterable[Tuple[int, int, int]]) -> int:
+        """
+        Retire des tuiles du cache
+
+        Args:
+            utilisateur_id: ID de l'utilisateur
+            tuiles: Tuiles (zoom, x, y) à retirer
+
+        Returns:
+            Nombre de tuiles retirées
+        """
+        TuileDAO._changer_generation(utilisateur_id)
+        nombre = 0
+        for zoom, x, y in tuiles:
+            try:
+                TuileDAO._chemin(utilisateur_id, zoom, x, y).unlink()
+                nombre += 1
+            except FileNotFoundError:
+                pass
+        return nombre
+
+    @staticmethod
+    def supprimer_utilisateur(utilisateur_id: int) -> bool:
+        """Retire toutes les tuiles d'un utilisateur du cache"""
+        TuileDAO._changer_generation(utilisateur_id)
+        dossier = TuileDAO.dossier / str(utilisateur_id)
+        if not dossier.exists():
+            return False
+        shutil.rmtree(dossier, ignore_errors=True)
+        return True
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 
 from database import SessionLocal, Base, engine
 from business_objects.models import Utilisateur, Activite
+from dao.compteurs_dao import CompteursDAO
 
 class UtilisateurDAO:
     """Classe DAO pour les opérations CRUD sur Utilisateur"""
@@ -195,6 +196,9 @@ class UtilisateurDAO:
             if not utilisateur:
                 return False
 
+            # Ses likes et ses follows disparaissent avec lui : compteurs des autres à ajuster
+            db.execute(CompteursDAO.retrait_likes_utilisateur(user_id))
+            db.execute(CompteursDAO.retrait_follows_utilisateur(user_id))
             db.delete(utilisateur)
             db.commit()
             return True
@@ -1,10 +1,17 @@
-from typing import Annotated
-from sqlalchemy import create_engine
+import os
+from contextlib import asynccontextmanager
+from typing import Annotated, AsyncIterator, Callable, Dict, Optional, TypeVar
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
 from pathlib import Path
 from fastapi import Depends
 from sqlmodel import Session # Garder cet import si vous l'utilisez ailleurs
 
+from .unite_de_travail import ECRITURE, LECTURE, UniteDeTravail, apres_validation, unite_courante
+
 
 # 1. CONFIGURATION DE BASE DE DONNÉES
 
@@ -15,15 +22,152 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DATA_DIR = PROJECT_ROOT / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
-# Chemin vers la base de données
+# Chemin vers la base de données (utilisée si DATABASE_URL n'est pas définie)
 DB_PATH = DATA_DIR / "app_sportive.db"
 
-# Crée un moteur de base de données SQLite
-engine = create_engine(
-    f"sqlite:///{DB_PATH}",
-    echo=False, # Désactiver l'echo ici si vous voulez moins de logs, mais ce n'est pas le problème
-    connect_args={"check_same_thread": False}
-)
+# URL SQLAlchemy de la base : sqlite:///chemin.db, postgresql+psycopg://...
+DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+# Profil SQLite, appliqué à chaque connexion ouverte par le pool.
+# WAL : les lectures ne bloquent plus les écritures (et inversement) ;
+# synchronous=NORMAL reste sûr en WAL (seul le dernier commit peut être
+# perdu en cas de coupure de courant) ; busy_timeout fait attendre un
+# écrivain concurrent au lieu de lever « database is locked ».
+PRAGMAS_SQLITE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000)),  # ms
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),  # octets
+    "cache_size": -int(os.getenv("SQLITE_CACHE_KIO", 64 * 1024)),  # négatif : en Kio
+    "temp_store": "MEMORY",
+}
+
+# Pilotes asynchrones utilisés par creer_engine_async, par type de base
+PILOTES_ASYNC = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+}
+
+# Profil des bases serveur (PostgreSQL, MySQL...) : taille du pool de connexions
+PROFIL_POOL = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 10)),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 20)),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),  # s
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", 30)),  # s
+    "pool_pre_ping": True,
+}
+
+
+def _appliquer_pragmas(engine: Engine, pragmas: Dict) -> None:
+    """Exécute les PRAGMA à l'ouverture de chaque connexion SQLite"""
+
+    @event.listens_for(engine, "connect")
+    def _configurer(connexion_dbapi, _):
+        curseur = connexion_dbapi.cursor()
+        try:
+            for nom, valeur in pragmas.items():
+                curseur.execute(f"PRAGMA {nom}={valeur}")
+        finally:
+            curseur.close()
+
+
+def _gerer_transactions(engine: Engine) -> None:
+    """
+    Laisse SQLAlchemy ouvrir lui-même les transactions SQLite
+
+    Le pilote sqlite3 n'ouvre une transaction qu'avant une écriture, ce qui
+    casse les points de sauvegarde et l'isolation des lectures. Il passe en
+    mode autocommit et chaque transaction commence par un BEGIN explicite :
+    BEGIN IMMEDIATE pour une unité de travail en écriture, qui prend le
+    verrou d'écriture d'emblée plutôt que d'échouer en cours de route quand
+    un autre écrivain est passé entre-temps.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _autocommit(connexion_dbapi, _):
+        connexion_dbapi.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _debuter(connexion):
+        ecriture = connexion.get_execution_options().get("transaction_ecriture", False)
+        connexion.exec_driver_sql("BEGIN IMMEDIATE" if ecriture else "BEGIN")
+
+
+def _options_sqlite(url, options: Dict) -> Dict:
+    """Options de create_engine pour une base SQLite (pragmas retirés de options)"""
+    pragmas = {**PRAGMAS_SQLITE, **options.pop("pragmas", {})}
+    if url.database in (None, "", ":memory:"):
+        # Une base en mémoire n'existe que dans sa connexion : elle est partagée
+        options.setdefault("poolclass", StaticPool)
+        pragmas.pop("journal_mode", None)
+    options["connect_args"] = {"check_same_thread": False, "timeout": pragmas["busy_timeout"] / 1000}
+    options["pragmas"] = pragmas
+    return options
+
+
+def creer_engine(url: Optional[str] = None, echo: bool = False, **options) -> Engine:
+    """
+    Crée le moteur de base de données selon le type de base
+
+    Args:
+        url: URL SQLAlchemy (DATABASE_URL par défaut)
+        echo: Journaliser les requêtes SQL
+        **options: Remplacent les réglages du profil (pragmas pour SQLite,
+            pool_size, max_overflow... pour une base serveur)
+
+    Returns:
+        Le moteur SQLAlchemy
+    """
+    url = make_url(url or DATABASE_URL)
+
+    if url.get_backend_name() != "sqlite":
+        return create_engine(url, echo=echo, **{**PROFIL_POOL, **options})
+
+    options = _options_sqlite(url, options)
+    pragmas = options.pop("pragmas")
+    engine = create_engine(url, echo=echo, **options)
+    _appliquer_pragmas(engine, pragmas)
+    _gerer_transactions(engine)
+    return engine
+
+
+def creer_engine_async(url: Optional[str] = None, echo: bool = False, **options) -> AsyncEngine:
+    """
+    Crée le moteur asynchrone (SQLAlchemy asyncio) de la même base
+
+    Le pilote synchrone de l'URL est remplacé par son équivalent asynchrone
+    (sqlite → aiosqlite, postgresql → asyncpg, mysql → aiomysql) ; le profil
+    (pragmas, transactions, pool) est celui de creer_engine.
+
+    Args:
+        url: URL SQLAlchemy (DATABASE_URL par défaut)
+        echo: Journaliser les requêtes SQL
+        **options: Comme pour creer_engine
+
+    Returns:
+        Le moteur asynchrone
+    """
+    url = make_url(url or DATABASE_URL)
+    backend = url.get_backend_name()
+    if backend in PILOTES_ASYNC:
+        url = url.set(drivername=f"{backend}+{PILOTES_ASYNC[backend]}")
+
+    if backend != "sqlite":
+        return create_async_engine(url, echo=echo, **{**PROFIL_POOL, **options})
+
+    options = _options_sqlite(url, options)
+    pragmas = options.pop("pragmas")
+    engine_async = create_async_engine(url, echo=echo, **options)
+    # Les événements se posent sur le moteur synchrone sous-jacent
+    _appliquer_pragmas(engine_async.sync_engine, pragmas)
+    _gerer_transactions(engine_async.sync_engine)
+    return engine_async
+
+
+# Crée les moteurs de base de données (synchrone et asynchrone, chacun son pool)
+engine = creer_engine(echo=os.getenv("DATABASE_ECHO", "0") == "1")
+engine_async = creer_engine_async(echo=os.getenv("DATABASE_ECHO", "0") == "1")
 
 
 # 2. DÉFINITION DE LA BASE DÉCLARATIVE 
@@ -43,8 +187,94 @@ except (ImportError, AttributeError):
 # 3. CRÉATION DES SESSIONS
 
 
-# Création de sessions pour interagir avec la base
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+# Sessions indépendantes, hors unité de travail (scripts, tâches de fond)
+_fabrique_sessions = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+
+def SessionLocal() -> Session:
+    """
+    Session pour un DAO ou un service
+
+    Pendant une unité de travail (requête de l'API, unite_de_travail()),
+    c'est une vue sur la session de l'unité : même connexion et même
+    transaction pour tous les appels (voir database.unite_de_travail).
+    Sinon, une nouvelle session indépendante.
+    """
+    unite = unite_courante()
+    return unite.session_partagee() if unite is not None else _fabrique_sessions()
+
+
+def unite_de_travail(mode: str = ECRITURE) -> UniteDeTravail:
+    """
+    Ouvre une unité de travail (à utiliser dans un bloc with)
+
+    Les DAO et services appelés dans le bloc partagent une session et une
+    transaction, validée à la sortie du bloc. Une unité ouverte dans une
+    autre est indépendante (sa propre connexion et sa propre transaction).
+
+    Args:
+        mode: LECTURE ou ECRITURE
+    """
+    return UniteDeTravail(engine, mode, engine_async)
+
+
+# Sessions asynchrones indépendantes, hors unité de travail
+_fabrique_sessions_async = async_sessionmaker(engine_async, autoflush=False, expire_on_commit=False)
+
+
+@asynccontextmanager
+async def session_async(ecriture: bool = False) -> AsyncIterator[AsyncSession]:
+    """
+    Session asynchrone pour un DAO ou un service (async with session_async() as db)
+
+    Pendant une unité de travail, c'est la session asynchrone de l'unité ;
+    avec ecriture=True, les écritures du bloc forment un point de sauvegarde,
+    annulé seul si le bloc échoue (comme avec SessionLocal()). Sinon, une
+    nouvelle session fermée à la sortie du bloc, qui valide ses écritures.
+
+    Args:
+        ecriture: Le bloc écrit dans la base
+    """
+    unite = unite_courante()
+    if unite is None:
+        async with _fabrique_sessions_async() as session:
+            if ecriture:
+                async with session.begin():
+                    yield session
+            else:
+                yield session
+        return
+
+    session = unite.session_async
+    if not ecriture:
+        yield session
+        return
+    async with session.begin_nested():
+        yield session
+    if unite.mode == LECTURE:
+        # Une unité en lecture ne valide rien à la fin : écriture ponctuelle validée aussitôt
+        await session.commit()
+
+
+T = TypeVar("T")
+
+
+async def executer_async(fonction: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Exécute du code synchrone d'accès aux données (services, DAO) sans thread
+
+    Le code tourne sur la connexion asynchrone de l'unité de travail (une
+    unité en lecture est ouverte s'il n'y en a pas) : ses SessionLocal() y
+    partagent la session, et chaque requête SQL rend la main à la boucle
+    d'événements le temps que la base réponde. Le calcul Python, lui, occupe
+    la boucle : à réserver aux traitements courts.
+    """
+    unite = unite_courante()
+    if unite is not None:
+        return await unite.session_async.run_sync(lambda _: fonction(*args, **kwargs))
+    async with unite_de_travail(LECTURE) as unite:
+        return await unite.session_async.run_sync(lambda _: fonction(*args, **kwargs))
+
 
 def get_session():
     # Note : Utilisation de SessionLocal qui est une sessionmaker de SQLAlchemy
@@ -56,4 +286,4 @@ def get_session():
 
 SessionDep = Annotated[Session, Depends(get_session)] 
 
-print(f" Base de données : {DB_PATH}")
\ No newline at end of file
+print(f" Base de données : {engine.url.render_as_string(hide_password=True)}")
\ No newline at end of file
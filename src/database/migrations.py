@@ -0,0 +1,127 @@
+"""
+Migrations versionnées du schéma
+
+Base.metadata.create_all crée les tables manquantes mais ne modifie jamais
+une table existante. Les évolutions d'une base déjà en service (index,
+colonnes ajoutées...) sont donc des migrations numérotées, appliquées dans
+l'ordre et enregistrées dans la table VersionSchema.
+
+Les tables sont créées avant les migrations : une base neuve a déjà tout ce
+que décrivent les modèles. Chaque migration vérifie donc ce qui existe
+avant d'agir, et peut être rejouée sans effet.
+
+Les migrations s'appliquent au démarrage de l'API et depuis la ligne de
+commande : python src/migrer_base.py
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Column, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+from database import Base, engine as engine_defaut
+from business_objects import models  # Enregistre les modèles dans Base.metadata
+from business_objects.models import VersionSchema
+from dao.compteurs_dao import CompteursDAO
+
+
+def _creer_index(connexion: Connection, table: Table, nom: str) -> None:
+    """Crée un index déclaré dans les modèles s'il n'existe pas encore"""
+    index = next(index for index in table.indexes if index.name == nom)
+    index.create(connexion, checkfirst=True)
+
+
+def _index_requetes_frequentes(connexion: Connection) -> None:
+    _creer_index(connexion, models.Activite.__table__, "ix_activite_utilisateur_date")
+    _creer_index(connexion, models.Activite.__table__, "ix_activite_utilisateur_sport_date")
+    _creer_index(connexion, models.Commentaire.__table__, "ix_commentaire_activite")
+    _creer_index(connexion, models.follows, "ix_follow_followed")
+    _creer_index(connexion, models.likes, "ix_like_activite")
+
+
+def _ajouter_colonne(connexion: Connection, colonne: Column) -> None:
+    """Ajoute à sa table une colonne déclarée dans les modèles si elle n'existe pas encore"""
+    table = colonne.table
+    if colonne.name in {c["name"] for c in inspect(connexion).get_columns(table.name)}:
+        return
+    preparateur = connexion.dialect.identifier_preparer
+    definition = f"{preparateur.quote(colonne.name)} {colonne.type.compile(dialect=connexion.dialect)}"
+    if not colonne.nullable:
+        definition += " NOT NULL"
+    if colonne.server_default is not None:
+        definition += f" DEFAULT {colonne.server_default.arg}"
+    connexion.execute(text(f"ALTER TABLE {preparateur.format_table(table)} ADD COLUMN {definition}"))
+
+
+def _compteurs_denormalises(connexion: Connection) -> None:
+    for colonne in (
+        models.Activite.nb_likes, models.Activite.nb_commentaires,
+        models.Utilisateur.nb_followers, models.Utilisateur.nb_following, models.Utilisateur.nb_activites,
+    ):
+        _ajouter_colonne(connexion, colonne.property.columns[0])
+    CompteursDAO.reconstruire(connexion)
+
+
+def _pauses_metriques(connexion: Connection) -> None:
+    # Les lignes existantes restent à NULL : le recalcul en arrière-plan les complète
+    _ajouter_colonne(connexion, models.MetriquesActivite.duree_pauses.property.columns[0])
+    _ajouter_colonne(connexion, models.MetriquesActivite.nb_pauses.property.columns[0])
+
+
+def _index_records(connexion: Connection) -> None:
+    for nom in ("ix_activite_record_duree", "ix_activite_record_denivele", "ix_activite_record_calories"):
+        _creer_index(connexion, models.Activite.__table__, nom)
+
+
+# (version, description, fonction) par version croissante ; ne jamais renuméroter
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Index des activités par utilisateur, des commentaires, abonnés et likes", _index_requetes_frequentes),
+    (2, "Compteurs de likes, commentaires, abonnés, abonnements et activités", _compteurs_denormalises),
+    (3, "Durée et nombre de pauses dans les métriques des activités", _pauses_metriques),
+    (4, "Index des records personnels par sport", _index_records),
+]
+
+
+def versions_appliquees(engine: Optional[Engine] = None) -> Dict[int, str]:
+    """
+    Migrations déjà appliquées à la base
+
+    Returns:
+        Dictionnaire {version: description}
+    """
+    engine = engine or engine_defaut
+    VersionSchema.__table__.create(engine, checkfirst=True)
+    with engine.connect() as connexion:
+        return dict(connexion.execute(select(VersionSchema.version, VersionSchema.description)).all())
+
+
+def migrer(engine: Optional[Engine] = None, cible: Optional[int] = None) -> List[int]:
+    """
+    Crée les tables manquantes puis applique les migrations en attente
+
+    Args:
+        engine: Moteur de la base (celui de l'application par défaut)
+        cible: Dernière version à appliquer (toutes par défaut)
+
+    Returns:
+        Versions appliquées par cet appel
+    """
+    engine = engine or engine_defaut
+    Base.metadata.create_all(bind=engine)
+    deja_appliquees = versions_appliquees(engine)
+
+    appliquees = []
+    for version, description, appliquer in MIGRATIONS:
+        if version in deja_appliquees or (cible is not None and version > cible):
+            continue
+        try:
+            with engine.begin() as connexion:
+                appliquer(connexion)
+                connexion.execute(VersionSchema.__table__.insert().values(version=version, description=description))
+        except IntegrityError:
+            # Appliquée en même temps par un autre processus
+            continue
+        print(f"✓ Migration {version} : {description}")
+        appliquees.append(version)
+
+    return appliquees
@@ -0,0 +1,280 @@
+"""
+Unité de travail : une session, une connexion et une transaction partagées
+par tous les DAO et services appelés pendant une requête (ou un traitement)
+
+Les DAO et services continuent d'ouvrir leur session avec SessionLocal() ;
+quand une unité de travail est en cours, ils reçoivent une SessionPartagee
+sur la session de l'unité au lieu d'une nouvelle connexion :
+- close() ne ferme rien (les écritures non validées de l'appelant sont annulées) ;
+- en écriture, commit() et rollback() ne portent que sur les écritures de
+  l'appelant (point de sauvegarde) ; la transaction est validée une seule
+  fois, à la fin de l'unité ;
+- en lecture, la transaction n'écrit rien : une écriture ponctuelle (cache)
+  est validée aussitôt, et l'unité se termine par une annulation.
+
+Une route asynchrone utilise la session asynchrone de l'unité
+(database.session_async) ; le code synchrone qu'elle exécute par
+database.executer_async partage alors cette même session, et donc la même
+connexion et la même transaction. Une unité n'a jamais les deux à la fois.
+
+Les effets hors base qui suivent une écriture (suppression d'un fichier,
+invalidation d'un cache) passent par apres_validation : ils n'ont lieu
+qu'une fois la transaction de l'unité validée, et jamais si elle est annulée.
+
+L'unité courante est portée par une ContextVar : elle suit la requête dans
+les threads de asyncio.to_thread, mais pas dans les threads et processus
+lancés à part (retraitement, pool d'analyse), qui gardent leurs sessions.
+"""
+import asyncio
+from contextvars import ContextVar, Token
+from typing import Callable, List, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import ResourceClosedError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+LECTURE = "lecture"
+ECRITURE = "ecriture"
+
+_unite_courante: ContextVar[Optional["UniteDeTravail"]] = ContextVar("unite_de_travail", default=None)
+
+
+def unite_courante() -> Optional["UniteDeTravail"]:
+    """Unité de travail en cours dans ce contexte (None si aucune ou déjà terminée)"""
+    unite = _unite_courante.get()
+    return unite if unite is not None and unite.ouverte else None
+
+
+def _appeler(rappel: Callable[[], None]) -> None:
+    # Les écritures sont déjà validées : l'échec d'un rappel ne doit pas les faire paraître perdues
+    try:
+        rappel()
+    except Exception as e:
+        print(f"Erreur après la validation de la transaction : {e}")
+
+
+def apres_validation(rappel: Callable[[], None]) -> None:
+    """
+    Exécute rappel une fois les écritures en cours validées
+
+    Pendant une unité de travail en écriture, rappel est exécuté après la
+    validation de sa transaction, et abandonné si elle est annulée. Sinon
+    (pas d'unité, ou unité en lecture qui valide aussitôt ses écritures),
+    il est exécuté tout de suite : à appeler après le commit() de l'appelant.
+    """
+    unite = unite_courante()
+    if unite is None:
+        _appeler(rappel)
+    else:
+        unite.apres_validation(rappel)
+
+
+class SessionPartagee:
+    """Session d'un appelant (DAO, service) dans une unité de travail"""
+
+    def __init__(self, unite: "UniteDeTravail"):
+        self._unite = unite
+        self._point = None  # Point de sauvegarde de l'appelant (mode écriture)
+
+    def __getattr__(self, nom):
+        session = self._unite.session
+        # Ouvert au premier usage : une session demandée mais inutilisée ne coûte rien
+        if self._unite.mode == ECRITURE and self._point is None:
+            self._point = session.begin_nested()
+        return getattr(session, nom)
+
+    def commit(self) -> None:
+        if self._unite.mode == LECTURE:
+            self._unite.session.commit()
+        elif self._point is not None:
+            try:
+                self._point.commit()
+            except ResourceClosedError:
+                pass  # Déjà validé avec le point de sauvegarde d'un appelant englobant
+        self._point = None
+
+    def rollback(self) -> None:
+        if self._unite.mode == LECTURE:
+            self._unite.session.rollback()
+        elif self._point is not None:
+            try:
+                # Aussi après un échec d'écriture, qui laisse le point à annuler
+                self._point.rollback()
+            except ResourceClosedError:
+                pass
+        self._point = None
+
+    def close(self) -> None:
+        if not self._unite.ouverte:
+            return
+        session = self._unite.session
+        if self._unite.mode == ECRITURE or session.new or session.dirty or session.deleted:
+            self.rollback()
+
+
+class UniteDeTravail:
+    """
+    Transaction unique d'une requête, en lecture ou en écriture
+
+    S'utilise comme gestionnaire de contexte, synchrone ou asynchrone
+    (validée à la sortie, annulée si une exception en sort), ou avec lier /
+    terminer / annuler / delier quand la fin de la transaction ne coïncide
+    pas avec la fin du bloc.
+    En écriture, la transaction SQLite prend le verrou d'écriture dès son
+    début (BEGIN IMMEDIATE, voir database.creer_engine).
+    """
+
+    def __init__(self, engine: Engine, mode: str = ECRITURE, engine_async: Optional[AsyncEngine] = None):
+        if mode not in (LECTURE, ECRITURE):
+            raise ValueError(f"Mode d'unité de travail inconnu : {mode}")
+        self.mode = mode
+        self.ouverte = True
+        self._engine = engine
+        self._engine_async = engine_async
+        self._session: Optional[Session] = None
+        self._session_async: Optional[AsyncSession] = None
+        self._jetons = []
+        self._rappels: List[Callable[[], None]] = []
+
+    @property
+    def session(self) -> Session:
+        """Session SQLAlchemy de l'unité, créée au premier usage"""
+        if self._session_async is not None:
+            # Code synchrone lancé par executer_async : même connexion que la session asynchrone
+            return self._session_async.sync_session
+        if self._session is None:
+            self._session = Session(
+                bind=self._engine.execution_options(transaction_ecriture=self.mode == ECRITURE),
+                autoflush=False,
+                expire_on_commit=False,
+            )
+        return self._session
+
+    @property
+    def session_async(self) -> AsyncSession:
+        """Session asynchrone de l'unité, créée au premier usage"""
+        if self._session_async is None:
+            if self._engine_async is None:
+                raise RuntimeError("Unité de travail sans moteur asynchrone")
+            if self._session is not None:
+                # Deux connexions dans une transaction d'écriture SQLite : la seconde attendrait la première
+                raise RuntimeError("L'unité de travail utilise déjà une session synchrone")
+            self._session_async = AsyncSession(
+                bind=self._engine_async.execution_options(transaction_ecriture=self.mode == ECRITURE),
+                autoflush=False,
+                expire_on_commit=False,
+            )
+        return self._session_async
+
+    def session_partagee(self) -> SessionPartagee:
+        return SessionPartagee(self)
+
+    def apres_validation(self, rappel: Callable[[], None]) -> None:
+        """Exécute rappel après la validation de la transaction (aussitôt en lecture)"""
+        if self.mode == LECTURE:
+            _appeler(rappel)
+        else:
+            self._rappels.append(rappel)
+
+    def _executer_rappels(self) -> None:
+        rappels, self._rappels = self._rappels, []
+        for rappel in rappels:
+            _appeler(rappel)
+
+    def lier(self) -> Token:
+        """Fait de cette unité l'unité courante du contexte"""
+        return _unite_courante.set(self)
+
+    def delier(self, jeton: Token) -> None:
+        _unite_courante.reset(jeton)
+
+    def terminer(self) -> None:
+        """Valide la transaction (écriture) ou la relâche (lecture), ferme la session, puis exécute les rappels"""
+        if not self.ouverte:
+            return
+        self.ouverte = False
+        if self._session is not None:
+            try:
+                if self.mode == ECRITURE:
+                    self._session.commit()
+            except Exception:
+                self._rappels.clear()
+                self._session.rollback()
+                raise
+            finally:
+                self._session.close()
+        self._executer_rappels()
+
+    def annuler(self) -> None:
+        """Annule la transaction et ferme la session"""
+        if not self.ouverte:
+            return
+        self.ouverte = False
+        self._rappels.clear()
+        if self._session is not None:
+            self._session.close()
+
+    async def terminer_async(self) -> None:
+        """Comme terminer, sans bloquer la boucle d'événements"""
+        if self._session_async is None:
+            if self._session is None and not self._rappels:
+                self.terminer()
+            else:
+                await asyncio.to_thread(self.terminer)
+            return
+        if not self.ouverte:
+            return
+        self.ouverte = False
+        try:
+            if self.mode == ECRITURE:
+                await self._session_async.commit()
+        except Exception:
+            self._rappels.clear()
+            await self._session_async.rollback()
+            raise
+        finally:
+            await self._session_async.close()
+        if self._rappels:
+            # Fichiers et caches : hors de la boucle d'événements
+            await asyncio.to_thread(self._executer_rappels)
+
+    async def annuler_async(self) -> None:
+        """Comme annuler, sans bloquer la boucle d'événements"""
+        if self._session_async is None:
+            if self._session is None:
+                self.annuler()
+            else:
+                await asyncio.to_thread(self.annuler)
+            return
+        if not self.ouverte:
+            return
+        self.ouverte = False
+        self._rappels.clear()
+        await self._session_async.close()
+
+    def __enter__(self) -> "UniteDeTravail":
+        self._jetons.append(self.lier())
+        return self
+
+    def __exit__(self, type_exception, exception, trace) -> None:
+        try:
+            if type_exception is None:
+                self.terminer()
+            else:
+                self.annuler()
+        finally:
+            self.delier(self._jetons.pop())
+
+    async def __aenter__(self) -> "UniteDeTravail":
+        self._jetons.append(self.lier())
+        return self
+
+    async def __aexit__(self, type_exception, exception, trace) -> None:
+        try:
+            if type_exception is None:
+                await self.terminer_async()
+            else:
+                await self.annuler_async()
+        finally:
+            self.delier(self._jetons.pop())
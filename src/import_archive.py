@@ -0,0 +1,44 @@
+"""
+Import en masse d'une archive de fichiers GPX (zip ou tar)
+
+Usage (depuis la racine du projet) :
+    python src/import_archive.py mon_export.zip --utilisateur 1 --sport Course
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Les modèles importent `src.database` : la racine du projet doit être dans le chemin
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import engine
+from database.migrations import migrer
+from business_objects import models  # Enregistre les modèles dans Base.metadata
+from service.import_service import ImportService
+from service.ingestion_service import arreter_pool
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importer une archive de fichiers GPX")
+    parser.add_argument("archive", help="Archive zip ou tar contenant les fichiers .gpx")
+    parser.add_argument("--utilisateur", type=int, required=True, help="ID de l'utilisateur")
+    parser.add_argument("--sport", required=True, help="Type de sport des activités (Course, Vélo...)")
+    parser.add_argument("--dossier", default="uploads/gpx", help="Dossier de stockage des GPX")
+    args = parser.parse_args()
+
+    migrer(engine)
+
+    try:
+        rapport = ImportService.importer_archive(args.archive, args.utilisateur, args.sport, args.dossier)
+    finally:
+        arreter_pool()
+
+    debit = rapport["nb_fichiers"] / rapport["duree_secondes"] if rapport["duree_secondes"] else 0
+    print(f"✓ {rapport['nb_importes']}/{rapport['nb_fichiers']} fichiers importés "
+          f"en {rapport['duree_secondes']} s ({debit:.1f} fichiers/s)")
+    for echec in rapport["echecs"]:
+        print(f"❌ {echec['fichier']} : {echec['erreur']}")
+
+
+if __name__ == "__main__":
+    main()
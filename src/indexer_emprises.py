@@ -0,0 +1,84 @@
+"""
+Migration unique : calcul de l'emprise géographique des activités GPX
+importées avant l'index spatial
+
+L'emprise est lue dans la trace stockée en colonnes (ou, à défaut, dans le
+fichier GPX) et enregistrée par lots, une transaction par lot. Le script
+peut être relancé sans risque : les activités déjà indexées sont ignorées.
+
+Usage (depuis la racine du projet) :
+    python src/indexer_emprises.py --taille-lot 500
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Les modèles importent `src.database` : la racine du projet doit être dans le chemin
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import SessionLocal, engine
+from database.migrations import migrer
+from business_objects import models  # Enregistre les modèles dans Base.metadata
+from dao.emprise_activite_dao import EmpriseActiviteDAO
+from dao.trace_dao import TraceDAO
+from utils.emprise import calculer_emprise
+from utils.lecteur_trace import lire_trace
+
+
+def indexer_emprises(taille_lot: int = 500) -> dict:
+    """
+    Calcule l'emprise des activités GPX qui n'en ont pas
+
+    Returns:
+        Rapport : nb_indexees, nb_echecs
+    """
+    rapport = {"nb_indexees": 0, "nb_echecs": 0}
+    dernier_id = 0
+
+    while True:
+        activites = EmpriseActiviteDAO.lister_sans_emprise(dernier_id, taille_lot)
+        if not activites:
+            break
+        dernier_id = activites[-1].id
+
+        emprises = {}
+        for activite in activites:
+            trace = TraceDAO.get_trace(activite.id)
+            if trace is None and os.path.exists(activite.gpx_path):
+                trace = lire_trace(activite.gpx_path)
+            emprise = calculer_emprise(trace) if trace is not None else None
+            if emprise is None:
+                rapport["nb_echecs"] += 1
+            else:
+                emprises[activite.id] = emprise
+
+        db = SessionLocal()
+        try:
+            for activite_id, emprise in emprises.items():
+                EmpriseActiviteDAO.ajouter(db, activite_id, emprise)
+            db.commit()
+            rapport["nb_indexees"] += len(emprises)
+        except Exception as e:
+            db.rollback()
+            rapport["nb_echecs"] += len(emprises)
+            print(f"❌ Lot jusqu'à l'activité {dernier_id} : {e}")
+        finally:
+            db.close()
+
+    return rapport
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexer l'emprise géographique des activités GPX")
+    parser.add_argument("--taille-lot", type=int, default=500, help="Activités par transaction")
+    args = parser.parse_args()
+
+    migrer(engine)
+    rapport = indexer_emprises(args.taille_lot)
+
+    print(f"✓ {rapport['nb_indexees']} activités indexées, {rapport['nb_echecs']} sans trace lisible")
+
+
+if __name__ == "__main__":
+    main()
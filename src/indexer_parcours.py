@@ -0,0 +1,90 @@
+"""
+Migration unique : signature de parcours des activités GPX importées avant
+la détection des doublons et des parcours répétés
+
+Les activités sont traitées par ID croissant, par lots (une transaction par
+lot) : la plus ancienne de deux copies d'une même sortie reste l'originale.
+Le script peut être relancé sans risque : les activités déjà signées sont
+ignorées.
+
+Usage (depuis la racine du projet) :
+    python src/indexer_parcours.py --taille-lot 500
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Les modèles importent `src.database` : la racine du projet doit être dans le chemin
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import SessionLocal, engine
+from database.migrations import migrer
+from business_objects import models  # Enregistre les modèles dans Base.metadata
+from dao.signature_parcours_dao import SignatureParcoursDAO
+from dao.trace_dao import TraceDAO
+from service.parcours_service import ParcoursService
+from utils.lecteur_trace import lire_trace
+
+
+def indexer_parcours(taille_lot: int = 500) -> dict:
+    """
+    Calcule la signature de parcours des activités GPX qui n'en ont pas
+
+    Returns:
+        Rapport : nb_indexees, nb_doublons, nb_echecs
+    """
+    rapport = {"nb_indexees": 0, "nb_doublons": 0, "nb_echecs": 0}
+    dernier_id = 0
+
+    while True:
+        activites = SignatureParcoursDAO.lister_sans_signature(dernier_id, taille_lot)
+        if not activites:
+            break
+        dernier_id = activites[-1].id
+
+        traces = {}
+        for activite in activites:
+            trace = TraceDAO.get_trace(activite.id)
+            if trace is None and os.path.exists(activite.gpx_path):
+                trace = lire_trace(activite.gpx_path)
+            if trace is None or len(trace) == 0:
+                rapport["nb_echecs"] += 1
+            else:
+                traces[activite.id] = trace
+
+        db = SessionLocal()
+        try:
+            doublons = 0
+            for activite in activites:
+                if activite.id in traces and ParcoursService.indexer(db, activite, traces[activite.id]):
+                    doublons += 1
+            db.commit()
+            rapport["nb_indexees"] += len(traces)
+            rapport["nb_doublons"] += doublons
+        except Exception as e:
+            db.rollback()
+            rapport["nb_echecs"] += len(traces)
+            print(f"❌ Lot jusqu'à l'activité {dernier_id} : {e}")
+        finally:
+            db.close()
+
+    return rapport
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Signer le parcours des activités GPX")
+    parser.add_argument("--taille-lot", type=int, default=500, help="Activités par transaction")
+    args = parser.parse_args()
+
+    migrer(engine)
+    rapport = indexer_parcours(args.taille_lot)
+
+    print(
+        f"✓ {rapport['nb_indexees']} activités signées dont {rapport['nb_doublons']} doublons, "
+        f"{rapport['nb_echecs']} sans trace lisible"
+    )
+
+
+if __name__ == "__main__":
+    main()
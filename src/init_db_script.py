@@ -3,7 +3,14 @@ SCRIPT UTILITAIRE - NE PAS IMPORTER DANS L'API
 Ce script sert uniquement à réinitialiser/tester la base de données.
 Exécutez-le directement : python src/init_db_script.py
 """
+import sys
+from pathlib import Path
+
+# Les modèles importent `src.database` : la racine du projet doit être dans le chemin
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
 from database import engine, Base
+from database.migrations import migrer
 from business_objects.models import Utilisateur  # importe le modèle
 from dao.utilisateur_dao import UtilisateurDAO
 
@@ -17,7 +24,7 @@ Base.metadata.drop_all(bind=engine)
 print(" Tables supprimées")
 
 print("\n Création des tables...")
-Base.metadata.create_all(bind=engine)
+migrer(engine)
 print(" Tables créées\n")
 
 print("="*60)
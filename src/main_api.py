@@ -2,11 +2,13 @@
 Application FastAPI complète avec toutes les fonctionnalités
 Version sans frontend
 """
+import os
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.exceptions import RequestValidationError
 from database import Base, engine # Imports essentiels pour l'initialisation de la DB
+from database.migrations import migrer
 from business_objects import models # IMPÉRATIF: Importe les modèles pour que Base.metadata les connaisse
 from dao.utilisateur_dao import UtilisateurDAO
 from dao.activite_dao import ActiviteDAO
@@ -31,10 +33,17 @@ app = FastAPI(
 )
 # Importer les routers
 from api.utilisateur_router import router as utilisateur_router
-from api.activite_router import router as activite_router
+from api.activite_router import router as activite_router, TAILLE_MAX_ENVOI_TRACE
 from api.fil_router import router as fil_router
 from api.interaction_router import router as interaction_router
 from api.statistiques_router import router as statistiques_router
+from api.segment_router import router as segment_router
+from api.heatmap_router import router as heatmap_router
+from api.direct_router import router as direct_router
+from api.limite_corps import LimiteTailleCorps
+from api.unite_requete import UniteDeTravailRequete
+from service.ingestion_service import arreter_pool
+from service.retraitement_service import RetraitementService
 
 # 2. LOGIQUE D'INITIALISATION DE LA BASE
 
@@ -49,14 +58,14 @@ def init_db_on_startup():
     print(" Événement STARTUP : Initialisation de la Base de Données")
     print("="*60)
     
-    # Créer les tables si elles n'existent pas
-    Base.metadata.create_all(bind=engine) 
+    # Créer les tables si elles n'existent pas et appliquer les migrations
+    migrer(engine)
     
     print(" Création des tables terminée (si elles n'existaient pas).\n")
 
 
-# Créer les tables
-Base.metadata.create_all(bind=engine)
+# Créer les tables et appliquer les migrations en attente
+migrer(engine)
 
 # Créer l'application
 app = FastAPI(docs_url="/docs", redoc_url=None, openapi_url="/openapi.json")
@@ -71,6 +80,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Refus des envois de trace trop volumineux avant la lecture de tout le corps
+app.add_middleware(LimiteTailleCorps, limites={"/api/activites/gpx": TAILLE_MAX_ENVOI_TRACE})
+
+# Une session et une transaction par requête ; l'import d'archive valide ses lots un à un
+app.add_middleware(UniteDeTravailRequete, exclus={"/api/activites/archive"})
+
 
 # Enregistrer les routers
 app.include_router(utilisateur_router, prefix="/api")
@@ -78,6 +93,23 @@ app.include_router(activite_router, prefix="/api")
 app.include_router(fil_router, prefix="/api")
 app.include_router(interaction_router, prefix="/api")
 app.include_router(statistiques_router, prefix="/api")
+app.include_router(segment_router, prefix="/api")
+app.include_router(heatmap_router, prefix="/api")
+app.include_router(direct_router, prefix="/api")
+
+
+@app.on_event("startup")
+def lancer_retraitement():
+    """Recalcule en arrière-plan les métriques calculées par une ancienne version"""
+    if os.getenv("RETRAITEMENT_AU_DEMARRAGE", "1") == "1":
+        RetraitementService.demarrer_en_arriere_plan()
+
+
+@app.on_event("shutdown")
+def arreter_ingestion():
+    """Arrête le recalcul des métriques et le pool de processus d'analyse des GPX"""
+    RetraitementService.arreter()
+    arreter_pool()
 
 
 # ========== ROUTES RACINES ==========
@@ -127,6 +159,23 @@ def api_info():
                 "commenter": "POST /api/interactions/activites/{id}/commentaires/{user_id}",
                 "voir_commentaires": "GET /api/interactions/activites/{id}/commentaires"
             },
+            "segments": {
+                "base": "/api/segments",
+                "creer": "POST /api/segments",
+                "classement": "GET /api/segments/{id}/classement",
+                "passages_activite": "GET /api/segments/activite/{id}"
+            },
+            "heatmap": {
+                "tuile": "GET /api/heatmap/{user_id}/{z}/{x}/{y}.png"
+            },
+            "direct": {
+                "base": "/api/directs",
+                "demarrer": "POST /api/directs",
+                "points": "POST /api/directs/{id}/points",
+                "suivre": "GET /api/directs/{id}/flux",
+                "suivis": "GET /api/directs/suivis/{user_id}",
+                "terminer": "POST /api/directs/{id}/terminer"
+            },
             "statistiques": {
                 "base": "/api/statistiques",
                 "resume": "GET /api/statistiques/{user_id}/resume",
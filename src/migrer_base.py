@@ -0,0 +1,39 @@
+"""
+Mise à jour du schéma de la base : applique les migrations en attente
+(voir database/migrations.py)
+
+L'API les applique aussi à son démarrage ; ce script sert à migrer une base
+avant un déploiement, ou à consulter son état.
+
+Usage (depuis la racine du projet) :
+    python src/migrer_base.py
+    python src/migrer_base.py --etat
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Les modèles importent `src.database` : la racine du projet doit être dans le chemin
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database.migrations import MIGRATIONS, migrer, versions_appliquees
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Appliquer les migrations du schéma de la base")
+    parser.add_argument("--etat", action="store_true", help="Afficher les migrations sans rien appliquer")
+    parser.add_argument("--cible", type=int, default=None, help="Dernière version à appliquer")
+    args = parser.parse_args()
+
+    if args.etat:
+        appliquees = versions_appliquees()
+        for version, description, _ in MIGRATIONS:
+            print(f"{'✓' if version in appliquees else '·'} {version} : {description}")
+        return
+
+    versions = migrer(cible=args.cible)
+    print(f"✓ {len(versions)} migration(s) appliquée(s)" if versions else "✓ Base déjà à jour")
+
+
+if __name__ == "__main__":
+    main()
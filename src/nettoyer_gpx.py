@@ -0,0 +1,77 @@
+"""
+Nettoyage des fichiers GPX stockés que plus rien n'utilise
+
+Un import en échec ne supprime pas le fichier qu'il a stocké : le même
+contenu peut être en cours d'import ailleurs (même empreinte, donc même
+fichier), sa référence pas encore validée. Ce script supprime les fichiers
+du dossier de stockage qu'aucun fichier suivi ni aucune activité ne
+référence, s'ils n'ont pas été modifiés depuis --age minutes : un import
+en cours a écrit son fichier il y a moins longtemps que ça. Il peut tourner
+pendant que l'API sert des requêtes.
+
+Usage (depuis la racine du projet) :
+    python src/nettoyer_gpx.py --dossier uploads/gpx
+    python src/nettoyer_gpx.py --simulation
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+# Les modèles importent `src.database` : la racine du projet doit être dans le chemin
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dao.fichier_gpx_dao import FichierGPXDAO
+from database.migrations import migrer
+
+AGE_MINIMUM = 60  # Minutes depuis la dernière écriture d'un fichier
+
+
+def nettoyer_dossier(dossier: str, age_minimum: float = AGE_MINIMUM, simulation: bool = False) -> dict:
+    """
+    Supprime les fichiers non référencés d'un dossier de stockage
+
+    Args:
+        dossier: Dossier de stockage des GPX
+        age_minimum: Âge minimal (minutes) d'un fichier supprimé
+        simulation: Compter les fichiers sans rien supprimer
+
+    Returns:
+        Rapport : nb_fichiers (supprimés ou à supprimer), taille (octets)
+    """
+    rapport = {"nb_fichiers": 0, "taille": 0}
+    limite = time.time() - age_minimum * 60
+
+    for nom in sorted(os.listdir(dossier)):
+        chemin = os.path.join(dossier, nom)
+        if nom.startswith(".") or not os.path.isfile(chemin):
+            continue
+        if os.path.getmtime(chemin) > limite or FichierGPXDAO.est_reference(chemin):
+            continue
+
+        rapport["nb_fichiers"] += 1
+        rapport["taille"] += os.path.getsize(chemin)
+        if not simulation:
+            os.remove(chemin)
+
+    return rapport
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Supprimer les fichiers GPX stockés sans référence")
+    parser.add_argument("--dossier", default="uploads/gpx", help="Dossier de stockage des GPX")
+    parser.add_argument("--age", type=float, default=AGE_MINIMUM,
+                        help="Âge minimal (minutes) d'un fichier supprimé")
+    parser.add_argument("--simulation", action="store_true", help="Compter les fichiers sans rien supprimer")
+    args = parser.parse_args()
+
+    migrer()
+    rapport = nettoyer_dossier(args.dossier, args.age, args.simulation)
+
+    verbe = "à supprimer" if args.simulation else "supprimé(s)"
+    print(f"✓ {rapport['nb_fichiers']} fichier(s) sans référence {verbe} ({rapport['taille'] / 1e6:.1f} Mo)")
+
+
+if __name__ == "__main__":
+    main()
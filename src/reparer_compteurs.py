@@ -0,0 +1,40 @@
+"""
+Réparation des compteurs dénormalisés (likes, commentaires, abonnés,
+abonnements, activités) : recalcule depuis les tables ceux qui ont dérivé
+(voir dao/compteurs_dao.py)
+
+Les écritures tiennent les compteurs à jour dans leur transaction ; ce
+script rattrape les écarts laissés par une modification directe de la base
+ou un ancien code. Il peut tourner pendant que l'API sert des requêtes.
+
+Usage (depuis la racine du projet) :
+    python src/reparer_compteurs.py
+    python src/reparer_compteurs.py --simulation
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Les modèles importent `src.database` : la racine du projet doit être dans le chemin
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dao.compteurs_dao import CompteursDAO
+from database.migrations import migrer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalculer les compteurs dénormalisés")
+    parser.add_argument("--simulation", action="store_true", help="Compter les écarts sans rien corriger")
+    args = parser.parse_args()
+
+    migrer()
+    corrections = CompteursDAO.reparer(simulation=args.simulation)
+    if corrections is None:
+        sys.exit(1)
+
+    verbe = "en écart" if args.simulation else "corrigé(e)s"
+    print(f"✓ {corrections['activites']} activité(s) et {corrections['utilisateurs']} utilisateur(s) {verbe}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Recalcul des métriques des activités GPX après un changement d'algorithme
+(VERSION_METRIQUES dans utils/track_metrics.py)
+
+Le recalcul peut être interrompu (Ctrl+C) et relancé : il reprend sur les
+activités qui n'ont pas encore de métriques pour la version courante.
+
+Usage (depuis la racine du projet) :
+    python src/retraiter_metriques.py --taille-lot 200
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Les modèles importent `src.database` : la racine du projet doit être dans le chemin
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import engine
+from database.migrations import migrer
+from business_objects import models  # Enregistre les modèles dans Base.metadata
+from service.ingestion_service import arreter_pool
+from service.retraitement_service import RetraitementService, TAILLE_LOT
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalculer les métriques périmées des activités GPX")
+    parser.add_argument("--taille-lot", type=int, default=TAILLE_LOT, help="Activités par transaction")
+    args = parser.parse_args()
+
+    migrer(engine)
+
+    try:
+        rapport = RetraitementService.retraiter(taille_lot=args.taille_lot)
+    finally:
+        arreter_pool()
+
+    print(f"✓ Version {rapport['version']} : {rapport['traitees']} activités recalculées, "
+          f"{rapport['echecs']} en échec, {rapport['a_jour']}/{rapport['total']} à jour")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,36 @@
-from typing import Optional, List, Dict
+import os
+from functools import partial
+import numpy as np
+from typing import Optional, List, Dict, Tuple
 from datetime import date, datetime, time, timedelta
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select
 from sqlalchemy.exc import IntegrityError
 import gpxpy
 import gpxpy.gpx
 
-from database import SessionLocal
-from business_objects.models import Utilisateur, Activite, Commentaire, likes
+from database import SessionLocal, apres_validation, session_async
+from business_objects.models import Utilisateur, Activite, Commentaire, EmpriseActivite, likes
+from dao.trace_dao import TraceDAO, temps_absents
+from dao.fichier_gpx_dao import FichierGPXDAO, metriques_en_cache
+from dao.meilleur_effort_dao import MeilleurEffortDAO
+from dao.metriques_activite_dao import MetriquesActiviteDAO
+from dao.donnees_capteurs_dao import DonneesCapteursDAO
+from dao.activite_dao import ActiviteDAO
+from dao.like_dao import LikeDAO
+from dao.compteurs_dao import CompteursDAO
+from dao.emprise_activite_dao import EmpriseActiviteDAO
+from dao.segment_dao import SegmentDAO, deserialiser_points
+from dao.signature_parcours_dao import SignatureParcoursDAO
+from service.heatmap_service import HeatmapService
+from service.parcours_service import ParcoursService
+from utils.emprise import calculer_emprise
+from utils.segments import trouver_efforts
+from utils.capteurs import fc_max_theorique, resume_capteurs
+from utils.meilleurs_efforts import meilleurs_efforts, splits
+from utils import polyline
+from utils.simplification import (
+    calculer_niveaux, choisir_niveau, TOLERANCES, PLEINE_RESOLUTION
+)
 
 
 class ActiviteService:
@@ -19,50 +43,67 @@ class ActiviteService:
         utilisateur_id: int,
         nom: str,
         type_sport: str,
-        description: str = ""
+        description: str = "",
+        empreinte: Optional[str] = None,
+        taille: Optional[int] = None,
+        analyse: Optional[tuple] = None
     ) -> Optional[Activite]:
         """
-        Crée une activité à partir d'un fichier GPX
+        Crée une activité à partir d'un fichier GPX, TCX ou FIT
+
+        Si l'empreinte du contenu est fournie et que ce contenu a déjà été
+        analysé, les métriques et la trace en cache sont réutilisées au lieu
+        de reparser le fichier. Une analyse (trace, métriques) déjà faite
+        ailleurs (pool d'ingestion) peut aussi être fournie.
         """
-        from utils.gpx_parser import analyser_gpx # Import local pour éviter les conflits
+        from utils.lecteur_trace import analyser_trace # Import local pour éviter les conflits
+
+        # 1. Réutiliser l'analyse d'un contenu identique déjà reçu
+        trace = None
+        if analyse is not None:
+            trace, parsed_data = analyse
+        else:
+            fichier_connu = FichierGPXDAO.get_by_empreinte(empreinte) if empreinte else None
+            parsed_data = metriques_en_cache(fichier_connu)
+            if parsed_data is not None:
+                trace = ActiviteService._obtenir_trace_stockee(fichier_connu.chemin)
+
+        # Sinon parser et extraire les données (colonnes NumPy + métriques vectorisées)
+        if trace is None:
+            analyse = analyser_trace(fichier_gpx)
+
+            if analyse is None:
+                # Le logger/print dans lire_trace gère l'erreur
+                return None
 
-        # 1. Parser et extraire les données
-        parsed_data = analyser_gpx(fichier_gpx)
-        
-        if not parsed_data:
-            # Le logger/print dans analyser_gpx gère l'erreur
-            return None
+            trace, parsed_data = analyse
 
-        # Extraction des données
-        duree_secondes = parsed_data.get('duree_secondes', 0)
-        d_plus = int(parsed_data.get('denivele_positif', 0))
-        distance = parsed_data.get('distance', 0)
-        date_activite = parsed_data.get('date_debut', date.today()).date() if parsed_data.get('date_debut') else date.today()
-        
-        # Calcul des calories
-        duree_heures = duree_secondes / 3600 if duree_secondes > 0 else 0
-        calories = ActiviteService._calculer_calories(type_sport, duree_heures, d_plus)
-        
         # 2. Créer l'activité en base (en passant la session `db`)
         db = SessionLocal()
         try:
-            activite = Activite(
-                nom=nom,
-                type_sport=type_sport,
-                date_activite=date_activite,
-                duree_activite=duree_secondes,
-                description=description,
-                # On stocke le chemin du fichier dans le champ gpx_path (assurez-vous que ce champ existe dans votre modèle Activite!)
-                gpx_path=fichier_gpx, 
-                d_plus=d_plus,
-                calories=calories,
-                distance=distance,
-                utilisateur_id=utilisateur_id
+            activite = ActiviteService._construire_activite(
+                fichier_gpx, utilisateur_id, nom, type_sport, description, parsed_data
             )
 
             db.add(activite)
+
+            # Les compteurs (références du fichier, activités de l'utilisateur)
+            # évoluent dans la même transaction que l'activité
+            if empreinte:
+                FichierGPXDAO.ajouter_reference(db, empreinte, fichier_gpx, taille, parsed_data)
+            db.execute(CompteursDAO.activites(utilisateur_id, +1))
+
+            # Métriques versionnées, meilleurs efforts et splits
+            db.flush()
+            ActiviteService._ajouter_derives(db, activite, trace, parsed_data)
+
             db.commit()
             db.refresh(activite)
+
+            # 3. Stocker les points en colonnes (et leurs niveaux de simplification)
+            # pour les relectures (cartes, profils, aperçus...)
+            ActiviteService._stocker_trace(activite.id, trace)
+            apres_validation(partial(HeatmapService.invalider, utilisateur_id, trace))
             return activite
 
         except Exception as e:
@@ -72,6 +113,192 @@ class ActiviteService:
         finally:
             db.close()
 
+    @staticmethod
+    def creer_activites_depuis_gpx(
+        utilisateur_id: int,
+        type_sport: str,
+        elements: List[Dict],
+        taille_lot: int = 200
+    ) -> List[Tuple[Optional[Activite], Optional[str]]]:
+        """
+        Crée en masse des activités à partir de GPX déjà analysés
+
+        Les lignes sont insérées par lots, un commit par lot. Si un lot
+        échoue, ses éléments sont repris un par un : une ligne en erreur
+        n'empêche pas la création des autres.
+
+        Args:
+            utilisateur_id: ID de l'utilisateur
+            type_sport: Type de sport commun aux activités
+            elements: Dictionnaires avec fichier_gpx, nom, empreinte, taille
+                et analyse (trace, métriques)
+            taille_lot: Nombre d'activités insérées par commit
+
+        Returns:
+            Pour chaque élément, (activité, None) ou (None, message d'erreur)
+        """
+        resultats = []
+        for debut in range(0, len(elements), taille_lot):
+            lot = elements[debut:debut + taille_lot]
+            try:
+                resultats.extend((a, None) for a in ActiviteService._inserer_lot(utilisateur_id, type_sport, lot))
+            except Exception as e:
+                print(f"Erreur lors de l'insertion d'un lot d'activités : {e}")
+                if len(lot) == 1:
+                    resultats.append((None, str(e)))
+                    continue
+                for element in lot:
+                    try:
+                        resultats.extend((a, None) for a in ActiviteService._inserer_lot(utilisateur_id, type_sport, [element]))
+                    except Exception as e_element:
+                        resultats.append((None, str(e_element)))
+
+        return resultats
+
+    @staticmethod
+    def _inserer_lot(utilisateur_id: int, type_sport: str, lot: List[Dict]) -> List[Activite]:
+        """Insère un lot d'activités dans une seule transaction (lève l'erreur en cas d'échec)"""
+        db = SessionLocal()
+        try:
+            activites = []
+            for element in lot:
+                trace, parsed_data = element["analyse"]
+                activites.append(ActiviteService._construire_activite(
+                    element["fichier_gpx"], utilisateur_id, element["nom"], type_sport,
+                    element.get("description", ""), parsed_data
+                ))
+                FichierGPXDAO.ajouter_reference(
+                    db, element["empreinte"], element["fichier_gpx"], element.get("taille"), parsed_data
+                )
+
+            db.add_all(activites)
+            db.execute(CompteursDAO.activites(utilisateur_id, len(activites)))
+            db.flush()
+            for activite, element in zip(activites, lot):
+                ActiviteService._ajouter_derives(db, activite, *element["analyse"])
+            db.commit()
+            for activite in activites:
+                db.refresh(activite)
+
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        for activite, element in zip(activites, lot):
+            ActiviteService._stocker_trace(activite.id, element["analyse"][0])
+            apres_validation(partial(HeatmapService.invalider, utilisateur_id, element["analyse"][0]))
+        return activites
+
+    @staticmethod
+    def _construire_activite(
+        fichier_gpx: str,
+        utilisateur_id: int,
+        nom: str,
+        type_sport: str,
+        description: str,
+        parsed_data: Dict
+    ) -> Activite:
+        """Construit (sans l'enregistrer) une activité à partir des métriques d'un GPX"""
+        # Extraction des données
+        duree_secondes = int(parsed_data.get('duree_secondes', 0))
+        d_plus = int(parsed_data.get('denivele_positif', 0))
+        distance = parsed_data.get('distance', 0)
+        date_activite = parsed_data.get('date_debut', date.today()).date() if parsed_data.get('date_debut') else date.today()
+
+        # Calcul des calories
+        duree_heures = duree_secondes / 3600 if duree_secondes > 0 else 0
+        calories = ActiviteService._calculer_calories(type_sport, duree_heures, d_plus)
+
+        return Activite(
+            nom=nom,
+            type_sport=type_sport,
+            date_activite=date_activite,
+            duree_activite=duree_secondes,
+            description=description,
+            # On stocke le chemin du fichier dans le champ gpx_path
+            gpx_path=fichier_gpx,
+            d_plus=d_plus,
+            calories=calories,
+            distance=distance,
+            utilisateur_id=utilisateur_id
+        )
+
+    @staticmethod
+    def _stocker_trace(activite_id: int, trace) -> bool:
+        """Stocke la trace avec les niveaux de simplification précalculés"""
+        return TraceDAO.create(activite_id, trace, calculer_niveaux(trace))
+
+    @staticmethod
+    def _ajouter_derives(db, activite: Activite, trace, parsed_data: Dict) -> None:
+        """
+        Ajoute (sans commit) les données dérivées de la trace : métriques
+        versionnées, meilleurs efforts, splits, résumé des capteurs, signature
+        du parcours, emprise et passages sur les segments
+        """
+        MetriquesActiviteDAO.ajouter(db, activite.id, parsed_data, activite.calories)
+        MeilleurEffortDAO.ajouter_pour_activite(db, activite, meilleurs_efforts(trace), splits(trace))
+
+        # Zones cardiaques calculées sur la FC max théorique de l'utilisateur
+        utilisateur = db.get(Utilisateur, activite.utilisateur_id)
+        resume = resume_capteurs(trace, fc_max_theorique(utilisateur.age if utilisateur else None))
+        if resume is not None:
+            DonneesCapteursDAO.ajouter(db, activite.id, resume)
+
+        # Signature du parcours : doublons et sorties répétées sur le même parcours
+        ParcoursService.indexer(db, activite, trace)
+
+        # Emprise géographique, indexée pour les recherches sur la carte
+        emprise = calculer_emprise(trace)
+        if emprise is None:
+            return
+        EmpriseActiviteDAO.ajouter(db, activite.id, emprise)
+
+        # Passages sur les segments dont le rectangle recoupe l'emprise
+        ActiviteService._rattacher_segments(db, activite, trace, SegmentDAO.candidats(db, emprise, activite.type_sport))
+
+    @staticmethod
+    def _rattacher_segments(db, activite: Activite, trace, segments) -> None:
+        """Ajoute (sans commit) les passages de la trace sur les segments donnés"""
+        for segment in segments:
+            efforts = trouver_efforts(trace, *deserialiser_points(segment.points))
+            if efforts:
+                SegmentDAO.ajouter_efforts(db, segment.id, activite, efforts)
+
+    @staticmethod
+    def _changer_sport(db, activite: Activite) -> None:
+        """
+        Reporte (sans commit) un changement de sport sur les données qui en
+        dépendent : sport des meilleurs efforts (les records se lisent par
+        sport) et passages sur les segments réservés à un sport
+        """
+        MeilleurEffortDAO.changer_sport(db, activite.id, activite.type_sport)
+        SegmentDAO.retirer_efforts_autre_sport(db, activite.id, activite.type_sport)
+
+        emprise = db.get(EmpriseActivite, activite.id)
+        trace = TraceDAO.get_trace(activite.id) if emprise is not None else None
+        if trace is None:
+            return
+        rectangle = {cle: getattr(emprise, cle) for cle in ("lat_min", "lat_max", "lon_min", "lon_max")}
+        # Les segments ouverts à tous les sports ont déjà été parcourus à l'import
+        segments = [
+            segment for segment in SegmentDAO.candidats(db, rectangle, activite.type_sport)
+            if segment.type_sport is not None
+        ]
+        ActiviteService._rattacher_segments(db, activite, trace, segments)
+
+    @staticmethod
+    def _obtenir_trace_stockee(chemin_gpx: str):
+        """Trace déjà stockée pour une activité utilisant ce fichier GPX (None sinon)"""
+        db = SessionLocal()
+        try:
+            activite = db.query(Activite).filter(Activite.gpx_path == chemin_gpx).first()
+        finally:
+            db.close()
+
+        return TraceDAO.get_trace(activite.id) if activite else None
+
     @staticmethod
     def creer_activite_manuelle(
         utilisateur_id: int,
@@ -115,6 +342,7 @@ class ActiviteService:
             )
 
             db.add(activite)
+            db.execute(CompteursDAO.activites(utilisateur_id, +1))
             db.commit()
             db.refresh(activite)
             return activite
@@ -165,6 +393,176 @@ class ActiviteService:
         finally:
             db.close()
 
+    @staticmethod
+    async def obtenir_activite_par_id_async(activite_id: int) -> Optional[Activite]:
+        """Variante asynchrone de obtenir_activite_par_id"""
+        return await ActiviteDAO.get_by_id_async(activite_id)
+
+    @staticmethod
+    def obtenir_trace_simplifiee(
+        activite_id: int,
+        zoom: Optional[float] = None,
+        pixels: Optional[int] = None,
+        encodee: bool = False,
+        altitudes: bool = False,
+        temps: bool = False
+    ) -> Optional[Dict]:
+        """
+        Récupère la trace d'une activité au niveau de détail adapté à l'affichage
+
+        Args:
+            activite_id: ID de l'activité
+            zoom: Niveau de zoom de la carte (prioritaire sur pixels)
+            pixels: Budget de points (aperçus, fil d'actualité)
+            encodee: Renvoyer les points en polyligne encodée (utils.polyline)
+                plutôt qu'en liste de [lat, lon]
+            altitudes: Avec la trace encodée, ajouter le canal des altitudes
+            temps: Avec la trace encodée, ajouter le canal des temps
+
+        Returns:
+            Dictionnaire avec niveau, tolerance_m, nb_points_total et points
+            ([lat, lon]) ou, si encodee, nb_points, polyligne et en option
+            altitudes (dm) et temps (s depuis temps_debut) ; None si
+            l'activité n'a pas de trace
+        """
+        colonnes = TraceDAO.get_colonnes(activite_id)
+        if colonnes is None:
+            return None
+
+        niveaux = colonnes.get("niveau")
+        if niveaux is None:
+            # Trace stockée avant le précalcul des niveaux
+            niveaux = calculer_niveaux(TraceDAO.get_trace(activite_id))
+
+        lat, lon = colonnes["lat"], colonnes["lon"]
+        latitude = float(lat[0]) if len(lat) else 0.0
+        niveau = choisir_niveau(niveaux, zoom=zoom, pixels=pixels, latitude=latitude)
+        garder = niveaux >= niveau
+
+        resultat = {
+            "activite_id": activite_id,
+            "niveau": niveau,
+            "tolerance_m": TOLERANCES[niveau] if niveau != PLEINE_RESOLUTION else 0.0,
+            "nb_points_total": len(lat),
+        }
+        if not encodee:
+            resultat["points"] = np.column_stack((lat[garder], lon[garder])).tolist()
+            return resultat
+
+        resultat["nb_points"] = int(garder.sum())
+        resultat["polyligne"] = polyline.encoder_coordonnees(lat[garder], lon[garder])
+        # Les valeurs absentes reprennent la dernière connue ; canal omis si aucune
+        if altitudes:
+            ele = colonnes["ele"][garder]
+            ele = polyline.combler(ele, np.isnan(ele))
+            if ele is not None:
+                resultat["altitudes"] = polyline.encoder(ele, polyline.PRECISION_ALTITUDE)
+        if temps:
+            secondes = colonnes["temps"][garder]
+            secondes = polyline.combler(secondes, temps_absents(secondes))
+            if secondes is not None:
+                resultat["temps_debut"] = colonnes["temps_debut"]
+                resultat["temps"] = polyline.encoder(secondes, polyline.PRECISION_TEMPS)
+        return resultat
+
+    @staticmethod
+    def obtenir_splits(activite_id: int) -> List[Dict]:
+        """
+        Récupère les temps de chaque kilomètre d'une activité
+
+        Args:
+            activite_id: ID de l'activité
+
+        Returns:
+            Liste de {numero, duree} (durée en secondes)
+        """
+        return [
+            {"numero": split.numero, "duree": split.duree}
+            for split in MeilleurEffortDAO.get_splits(activite_id)
+        ]
+
+    @staticmethod
+    def obtenir_capteurs(activite_id: int) -> Optional[Dict]:
+        """
+        Récupère le résumé des capteurs d'une activité
+
+        Args:
+            activite_id: ID de l'activité
+
+        Returns:
+            Moyennes des capteurs et temps (s) dans les zones cardiaques 1 à 5,
+            ou None si la trace ne porte pas de données capteurs
+        """
+        capteurs = DonneesCapteursDAO.get(activite_id)
+        if capteurs is None:
+            return None
+
+        zones = [capteurs.zone_1, capteurs.zone_2, capteurs.zone_3, capteurs.zone_4, capteurs.zone_5]
+        return {
+            "activite_id": activite_id,
+            "fc_moyenne": capteurs.fc_moyenne,
+            "fc_max": capteurs.fc_max,
+            "cadence_moyenne": capteurs.cadence_moyenne,
+            "puissance_moyenne": capteurs.puissance_moyenne,
+            "temperature_moyenne": capteurs.temperature_moyenne,
+            "fc_reference": capteurs.fc_reference,
+            "zones_fc": zones if capteurs.zone_1 is not None else None,
+        }
+
+    @staticmethod
+    def rechercher_dans_zone(
+        lat_min: float,
+        lon_min: float,
+        lat_max: float,
+        lon_max: float,
+        utilisateur_id: Optional[int] = None,
+        type_sport: Optional[str] = None,
+        limit: Optional[int] = 100
+    ) -> List[Activite]:
+        """
+        Recherche les activités qui passent dans un rectangle (vue de carte)
+
+        Args:
+            lat_min, lon_min, lat_max, lon_max: Rectangle en degrés
+            utilisateur_id: Limiter aux activités d'un utilisateur (optionnel)
+            type_sport: Filtrer par sport (optionnel)
+            limit: Nombre maximum d'activités
+
+        Returns:
+            Liste des activités, les plus récentes d'abord
+        """
+        return ActiviteDAO.get_by_filters(
+            utilisateur_id, type_sport=type_sport, limit=limit,
+            zone=(lat_min, lon_min, lat_max, lon_max)
+        )
+
+    @staticmethod
+    def rechercher_autour(
+        lat: float,
+        lon: float,
+        rayon_km: float,
+        utilisateur_id: Optional[int] = None,
+        type_sport: Optional[str] = None,
+        limit: Optional[int] = 100
+    ) -> List[Activite]:
+        """
+        Recherche les activités qui partent à proximité d'un point
+
+        Args:
+            lat, lon: Centre de la recherche en degrés
+            rayon_km: Rayon en kilomètres
+            utilisateur_id: Limiter aux activités d'un utilisateur (optionnel)
+            type_sport: Filtrer par sport (optionnel)
+            limit: Nombre maximum d'activités
+
+        Returns:
+            Liste des activités, les plus récentes d'abord
+        """
+        return ActiviteDAO.get_by_filters(
+            utilisateur_id, type_sport=type_sport, limit=limit,
+            autour=(lat, lon, rayon_km * 1000)
+        )
+
     @staticmethod
     def obtenir_activites_utilisateur(
         utilisateur_id: int,
@@ -188,28 +586,55 @@ class ActiviteService:
         """
         db = SessionLocal()
         try:
-            query = db.query(Activite).filter(Activite.utilisateur_id == utilisateur_id)
+            return list(db.scalars(ActiviteService._requete_activites_utilisateur(
+                utilisateur_id, type_sport, date_debut, date_fin, limit
+            )))
 
-            # Appliquer les filtres
-            if type_sport:
-                query = query.filter(Activite.type_sport == type_sport)
+        finally:
+            db.close()
 
-            if date_debut:
-                query = query.filter(Activite.date_activite >= date_debut)
+    @staticmethod
+    async def obtenir_activites_utilisateur_async(
+        utilisateur_id: int,
+        type_sport: Optional[str] = None,
+        date_debut: Optional[date] = None,
+        date_fin: Optional[date] = None,
+        limit: Optional[int] = None
+    ) -> List[Activite]:
+        """Variante asynchrone de obtenir_activites_utilisateur"""
+        async with session_async() as db:
+            return list(await db.scalars(ActiviteService._requete_activites_utilisateur(
+                utilisateur_id, type_sport, date_debut, date_fin, limit
+            )))
 
-            if date_fin:
-                query = query.filter(Activite.date_activite <= date_fin)
+    @staticmethod
+    def _requete_activites_utilisateur(
+        utilisateur_id: int,
+        type_sport: Optional[str],
+        date_debut: Optional[date],
+        date_fin: Optional[date],
+        limit: Optional[int]
+    ):
+        """Requête des activités d'un utilisateur, filtrée et triée par date décroissante"""
+        query = select(Activite).where(Activite.utilisateur_id == utilisateur_id)
 
-            # Trier par date décroissante
-            query = query.order_by(Activite.date_activite.desc())
+        # Appliquer les filtres
+        if type_sport:
+            query = query.where(Activite.type_sport == type_sport)
 
-            if limit:
-                query = query.limit(limit)
+        if date_debut:
+            query = query.where(Activite.date_activite >= date_debut)
 
-            return query.all()
+        if date_fin:
+            query = query.where(Activite.date_activite <= date_fin)
 
-        finally:
-            db.close()
+        # Trier par date décroissante
+        query = query.order_by(Activite.date_activite.desc())
+
+        if limit:
+            query = query.limit(limit)
+
+        return query
 
     @staticmethod
     def modifier_activite(
@@ -233,9 +658,12 @@ class ActiviteService:
             if not activite:
                 return None
 
+            ancien_sport = activite.type_sport
             for key, value in kwargs.items():
                 if hasattr(activite, key):
                     setattr(activite, key, value)
+            if activite.type_sport != ancien_sport:
+                ActiviteService._changer_sport(db, activite)
 
             db.commit()
             db.refresh(activite)
@@ -266,8 +694,21 @@ class ActiviteService:
             if not activite:
                 return False
 
+            # Le fichier GPX n'est supprimé que lorsque plus aucune activité ne l'utilise
+            chemin_gpx = activite.gpx_path
+            utilisateur_id = activite.utilisateur_id
+            references = FichierGPXDAO.retirer_reference(db, chemin_gpx) if chemin_gpx else None
+
+            db.execute(CompteursDAO.activites(utilisateur_id, -1))
+            SignatureParcoursDAO.oublier_original(db, activite_id)
             db.delete(activite)
             db.commit()
+            # Fichiers supprimés seulement une fois la suppression validée :
+            # une transaction annulée retrouve l'activité avec sa trace
+            apres_validation(partial(
+                ActiviteService._supprimer_fichiers, activite_id, utilisateur_id,
+                chemin_gpx if references == 0 else None
+            ))
             return True
 
         except Exception as e:
@@ -277,6 +718,15 @@ class ActiviteService:
         finally:
             db.close()
 
+    @staticmethod
+    def _supprimer_fichiers(activite_id: int, utilisateur_id: int, chemin_gpx: Optional[str]) -> None:
+        """Trace, tuiles de carte de chaleur et fichier GPX (s'il n'est plus référencé) d'une activité supprimée"""
+        # Les tuiles traversées par la trace sont à refaire
+        HeatmapService.invalider(utilisateur_id, TraceDAO.get_trace(activite_id))
+        TraceDAO.delete(activite_id)
+        if chemin_gpx and os.path.exists(chemin_gpx):
+            os.remove(chemin_gpx)
+
 # GESTION DES LIKES
 
     @staticmethod
@@ -324,6 +774,7 @@ class ActiviteService:
                     activite_id=activite_id
                 )
             )
+            db.execute(CompteursDAO.likes(activite_id, +1))
             db.commit()
             return True
 
@@ -354,6 +805,8 @@ class ActiviteService:
                     likes.c.activite_id == activite_id
                 )
             )
+            if result.rowcount > 0:
+                db.execute(CompteursDAO.likes(activite_id, -1))
             db.commit()
             return result.rowcount > 0
 
@@ -367,14 +820,7 @@ class ActiviteService:
     @staticmethod
     def obtenir_nombre_likes(activite_id: int) -> int:
         """Retourne le nombre de likes d'une activité"""
-        db = SessionLocal()
-        try:
-            result = db.execute(
-                likes.select().where(likes.c.activite_id == activite_id)
-            ).fetchall()
-            return len(result)
-        finally:
-            db.close()
+        return LikeDAO.count_by_activite(activite_id)
 
     @staticmethod
     def utilisateur_a_like(utilisateur_id: int, activite_id: int) -> bool:
@@ -391,6 +837,33 @@ class ActiviteService:
         finally:
             db.close()
 
+    @staticmethod
+    async def liker_activite_async(utilisateur_id: int, activite_id: int) -> bool:
+        """Variante asynchrone de liker_activite"""
+        async with session_async() as db:
+            if await db.get(Activite, activite_id) is None:
+                print("Activité non trouvée")
+                return False
+            if await db.get(Utilisateur, utilisateur_id) is None:
+                print("Utilisateur non trouvé")
+                return False
+        return await LikeDAO.create_async(utilisateur_id, activite_id)
+
+    @staticmethod
+    async def unliker_activite_async(utilisateur_id: int, activite_id: int) -> bool:
+        """Variante asynchrone de unliker_activite"""
+        return await LikeDAO.delete_async(utilisateur_id, activite_id)
+
+    @staticmethod
+    async def obtenir_nombre_likes_async(activite_id: int) -> int:
+        """Variante asynchrone de obtenir_nombre_likes"""
+        return await LikeDAO.count_by_activite_async(activite_id)
+
+    @staticmethod
+    async def utilisateur_a_like_async(utilisateur_id: int, activite_id: int) -> bool:
+        """Variante asynchrone de utilisateur_a_like"""
+        return await LikeDAO.exists_async(utilisateur_id, activite_id)
+
 # GESTION DES COMMENTAIRES
 
     @staticmethod
@@ -431,6 +904,7 @@ class ActiviteService:
             )
 
             db.add(commentaire)
+            db.execute(CompteursDAO.commentaires(activite_id, +1))
             db.commit()
             db.refresh(commentaire)
             return commentaire
@@ -491,6 +965,7 @@ class ActiviteService:
             if not commentaire:
                 return False
 
+            db.execute(CompteursDAO.commentaires(commentaire.activite_id, -1))
             db.delete(commentaire)
             db.commit()
             return True
@@ -515,9 +990,11 @@ class ActiviteService:
 
     @staticmethod
     def obtenir_nombre_commentaires(activite_id: int) -> int:
-        """Retourne le nombre de commentaires d'une activité"""
+        """Retourne le nombre de commentaires d'une activité (compteur de l'activité)"""
         db = SessionLocal()
         try:
-            return db.query(Commentaire).filter(Commentaire.activite_id == activite_id).count()
+            return db.scalar(
+                select(Activite.nb_commentaires).where(Activite.id == activite_id)
+            ) or 0
         finally:
             db.close()
@@ -0,0 +1,215 @@
+"""
+Service des activités en direct
+
+Le client démarre une session puis envoie ses points par lots. Chaque lot
+prolonge l'état des métriques (utils.suivi_direct) en O(taille du lot) et
+s'ajoute au fichier de points ; l'état est enregistré avec un numéro de
+version, ce qui permet aux abonnés de ne relire les métriques que lorsqu'elles
+ont changé. À la fin, la trace est écrite en GPX et suit le même chemin
+qu'un import : activité, trace stockée et métriques exactes.
+"""
+import io
+import json
+from functools import partial
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from database import SessionLocal, apres_validation
+from business_objects.models import Activite, SessionDirecte, Utilisateur, follows
+from dao.session_directe_dao import SessionDirecteDAO
+from service.activite_service import ActiviteService
+from utils.ecriture_gpx import ecrire_gpx
+from utils.stockage_gpx import enregistrer_flux
+from utils.suivi_direct import EtatDirect
+from utils.trace import Trace
+from utils.track_metrics import calculer_metriques
+from utils.validation_trace import NB_POINTS_MAX, TraceRefusee
+
+EN_COURS = "en_cours"
+TERMINEE = "terminee"
+ANNULEE = "annulee"
+
+
+def _resume(session: SessionDirecte) -> Dict:
+    """Métadonnées et métriques courantes d'une session"""
+    return {
+        "id": session.id,
+        "utilisateur_id": session.utilisateur_id,
+        "nom": session.nom,
+        "type_sport": session.type_sport,
+        "statut": session.statut,
+        "version": session.version,
+        "date_debut": session.date_debut,
+        "date_maj": session.date_maj,
+        "activite_id": session.activite_id,
+        **EtatDirect.depuis_dict(json.loads(session.etat)).resume(),
+    }
+
+
+class DirectService:
+    """Service pour suivre des activités en direct"""
+
+    @staticmethod
+    def demarrer(utilisateur_id: int, nom: str, type_sport: str, description: str = "") -> Optional[Dict]:
+        """
+        Démarre une session en direct
+
+        Returns:
+            La session (voir obtenir) ou None si l'utilisateur n'existe pas
+        """
+        db = SessionLocal()
+        try:
+            if db.get(Utilisateur, utilisateur_id) is None:
+                return None
+        finally:
+            db.close()
+
+        session = SessionDirecteDAO.create(utilisateur_id, nom, type_sport, description, EtatDirect().vers_dict())
+        return _resume(session) if session else None
+
+    @staticmethod
+    def ajouter_points(session_id: int, points: List[Dict], nouveau_segment: bool = False) -> Optional[Dict]:
+        """
+        Ajoute un lot de points à une session en cours
+
+        Les points déjà reçus (lot renvoyé) ou sans horodatage sont ignorés.
+
+        Args:
+            session_id: ID de la session
+            points: Dictionnaires avec lat, lon, temps (POSIX) et en option
+                ele, fc, cadence, puissance, temperature
+            nouveau_segment: Le lot reprend après un arrêt du chronomètre
+
+        Returns:
+            La session mise à jour, ou None si elle n'est pas en cours ou a
+            été modifiée en même temps (lot à renvoyer)
+
+        Raises:
+            TraceRefusee: Si la session dépasse NB_POINTS_MAX points
+            RuntimeError: Si les points n'ont pas pu être écrits ; dans une
+                unité de travail (requête API), la mise à jour de l'état est
+                annulée avec elle
+        """
+        session = SessionDirecteDAO.get(session_id)
+        if session is None or session.statut != EN_COURS:
+            return None
+
+        lot = Trace.depuis_blocs([[
+            (0, p["lat"], p["lon"], p.get("ele"), p.get("temps"),
+             p.get("fc"), p.get("cadence"), p.get("puissance"), p.get("temperature"))
+            for p in points
+        ]])
+        etat = EtatDirect.depuis_dict(json.loads(session.etat))
+        retenus = etat.ajouter(lot, nouveau_segment)
+        if etat.nb_points > NB_POINTS_MAX:
+            raise TraceRefusee(f"Trop de points dans la session (maximum {NB_POINTS_MAX})", 413)
+        if not retenus.any():
+            return _resume(session)
+
+        # L'état est validé avant l'écriture des points : un lot concurrent n'écrit rien
+        if not SessionDirecteDAO.mettre_a_jour(
+            session_id, session.version, etat=json.dumps(etat.vers_dict()), nb_points=etat.nb_points
+        ):
+            return None
+
+        colonnes = np.column_stack([getattr(lot, colonne) for colonne in Trace.COLONNES])[retenus]
+        colonnes[:, 0] = etat.segment
+        if not SessionDirecteDAO.ecrire_points(session_id, session.nb_points, colonnes):
+            # L'état ne doit pas compter des points absents du fichier
+            raise RuntimeError(f"Écriture des points de la session {session_id} impossible")
+        return DirectService.obtenir(session_id)
+
+    @staticmethod
+    def obtenir(session_id: int) -> Optional[Dict]:
+        """
+        Récupère une session et ses métriques courantes
+
+        Returns:
+            Dictionnaire avec id, utilisateur_id, nom, type_sport, statut,
+            version, date_debut, date_maj, activite_id, nb_points, distance
+            (km), denivele_positif (m), duree_ecoulee, duree_mouvement (s),
+            allure (s/km) et la dernière position (lat, lon), ou None
+        """
+        session = SessionDirecteDAO.get(session_id)
+        return _resume(session) if session else None
+
+    @staticmethod
+    def obtenir_version(session_id: int) -> Optional[int]:
+        """Version d'une session (change à chaque lot de points et à la fin), sans lire ses métriques"""
+        ligne = SessionDirecteDAO.get_version(session_id)
+        return ligne[0] if ligne else None
+
+    @staticmethod
+    def lister_suivis(utilisateur_id: int) -> List[Dict]:
+        """Sessions en cours des utilisateurs suivis, des plus récemment mises à jour aux plus anciennes"""
+        db = SessionLocal()
+        try:
+            ids_suivis = [
+                ligne.followed_id
+                for ligne in db.execute(follows.select().where(follows.c.follower_id == utilisateur_id))
+            ]
+        finally:
+            db.close()
+
+        return [_resume(session) for session in SessionDirecteDAO.lister_en_cours(ids_suivis)]
+
+    @staticmethod
+    def terminer(session_id: int, dossier: str) -> Optional[Activite]:
+        """
+        Termine une session : crée l'activité et stocke sa trace
+
+        La trace est écrite en GPX dans le stockage par empreinte ; l'activité
+        est créée comme un import, avec des métriques exactes recalculées sur
+        toute la trace.
+
+        Args:
+            session_id: ID de la session
+            dossier: Dossier de stockage des fichiers GPX
+
+        Returns:
+            L'activité créée, ou None si la session n'est pas en cours, a
+            moins de deux points ou en cas d'erreur
+        """
+        session = SessionDirecteDAO.get(session_id)
+        if session is None or session.statut != EN_COURS or session.nb_points < 2:
+            return None
+
+        # La session est close avant la création : un lot tardif est refusé
+        if not SessionDirecteDAO.mettre_a_jour(session_id, session.version, statut=TERMINEE):
+            return None
+
+        trace = SessionDirecteDAO.lire_points(session_id, session.nb_points)
+        activite = None
+        try:
+            chemin, empreinte, taille = enregistrer_flux(io.BytesIO(ecrire_gpx(trace, session.nom)), dossier)
+            activite = ActiviteService.creer_activite_depuis_gpx(
+                chemin, session.utilisateur_id, session.nom, session.type_sport, session.description or "",
+                empreinte=empreinte, taille=taille, analyse=(trace, calculer_metriques(trace))
+            )
+        except Exception as e:
+            print(f"Erreur lors de l'enregistrement de la trace en direct : {e}")
+
+        if activite is None:
+            # La session reste ouverte : le client peut réessayer
+            SessionDirecteDAO.renseigner(session_id, statut=EN_COURS)
+            return None
+
+        SessionDirecteDAO.renseigner(session_id, activite_id=activite.id)
+        # Les points ne sont plus utiles qu'une fois l'activité validée
+        apres_validation(partial(SessionDirecteDAO.supprimer_points, session_id))
+        return activite
+
+    @staticmethod
+    def annuler(session_id: int) -> bool:
+        """
+        Abandonne une session en cours (aucune activité n'est créée)
+
+        Returns:
+            True si annulée, False si elle n'est pas en cours
+        """
+        ligne = SessionDirecteDAO.get_version(session_id)
+        if ligne is None or not SessionDirecteDAO.mettre_a_jour(session_id, ligne[0], statut=ANNULEE):
+            return False
+        apres_validation(partial(SessionDirecteDAO.supprimer_points, session_id))
+        return True
@@ -1,9 +1,9 @@
 
 from typing import List
 from datetime import date, timedelta
-from sqlalchemy import desc
-from database import SessionLocal
-from business_objects.models import Activite, Utilisateur, follows
+from sqlalchemy import desc, exists, select
+from database import SessionLocal, session_async
+from business_objects.models import Activite, Utilisateur, follows, likes
 
 
 class FilActualiteService:
@@ -25,51 +25,65 @@ class FilActualiteService:
             limite: Nombre maximum d'activités (par défaut 50)
 
         Returns:
-            Liste de dictionnaires contenant les activités et infos utilisateur
+            Liste de dictionnaires contenant l'activité, son auteur, ses
+            nombres de likes et de commentaires et si l'utilisateur l'a likée
         """
         db = SessionLocal()
         try:
-            # Récupérer les IDs des utilisateurs suivis
-            suivis = db.execute(
-                follows.select().where(follows.c.follower_id == utilisateur_id)
-            ).fetchall()
-            
-            ids_suivis = [row.followed_id for row in suivis]
-            
-            if not ids_suivis:
-                return []
+            lignes = db.execute(FilActualiteService._requete_fil(utilisateur_id, nb_jours, limite))
+            return FilActualiteService._formater_fil(lignes)
+        finally:
+            db.close()
 
-            # Date limite
-            date_limite = date.today() - timedelta(days=nb_jours)
+    @staticmethod
+    async def obtenir_fil_actualite_async(
+        utilisateur_id: int,
+        nb_jours: int = 7,
+        limite: int = 50
+    ) -> List[dict]:
+        """Variante asynchrone de obtenir_fil_actualite"""
+        async with session_async() as db:
+            lignes = await db.execute(FilActualiteService._requete_fil(utilisateur_id, nb_jours, limite))
+            return FilActualiteService._formater_fil(lignes)
 
-            # Récupérer les activités des utilisateurs suivis
-            activites = db.query(Activite).filter(
-                Activite.utilisateur_id.in_(ids_suivis),
+    @staticmethod
+    def _requete_fil(utilisateur_id: int, nb_jours: int, limite: int):
+        """
+        Requête unique du fil : activités des suivis avec leur auteur, leurs
+        compteurs et le like de l'utilisateur (au lieu de requêtes par activité)
+        """
+        # Date limite
+        date_limite = date.today() - timedelta(days=nb_jours)
+
+        suivis = select(follows.c.followed_id).where(follows.c.follower_id == utilisateur_id)
+        a_like = exists().where(
+            likes.c.activite_id == Activite.id,
+            likes.c.utilisateur_id == utilisateur_id
+        )
+
+        return (
+            select(Activite, Utilisateur, a_like)
+            .join(Utilisateur, Utilisateur.id == Activite.utilisateur_id)
+            .where(
+                Activite.utilisateur_id.in_(suivis),
                 Activite.date_activite >= date_limite
-            ).order_by(desc(Activite.date_activite)).limit(limite).all()
-
-            # Formater les résultats avec les infos utilisateur
-            fil = []
-            for activite in activites:
-                utilisateur = db.query(Utilisateur).filter(
-                    Utilisateur.id == activite.utilisateur_id
-                ).first()
-                
-                # Compter likes et commentaires
-                nb_likes = len(activite.likers)
-                nb_commentaires = len(activite.commentaires)
-                
-                fil.append({
-                    'activite': activite,
-                    'utilisateur': utilisateur,
-                    'nb_likes': nb_likes,
-                    'nb_commentaires': nb_commentaires
-                })
-
-            return fil
+            )
+            .order_by(desc(Activite.date_activite))
+            .limit(limite)
+        )
 
-        finally:
-            db.close()
+    @staticmethod
+    def _formater_fil(lignes) -> List[dict]:
+        return [
+            {
+                'activite': activite,
+                'utilisateur': utilisateur,
+                'nb_likes': activite.nb_likes,
+                'nb_commentaires': activite.nb_commentaires,
+                'user_has_liked': bool(a_like)
+            }
+            for activite, utilisateur, a_like in lignes
+        ]
 
     @staticmethod
     def rechercher_utilisateurs(
@@ -0,0 +1,106 @@
+"""
+Service de la carte de chaleur : tuiles XYZ de toutes les traces d'un utilisateur
+
+Une tuile est rendue à la première demande puis servie depuis le cache
+disque. Quand une activité est ajoutée ou supprimée, seules les tuiles que
+sa trace traverse sont retirées du cache : elles seront rendues à nouveau
+à la demande suivante, les autres restent valides. Une tuile dont le rendu
+a croisé une invalidation est servie mais pas mise en cache.
+"""
+import io
+from typing import Optional
+
+import matplotlib.image
+import numpy as np
+
+from dao.activite_dao import ActiviteDAO
+from dao.trace_dao import TraceDAO
+from dao.tuile_dao import TuileDAO
+from utils.heatmap import (
+    TAILLE_TUILE, ZOOM_MAX, densite, limites_tuile, pixels_traverses, rendre_png, tuiles_touchees
+)
+from utils.simplification import calculer_niveaux, choisir_niveau
+
+
+def _png_transparent() -> bytes:
+    sortie = io.BytesIO()
+    matplotlib.image.imsave(sortie, np.zeros((TAILLE_TUILE, TAILLE_TUILE, 4)), format="png")
+    return sortie.getvalue()
+
+
+TUILE_VIDE = _png_transparent()
+
+
+class HeatmapService:
+    """Service pour rendre et mettre en cache les tuiles de carte de chaleur"""
+
+    @staticmethod
+    def obtenir_tuile(utilisateur_id: int, zoom: int, x: int, y: int) -> Optional[bytes]:
+        """
+        Récupère une tuile de la carte de chaleur d'un utilisateur
+
+        Args:
+            utilisateur_id: ID de l'utilisateur
+            zoom, x, y: Coordonnées XYZ de la tuile
+
+        Returns:
+            Le PNG de la tuile, ou None si les coordonnées sont hors de la carte
+        """
+        if not 0 <= zoom <= ZOOM_MAX or not (0 <= x < 2 ** zoom and 0 <= y < 2 ** zoom):
+            return None
+
+        png = TuileDAO.get(utilisateur_id, zoom, x, y)
+        if png is None:
+            # Lue avant le rendu : une invalidation pendant le rendu empêche la mise en cache
+            generation = TuileDAO.generation(utilisateur_id)
+            comptes = HeatmapService._calculer_densite(utilisateur_id, zoom, x, y)
+            png = rendre_png(comptes) if comptes.any() else b""
+            TuileDAO.enregistrer(utilisateur_id, zoom, x, y, png, generation)
+
+        return png or TUILE_VIDE
+
+    @staticmethod
+    def _calculer_densite(utilisateur_id: int, zoom: int, x: int, y: int) -> np.ndarray:
+        """Passages par pixel des traces de l'utilisateur qui recoupent la tuile"""
+        # Seules les activités dont l'emprise recoupe la tuile sont relues (index spatial)
+        activites = ActiviteDAO.get_by_filters(utilisateur_id, zone=limites_tuile(zoom, x, y))
+
+        pixels = []
+        for activite in activites:
+            colonnes = TraceDAO.get_colonnes(activite.id)
+            if colonnes is None:
+                continue
+            lat, lon, segment = colonnes["lat"], colonnes["lon"], colonnes["segment"]
+            if len(lat) == 0:
+                continue
+
+            # Aux petits zooms, les points qu'aucun pixel ne distingue sont ignorés
+            niveaux = colonnes.get("niveau")
+            if niveaux is None:
+                niveaux = calculer_niveaux(TraceDAO.get_trace(activite.id))
+            gardes = niveaux >= choisir_niveau(niveaux, zoom=zoom, latitude=float(lat[0]))
+            pixels.append(pixels_traverses(lat[gardes], lon[gardes], segment[gardes], zoom, x, y))
+
+        return densite(pixels)
+
+    @staticmethod
+    def invalider(utilisateur_id: int, trace) -> int:
+        """
+        Retire du cache les tuiles traversées par une trace, à tous les zooms
+
+        Args:
+            utilisateur_id: Propriétaire de la trace
+            trace: Trace ajoutée ou supprimée (None : rien à faire)
+
+        Returns:
+            Nombre de tuiles retirées
+        """
+        if trace is None or len(trace) == 0:
+            return 0
+
+        tuiles = [
+            (zoom, x, y)
+            for zoom in range(ZOOM_MAX + 1)
+            for x, y in tuiles_touchees(trace.lat, trace.lon, trace.segment, zoom)
+        ]
+        return TuileDAO.supprimer(utilisateur_id, tuiles)
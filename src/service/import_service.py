@@ -0,0 +1,142 @@
+"""
+Service d'import en masse de traces (GPX, TCX, FIT) depuis une archive (zip ou tar)
+
+Les membres GPX sont stockés par empreinte, analysés en parallèle dans le
+pool de processus d'ingestion puis insérés par lots. Un fichier en erreur
+est signalé dans le rapport sans interrompre l'import des autres.
+"""
+import os
+import tarfile
+import time
+import zipfile
+from typing import BinaryIO, Dict, Iterator, List, Tuple
+
+from dao.fichier_gpx_dao import FichierGPXDAO, metriques_en_cache
+from service import ingestion_service
+from service.activite_service import ActiviteService
+from utils.lecteur_trace import EXTENSIONS_TRACE, analyser_trace
+from utils.stockage_gpx import enregistrer_flux
+from utils.validation_trace import ValidateurTrace
+
+
+def iterer_gpx_archive(chemin_archive: str) -> Iterator[Tuple[str, BinaryIO]]:
+    """
+    Parcourt les traces (.gpx, .tcx, .fit) d'une archive zip ou tar (compressée ou non)
+
+    Les membres sont lus en flux : rien n'est extrait sur le disque
+    sous le nom choisi par l'archive.
+
+    Yields:
+        (nom du membre, flux binaire du membre)
+    """
+    def est_trace(nom: str) -> bool:
+        base = os.path.basename(nom)
+        # Ignorer les métadonnées macOS (__MACOSX/, ._fichier.gpx)
+        return base.lower().endswith(EXTENSIONS_TRACE) and not base.startswith("._") and "__MACOSX/" not in nom
+
+    if zipfile.is_zipfile(chemin_archive):
+        with zipfile.ZipFile(chemin_archive) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and est_trace(info.filename):
+                    with archive.open(info) as flux:
+                        yield info.filename, flux
+
+    elif tarfile.is_tarfile(chemin_archive):
+        with tarfile.open(chemin_archive, "r:*") as archive:
+            for membre in archive:
+                if membre.isfile() and est_trace(membre.name):
+                    yield membre.name, archive.extractfile(membre)
+
+    else:
+        raise ValueError("L'archive doit être au format zip ou tar")
+
+
+class ImportService:
+    """Service pour l'import de nombreux fichiers GPX en une fois"""
+
+    @staticmethod
+    def importer_archive(
+        chemin_archive: str,
+        utilisateur_id: int,
+        type_sport: str,
+        dossier: str = "uploads/gpx"
+    ) -> Dict:
+        """
+        Importe tous les fichiers GPX d'une archive
+
+        Args:
+            chemin_archive: Chemin de l'archive zip ou tar
+            utilisateur_id: ID de l'utilisateur
+            type_sport: Type de sport des activités créées
+            dossier: Dossier de stockage des GPX
+
+        Returns:
+            Rapport : nb_fichiers, nb_importes, activite_ids, echecs
+            (liste de {fichier, erreur}) et duree_secondes
+        """
+        debut = time.perf_counter()
+        echecs: List[Dict] = []
+        membres: List[Dict] = []
+        nb_fichiers = 0
+
+        # 1. Valider et stocker chaque membre sous l'empreinte de son contenu
+        for nom_membre, flux in iterer_gpx_archive(chemin_archive):
+            nb_fichiers += 1
+            try:
+                chemin, empreinte, taille = enregistrer_flux(flux, dossier, ValidateurTrace())
+                membres.append({
+                    "fichier": nom_membre,
+                    "fichier_gpx": chemin,
+                    "nom": os.path.splitext(os.path.basename(nom_membre))[0],
+                    "empreinte": empreinte,
+                    "taille": taille,
+                })
+            except Exception as e:
+                echecs.append({"fichier": nom_membre, "erreur": str(e)})
+
+        # 2. Réutiliser les analyses en cache, analyser les contenus nouveaux en parallèle
+        analyses: Dict[str, tuple] = {}
+        a_analyser: Dict[str, str] = {}
+        for membre in membres:
+            empreinte = membre["empreinte"]
+            if empreinte in analyses or empreinte in a_analyser:
+                continue
+            fichier_connu = FichierGPXDAO.get_by_empreinte(empreinte)
+            metriques = metriques_en_cache(fichier_connu)
+            trace = ActiviteService._obtenir_trace_stockee(fichier_connu.chemin) if metriques else None
+            if trace is not None:
+                analyses[empreinte] = (trace, metriques)
+            else:
+                a_analyser[empreinte] = membre["fichier_gpx"]
+
+        if a_analyser:
+            pool = ingestion_service.obtenir_pool()
+            lot = max(1, len(a_analyser) // (ingestion_service.NB_WORKERS * 4))
+            resultats = pool.map(analyser_trace, a_analyser.values(), chunksize=lot)
+            for empreinte, analyse in zip(a_analyser, resultats):
+                if analyse is not None:
+                    analyses[empreinte] = analyse
+
+        # 3. Insertion par lots des activités dont l'analyse a réussi
+        elements = []
+        for membre in membres:
+            if membre["empreinte"] in analyses:
+                elements.append({**membre, "analyse": analyses[membre["empreinte"]]})
+            else:
+                echecs.append({"fichier": membre["fichier"], "erreur": "Fichier illisible (GPX, TCX ou FIT attendu)"})
+
+        activite_ids = []
+        resultats = ActiviteService.creer_activites_depuis_gpx(utilisateur_id, type_sport, elements)
+        for element, (activite, erreur) in zip(elements, resultats):
+            if activite is not None:
+                activite_ids.append(activite.id)
+            else:
+                echecs.append({"fichier": element["fichier"], "erreur": erreur})
+
+        return {
+            "nb_fichiers": nb_fichiers,
+            "nb_importes": len(activite_ids),
+            "activite_ids": activite_ids,
+            "echecs": echecs,
+            "duree_secondes": round(time.perf_counter() - debut, 3),
+        }
@@ -0,0 +1,159 @@
+"""
+Service d'ingestion des fichiers GPX en arrière-plan
+
+L'analyse d'un GPX est coûteuse en CPU : elle est confiée à un pool de
+processus pour ne jamais bloquer la boucle d'événements de l'API.
+Chaque import est suivi par une TacheIngestion consultable par son ID.
+"""
+import asyncio
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from database import SessionLocal
+from business_objects.models import TacheIngestion
+from dao.fichier_gpx_dao import FichierGPXDAO, metriques_en_cache
+from service.activite_service import ActiviteService
+from utils.lecteur_trace import analyser_trace
+
+# Nombre de processus d'analyse (variable d'environnement INGESTION_WORKERS)
+NB_WORKERS = int(os.getenv("INGESTION_WORKERS", os.cpu_count() or 1))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def obtenir_pool() -> ProcessPoolExecutor:
+    """Crée le pool de processus au premier usage"""
+    global _pool
+    if _pool is None:
+        # spawn : pas de fork d'un processus qui a déjà des threads et des connexions
+        _pool = ProcessPoolExecutor(
+            max_workers=NB_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def arreter_pool() -> None:
+    """Arrête le pool (à l'arrêt de l'application)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+class IngestionService:
+    """Service pour les imports GPX traités en arrière-plan"""
+
+    @staticmethod
+    def creer_tache(utilisateur_id: int) -> Optional[TacheIngestion]:
+        """
+        Enregistre une nouvelle tâche en attente
+
+        Args:
+            utilisateur_id: ID de l'utilisateur
+
+        Returns:
+            La tâche créée ou None en cas d'erreur
+        """
+        db = SessionLocal()
+        try:
+            tache = TacheIngestion(
+                id=uuid.uuid4().hex,
+                utilisateur_id=utilisateur_id,
+                statut="en_attente"
+            )
+            db.add(tache)
+            db.commit()
+            db.refresh(tache)
+            return tache
+
+        except Exception as e:
+            db.rollback()
+            print(f"Erreur lors de la création de la tâche : {e}")
+            return None
+        finally:
+            db.close()
+
+    @staticmethod
+    def obtenir_tache(tache_id: str) -> Optional[TacheIngestion]:
+        """Récupère une tâche par son ID"""
+        db = SessionLocal()
+        try:
+            return db.get(TacheIngestion, tache_id)
+        finally:
+            db.close()
+
+    @staticmethod
+    def mettre_a_jour_tache(tache_id: str, **kwargs) -> None:
+        """Met à jour le statut (et le résultat) d'une tâche"""
+        db = SessionLocal()
+        try:
+            tache = db.get(TacheIngestion, tache_id)
+            if tache:
+                for key, value in kwargs.items():
+                    setattr(tache, key, value)
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Erreur lors de la mise à jour de la tâche : {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    async def traiter_fichier(
+        tache_id: str,
+        chemin: str,
+        empreinte: str,
+        taille: int,
+        utilisateur_id: int,
+        nom: str,
+        type_sport: str,
+        description: str = ""
+    ) -> None:
+        """
+        Analyse un GPX déjà enregistré et crée l'activité correspondante
+
+        L'analyse tourne dans le pool de processus, les accès à la base dans
+        des threads : la boucle d'événements n'est jamais bloquée.
+        """
+        await asyncio.to_thread(IngestionService.mettre_a_jour_tache, tache_id, statut="en_cours")
+
+        try:
+            # Un contenu déjà analysé n'a pas besoin de repasser par le pool
+            analyse = None
+            fichier = await asyncio.to_thread(FichierGPXDAO.get_by_empreinte, empreinte)
+            if metriques_en_cache(fichier) is None:
+                boucle = asyncio.get_running_loop()
+                analyse = await boucle.run_in_executor(obtenir_pool(), analyser_trace, chemin)
+                if analyse is None:
+                    raise ValueError("Fichier illisible (GPX, TCX ou FIT attendu)")
+
+            activite = await asyncio.to_thread(
+                ActiviteService.creer_activite_depuis_gpx,
+                fichier_gpx=chemin,
+                utilisateur_id=utilisateur_id,
+                nom=nom,
+                type_sport=type_sport,
+                description=description,
+                empreinte=empreinte,
+                taille=taille,
+                analyse=analyse
+            )
+            if not activite:
+                raise ValueError("Erreur lors de la création de l'activité depuis le GPX")
+
+            await asyncio.to_thread(
+                IngestionService.mettre_a_jour_tache, tache_id,
+                statut="terminee", activite_id=activite.id
+            )
+
+        except Exception as e:
+            # Le fichier est laissé en place : un import du même contenu peut être
+            # en cours (voir nettoyer_gpx.py pour les fichiers restés sans référence)
+            await asyncio.to_thread(
+                IngestionService.mettre_a_jour_tache, tache_id,
+                statut="echec", erreur=str(e)
+            )
@@ -0,0 +1,105 @@
+"""
+Service des parcours : doublons à l'import et sorties répétées sur le même parcours
+
+À l'import, la signature MinHash de la trace est calculée et ses bandes LSH
+enregistrées. Les activités candidates sont celles de l'utilisateur qui
+partagent une bande : leur similarité est alors estimée sur les signatures,
+sans jamais comparer la trace à toutes les traces stockées.
+"""
+from typing import Dict, Optional
+
+from database import SessionLocal
+from business_objects.models import Activite
+from dao.signature_parcours_dao import SignatureParcoursDAO, deserialiser_signature
+from utils.signature_parcours import (
+    SEUIL_DOUBLON, SEUIL_MEME_PARCOURS, cles_lsh, signature, similarite
+)
+
+ECART_DUREE_DOUBLON = 0.05  # Écart de durée relatif toléré entre deux copies d'une même sortie
+
+
+def _est_doublon(activite: Activite, candidate: Activite, score: float) -> bool:
+    """Même parcours, même jour et même durée (à l'export près) : c'est la même sortie"""
+    if score < SEUIL_DOUBLON or activite.date_activite != candidate.date_activite:
+        return False
+    duree, duree_candidate = activite.duree_activite or 0, candidate.duree_activite or 0
+    return abs(duree - duree_candidate) <= max(60, ECART_DUREE_DOUBLON * max(duree, duree_candidate))
+
+
+class ParcoursService:
+    """Service pour reconnaître les doublons et les parcours répétés"""
+
+    @staticmethod
+    def indexer(db, activite: Activite, trace) -> Optional[int]:
+        """
+        Calcule et ajoute (sans commit) la signature du parcours d'une activité
+
+        Args:
+            db: Session de l'appelant
+            activite: Activité déjà insérée (id connu)
+            trace: Trace de l'activité
+
+        Returns:
+            L'ID de l'activité d'origine si c'est un doublon, None sinon
+        """
+        signature_activite = signature(trace)
+        if signature_activite is None:
+            return None
+        cles = cles_lsh(signature_activite)
+
+        doublon_de = None
+        for ligne, candidate in SignatureParcoursDAO.candidats(db, activite.utilisateur_id, cles):
+            score = similarite(signature_activite, deserialiser_signature(ligne.signature))
+            if _est_doublon(activite, candidate, score):
+                # Le doublon d'un doublon renvoie à l'activité d'origine
+                doublon_de = ligne.doublon_de or candidate.id
+                break
+
+        SignatureParcoursDAO.ajouter(db, activite, signature_activite, cles, doublon_de)
+        return doublon_de
+
+    @staticmethod
+    def obtenir_parcours(activite_id: int) -> Optional[Dict]:
+        """
+        Doublon éventuel d'une activité et sorties de l'utilisateur sur le même parcours
+
+        Args:
+            activite_id: ID de l'activité
+
+        Returns:
+            Dictionnaire avec activite_id, doublon_de et parcours_similaires
+            (activite_id, nom, date_activite, duree_activite, distance,
+            similarite ; du plus récent au plus ancien), ou None si
+            l'activité n'a pas de signature
+        """
+        db = SessionLocal()
+        try:
+            ligne = SignatureParcoursDAO.get(activite_id)
+            if ligne is None:
+                return None
+            signature_activite = deserialiser_signature(ligne.signature)
+
+            similaires = []
+            for autre, activite in SignatureParcoursDAO.candidats(db, ligne.utilisateur_id, cles_lsh(signature_activite)):
+                score = similarite(signature_activite, deserialiser_signature(autre.signature))
+                if activite.id == activite_id or score < SEUIL_MEME_PARCOURS:
+                    continue
+                similaires.append({
+                    "activite_id": activite.id,
+                    "nom": activite.nom,
+                    "date_activite": activite.date_activite,
+                    "duree_activite": activite.duree_activite,
+                    "distance": activite.distance,
+                    "similarite": round(score, 3),
+                })
+
+            doublon_de = ligne.doublon_de
+        finally:
+            db.close()
+
+        similaires.sort(key=lambda s: (s["date_activite"], s["activite_id"]), reverse=True)
+        return {
+            "activite_id": activite_id,
+            "doublon_de": doublon_de,
+            "parcours_similaires": similaires,
+        }
@@ -0,0 +1,184 @@
+"""
+Service de recalcul des métriques après un changement d'algorithme
+
+Quand VERSION_METRIQUES augmente, les activités GPX sans métriques pour la
+nouvelle version (ou dont les métriques n'ont pas encore les pauses) sont
+recalculées par lots, en parallèle dans le pool de processus d'ingestion.
+Chaque lot est écrit dans sa propre transaction courte : l'application reste
+disponible et aucune table n'est verrouillée longtemps. La progression est
+portée par la table MetriquesActivite, le recalcul reprend donc là où il
+s'était arrêté après une interruption.
+
+Un lot recalcule les métriques (pauses et temps en mouvement compris), la
+durée, le dénivelé, la distance et les calories de l'activité, ainsi que
+ses meilleurs efforts et splits. L'emprise, la signature du parcours, les
+passages sur les segments et le résumé des capteurs ne dépendent pas de
+VERSION_METRIQUES : ils gardent leurs valeurs (indexer_emprises.py,
+indexer_parcours.py et le rattachement des segments les reconstruisent).
+"""
+import os
+import threading
+from typing import Dict, List, Optional
+
+from database import SessionLocal
+from business_objects.models import Activite
+from dao.meilleur_effort_dao import MeilleurEffortDAO
+from dao.metriques_activite_dao import MetriquesActiviteDAO
+from dao.trace_dao import TraceDAO
+from service import ingestion_service
+from service.activite_service import ActiviteService
+from utils.lecteur_trace import analyser_trace
+from utils.meilleurs_efforts import efforts_et_splits
+from utils.track_metrics import VERSION_METRIQUES, calculer_metriques
+
+TAILLE_LOT = 100
+
+_thread: Optional[threading.Thread] = None
+_arret = threading.Event()
+
+
+class RetraitementService:
+    """Service pour recalculer les métriques des activités existantes"""
+
+    @staticmethod
+    def retraiter(taille_lot: int = TAILLE_LOT, arret: Optional[threading.Event] = None) -> Dict:
+        """
+        Recalcule les métriques périmées de toutes les activités GPX
+
+        Args:
+            taille_lot: Nombre d'activités par lot (une transaction par lot)
+            arret: Événement qui interrompt le recalcul entre deux lots
+
+        Returns:
+            Rapport : version, traitees, echecs, a_jour, total
+        """
+        traitees = echecs = 0
+        dernier_id = 0
+
+        while not (arret and arret.is_set()):
+            activites = MetriquesActiviteDAO.lister_a_retraiter(VERSION_METRIQUES, dernier_id, taille_lot)
+            if not activites:
+                break
+            dernier_id = activites[-1].id
+
+            # Trace en colonnes si elle est stockée, sinon le fichier GPX est reparsé
+            traces, a_parser = {}, {}
+            for activite in activites:
+                trace = TraceDAO.get_trace(activite.id)
+                if trace is not None:
+                    traces[activite.id] = trace
+                elif activite.gpx_path and os.path.exists(activite.gpx_path):
+                    a_parser[activite.id] = activite.gpx_path
+
+            pool = ingestion_service.obtenir_pool()
+            resultats = dict(zip(traces, pool.map(calculer_metriques, traces.values())))
+            nouvelles_traces = {}
+            for activite_id, analyse in zip(a_parser, pool.map(analyser_trace, a_parser.values())):
+                if analyse is not None:
+                    nouvelles_traces[activite_id], resultats[activite_id] = analyse
+            analysees = {**traces, **nouvelles_traces}
+            derives = dict(zip(analysees, pool.map(efforts_et_splits, analysees.values())))
+
+            enregistrees = (
+                RetraitementService._enregistrer_lot(resultats, derives, nouvelles_traces) if resultats else None
+            )
+            if enregistrees is None:
+                resultats = {}
+            else:
+                # Les activités supprimées pendant le calcul ne comptent pas
+                traitees += len(enregistrees)
+            echecs += len(activites) - len(resultats)
+
+        a_jour, total = MetriquesActiviteDAO.compter(VERSION_METRIQUES)
+        return {
+            "version": VERSION_METRIQUES,
+            "traitees": traitees,
+            "echecs": echecs,
+            "a_jour": a_jour,
+            "total": total,
+        }
+
+    @staticmethod
+    def _enregistrer_lot(
+        resultats: Dict[int, Dict],
+        derives: Dict[int, tuple],
+        nouvelles_traces: Dict
+    ) -> Optional[List[int]]:
+        """
+        Écrit les métriques d'un lot et met à jour les activités, en une transaction
+
+        Args:
+            resultats: Métriques recalculées {activite_id: métriques}
+            derives: Meilleurs efforts et splits {activite_id: (efforts, splits)}
+            nouvelles_traces: Traces reparsées des activités sans trace stockée
+
+        Returns:
+            IDs des activités mises à jour (celles supprimées entre-temps
+            sont ignorées), ou None en cas d'erreur
+        """
+        db = SessionLocal()
+        try:
+            activites = db.query(Activite).filter(Activite.id.in_(list(resultats))).all()
+            trouvees = [activite.id for activite in activites]
+            # Lignes de la version courante calculées avant l'ajout des pauses
+            MetriquesActiviteDAO.remplacer(db, trouvees, VERSION_METRIQUES)
+            MeilleurEffortDAO.supprimer_pour_activites(db, trouvees)
+            for activite in activites:
+                metriques = resultats[activite.id]
+                duree_secondes = int(metriques['duree_secondes'])
+                activite.duree_activite = duree_secondes
+                activite.d_plus = int(metriques['denivele_positif'])
+                activite.distance = metriques['distance']
+                activite.calories = ActiviteService._calculer_calories(
+                    activite.type_sport, duree_secondes / 3600, activite.d_plus
+                )
+                MetriquesActiviteDAO.ajouter(
+                    db, activite.id, {**metriques, 'version': VERSION_METRIQUES}, activite.calories
+                )
+                MeilleurEffortDAO.ajouter_pour_activite(db, activite, *derives[activite.id])
+            db.flush()
+
+            # Les activités anciennes sans trace stockée en ont désormais une. Écrite
+            # avant le commit, tant que les lignes du lot sont verrouillées : une
+            # suppression concurrente attend, puis retire la trace avec l'activité
+            for activite_id in trouvees:
+                if activite_id in nouvelles_traces:
+                    ActiviteService._stocker_trace(activite_id, nouvelles_traces[activite_id])
+            db.commit()
+            return trouvees
+
+        except Exception as e:
+            db.rollback()
+            print(f"Erreur lors de l'enregistrement d'un lot de métriques : {e}")
+            return None
+        finally:
+            db.close()
+
+    @staticmethod
+    def demarrer_en_arriere_plan(taille_lot: int = TAILLE_LOT) -> bool:
+        """
+        Lance le recalcul dans un thread (sans effet s'il tourne déjà)
+
+        Returns:
+            True si un recalcul a été lancé
+        """
+        global _thread
+        if _thread is not None and _thread.is_alive():
+            return False
+
+        _arret.clear()
+        _thread = threading.Thread(
+            target=RetraitementService.retraiter,
+            kwargs={"taille_lot": taille_lot, "arret": _arret},
+            name="retraitement-metriques",
+            daemon=True
+        )
+        _thread.start()
+        return True
+
+    @staticmethod
+    def arreter() -> None:
+        """Interrompt le recalcul à la fin du lot en cours"""
+        _arret.set()
+        if _thread is not None:
+            _thread.join()
@@ -0,0 +1,174 @@
+"""
+Service des segments : création, rattachement des activités existantes, classements
+
+Les activités importées après la création d'un segment y sont rapprochées à
+l'import (ActiviteService._ajouter_derives). Un nouveau segment est rattaché
+aux activités déjà présentes par un traitement par lots, en parallèle dans le
+pool de processus d'ingestion, et jamais pendant une requête.
+"""
+from itertools import repeat
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from database import SessionLocal
+from business_objects.models import Segment
+from dao.segment_dao import SegmentDAO, deserialiser_points
+from dao.trace_dao import TraceDAO
+from service import ingestion_service
+from utils.segments import longueur, simplifier_segment, trouver_efforts
+
+TAILLE_LOT = 200
+
+
+class SegmentService:
+    """Service pour gérer les segments et leurs classements"""
+
+    @staticmethod
+    def creer_segment_depuis_activite(
+        nom: str,
+        createur_id: int,
+        activite_id: int,
+        indice_debut: int,
+        indice_fin: int,
+        type_sport: Optional[str] = None
+    ) -> Optional[Segment]:
+        """
+        Crée un segment à partir d'une portion de la trace d'une activité
+
+        Args:
+            nom: Nom du segment
+            createur_id: ID de l'utilisateur qui le crée
+            activite_id: Activité dont la trace est découpée
+            indice_debut, indice_fin: Points de la trace qui bornent le segment
+            type_sport: Sport concerné (None : tous)
+
+        Returns:
+            Le segment, ou None si la trace ou la portion est invalide
+        """
+        colonnes = TraceDAO.get_colonnes(activite_id)
+        if colonnes is None or not 0 <= indice_debut < indice_fin < len(colonnes["lat"]):
+            return None
+
+        lat, lon = simplifier_segment(
+            np.array(colonnes["lat"][indice_debut:indice_fin + 1]),
+            np.array(colonnes["lon"][indice_debut:indice_fin + 1])
+        )
+        return SegmentDAO.create(nom, createur_id, lat, lon, longueur(lat, lon), type_sport)
+
+    @staticmethod
+    def rattacher_activites(segment_id: int, taille_lot: int = TAILLE_LOT) -> Dict:
+        """
+        Cherche les passages des activités existantes sur un segment
+
+        Les activités candidates sont préfiltrées par l'index spatial, leurs
+        traces sont rapprochées du segment dans le pool de processus et les
+        passages écrits par lots, une transaction par lot. Relancé, le
+        traitement ignore les activités déjà rattachées.
+
+        Args:
+            segment_id: ID du segment
+            taille_lot: Nombre d'activités par lot
+
+        Returns:
+            Rapport : nb_activites (examinées), nb_efforts (trouvés)
+        """
+        segment = SegmentDAO.get_by_id(segment_id)
+        if segment is None:
+            return {"nb_activites": 0, "nb_efforts": 0}
+        lat, lon = deserialiser_points(segment.points)
+
+        nb_activites = nb_efforts = 0
+        dernier_id = 0
+        while True:
+            activites = SegmentDAO.lister_activites_a_rattacher(segment, dernier_id, taille_lot)
+            if not activites:
+                break
+            dernier_id = activites[-1].id
+
+            traces = {}
+            for activite in activites:
+                trace = TraceDAO.get_trace(activite.id)
+                if trace is not None:
+                    traces[activite.id] = trace
+
+            pool = ingestion_service.obtenir_pool()
+            resultats = pool.map(trouver_efforts, traces.values(), repeat(lat), repeat(lon))
+            efforts = {activite_id: trouves for activite_id, trouves in zip(traces, resultats) if trouves}
+
+            db = SessionLocal()
+            try:
+                for activite in activites:
+                    if activite.id in efforts:
+                        SegmentDAO.ajouter_efforts(db, segment.id, activite, efforts[activite.id])
+                db.commit()
+                nb_activites += len(activites)
+                nb_efforts += sum(len(trouves) for trouves in efforts.values())
+            except Exception as e:
+                db.rollback()
+                print(f"Erreur lors du rattachement au segment {segment_id} : {e}")
+            finally:
+                db.close()
+
+        return {"nb_activites": nb_activites, "nb_efforts": nb_efforts}
+
+    @staticmethod
+    def obtenir_segment(segment_id: int) -> Optional[Dict]:
+        """
+        Récupère un segment et ses points
+
+        Returns:
+            Dictionnaire du segment (points : [[lat, lon], ...]) ou None
+        """
+        segment = SegmentDAO.get_by_id(segment_id)
+        if segment is None:
+            return None
+
+        lat, lon = deserialiser_points(segment.points)
+        return {
+            "id": segment.id,
+            "nom": segment.nom,
+            "createur_id": segment.createur_id,
+            "type_sport": segment.type_sport,
+            "distance": segment.distance,
+            "points": np.column_stack((lat, lon)).tolist(),
+        }
+
+    @staticmethod
+    def obtenir_classement(segment_id: int, limite: int = 50) -> List[Dict]:
+        """
+        Classement d'un segment : meilleur temps de chaque utilisateur
+
+        Returns:
+            Liste de {rang, utilisateur_id, pseudo, duree, date, activite_id}
+        """
+        return [
+            {
+                "rang": rang,
+                "utilisateur_id": effort.utilisateur_id,
+                "pseudo": pseudo,
+                "duree": effort.duree,
+                "date": effort.date_activite,
+                "activite_id": effort.activite_id,
+            }
+            for rang, (effort, pseudo) in enumerate(SegmentDAO.get_classement(segment_id, limite), start=1)
+        ]
+
+    @staticmethod
+    def obtenir_efforts_activite(activite_id: int) -> List[Dict]:
+        """
+        Passages d'une activité sur les segments
+
+        Returns:
+            Liste de {segment_id, segment, duree, indice_debut, indice_fin}
+        """
+        return [
+            {
+                "segment_id": effort.segment_id,
+                "segment": nom,
+                "duree": effort.duree,
+                "indice_debut": effort.indice_debut,
+                "indice_fin": effort.indice_fin,
+            }
+            for effort, nom in SegmentDAO.get_efforts_activite(activite_id)
+        ]
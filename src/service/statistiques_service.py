@@ -2,10 +2,37 @@
 from typing import Dict, List
 from datetime import date, datetime, timedelta
 from collections import defaultdict
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, select
 
 from database import SessionLocal
-from business_objects.models import Activite
+from business_objects.models import Activite, MetriquesActivite
+from dao.meilleur_effort_dao import MeilleurEffortDAO
+
+# Durée retenue pour une activité : temps écoulé (pauses comprises) ou temps en mouvement
+TEMPS_ECOULE = "ecoule"
+TEMPS_MOUVEMENT = "mouvement"
+
+
+def colonne_duree(temps: str = TEMPS_ECOULE):
+    """
+    Expression SQL de la durée d'une activité (secondes)
+
+    Le temps en mouvement vient des dernières métriques calculées de
+    l'activité ; une activité manuelle (ou pas encore analysée) garde
+    son temps écoulé.
+    """
+    if temps == TEMPS_MOUVEMENT:
+        mouvement = (
+            select(MetriquesActivite.duree_mouvement)
+            .where(MetriquesActivite.activite_id == Activite.id)
+            .order_by(MetriquesActivite.version.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        return func.coalesce(mouvement, Activite.duree_activite)
+    if temps != TEMPS_ECOULE:
+        raise ValueError(f"Durée inconnue : {temps}")
+    return Activite.duree_activite
 
 
 class StatistiquesService:
@@ -106,7 +133,8 @@ class StatistiquesService:
     @staticmethod
     def obtenir_heures_par_semaine(
         utilisateur_id: int,
-        nombre_semaines: int = 12
+        nombre_semaines: int = 12,
+        temps: str = TEMPS_ECOULE
     ) -> Dict[str, float]:
         """
         Calcule le nombre d'heures d'activité par semaine
@@ -114,6 +142,7 @@ class StatistiquesService:
         Args:
             utilisateur_id: ID de l'utilisateur
             nombre_semaines: Nombre de semaines à analyser
+            temps: TEMPS_ECOULE ou TEMPS_MOUVEMENT (pauses exclues)
 
         Returns:
             Dictionnaire {'semaine_2024-W01': 8.5, 'semaine_2024-W02': 10.2, ...}
@@ -122,7 +151,7 @@ class StatistiquesService:
         try:
             date_debut = date.today() - timedelta(weeks=nombre_semaines)
 
-            activites = db.query(Activite).filter(
+            activites = db.query(Activite, colonne_duree(temps)).filter(
                 and_(
                     Activite.utilisateur_id == utilisateur_id,
                     Activite.date_activite >= date_debut,
@@ -133,13 +162,13 @@ class StatistiquesService:
             # Organiser par semaine
             stats = defaultdict(float)
 
-            for activite in activites:
+            for activite, duree in activites:
                 annee, semaine, _ = activite.date_activite.isocalendar()
                 cle_semaine = f"{annee}-W{semaine:02d}"
 
                 # Convertir les secondes en heures
-                if activite.duree_activite:
-                    heures = activite.duree_activite / 3600.0
+                if duree:
+                    heures = duree / 3600.0
                     stats[cle_semaine] += heures
 
             return dict(stats)
@@ -150,7 +179,8 @@ class StatistiquesService:
     @staticmethod
     def obtenir_statistiques_completes(
         utilisateur_id: int,
-        nombre_semaines: int = 12
+        nombre_semaines: int = 12,
+        temps: str = TEMPS_ECOULE
     ) -> Dict:
         """
         Récupère toutes les statistiques en une seule fois
@@ -158,6 +188,7 @@ class StatistiquesService:
         Args:
             utilisateur_id: ID de l'utilisateur
             nombre_semaines: Nombre de semaines à analyser
+            temps: Durée retenue pour les heures (TEMPS_ECOULE ou TEMPS_MOUVEMENT)
 
         Returns:
             Dictionnaire avec toutes les statistiques
@@ -170,7 +201,7 @@ class StatistiquesService:
                 utilisateur_id, nombre_semaines
             ),
             'heures_par_semaine': StatistiquesService.obtenir_heures_par_semaine(
-                utilisateur_id, nombre_semaines
+                utilisateur_id, nombre_semaines, temps
             ),
             'periode_analyse': {
                 'date_debut': (date.today() - timedelta(weeks=nombre_semaines)).isoformat(),
@@ -182,7 +213,8 @@ class StatistiquesService:
     @staticmethod
     def obtenir_statistiques_par_sport(
         utilisateur_id: int,
-        nombre_semaines: int = 12
+        nombre_semaines: int = 12,
+        temps: str = TEMPS_ECOULE
     ) -> Dict[str, Dict]:
         """
         Calcule les statistiques détaillées par type de sport
@@ -190,6 +222,7 @@ class StatistiquesService:
         Args:
             utilisateur_id: ID de l'utilisateur
             nombre_semaines: Nombre de semaines à analyser
+            temps: Durée retenue (TEMPS_ECOULE ou TEMPS_MOUVEMENT)
 
         Returns:
             Dictionnaire {
@@ -207,7 +240,7 @@ class StatistiquesService:
         try:
             date_debut = date.today() - timedelta(weeks=nombre_semaines)
 
-            activites = db.query(Activite).filter(
+            activites = db.query(Activite, colonne_duree(temps)).filter(
                 and_(
                     Activite.utilisateur_id == utilisateur_id,
                     Activite.date_activite >= date_debut
@@ -223,12 +256,12 @@ class StatistiquesService:
                 'denivele_total': 0
             })
 
-            for activite in activites:
+            for activite, duree in activites:
                 sport = activite.type_sport
                 stats[sport]['nombre_activites'] += 1
 
-                if activite.duree_activite:
-                    stats[sport]['duree_totale_heures'] += activite.duree_activite / 3600.0
+                if duree:
+                    stats[sport]['duree_totale_heures'] += duree / 3600.0
 
                 if activite.distance:
                     stats[sport]['distance_totale_km'] += activite.distance 
@@ -246,7 +279,8 @@ class StatistiquesService:
     def obtenir_progression(
         utilisateur_id: int,
         type_sport: str,
-        nombre_semaines: int = 12
+        nombre_semaines: int = 12,
+        temps: str = TEMPS_ECOULE
     ) -> Dict:
         """
         Calcule la progression pour un sport spécifique
@@ -255,6 +289,7 @@ class StatistiquesService:
             utilisateur_id: ID de l'utilisateur
             type_sport: Type de sport à analyser
             nombre_semaines: Nombre de semaines à analyser
+            temps: Durée retenue (TEMPS_ECOULE ou TEMPS_MOUVEMENT)
 
         Returns:
             Dictionnaire avec les données de progression
@@ -263,7 +298,7 @@ class StatistiquesService:
         try:
             date_debut = date.today() - timedelta(weeks=nombre_semaines)
 
-            activites = db.query(Activite).filter(
+            activites = db.query(Activite, colonne_duree(temps)).filter(
                 and_(
                     Activite.utilisateur_id == utilisateur_id,
                     Activite.type_sport == type_sport,
@@ -280,10 +315,10 @@ class StatistiquesService:
 
             # Extraire les données pour chaque activité
             progression = []
-            for activite in activites:
+            for activite, duree in activites:
                 progression.append({
                     'date': activite.date_activite.isoformat(),
-                    'duree_minutes': activite.duree_activite / 60 if activite.duree_activite else 0,
+                    'duree_minutes': duree / 60 if duree else 0,
                     'distance_km': activite.distance/ 1000 if activite.distance else 0,
                     'calories': activite.calories or 0
                 })
@@ -319,73 +354,46 @@ class StatistiquesService:
             db.close()
 
     @staticmethod
-    def obtenir_records_personnels(utilisateur_id: int) -> Dict:
+    def obtenir_records_personnels(utilisateur_id: int, temps: str = TEMPS_ECOULE) -> Dict:
         """
         Récupère les records personnels de l'utilisateur
 
         Args:
             utilisateur_id: ID de l'utilisateur
+            temps: Durée retenue pour la durée maximale (TEMPS_ECOULE ou TEMPS_MOUVEMENT)
 
         Returns:
             Dictionnaire avec les records par type
         """
         db = SessionLocal()
         try:
-            activites = db.query(Activite).filter(
-                Activite.utilisateur_id == utilisateur_id
-            ).all()
-
-            if not activites:
-                return {}
-
             records = {}
 
-            # Organiser par sport
-            par_sport = defaultdict(list)
-            for activite in activites:
-                par_sport[activite.type_sport].append(activite)
-
-            # Trouver les records pour chaque sport
-            for sport, activites_sport in par_sport.items():
-                # Durée la plus longue
-                activite_plus_longue = max(
-                    activites_sport,
-                    key=lambda a: a.duree_activite or 0
-                )
-
-                # Plus de dénivelé
-                activite_plus_denivele = max(
-                    activites_sport,
-                    key=lambda a: a.d_plus or 0
-                )
-
-                # Plus de calories
-                activite_plus_calories = max(
-                    activites_sport,
-                    key=lambda a: a.calories or 0
-                )
-
-                records[sport] = {
-                    'duree_maximale': {
-                        'valeur': (
-                            activite_plus_longue.duree_activite / 3600
-                            if activite_plus_longue.duree_activite
-                            else 0
-                        ),
-
-                        'date': activite_plus_longue.date_activite.isoformat(),
-                        'activite': activite_plus_longue.nom
-                    },
-                    'denivele_maximal': {
-                        'valeur': activite_plus_denivele.d_plus or 0,
-                        'date': activite_plus_denivele.date_activite.isoformat(),
-                        'activite': activite_plus_denivele.nom
-                    },
-                    'calories_maximales': {
-                        'valeur': activite_plus_calories.calories or 0,
-                        'date': activite_plus_calories.date_activite.isoformat(),
-                        'activite': activite_plus_calories.nom
+            # Une requête par record : la meilleure activité de chaque sport, lue par index
+            criteres = [
+                ('duree_maximale', colonne_duree(temps), 3600),
+                ('denivele_maximal', Activite.d_plus, 1),
+                ('calories_maximales', Activite.calories, 1),
+            ]
+            for cle, colonne, unite in criteres:
+                for sport, valeur, date_activite, nom in StatistiquesService._meilleures_activites(
+                    db, utilisateur_id, colonne
+                ):
+                    records.setdefault(sport, {})[cle] = {
+                        'valeur': valeur / unite if valeur else 0,
+                        'date': date_activite.isoformat(),
+                        'activite': nom
                     }
+
+            # Meilleurs efforts (1 km, 5 km...) : calculés à l'import, lus par index
+            for effort, nom_activite in MeilleurEffortDAO.get_records(utilisateur_id):
+                efforts_sport = records.setdefault(effort.type_sport, {}).setdefault('meilleurs_efforts', {})
+                efforts_sport[effort.nom] = {
+                    'duree': effort.duree,
+                    'allure': effort.duree / (effort.distance / 1000),  # s/km
+                    'date': effort.date_activite.isoformat(),
+                    'activite': nom_activite,
+                    'activite_id': effort.activite_id
                 }
 
             return records
@@ -394,21 +402,47 @@ class StatistiquesService:
             db.close()
 
     @staticmethod
-    def obtenir_resume_global(utilisateur_id: int) -> Dict:
+    def _meilleures_activites(db, utilisateur_id: int, colonne) -> List[tuple]:
+        """
+        Activité de plus grande valeur de chaque sport de l'utilisateur
+
+        Returns:
+            Liste de (sport, valeur, date, nom de l'activité)
+        """
+        # Classement dans chaque sport, servi par les index ix_activite_record_*
+        # (à égalité, la plus ancienne activité créée)
+        rang = func.row_number().over(
+            partition_by=Activite.type_sport,
+            order_by=(colonne.desc().nulls_last(), Activite.id)
+        ).label("rang")
+        classement = (
+            select(Activite.type_sport, colonne.label("valeur"), Activite.date_activite, Activite.nom, rang)
+            .where(Activite.utilisateur_id == utilisateur_id)
+            .subquery()
+        )
+        return db.execute(
+            select(classement.c.type_sport, classement.c.valeur, classement.c.date_activite, classement.c.nom)
+            .where(classement.c.rang == 1)
+        ).all()
+
+    @staticmethod
+    def obtenir_resume_global(utilisateur_id: int, temps: str = TEMPS_ECOULE) -> Dict:
         """
         Récupère un résumé global de toutes les activités
 
         Args:
             utilisateur_id: ID de l'utilisateur
+            temps: Durée retenue (TEMPS_ECOULE ou TEMPS_MOUVEMENT)
 
         Returns:
             Dictionnaire avec le résumé global
         """
         db = SessionLocal()
         try:
-            activites = db.query(Activite).filter(
+            lignes = db.query(Activite, colonne_duree(temps)).filter(
                 Activite.utilisateur_id == utilisateur_id
             ).all()
+            activites = [activite for activite, _ in lignes]
 
             if not activites:
                 return {
@@ -419,7 +453,7 @@ class StatistiquesService:
                     'sports_pratiques': []
                 }
 
-            duree_totale = sum(a.duree_activite or 0 for a in activites) / 3600
+            duree_totale = sum(duree or 0 for _, duree in lignes) / 3600
             distance_totale = sum(a.distance or 0 for a in activites) 
             calories_totales = sum(a.calories or 0 for a in activites)
             sports_pratiques = list(set(a.type_sport for a in activites))
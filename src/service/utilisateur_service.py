@@ -1,9 +1,12 @@
 from typing import Optional, List
 from datetime import date, datetime
+from functools import partial
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import select # Ajout pour l'API moderne
-from database import SessionLocal
+from database import SessionLocal, apres_validation
 from business_objects.models import Utilisateur, Activite, Commentaire, follows
+from dao.tuile_dao import TuileDAO
+from dao.compteurs_dao import CompteursDAO
 
 
 class UtilisateurService:
@@ -125,8 +128,12 @@ class UtilisateurService:
             if not utilisateur:
                 return False
 
+            # Ses likes et ses follows disparaissent avec lui : compteurs des autres à ajuster
+            db.execute(CompteursDAO.retrait_likes_utilisateur(user_id))
+            db.execute(CompteursDAO.retrait_follows_utilisateur(user_id))
             db.delete(utilisateur)
             db.commit()
+            apres_validation(partial(TuileDAO.supprimer_utilisateur, user_id))
             return True
 
         except Exception as e:
@@ -192,6 +199,7 @@ class UtilisateurService:
                     followed_id=followed_id
                 )
             )
+            db.execute(CompteursDAO.follow(follower_id, followed_id, +1))
             db.commit()
             return True
 
@@ -213,6 +221,8 @@ class UtilisateurService:
                     follows.c.followed_id == followed_id
                 )
             )
+            if result.rowcount > 0:
+                db.execute(CompteursDAO.follow(follower_id, followed_id, -1))
             db.commit()
             return result.rowcount > 0
 
@@ -276,34 +286,23 @@ class UtilisateurService:
 
     @staticmethod
     def obtenir_nombre_activites(user_id: int) -> int:
-        """Retourne le nombre total d'activités d'un utilisateur"""
-        db = SessionLocal()
-        try:
-            # Utilisation de la fonction count() pour compter
-            from sqlalchemy.sql import func
-            count_stmt = select(func.count(Activite.id)).where(Activite.utilisateur_id == user_id)
-            return db.execute(count_stmt).scalar_one()
-        finally:
-            db.close()
+        """Retourne le nombre total d'activités d'un utilisateur (compteur de l'utilisateur)"""
+        return UtilisateurService._lire_compteur(Utilisateur.nb_activites, user_id)
 
     @staticmethod
     def obtenir_nombre_followers(user_id: int) -> int:
-        """Retourne le nombre de followers d'un utilisateur"""
-        db = SessionLocal()
-        try:
-            from sqlalchemy.sql import func
-            count_stmt = select(func.count()).select_from(follows).where(follows.c.followed_id == user_id)
-            return db.execute(count_stmt).scalar_one()
-        finally:
-            db.close()
+        """Retourne le nombre de followers d'un utilisateur (compteur de l'utilisateur)"""
+        return UtilisateurService._lire_compteur(Utilisateur.nb_followers, user_id)
 
     @staticmethod
     def obtenir_nombre_suivis(user_id: int) -> int:
-        """Retourne le nombre d'utilisateurs suivis"""
+        """Retourne le nombre d'utilisateurs suivis (compteur de l'utilisateur)"""
+        return UtilisateurService._lire_compteur(Utilisateur.nb_following, user_id)
+
+    @staticmethod
+    def _lire_compteur(colonne, user_id: int) -> int:
         db = SessionLocal()
         try:
-            from sqlalchemy.sql import func
-            count_stmt = select(func.count()).select_from(follows).where(follows.c.follower_id == user_id)
-            return db.execute(count_stmt).scalar_one()
+            return db.scalar(select(colonne).where(Utilisateur.id == user_id)) or 0
         finally:
             db.close()
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""
+Tests de l'accès asynchrone à la base : session asynchrone de l'unité de
+travail, DAO asynchrones et code synchrone exécuté sans thread
+"""
+import asyncio
+import sys
+import threading
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event, text
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from business_objects.models import Activite
+from dao.commentaire_dao import CommentaireDAO
+from dao.follow_dao import FollowDAO
+from dao.like_dao import LikeDAO
+from dao.utilisateur_dao import UtilisateurDAO
+from database import (
+    ECRITURE, LECTURE, SessionLocal, engine, engine_async, executer_async, unite_de_travail
+)
+from service.activite_service import ActiviteService
+from service.fil_actualite_service import FilActualiteService
+
+
+def executer(coroutine):
+    """Exécute une coroutine dans sa propre boucle, puis vide le pool asynchrone lié à cette boucle"""
+    async def avec_pool_vide():
+        try:
+            return await coroutine
+        finally:
+            await engine_async.dispose()
+    return asyncio.run(avec_pool_vide())
+
+
+def creer(pseudo):
+    return UtilisateurDAO.create(
+        nom="Martin", prenom="Sophie", age=28, pseudo=pseudo, mail=f"{pseudo}@example.com", mdp="securepass"
+    )
+
+
+def creer_activite(utilisateur_id, nom):
+    db = SessionLocal()
+    try:
+        activite = Activite(
+            utilisateur_id=utilisateur_id, nom=nom, type_sport="Course",
+            date_activite=date.today(), duree_activite=1800
+        )
+        db.add(activite)
+        db.commit()
+        return activite.id
+    finally:
+        db.close()
+
+
+def likes_en_base():
+    # Connexion indépendante : ne voit que ce qui est validé
+    with engine.connect() as connexion:
+        return set(connexion.execute(text('SELECT utilisateur_id, activite_id FROM "Like"')).all())
+
+
+@pytest.fixture
+def reseau(setup_database):
+    """alice suit bob, qui a deux activités"""
+    alice, bob = creer("alice"), creer("bob")
+    FollowDAO.create(alice.id, bob.id)
+    return alice.id, bob.id, creer_activite(bob.id, "Footing"), creer_activite(bob.id, "Fractionné")
+
+
+class TestAccesAsync:
+    """Tests de l'accès asynchrone"""
+
+    def test_ecritures_dans_l_unite(self, reseau):
+        """Les likes asynchrones sont validés à la fin de l'unité ; un like refusé n'annule que lui-même"""
+        alice, bob, footing, fractionne = reseau
+
+        async def scenario():
+            async with unite_de_travail(ECRITURE):
+                assert await LikeDAO.create_async(alice, footing)
+                assert not await LikeDAO.create_async(alice, footing)  # Déjà liké
+                assert await LikeDAO.create_async(bob, fractionne)
+                assert await LikeDAO.count_by_activite_async(footing) == 1
+                assert likes_en_base() == set()
+
+        executer(scenario())
+        assert likes_en_base() == {(alice, footing), (bob, fractionne)}
+
+    def test_like_utilisateur_ou_activite_inconnus(self, reseau):
+        """Comme en synchrone, le like d'un utilisateur ou d'une activité inconnus est refusé"""
+        alice, _, footing, _ = reseau
+
+        async def scenario():
+            async with unite_de_travail(ECRITURE):
+                assert not await ActiviteService.liker_activite_async(9999, footing)
+                assert not await ActiviteService.liker_activite_async(alice, 9999)
+                assert await ActiviteService.liker_activite_async(alice, footing)
+
+        executer(scenario())
+        assert likes_en_base() == {(alice, footing)}
+        assert ActiviteService.obtenir_nombre_likes(footing) == 1
+
+    def test_hors_unite(self, reseau):
+        """Sans unité de travail, chaque appel valide ses écritures"""
+        alice, _, footing, _ = reseau
+
+        assert executer(LikeDAO.create_async(alice, footing))
+        assert likes_en_base() == {(alice, footing)}
+        assert executer(LikeDAO.exists_async(alice, footing))
+        assert executer(LikeDAO.delete_async(alice, footing))
+        assert likes_en_base() == set()
+
+    def test_fil_en_une_requete(self, reseau):
+        """Le fil, ses compteurs et le like de l'utilisateur viennent d'une seule requête SQL"""
+        alice, bob, footing, fractionne = reseau
+        LikeDAO.create(alice, footing)
+        LikeDAO.create(bob, footing)
+        CommentaireDAO.create(activite_id=fractionne, auteur_id=alice, contenu="Bravo")
+
+        requetes = []
+
+        def compter(_connexion, _curseur, requete, *_):
+            if requete.startswith("SELECT"):
+                requetes.append(requete)
+
+        event.listen(engine_async.sync_engine, "before_cursor_execute", compter)
+        try:
+            fil = executer(FilActualiteService.obtenir_fil_actualite_async(alice))
+        finally:
+            event.remove(engine_async.sync_engine, "before_cursor_execute", compter)
+
+        assert len(requetes) == 1
+        resume = {
+            item["activite"].nom: (item["nb_likes"], item["nb_commentaires"], item["user_has_liked"])
+            for item in fil
+        }
+        assert resume == {"Footing": (2, 0, True), "Fractionné": (0, 1, False)}
+        assert all(item["utilisateur"].pseudo == "bob" for item in fil)
+        assert executer(FilActualiteService.obtenir_fil_actualite_async(bob)) == []
+
+    def test_code_synchrone_sans_thread(self, reseau):
+        """executer_async fait tourner un DAO synchrone sur la connexion asynchrone, dans le thread de la boucle"""
+        alice, _, footing, _ = reseau
+        connexions_synchrones = []
+        threads = []
+
+        def liker():
+            threads.append(threading.get_ident())
+            return LikeDAO.create(alice, footing)
+
+        def emprunt(*_):
+            connexions_synchrones.append(1)
+
+        async def scenario():
+            async with unite_de_travail(LECTURE):
+                assert await executer_async(liker)
+                assert await LikeDAO.exists_async(alice, footing)
+            return threading.get_ident()
+
+        event.listen(engine, "checkout", emprunt)
+        try:
+            thread_boucle = executer(scenario())
+        finally:
+            event.remove(engine, "checkout", emprunt)
+
+        assert threads == [thread_boucle]
+        assert connexions_synchrones == []
+        assert likes_en_base() == {(alice, footing)}
+
+    def test_une_seule_session_par_unite(self, setup_database):
+        """Une unité de travail n'utilise pas à la fois une session synchrone et une asynchrone"""
+        async def scenario():
+            async with unite_de_travail(ECRITURE) as unite:
+                creer("alice")
+                with pytest.raises(RuntimeError):
+                    unite.session_async
+
+        executer(scenario())
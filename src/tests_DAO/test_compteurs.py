@@ -0,0 +1,135 @@
+"""
+Tests des compteurs dénormalisés : tenus à jour par les écritures, dans
+leur transaction, et réparés par la tâche de reconstruction
+"""
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from business_objects.models import Activite, Utilisateur
+from dao.compteurs_dao import CompteursDAO
+from dao.commentaire_dao import CommentaireDAO
+from dao.follow_dao import FollowDAO
+from dao.like_dao import LikeDAO
+from dao.utilisateur_dao import UtilisateurDAO
+from database import ECRITURE, SessionLocal, engine, unite_de_travail
+from service.activite_service import ActiviteService
+from service.utilisateur_service import UtilisateurService
+
+
+def creer(pseudo):
+    return UtilisateurDAO.create(
+        nom="Martin", prenom="Sophie", age=28, pseudo=pseudo, mail=f"{pseudo}@example.com", mdp="securepass"
+    ).id
+
+
+def creer_activite(utilisateur_id, nom="Footing"):
+    return ActiviteService.creer_activite_manuelle(
+        utilisateur_id=utilisateur_id, nom=nom, type_sport="Course",
+        date_activite=date.today(), duree_activite=1800
+    ).id
+
+
+def compteurs_activite(activite_id):
+    db = SessionLocal()
+    try:
+        activite = db.get(Activite, activite_id)
+        return activite.nb_likes, activite.nb_commentaires
+    finally:
+        db.close()
+
+
+def compteurs_utilisateur(utilisateur_id):
+    db = SessionLocal()
+    try:
+        utilisateur = db.get(Utilisateur, utilisateur_id)
+        return utilisateur.nb_followers, utilisateur.nb_following, utilisateur.nb_activites
+    finally:
+        db.close()
+
+
+class TestCompteurs:
+    """Tests des compteurs dénormalisés"""
+
+    def test_ecritures(self, setup_database):
+        """Likes, commentaires, follows et activités ajustent leurs compteurs"""
+        alice, bob = creer("alice"), creer("bob")
+        footing = creer_activite(bob)
+
+        assert ActiviteService.liker_activite(alice, footing)
+        assert LikeDAO.create(bob, footing)
+        assert not LikeDAO.create(bob, footing)  # Déjà liké : rien ne change
+        commentaire = CommentaireDAO.create(activite_id=footing, auteur_id=alice, contenu="Bravo")
+        ActiviteService.ajouter_commentaire(bob, footing, "Merci")
+        assert compteurs_activite(footing) == (2, 2)
+        assert LikeDAO.count_by_activite(footing) == 2
+        assert ActiviteService.obtenir_nombre_commentaires(footing) == 2
+
+        assert LikeDAO.delete(alice, footing)
+        assert not ActiviteService.unliker_activite(alice, footing)  # Plus liké : rien ne change
+        assert CommentaireDAO.delete(commentaire.id)
+        assert compteurs_activite(footing) == (1, 1)
+
+        assert UtilisateurService.suivre_utilisateur(alice, bob)
+        assert FollowDAO.create(bob, alice)
+        assert compteurs_utilisateur(bob) == (1, 1, 1)
+        assert UtilisateurService.ne_plus_suivre_utilisateur(alice, bob)
+        assert (UtilisateurService.obtenir_nombre_followers(bob), FollowDAO.count_following(bob)) == (0, 1)
+
+        assert ActiviteService.supprimer_activite(footing)
+        assert UtilisateurService.obtenir_nombre_activites(bob) == 0
+
+    def test_meme_transaction(self, setup_database):
+        """Un compteur est annulé avec l'écriture qui l'a modifié"""
+        alice, bob = creer("alice"), creer("bob")
+        footing = creer_activite(bob)
+
+        with pytest.raises(RuntimeError):
+            with unite_de_travail(ECRITURE):
+                LikeDAO.create(alice, footing)
+                FollowDAO.create(alice, bob)
+                raise RuntimeError("échec de la requête")
+
+        assert compteurs_activite(footing) == (0, 0)
+        assert compteurs_utilisateur(bob) == (0, 0, 1)
+
+    def test_suppression_utilisateur(self, setup_database):
+        """Les likes et follows d'un utilisateur supprimé sortent des compteurs des autres"""
+        alice, bob, carole = creer("alice"), creer("bob"), creer("carole")
+        footing = creer_activite(bob)
+        LikeDAO.create(alice, footing)
+        FollowDAO.create(alice, bob)
+        FollowDAO.create(carole, alice)
+        FollowDAO.create(bob, carole)
+
+        assert UtilisateurService.supprimer_utilisateur(alice)
+
+        assert compteurs_activite(footing) == (0, 0)
+        assert compteurs_utilisateur(bob) == (0, 1, 1)
+        assert compteurs_utilisateur(carole) == (1, 0, 0)
+        assert CompteursDAO.reparer(simulation=True) == {"activites": 0, "utilisateurs": 0}
+
+    def test_reparation(self, setup_database):
+        """La réparation recalcule les compteurs en écart, la simulation ne fait que les compter"""
+        alice, bob = creer("alice"), creer("bob")
+        footing = creer_activite(bob)
+        LikeDAO.create(alice, footing)
+        FollowDAO.create(alice, bob)
+        assert CompteursDAO.reparer() == {"activites": 0, "utilisateurs": 0}
+
+        with engine.begin() as connexion:
+            connexion.execute(text('UPDATE "Activite" SET nb_likes = 7, nb_commentaires = 3'))
+            connexion.execute(text('UPDATE "Utilisateur" SET nb_activites = 0'))
+
+        assert CompteursDAO.reparer(simulation=True) == {"activites": 1, "utilisateurs": 1}
+        assert compteurs_activite(footing) == (7, 3)
+
+        assert CompteursDAO.reparer() == {"activites": 1, "utilisateurs": 1}
+        assert compteurs_activite(footing) == (1, 0)
+        assert compteurs_utilisateur(bob) == (1, 0, 1)
+        assert compteurs_utilisateur(alice) == (0, 1, 0)
@@ -0,0 +1,51 @@
+import sys
+from pathlib import Path
+
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import PRAGMAS_SQLITE, creer_engine
+
+
+# Test 1 : Le profil SQLite est appliqué à chaque connexion du pool
+def test_pragmas_sqlite(tmp_path):
+    engine = creer_engine(f"sqlite:///{tmp_path / 'test.db'}", pragmas={"cache_size": -1024})
+
+    connexions = [engine.connect() for _ in range(2)]
+    try:
+        for connexion in connexions:
+            assert connexion.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connexion.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert connexion.execute(text("PRAGMA busy_timeout")).scalar() == PRAGMAS_SQLITE["busy_timeout"]
+            assert connexion.execute(text("PRAGMA cache_size")).scalar() == -1024
+    finally:
+        for connexion in connexions:
+            connexion.close()
+        engine.dispose()
+
+
+# Test 2 : En WAL, une lecture n'attend pas une écriture en cours
+def test_lecture_pendant_ecriture(tmp_path):
+    engine = creer_engine(f"sqlite:///{tmp_path / 'test.db'}", pragmas={"busy_timeout": 100})
+    with engine.begin() as connexion:
+        connexion.execute(text("CREATE TABLE t (x INTEGER)"))
+        connexion.execute(text("INSERT INTO t VALUES (1)"))
+
+    with engine.connect() as ecrivain, engine.connect() as lecteur:
+        ecrivain.execute(text("INSERT INTO t VALUES (2)"))  # Transaction laissée ouverte
+        # Le lecteur voit le dernier état validé, sans « database is locked »
+        assert lecteur.execute(text("SELECT count(*) FROM t")).scalar() == 1
+        ecrivain.commit()
+        lecteur.rollback()
+        assert lecteur.execute(text("SELECT count(*) FROM t")).scalar() == 2
+    engine.dispose()
+
+
+# Test 3 : Une base en mémoire est partagée par toutes les sessions
+def test_base_en_memoire():
+    engine = creer_engine("sqlite://")
+    with engine.begin() as connexion:
+        connexion.execute(text("CREATE TABLE t (x INTEGER)"))
+    with engine.connect() as connexion:
+        assert connexion.execute(text("SELECT count(*) FROM t")).scalar() == 0
@@ -0,0 +1,124 @@
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import inspect, text
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from database import Base, creer_engine
+from database.migrations import MIGRATIONS, migrer, versions_appliquees
+
+INDEX_MIGRATION_1 = {
+    "Activite": {"ix_activite_utilisateur_date", "ix_activite_utilisateur_sport_date"},
+    "Commentaire": {"ix_commentaire_activite"},
+    "Follow": {"ix_follow_followed"},
+    "Like": {"ix_like_activite"},
+}
+
+COLONNES_MIGRATION_2 = {
+    "Activite": ("nb_likes", "nb_commentaires"),
+    "Utilisateur": ("nb_followers", "nb_following", "nb_activites"),
+}
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = creer_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    yield engine
+    engine.dispose()
+
+
+def index_de(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+# Test 1 : Une base créée avant les migrations reçoit les index, une seule fois
+def test_migrer_base_existante(engine):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connexion:
+        for noms in INDEX_MIGRATION_1.values():
+            for nom in noms:
+                connexion.execute(text(f"DROP INDEX {nom}"))
+
+    assert migrer(engine) == [version for version, _, _ in MIGRATIONS]
+    for table, noms in INDEX_MIGRATION_1.items():
+        assert noms <= index_de(engine, table)
+    assert set(versions_appliquees(engine)) == {version for version, _, _ in MIGRATIONS}
+
+    # Déjà à jour : rien n'est rejoué
+    assert migrer(engine) == []
+
+
+# Test 2 : Une base neuve est créée complète, migrations comprises
+def test_migrer_base_neuve(engine):
+    assert migrer(engine, cible=0) == []
+    assert versions_appliquees(engine) == {}
+    assert INDEX_MIGRATION_1["Activite"] <= index_de(engine, "Activite")
+
+    assert migrer(engine) == [version for version, _, _ in MIGRATIONS]
+
+
+# Test 3 : Les activités d'un utilisateur ne parcourent plus toute la table
+def test_plan_requete_activites(engine):
+    migrer(engine)
+    with engine.connect() as connexion:
+        plan = " ".join(
+            ligne[-1] for ligne in connexion.execute(text(
+                "EXPLAIN QUERY PLAN SELECT * FROM Activite WHERE utilisateur_id = 1 "
+                "ORDER BY date_activite DESC"
+            ))
+        )
+    assert "ix_activite_utilisateur_date" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+# Test 4 : Les compteurs ajoutés à une base existante partent des lignes déjà présentes
+def test_migrer_compteurs(engine):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connexion:
+        for table, colonnes in COLONNES_MIGRATION_2.items():
+            for colonne in colonnes:
+                connexion.execute(text(f'ALTER TABLE "{table}" DROP COLUMN {colonne}'))
+        connexion.execute(text(
+            "INSERT INTO Utilisateur (id, nom, prenom, pseudo, mail, mdp) VALUES "
+            "(1, 'A', 'a', 'alice', 'alice@example.com', 'x'), (2, 'B', 'b', 'bob', 'bob@example.com', 'x')"
+        ))
+        connexion.execute(text(
+            "INSERT INTO Activite (id, type_sport, date_activite, utilisateur_id) VALUES (1, 'Course', '2025-01-01', 2)"
+        ))
+        connexion.execute(text('INSERT INTO "Like" (utilisateur_id, activite_id) VALUES (1, 1), (2, 1)'))
+        connexion.execute(text("INSERT INTO Follow (follower_id, followed_id) VALUES (1, 2)"))
+
+    migrer(engine)
+    with engine.connect() as connexion:
+        assert connexion.execute(text("SELECT nb_likes, nb_commentaires FROM Activite")).one() == (2, 0)
+        assert connexion.execute(text(
+            "SELECT nb_followers, nb_following, nb_activites FROM Utilisateur ORDER BY id"
+        )).all() == [(0, 1, 0), (1, 0, 1)]
+
+
+# Test 5 : Les colonnes de pauses sont ajoutées aux métriques déjà calculées
+def test_migrer_pauses(engine):
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connexion:
+        for colonne in ("duree_pauses", "nb_pauses"):
+            connexion.execute(text(f'ALTER TABLE "MetriquesActivite" DROP COLUMN {colonne}'))
+
+    migrer(engine)
+    colonnes = {colonne["name"] for colonne in inspect(engine).get_columns("MetriquesActivite")}
+    assert {"duree_pauses", "nb_pauses"} <= colonnes
+
+
+# Test 6 : Les records d'un sport se lisent par index, sans trier les activités
+def test_plan_requete_records(engine):
+    migrer(engine)
+    with engine.connect() as connexion:
+        plan = " ".join(
+            ligne[-1] for ligne in connexion.execute(text(
+                "EXPLAIN QUERY PLAN SELECT type_sport, d_plus, row_number() OVER "
+                "(PARTITION BY type_sport ORDER BY d_plus DESC NULLS LAST, id) "
+                "FROM Activite WHERE utilisateur_id = 1"
+            ))
+        )
+    assert "ix_activite_record_denivele" in plan
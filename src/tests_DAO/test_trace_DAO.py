@@ -0,0 +1,125 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dao.trace_dao import ENTREE_COLONNE, EN_TETE, MAGIC, TEMPS_ABSENT, TraceDAO
+from utils.trace import Trace
+
+
+# Redirige le stockage vers un dossier temporaire
+@pytest.fixture(autouse=True)
+def dossier_traces(tmp_path, monkeypatch):
+    monkeypatch.setattr(TraceDAO, "dossier", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def trace_test():
+    return Trace(
+        segment=[0, 0, 1],
+        lat=[48.0, 48.001, 48.002],
+        lon=[-1.7, -1.701, -1.702],
+        ele=[10.5, np.nan, 12.0],
+        temps=[1_700_000_000.0, np.nan, 1_700_000_060.0],
+    )
+
+
+# Test 1 : Écriture puis relecture à l'identique
+def test_create_et_get_trace(trace_test):
+    assert TraceDAO.create(1, trace_test) is True
+
+    trace = TraceDAO.get_trace(1)
+
+    assert list(trace.segment) == [0, 0, 1]
+    assert np.array_equal(trace.lat, trace_test.lat)
+    assert np.array_equal(trace.lon, trace_test.lon)
+    assert np.array_equal(trace.ele, trace_test.ele, equal_nan=True)
+    assert np.array_equal(trace.temps, trace_test.temps, equal_nan=True)
+
+
+# Test 2 : Les colonnes sont des vues memory-mappées en lecture seule
+def test_get_colonnes_memmap(trace_test):
+    TraceDAO.create(2, trace_test)
+
+    colonnes = TraceDAO.get_colonnes(2)
+
+    assert not colonnes["lat"].flags.owndata
+    assert colonnes["temps"].dtype == np.float64
+    assert list(colonnes["temps"][[0, 2]]) == [0, 60]
+    assert not colonnes["lat"].flags.writeable
+
+
+# Test 3 : Trace absente puis suppression
+def test_get_et_delete(trace_test):
+    assert TraceDAO.get_colonnes(3) is None
+    assert TraceDAO.delete(3) is False
+
+    TraceDAO.create(3, trace_test)
+    assert TraceDAO.exists(3)
+    assert TraceDAO.delete(3) is True
+    assert not TraceDAO.exists(3)
+
+
+# Test 4 : La colonne optionnelle des niveaux de simplification
+def test_create_avec_niveaux(trace_test):
+    TraceDAO.create(4, trace_test, np.array([4, -1, 4], dtype=np.int8))
+
+    colonnes = TraceDAO.get_colonnes(4)
+
+    assert list(colonnes["niveau"]) == [4, -1, 4]
+    assert len(TraceDAO.get_trace(4)) == 3
+
+    TraceDAO.create(5, trace_test)
+    assert "niveau" not in TraceDAO.get_colonnes(5)
+
+
+# Test 5 : Les colonnes des capteurs ne sont écrites que si la trace en porte
+def test_create_avec_capteurs(trace_test):
+    trace_test.fc = np.array([120.0, np.nan, 150.0])
+    TraceDAO.create(6, trace_test)
+
+    colonnes = TraceDAO.get_colonnes(6)
+    trace = TraceDAO.get_trace(6)
+
+    assert "fc" in colonnes and "watts" not in colonnes
+    assert np.array_equal(trace.fc, trace_test.fc, equal_nan=True)
+    assert np.isnan(trace.puissance).all()
+
+
+# Test 6 : Les fractions de seconde des traces à 1 Hz et plus sont conservées
+def test_temps_fractionnaires(trace_test):
+    trace_test.temps = np.array([1_700_000_000.25, 1_700_000_000.75, np.nan])
+    TraceDAO.create(7, trace_test)
+
+    trace = TraceDAO.get_trace(7)
+
+    assert np.array_equal(trace.temps, trace_test.temps, equal_nan=True)
+
+
+# Test 7 : Un fichier de la version 1 (temps en secondes entières) reste lisible
+def test_lecture_version_1(dossier_traces):
+    colonnes = [
+        ("lat", "<f8", np.array([48.0, 48.001])),
+        ("lon", "<f8", np.array([-1.7, -1.7])),
+        ("ele", "<f4", np.array([10.0, 11.0])),
+        ("temps", "<i4", np.array([0, TEMPS_ABSENT])),
+        ("segment", "<i4", np.array([0, 0])),
+    ]
+    with open(dossier_traces / "8.trk", "wb") as f:
+        f.write(EN_TETE.pack(MAGIC, 1, len(colonnes), 2, 1_700_000_000.0))
+        position = 64 * 8
+        for nom, type_colonne, _ in colonnes:
+            f.write(ENTREE_COLONNE.pack(nom.encode(), type_colonne.encode(), position))
+            position += 64
+        for i, (_, type_colonne, valeurs) in enumerate(colonnes):
+            f.seek(64 * (8 + i))
+            f.write(valeurs.astype(type_colonne).tobytes())
+
+    trace = TraceDAO.get_trace(8)
+
+    assert trace.temps[0] == 1_700_000_000.0
+    assert np.isnan(trace.temps[1])
@@ -0,0 +1,166 @@
+"""
+Tests de l'unité de travail : une session et une transaction partagées
+par les DAO pendant une requête
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from api.unite_requete import UniteDeTravailRequete
+from dao.trace_dao import TraceDAO
+from dao.utilisateur_dao import UtilisateurDAO
+from database import ECRITURE, LECTURE, apres_validation, engine, unite_de_travail
+from service.activite_service import ActiviteService
+
+
+def creer(pseudo):
+    return UtilisateurDAO.create(
+        nom="Martin", prenom="Sophie", age=28, pseudo=pseudo, mail=f"{pseudo}@example.com", mdp="securepass"
+    )
+
+
+def pseudos_en_base():
+    # Connexion indépendante : ne voit que ce qui est validé
+    with engine.connect() as connexion:
+        return {ligne[0] for ligne in connexion.execute(text('SELECT pseudo FROM "Utilisateur"'))}
+
+
+@pytest.fixture
+def connexions():
+    """Compte les connexions empruntées au pool et les transactions ouvertes"""
+    compteurs = {"checkout": 0, "begin": 0}
+
+    def emprunt(*_):
+        compteurs["checkout"] += 1
+
+    def debut(*_):
+        compteurs["begin"] += 1
+
+    event.listen(engine, "checkout", emprunt)
+    event.listen(engine, "begin", debut)
+    yield compteurs
+    event.remove(engine, "checkout", emprunt)
+    event.remove(engine, "begin", debut)
+
+
+class TestUniteDeTravail:
+    """Tests de l'unité de travail"""
+
+    def test_une_transaction_en_ecriture(self, setup_database, connexions):
+        """Les écritures des DAO ne sont visibles qu'à la fin de l'unité, en une transaction"""
+        with unite_de_travail(ECRITURE):
+            assert creer("alice") is not None
+            assert creer("bob") is not None
+            assert UtilisateurDAO.get_by_pseudo("alice") is not None
+            assert connexions == {"checkout": 1, "begin": 1}
+            assert pseudos_en_base() == set()
+
+        assert pseudos_en_base() == {"alice", "bob"}
+
+    def test_echec_d_un_appel(self, setup_database):
+        """Un appel en échec n'annule que ses propres écritures"""
+        with unite_de_travail(ECRITURE):
+            creer("alice")
+            assert creer("alice") is None  # Pseudo déjà pris
+            creer("bob")
+
+        assert pseudos_en_base() == {"alice", "bob"}
+
+    def test_exception_annule_tout(self, setup_database):
+        """Une exception qui sort de l'unité annule toute la transaction"""
+        with pytest.raises(RuntimeError):
+            with unite_de_travail(ECRITURE):
+                creer("alice")
+                raise RuntimeError("échec de la requête")
+
+        assert pseudos_en_base() == set()
+
+    def test_lecture(self, setup_database, connexions):
+        """En lecture, une seule connexion pour tous les appels ; une écriture ponctuelle est validée aussitôt"""
+        creer("alice")
+        connexions.update(checkout=0, begin=0)
+
+        with unite_de_travail(LECTURE):
+            for _ in range(10):
+                assert UtilisateurDAO.get_by_pseudo("alice") is not None
+            assert connexions == {"checkout": 1, "begin": 1}
+            creer("bob")
+            assert "bob" in pseudos_en_base()
+
+    def test_requete_validee_avant_reponse(self, setup_database):
+        """Le middleware valide la transaction avant d'envoyer la réponse, et l'annule sur exception"""
+        app = FastAPI()
+        app.add_middleware(UniteDeTravailRequete)
+        vus_par_la_reponse = []
+
+        @app.post("/utilisateurs/{pseudo}")
+        def inscrire(pseudo: str):
+            creer(pseudo)
+            if pseudo == "erreur":
+                raise RuntimeError("échec de la requête")
+            if pseudo == "indisponible":
+                raise HTTPException(status_code=503, detail="échec de la requête")
+            return {"pseudo": pseudo}
+
+        # Ajouté après : enveloppe le middleware testé et voit passer le début de la réponse
+        def observateur(application):
+            async def observer(scope, receive, send):
+                async def envoyer(message):
+                    if message["type"] == "http.response.start":
+                        vus_par_la_reponse.append(pseudos_en_base())
+                    await send(message)
+                await application(scope, receive, envoyer)
+            return observer
+
+        app.add_middleware(observateur)
+
+        client = TestClient(app, raise_server_exceptions=False)
+        assert client.post("/utilisateurs/alice").status_code == 200
+        assert vus_par_la_reponse == [{"alice"}]
+        assert client.post("/utilisateurs/erreur").status_code == 500
+        assert client.post("/utilisateurs/indisponible").status_code == 503
+        assert pseudos_en_base() == {"alice"}
+
+    def test_rappels_apres_validation(self, setup_database):
+        """Un rappel attend la validation de l'unité, et disparaît avec une unité annulée"""
+        appels = []
+
+        with unite_de_travail(ECRITURE):
+            creer("alice")
+            apres_validation(lambda: appels.append(pseudos_en_base()))
+            assert appels == []
+        assert appels == [{"alice"}]
+
+        with pytest.raises(RuntimeError):
+            with unite_de_travail(ECRITURE):
+                apres_validation(lambda: appels.append("annulée"))
+                raise RuntimeError("échec de la requête")
+        assert appels == [{"alice"}]
+
+        # Sans unité de travail : aussitôt
+        apres_validation(lambda: appels.append("aussitôt"))
+        assert appels == [{"alice"}, "aussitôt"]
+
+    def test_suppression_annulee_garde_les_fichiers(self, setup_database, tmp_path, gpx):
+        """Une suppression d'activité annulée avec sa transaction laisse sa trace et son GPX en place"""
+        chemin = tmp_path / "sortie.gpx"
+        chemin.write_bytes(gpx([(48.0, -1.7, 0), (48.001, -1.7, 60), (48.002, -1.7, 120)]))
+        activite = ActiviteService.creer_activite_depuis_gpx(str(chemin), creer("alice").id, "Footing", "Course")
+
+        with pytest.raises(RuntimeError):
+            with unite_de_travail(ECRITURE):
+                assert ActiviteService.supprimer_activite(activite.id)
+                raise RuntimeError("échec de la requête")
+        assert TraceDAO.exists(activite.id)
+        assert chemin.exists()
+
+        with unite_de_travail(ECRITURE):
+            assert ActiviteService.supprimer_activite(activite.id)
+            assert TraceDAO.exists(activite.id)
+        assert not TraceDAO.exists(activite.id)
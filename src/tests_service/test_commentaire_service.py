@@ -5,15 +5,6 @@ import pytest
 from datetime import date
 from service.activite_service import ActiviteService
 from service.utilisateur_service import UtilisateurService
-from database import SessionLocal, Base, engine
-
-
-@pytest.fixture(scope="function")
-def setup_database():
-    """Crée les tables avant chaque test et les supprime après"""
-    Base.metadata.create_all(bind=engine)
-    yield
-    Base.metadata.drop_all(bind=engine)
 
 
 @pytest.fixture
@@ -0,0 +1,117 @@
+"""
+Tests pour les activités en direct : lots de points, suivi et création de l'activité
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dao.session_directe_dao import SessionDirecteDAO
+from dao.trace_dao import TraceDAO
+from database import ECRITURE, unite_de_travail
+from service.activite_service import ActiviteService
+from service.direct_service import DirectService
+from service.utilisateur_service import UtilisateurService
+from utils.track_metrics import calculer_metriques
+
+
+def points(debut, fin):
+    """Course plein nord à 3 m/s, un point par seconde, en montée de 0,1 m/s"""
+    return [
+        {"lat": 48 + i * 3 / 111319.49, "lon": -1.7, "ele": 50 + i * 0.1, "temps": 1.7e9 + i, "fc": 150}
+        for i in range(debut, fin)
+    ]
+
+
+@pytest.fixture
+def coureur(setup_database):
+    return UtilisateurService.creer_utilisateur(
+        nom="Martin", prenom="Sophie", age=28, pseudo="en_direct",
+        mail="direct@example.com", mdp="securepass"
+    )
+
+
+class TestDirectService:
+    """Tests des sessions en direct"""
+
+    def test_session_complete(self, coureur, tmp_path):
+        """Les métriques suivent les lots, puis la session devient une activité"""
+        session = DirectService.demarrer(coureur.id, "Footing du midi", "Course")
+        assert session["statut"] == "en_cours" and session["nb_points"] == 0
+
+        for debut in range(0, 600, 60):
+            session = DirectService.ajouter_points(session["id"], points(debut, debut + 60))
+
+        assert session["nb_points"] == 600
+        assert session["version"] == 10
+        assert session["distance"] == pytest.approx(1.797, abs=0.01)
+        assert session["denivele_positif"] == pytest.approx(59.9, abs=0.1)
+        assert session["allure"] == pytest.approx(333.3, abs=1)
+
+        # Lot renvoyé après une coupure : ignoré, la version ne change pas
+        assert DirectService.ajouter_points(session["id"], points(540, 600))["version"] == 10
+
+        dossier = tmp_path / "gpx"
+        dossier.mkdir()
+        activite = DirectService.terminer(session["id"], str(dossier))
+
+        assert activite.nom == "Footing du midi"
+        assert activite.duree_activite == 599
+        assert activite.distance == pytest.approx(session["distance"])
+        assert os.path.exists(activite.gpx_path)
+        trace = TraceDAO.get_trace(activite.id)
+        assert len(trace) == 600
+        assert calculer_metriques(trace)["distance"] == pytest.approx(session["distance"], abs=1e-3)
+        assert ActiviteService.obtenir_capteurs(activite.id)["fc_moyenne"] == 150
+
+        # Session close : plus de points, fichier de points supprimé
+        assert DirectService.obtenir(session["id"])["activite_id"] == activite.id
+        assert DirectService.ajouter_points(session["id"], points(600, 660)) is None
+        assert not (tmp_path / "directs" / f"{session['id']}.pts").exists()
+
+    def test_lot_concurrent(self, coureur):
+        """Un lot calculé sur une version dépassée n'est pas enregistré"""
+        session = DirectService.demarrer(coureur.id, "Sortie", "Vélo")
+        DirectService.ajouter_points(session["id"], points(0, 10))
+
+        ancienne = SessionDirecteDAO.get(session["id"])
+        DirectService.ajouter_points(session["id"], points(10, 20))
+        assert not SessionDirecteDAO.mettre_a_jour(session["id"], ancienne.version, nb_points=0)
+
+        assert DirectService.obtenir(session["id"])["nb_points"] == 20
+        assert len(SessionDirecteDAO.lire_points(session["id"], 20)) == 20
+
+    def test_echec_ecriture_points(self, coureur, monkeypatch):
+        """Des points non écrits lèvent une erreur et l'état de la session est annulé avec l'unité"""
+        session = DirectService.demarrer(coureur.id, "Sortie", "Course")
+        DirectService.ajouter_points(session["id"], points(0, 10))
+        monkeypatch.setattr(SessionDirecteDAO, "ecrire_points", staticmethod(lambda *args: False))
+
+        with pytest.raises(RuntimeError):
+            with unite_de_travail(ECRITURE):
+                DirectService.ajouter_points(session["id"], points(10, 20))
+
+        assert DirectService.obtenir(session["id"])["nb_points"] == 10
+        assert DirectService.obtenir_version(session["id"]) == 1
+
+    def test_suivis_et_annulation(self, coureur):
+        """Les abonnés voient les sessions en cours des personnes qu'ils suivent"""
+        abonne = UtilisateurService.creer_utilisateur(
+            nom="Durand", prenom="Paul", age=30, pseudo="supporter",
+            mail="supporter@example.com", mdp="securepass"
+        )
+        UtilisateurService.suivre_utilisateur(abonne.id, coureur.id)
+        session = DirectService.demarrer(coureur.id, "Trail", "Course")
+        DirectService.ajouter_points(session["id"], points(0, 30))
+
+        suivies = DirectService.lister_suivis(abonne.id)
+        assert [s["id"] for s in suivies] == [session["id"]]
+        assert DirectService.obtenir_version(session["id"]) == 1
+
+        assert DirectService.annuler(session["id"])
+        assert DirectService.lister_suivis(abonne.id) == []
+        assert DirectService.terminer(session["id"], "inutile") is None
+        assert DirectService.demarrer(9999, "Fantôme", "Course") is None
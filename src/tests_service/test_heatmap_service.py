@@ -0,0 +1,126 @@
+"""
+Tests pour la carte de chaleur : rendu, cache disque et invalidation incrémentale
+"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dao.tuile_dao import TuileDAO
+from service.activite_service import ActiviteService
+from service.heatmap_service import TUILE_VIDE, HeatmapService
+from service.utilisateur_service import UtilisateurService
+from utils.heatmap import pixels_mercator
+
+ZOOM = 14
+
+
+def ligne_est(lat, lon_debut, lon_fin):
+    """Sortie d'ouest en est sur une latitude, un point tous les 0,0005° et par seconde"""
+    nombre = int(round((lon_fin - lon_debut) / 0.0005)) + 1
+    return [(lat, lon_debut + i * 0.0005, i) for i in range(nombre)]
+
+
+def tuile_de(lat, lon):
+    px, py = pixels_mercator([lat], [lon], ZOOM)
+    return int(px[0] // 256), int(py[0] // 256)
+
+
+@pytest.fixture
+def utilisateur(setup_database):
+    return UtilisateurService.creer_utilisateur(
+        nom="Martin", prenom="Sophie", age=28, pseudo="cartographe",
+        mail="cartographe@example.com", mdp="securepass"
+    )
+
+
+def creer_sortie(gpx, utilisateur, tmp_path, nom, lat, lon_debut, lon_fin):
+    chemin = tmp_path / f"{nom}.gpx"
+    chemin.write_bytes(gpx(ligne_est(lat, lon_debut, lon_fin)))
+    return ActiviteService.creer_activite_depuis_gpx(str(chemin), utilisateur.id, nom, "Course")
+
+
+class TestHeatmapService:
+    """Tests du rendu et du cache des tuiles"""
+
+    def test_rendu_et_cache(self, utilisateur, tmp_path, gpx):
+        """Une tuile est rendue une fois puis lue dans le cache"""
+        creer_sortie(gpx, utilisateur, tmp_path, "rennes", 48.11, -1.70, -1.66)
+        x, y = tuile_de(48.11, -1.68)
+
+        png = HeatmapService.obtenir_tuile(utilisateur.id, ZOOM, x, y)
+        assert png[:4] == b"\x89PNG" and png != TUILE_VIDE
+        assert TuileDAO.get(utilisateur.id, ZOOM, x, y) == png
+
+        # Tuile sans passage : servie transparente, notée vide dans le cache
+        assert HeatmapService.obtenir_tuile(utilisateur.id, ZOOM, x, y + 5) == TUILE_VIDE
+        assert TuileDAO.get(utilisateur.id, ZOOM, x, y + 5) == b""
+
+        # Hors de la carte
+        assert HeatmapService.obtenir_tuile(utilisateur.id, ZOOM, 2 ** ZOOM, 0) is None
+        assert HeatmapService.obtenir_tuile(utilisateur.id, 30, 0, 0) is None
+
+    def test_invalidation_incrementale(self, utilisateur, tmp_path, gpx):
+        """Ajouter ou supprimer une activité ne retire que les tuiles de sa trace"""
+        creer_sortie(gpx, utilisateur, tmp_path, "rennes", 48.11, -1.70, -1.66)
+        x_rennes, y_rennes = tuile_de(48.11, -1.68)
+        x_nantes, y_nantes = tuile_de(47.22, -1.55)
+        avant = HeatmapService.obtenir_tuile(utilisateur.id, ZOOM, x_rennes, y_rennes)
+        HeatmapService.obtenir_tuile(utilisateur.id, ZOOM, x_nantes, y_nantes)
+        HeatmapService.obtenir_tuile(utilisateur.id, 0, 0, 0)
+
+        nantes = creer_sortie(gpx, utilisateur, tmp_path, "nantes", 47.22, -1.56, -1.54)
+
+        # Seules les tuiles traversées par la nouvelle trace sont à refaire
+        assert TuileDAO.get(utilisateur.id, ZOOM, x_rennes, y_rennes) == avant
+        assert TuileDAO.get(utilisateur.id, ZOOM, x_nantes, y_nantes) is None
+        assert TuileDAO.get(utilisateur.id, 0, 0, 0) is None
+        assert HeatmapService.obtenir_tuile(utilisateur.id, ZOOM, x_nantes, y_nantes) != TUILE_VIDE
+
+        assert ActiviteService.supprimer_activite(nantes.id)
+        assert TuileDAO.get(utilisateur.id, ZOOM, x_nantes, y_nantes) is None
+        assert HeatmapService.obtenir_tuile(utilisateur.id, ZOOM, x_nantes, y_nantes) == TUILE_VIDE
+
+    def test_densite_additive(self, utilisateur, tmp_path, gpx):
+        """Deux passages au même endroit colorent plus fort qu'un seul"""
+        creer_sortie(gpx, utilisateur, tmp_path, "aller", 48.11, -1.70, -1.66)
+        x, y = tuile_de(48.11, -1.68)
+        une_fois = HeatmapService._calculer_densite(utilisateur.id, ZOOM, x, y)
+
+        creer_sortie(gpx, utilisateur, tmp_path, "retour", 48.11, -1.70, -1.66)
+        deux_fois = HeatmapService._calculer_densite(utilisateur.id, ZOOM, x, y)
+
+        assert une_fois.max() == 1
+        assert (deux_fois == 2 * une_fois).all()
+
+    def test_invalidation_pendant_le_rendu(self, utilisateur, tmp_path, gpx, monkeypatch):
+        """Une tuile rendue pendant qu'une activité l'invalide est servie mais pas mise en cache"""
+        creer_sortie(gpx, utilisateur, tmp_path, "aller", 48.11, -1.70, -1.66)
+        x, y = tuile_de(48.11, -1.68)
+        calculer_densite = HeatmapService._calculer_densite
+
+        def rendu_lent(*args):
+            comptes = calculer_densite(*args)
+            # Nouvelle activité validée et invalidée après la lecture des traces
+            creer_sortie(gpx, utilisateur, tmp_path, "retour", 48.11, -1.70, -1.66)
+            return comptes
+
+        monkeypatch.setattr(HeatmapService, "_calculer_densite", staticmethod(rendu_lent))
+        assert HeatmapService.obtenir_tuile(utilisateur.id, ZOOM, x, y) != TUILE_VIDE
+        assert TuileDAO.get(utilisateur.id, ZOOM, x, y) is None
+
+    def test_invalidations_concurrentes(self, utilisateur):
+        """Des invalidations simultanées dans les threads du processus ne se marchent pas dessus"""
+        def invalider(_):
+            for _ in range(20):
+                TuileDAO.supprimer(utilisateur.id, [])
+                TuileDAO.enregistrer(utilisateur.id, ZOOM, 0, 0, b"png", TuileDAO.generation(utilisateur.id))
+
+        with ThreadPoolExecutor(8) as threads:
+            list(threads.map(invalider, range(8)))
+
+        assert TuileDAO.generation(utilisateur.id) is not None
+        assert not list(TuileDAO.dossier.rglob("*.tmp"))
@@ -0,0 +1,106 @@
+"""
+Tests pour l'import d'archives de fichiers GPX
+"""
+import hashlib
+import io
+import sys
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dao.fichier_gpx_dao import FichierGPXDAO
+from dao.trace_dao import TraceDAO
+from nettoyer_gpx import nettoyer_dossier
+from service import ingestion_service
+from service.import_service import ImportService, iterer_gpx_archive
+from service.utilisateur_service import UtilisateurService
+
+
+def sortie(minute: int):
+    """Deux points, le second `minute` minutes après le premier"""
+    return [(48.0, -1.7, 0, 10), (48.001, -1.7, minute * 60, 20)]
+
+
+@pytest.fixture
+def utilisateur_test(setup_database, tmp_path, monkeypatch):
+    """Crée un utilisateur de test ; les archives sont analysées par deux processus"""
+    monkeypatch.setattr(ingestion_service, "NB_WORKERS", 2)
+    (tmp_path / "gpx").mkdir()
+    return UtilisateurService.creer_utilisateur(
+        nom="Martin",
+        prenom="Sophie",
+        age=28,
+        pseudo="smartin_import",
+        mail="sophie.import@example.com",
+        mdp="securepass"
+    )
+
+
+class TestImportService:
+    """Tests de l'import en masse"""
+
+    def test_iterer_gpx_archive_tar(self, tmp_path, gpx):
+        """Seuls les fichiers .gpx d'une archive tar sont parcourus"""
+        chemin = tmp_path / "export.tar.gz"
+        with tarfile.open(chemin, "w:gz") as archive:
+            for nom, contenu in [("a/sortie.gpx", gpx(sortie(1))), ("lisezmoi.txt", b"texte")]:
+                info = tarfile.TarInfo(nom)
+                info.size = len(contenu)
+                archive.addfile(info, io.BytesIO(contenu))
+
+        assert [nom for nom, _ in iterer_gpx_archive(str(chemin))] == ["a/sortie.gpx"]
+
+    def test_iterer_gpx_archive_invalide(self, tmp_path):
+        """Un fichier qui n'est ni zip ni tar est refusé"""
+        chemin = tmp_path / "export.zip"
+        chemin.write_bytes(b"pas une archive")
+
+        with pytest.raises(ValueError):
+            list(iterer_gpx_archive(str(chemin)))
+
+    def test_importer_archive(self, utilisateur_test, tmp_path, capsys, gpx):
+        """Les fichiers valides sont importés, les autres listés en échec"""
+        chemin = tmp_path / "export.zip"
+        with zipfile.ZipFile(chemin, "w") as archive:
+            archive.writestr("sortie1.gpx", gpx(sortie(1)))
+            archive.writestr("sortie2.gpx", gpx(sortie(2)))
+            archive.writestr("doublon.gpx", gpx(sortie(2)))
+            archive.writestr("casse.gpx", b"<gpx><trk>")
+
+        rapport = ImportService.importer_archive(
+            str(chemin), utilisateur_test.id, "Course", str(tmp_path / "gpx")
+        )
+
+        assert rapport["nb_fichiers"] == 4
+        assert rapport["nb_importes"] == 3
+        assert [e["fichier"] for e in rapport["echecs"]] == ["casse.gpx"]
+        assert all(TraceDAO.exists(i) for i in rapport["activite_ids"])
+        # Deux fichiers stockés : le doublon partage le fichier de sortie2, le fichier cassé est refusé
+        assert len(list((tmp_path / "gpx").iterdir())) == 2
+        assert FichierGPXDAO.get_by_empreinte(hashlib.sha256(gpx(sortie(2))).hexdigest()).nb_references == 2
+        # Le doublon est inséré dans le même lot, sans repli ligne par ligne
+        assert "Erreur lors de l'insertion d'un lot" not in capsys.readouterr().out
+
+    def test_nettoyer_fichiers_sans_reference(self, utilisateur_test, tmp_path, gpx):
+        """Le nettoyage supprime les fichiers stockés sans référence, passé leur âge minimal"""
+        chemin = tmp_path / "export.zip"
+        with zipfile.ZipFile(chemin, "w") as archive:
+            archive.writestr("sortie.gpx", gpx(sortie(1)))
+        rapport = ImportService.importer_archive(str(chemin), utilisateur_test.id, "Course", str(tmp_path / "gpx"))
+        # Laissé par un import en échec
+        (tmp_path / "gpx" / f"{hashlib.sha256(b'illisible').hexdigest()}.gpx.gz").write_bytes(b"illisible")
+        dossier = str(tmp_path / "gpx")
+
+        # Écrit à l'instant : peut-être un import en cours
+        assert nettoyer_dossier(dossier)["nb_fichiers"] == 0
+        assert nettoyer_dossier(dossier, age_minimum=0, simulation=True)["nb_fichiers"] == 1
+        assert len(list((tmp_path / "gpx").iterdir())) == 2
+
+        assert nettoyer_dossier(dossier, age_minimum=0)["nb_fichiers"] == 1
+        restant, = (tmp_path / "gpx").iterdir()
+        assert FichierGPXDAO.est_reference(str(restant))
+        assert rapport["nb_importes"] == 1
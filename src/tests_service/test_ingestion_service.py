@@ -0,0 +1,90 @@
+"""
+Tests pour l'ingestion des GPX en arrière-plan
+"""
+import asyncio
+import hashlib
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from business_objects.models import Activite
+from dao.trace_dao import TraceDAO
+from database import SessionLocal
+from service.ingestion_service import IngestionService
+from service.utilisateur_service import UtilisateurService
+
+POINTS_TEST = [(48.0, -1.7, 0, 10), (48.001, -1.7, 60, 20), (48.002, -1.7, 120, 15)]
+
+
+@pytest.fixture
+def utilisateur_test(setup_database):
+    """Crée un utilisateur de test"""
+    return UtilisateurService.creer_utilisateur(
+        nom="Martin",
+        prenom="Sophie",
+        age=28,
+        pseudo="smartin_ingestion",
+        mail="sophie.ingestion@example.com",
+        mdp="securepass"
+    )
+
+
+class TestIngestionService:
+    """Tests du suivi des tâches d'import"""
+
+    def test_creer_et_obtenir_tache(self, utilisateur_test):
+        """Une tâche créée est en attente et retrouvable par son ID"""
+        tache = IngestionService.creer_tache(utilisateur_test.id)
+
+        assert tache.statut == "en_attente"
+        assert IngestionService.obtenir_tache(tache.id).utilisateur_id == utilisateur_test.id
+        assert IngestionService.obtenir_tache("inconnue") is None
+
+    def test_traiter_fichier(self, utilisateur_test, tmp_path, gpx):
+        """Le fichier est analysé dans le pool et l'activité créée"""
+        contenu = gpx(POINTS_TEST)
+        chemin = tmp_path / "test.gpx"
+        chemin.write_bytes(contenu)
+        tache = IngestionService.creer_tache(utilisateur_test.id)
+
+        asyncio.run(IngestionService.traiter_fichier(
+            tache_id=tache.id,
+            chemin=str(chemin),
+            empreinte=hashlib.sha256(contenu).hexdigest(),
+            taille=len(contenu),
+            utilisateur_id=utilisateur_test.id,
+            nom="Footing",
+            type_sport="Course"
+        ))
+
+        tache = IngestionService.obtenir_tache(tache.id)
+        assert tache.statut == "terminee"
+        db = SessionLocal()
+        activite = db.get(Activite, tache.activite_id)
+        db.close()
+        assert activite.duree_activite == 120
+        assert TraceDAO.exists(activite.id)
+
+    def test_traiter_fichier_invalide(self, utilisateur_test, tmp_path):
+        """Un fichier illisible fait échouer la tâche ; il est laissé au nettoyage (nettoyer_gpx.py)"""
+        chemin = tmp_path / "invalide.gpx"
+        chemin.write_bytes(b"pas du xml")
+        tache = IngestionService.creer_tache(utilisateur_test.id)
+
+        asyncio.run(IngestionService.traiter_fichier(
+            tache_id=tache.id,
+            chemin=str(chemin),
+            empreinte=hashlib.sha256(b"pas du xml").hexdigest(),
+            taille=10,
+            utilisateur_id=utilisateur_test.id,
+            nom="Footing",
+            type_sport="Course"
+        ))
+
+        tache = IngestionService.obtenir_tache(tache.id)
+        assert tache.statut == "echec"
+        assert tache.erreur
+        assert chemin.exists()
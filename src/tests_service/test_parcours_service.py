@@ -0,0 +1,94 @@
+"""
+Tests pour les signatures de parcours : doublons à l'import et parcours répétés
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dao.signature_parcours_dao import SignatureParcoursDAO
+from database import engine
+from indexer_parcours import indexer_parcours
+from service.activite_service import ActiviteService
+from service.parcours_service import ParcoursService
+from service.utilisateur_service import UtilisateurService
+
+# Boucle d'environ 4 km autour de (48.11, -1.68) : est, nord, ouest, sud
+COINS = [(48.11, -1.68), (48.11, -1.6666), (48.119, -1.6666), (48.119, -1.68), (48.11, -1.68)]
+
+
+def boucle(jour, heure=10, pas=20, decalage=0.0, coins=COINS):
+    """Boucle parcourue à raison d'un point par `pas` secondes : (points, début)"""
+    points = []
+    for (lat_a, lon_a), (lat_b, lon_b) in zip(coins, coins[1:]):
+        for i in range(0, 60, pas // 10):
+            t = i / 60
+            points.append((lat_a + t * (lat_b - lat_a) + decalage, lon_a + t * (lon_b - lon_a), len(points) * pas))
+    return points, datetime(2025, 3, jour, heure)
+
+
+@pytest.fixture
+def utilisateurs(setup_database):
+    return [
+        UtilisateurService.creer_utilisateur(
+            nom="Martin", prenom="Sophie", age=28, pseudo=f"habitue_{i}",
+            mail=f"habitue{i}@example.com", mdp="securepass"
+        )
+        for i in range(2)
+    ]
+
+
+def importer(utilisateur, tmp_path, nom, contenu):
+    chemin = tmp_path / f"{nom}.gpx"
+    chemin.write_bytes(contenu)
+    return ActiviteService.creer_activite_depuis_gpx(str(chemin), utilisateur.id, nom, "Course")
+
+
+class TestParcoursService:
+    """Tests des doublons et des parcours répétés"""
+
+    def test_doublon_et_parcours_repetes(self, utilisateurs, tmp_path, gpx):
+        """Même sortie réimportée : doublon ; même boucle un autre jour : parcours répété"""
+        moi, autre = utilisateurs
+        lundi = importer(moi, tmp_path, "lundi", gpx(*boucle(3)))
+        # Même sortie exportée autrement (échantillonnage différent)
+        copie = importer(moi, tmp_path, "lundi_montre", gpx(*boucle(3, pas=10)))
+        lundi_suivant = importer(moi, tmp_path, "lundi_suivant", gpx(*boucle(10, pas=10, decalage=0.00005)))
+        # Même boucle, mais courue par un autre utilisateur
+        importer(autre, tmp_path, "voisin", gpx(*boucle(10)))
+        # Autre parcours du même utilisateur
+        importer(moi, tmp_path, "ailleurs", gpx(*boucle(11, coins=[(lat + 0.1, lon) for lat, lon in COINS])))
+
+        assert ParcoursService.obtenir_parcours(copie.id)["doublon_de"] == lundi.id
+
+        parcours = ParcoursService.obtenir_parcours(lundi_suivant.id)
+        assert parcours["doublon_de"] is None
+        assert [s["activite_id"] for s in parcours["parcours_similaires"]] == [copie.id, lundi.id]
+        assert all(s["similarite"] >= 0.5 for s in parcours["parcours_similaires"])
+
+    def test_suppression_de_l_original(self, utilisateurs, tmp_path, gpx):
+        """Le doublon d'une activité supprimée n'y renvoie plus"""
+        original = importer(utilisateurs[0], tmp_path, "original", gpx(*boucle(3)))
+        copie = importer(utilisateurs[0], tmp_path, "copie", gpx(*boucle(3)))
+
+        assert ActiviteService.supprimer_activite(original.id)
+        assert SignatureParcoursDAO.get(original.id) is None
+        assert SignatureParcoursDAO.get(copie.id).doublon_de is None
+        assert ParcoursService.obtenir_parcours(copie.id) == {
+            "activite_id": copie.id, "doublon_de": None, "parcours_similaires": []
+        }
+
+    def test_indexer_parcours(self, utilisateurs, tmp_path, gpx):
+        """Les activités importées avant les signatures sont signées par la migration"""
+        premiere = importer(utilisateurs[0], tmp_path, "premiere", gpx(*boucle(3)))
+        seconde = importer(utilisateurs[0], tmp_path, "seconde", gpx(*boucle(3, pas=10)))
+        with engine.begin() as connexion:
+            connexion.exec_driver_sql("DELETE FROM BucketParcours")
+            connexion.exec_driver_sql("DELETE FROM SignatureParcours")
+
+        assert indexer_parcours(taille_lot=1) == {"nb_indexees": 2, "nb_doublons": 1, "nb_echecs": 0}
+        assert SignatureParcoursDAO.get(seconde.id).doublon_de == premiere.id
+        assert indexer_parcours()["nb_indexees"] == 0
@@ -0,0 +1,91 @@
+"""
+Tests pour l'emprise des activités et les recherches géographiques
+"""
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dao.activite_dao import ActiviteDAO
+from dao.emprise_activite_dao import EmpriseActiviteDAO
+from database import SessionLocal
+from service.activite_service import ActiviteService
+from service.utilisateur_service import UtilisateurService
+
+
+def ligne(lat, lon, nb_points=5, pas=0.001):
+    """Sortie plein nord à partir de (lat, lon), un point par minute"""
+    return [(lat + i * pas, lon, i * 60) for i in range(nb_points)]
+
+
+@pytest.fixture
+def activites(setup_database, tmp_path, gpx):
+    """Une sortie à Rennes, une à Bruz (10 km au sud) pour un autre utilisateur, une à Paris"""
+    utilisateurs = [
+        UtilisateurService.creer_utilisateur(
+            nom="Martin", prenom="Sophie", age=28, pseudo=f"smartin_carte_{i}",
+            mail=f"sophie.carte{i}@example.com", mdp="securepass"
+        )
+        for i in range(2)
+    ]
+    lieux = {
+        "Rennes": (utilisateurs[0], 48.110, -1.680),
+        "Bruz": (utilisateurs[1], 48.024, -1.745),
+        "Paris": (utilisateurs[0], 48.857, 2.352),
+    }
+    resultat = {}
+    for nom, (utilisateur, lat, lon) in lieux.items():
+        chemin = tmp_path / f"{nom}.gpx"
+        chemin.write_bytes(gpx(ligne(lat, lon)))
+        resultat[nom] = ActiviteService.creer_activite_depuis_gpx(str(chemin), utilisateur.id, nom, "Course")
+    return resultat
+
+
+def noms(activites):
+    return sorted(activite.nom for activite in activites)
+
+
+class TestRechercheSpatiale:
+    """Tests des recherches par rectangle et par rayon"""
+
+    def test_emprise_a_l_import(self, activites):
+        """L'import enregistre le rectangle englobant, le départ et l'arrivée"""
+        emprise = EmpriseActiviteDAO.get(activites["Rennes"].id)
+
+        assert emprise.lat_min == pytest.approx(48.110)
+        assert emprise.lat_max == pytest.approx(48.114)
+        assert emprise.lon_depart == pytest.approx(-1.680)
+        assert emprise.lat_arrivee == pytest.approx(48.114)
+
+    def test_recherche_zone(self, activites):
+        """Une vue de carte renvoie les activités qui la traversent"""
+        bretagne = ActiviteService.rechercher_dans_zone(47.9, -2.0, 48.2, -1.5)
+        assert noms(bretagne) == ["Bruz", "Rennes"]
+
+        # Vue qui ne contient que la fin de la sortie de Rennes
+        assert noms(ActiviteService.rechercher_dans_zone(48.113, -1.69, 48.2, -1.67)) == ["Rennes"]
+        assert ActiviteService.rechercher_dans_zone(0, 0, 1, 1) == []
+
+    def test_recherche_autour(self, activites):
+        """La recherche par rayon porte sur le point de départ"""
+        rennes = activites["Rennes"]
+
+        assert noms(ActiviteService.rechercher_autour(48.110, -1.680, 5)) == ["Rennes"]
+        assert noms(ActiviteService.rechercher_autour(48.110, -1.680, 15)) == ["Bruz", "Rennes"]
+        # Combinée aux autres filtres de get_by_filters
+        assert noms(ActiviteDAO.get_by_filters(
+            rennes.utilisateur_id, autour=(48.110, -1.680, 15000)
+        )) == ["Rennes"]
+
+    def test_index_suit_les_suppressions(self, activites):
+        """Les triggers retirent l'activité supprimée de l'index R*Tree"""
+        assert ActiviteService.supprimer_activite(activites["Paris"].id)
+
+        db = SessionLocal()
+        nb_index = db.execute(text("SELECT count(*) FROM EmpriseActivite_rtree")).scalar()
+        db.close()
+        assert nb_index == 2
+        assert ActiviteService.rechercher_autour(48.857, 2.352, 5) == []
@@ -0,0 +1,144 @@
+"""
+Tests pour les meilleurs efforts calculés à l'import et les records
+"""
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from business_objects.models import MeilleurEffort, Split
+from database import SessionLocal
+from service.activite_service import ActiviteService
+from service.statistiques_service import StatistiquesService, TEMPS_ECOULE, TEMPS_MOUVEMENT
+from service.utilisateur_service import UtilisateurService
+
+
+def plein_nord(points):
+    """Points d'une trace plein nord à partir de (distance en m, temps en s)"""
+    return [(48 + distance * 1.00001 / 111319.49, -1.7, temps) for distance, temps in points]
+
+
+def course(secondes_par_100m):
+    """Course plein nord avec un point tous les 100 m"""
+    temps = [0]
+    for duree in secondes_par_100m:
+        temps.append(temps[-1] + duree)
+    return plein_nord([(i * 100, t) for i, t in enumerate(temps)])
+
+
+@pytest.fixture
+def utilisateur_test(setup_database):
+    """Crée un utilisateur de test"""
+    return UtilisateurService.creer_utilisateur(
+        nom="Martin",
+        prenom="Sophie",
+        age=28,
+        pseudo="smartin_records",
+        mail="sophie.records@example.com",
+        mdp="securepass"
+    )
+
+
+def creer_course(gpx, utilisateur_id, tmp_path, nom, secondes_par_100m):
+    chemin = tmp_path / f"{nom}.gpx"
+    chemin.write_bytes(gpx(course(secondes_par_100m)))
+    return ActiviteService.creer_activite_depuis_gpx(str(chemin), utilisateur_id, nom, "Course")
+
+
+class TestRecords:
+    """Tests des records personnels issus des meilleurs efforts"""
+
+    def test_meilleur_effort_et_splits(self, utilisateur_test, tmp_path, gpx):
+        """Le meilleur kilomètre est le plus rapide des deux sorties"""
+        creer_course(gpx, utilisateur_test.id, tmp_path, "lente", [36] * 25)
+        rapide = creer_course(gpx, utilisateur_test.id, tmp_path, "rapide", [36] * 10 + [24] * 10 + [36] * 5)
+
+        records = StatistiquesService.obtenir_records_personnels(utilisateur_test.id)
+
+        record_1km = records["Course"]["meilleurs_efforts"]["1km"]
+        assert record_1km["activite"] == "rapide"
+        assert record_1km["duree"] == pytest.approx(240, abs=1)
+        assert "5km" not in records["Course"]["meilleurs_efforts"]
+
+        durees = [split["duree"] for split in ActiviteService.obtenir_splits(rapide.id)]
+        assert durees == pytest.approx([360, 240], abs=1)
+
+    def test_records_par_sport(self, utilisateur_test):
+        """Durée, dénivelé et calories maximaux de chaque sport, sans activité : aucun record"""
+        assert StatistiquesService.obtenir_records_personnels(utilisateur_test.id) == {}
+        for nom, sport, duree, d_plus, calories in [
+            ("Longue", "Course", 7200, 100, 600),
+            ("Montée", "Course", 3600, 800, 600),
+            ("Brûlante", "Course", 1800, None, 900),
+            ("Balade", "Vélo", 5400, 300, None),
+        ]:
+            activite = ActiviteService.creer_activite_manuelle(
+                utilisateur_test.id, nom, sport, date(2025, 1, 1), duree_activite=duree, calories=calories
+            )
+            ActiviteService.modifier_activite(activite.id, d_plus=d_plus)
+
+        records = StatistiquesService.obtenir_records_personnels(utilisateur_test.id)
+
+        resume = {
+            sport: {cle: (record["valeur"], record["activite"]) for cle, record in records_sport.items()}
+            for sport, records_sport in records.items()
+        }
+        assert resume == {
+            "Course": {
+                "duree_maximale": (2, "Longue"),
+                "denivele_maximal": (800, "Montée"),
+                "calories_maximales": (900, "Brûlante"),
+            },
+            "Vélo": {
+                "duree_maximale": (1.5, "Balade"),
+                "denivele_maximal": (300, "Balade"),
+                "calories_maximales": (0, "Balade"),
+            },
+        }
+
+    def test_changement_de_sport(self, utilisateur_test, tmp_path, gpx):
+        """Un record suit le sport de son activité quand il est modifié"""
+        sortie = creer_course(gpx, utilisateur_test.id, tmp_path, "sortie", [36] * 15)
+
+        ActiviteService.modifier_activite(sortie.id, type_sport="Marche")
+
+        records = StatistiquesService.obtenir_records_personnels(utilisateur_test.id)
+        assert "Course" not in records
+        assert records["Marche"]["meilleurs_efforts"]["1km"]["activite"] == "sortie"
+
+    def test_suppression_cascade(self, utilisateur_test, tmp_path, gpx):
+        """Les efforts et splits disparaissent avec l'activité"""
+        activite = creer_course(gpx, utilisateur_test.id, tmp_path, "sortie", [30] * 20)
+
+        assert ActiviteService.supprimer_activite(activite.id)
+
+        db = SessionLocal()
+        assert db.query(MeilleurEffort).count() == 0
+        assert db.query(Split).count() == 0
+        db.close()
+
+    def test_temps_en_mouvement(self, utilisateur_test, tmp_path, gpx):
+        """Une pause de 10 minutes compte dans le temps écoulé, pas dans le temps en mouvement"""
+        # 1 km en 6 min, 20 points immobiles sur 10 min, puis 1 km en 6 min
+        points = [(i * 100, i * 36) for i in range(11)]
+        points += [(1000, 360 + i * 30) for i in range(1, 21)]
+        points += [(1000 + i * 100, 960 + i * 36) for i in range(1, 11)]
+        chemin = tmp_path / "cafe.gpx"
+        chemin.write_bytes(gpx(plein_nord(points)))
+        ActiviteService.creer_activite_depuis_gpx(str(chemin), utilisateur_test.id, "cafe", "Course")
+        ActiviteService.creer_activite_manuelle(
+            utilisateur_test.id, "Tapis", "Course", date(2025, 1, 2), duree_activite=1800
+        )
+
+        ecoule = StatistiquesService.obtenir_resume_global(utilisateur_test.id, temps=TEMPS_ECOULE)
+        mouvement = StatistiquesService.obtenir_resume_global(utilisateur_test.id, temps=TEMPS_MOUVEMENT)
+
+        # Activité manuelle : sa durée saisie, dans les deux cas
+        assert ecoule["duree_totale_heures"] == pytest.approx((1320 + 1800) / 3600, abs=0.01)
+        assert mouvement["duree_totale_heures"] == pytest.approx((720 + 1800) / 3600, abs=0.01)
+
+        with pytest.raises(ValueError):
+            StatistiquesService.obtenir_resume_global(utilisateur_test.id, temps="inconnu")
@@ -0,0 +1,132 @@
+"""
+Tests pour le recalcul des métriques versionnées
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from business_objects.models import Activite, MeilleurEffort, MetriquesActivite, Split
+from dao.metriques_activite_dao import MetriquesActiviteDAO
+from dao.trace_dao import TraceDAO
+from database import SessionLocal
+from service import retraitement_service
+from service.activite_service import ActiviteService
+from service.retraitement_service import RetraitementService
+from service.utilisateur_service import UtilisateurService
+from utils.track_metrics import VERSION_METRIQUES
+
+POINTS_TEST = [(48.0, -1.7, 0, 10), (48.001, -1.7, 60, 20), (48.002, -1.7, 120, 15)]
+
+
+@pytest.fixture
+def activites_gpx(setup_database, tmp_path, gpx):
+    """Trois activités GPX : deux avec une trace stockée, une ancienne sans trace ni métriques"""
+    utilisateur = UtilisateurService.creer_utilisateur(
+        nom="Martin", prenom="Sophie", age=28, pseudo="smartin_retraitement",
+        mail="sophie.retraitement@example.com", mdp="securepass"
+    )
+    chemin = tmp_path / "sortie.gpx"
+    chemin.write_bytes(gpx(POINTS_TEST))
+    ids = [
+        ActiviteService.creer_activite_depuis_gpx(str(chemin), utilisateur.id, f"Sortie {i}", "Course").id
+        for i in range(2)
+    ]
+
+    # Activité importée avant les métriques versionnées
+    ancienne = ActiviteService.creer_activite_depuis_gpx(str(chemin), utilisateur.id, "Ancienne", "Course")
+    TraceDAO.delete(ancienne.id)
+    db = SessionLocal()
+    db.query(MetriquesActivite).filter(MetriquesActivite.activite_id == ancienne.id).delete()
+    db.query(Activite).filter(Activite.id == ancienne.id).update({"d_plus": 0})
+    db.commit()
+    db.close()
+    return ids + [ancienne.id]
+
+
+class TestRetraitementService:
+    """Tests du recalcul par lots"""
+
+    def test_metriques_a_l_import(self, activites_gpx):
+        """L'import enregistre les métriques de la version courante"""
+        metriques = MetriquesActiviteDAO.get(activites_gpx[0])
+
+        assert metriques.version == VERSION_METRIQUES
+        assert metriques.duree_secondes == 120
+        assert (metriques.duree_pauses, metriques.nb_pauses) == (0, 0)
+        assert MetriquesActiviteDAO.compter(VERSION_METRIQUES) == (2, 3)
+
+    def test_retraiter_nouvelle_version(self, activites_gpx, monkeypatch):
+        """Un changement de version recalcule toutes les activités, par lots"""
+        monkeypatch.setattr(retraitement_service, "VERSION_METRIQUES", VERSION_METRIQUES + 1)
+        monkeypatch.setattr("dao.metriques_activite_dao.VERSION_METRIQUES", VERSION_METRIQUES + 1)
+
+        rapport = RetraitementService.retraiter(taille_lot=2)
+
+        assert rapport["traitees"] == 3
+        assert rapport["a_jour"] == rapport["total"] == 3
+        # L'activité ancienne a retrouvé son dénivelé et une trace stockée
+        assert ActiviteService.obtenir_activite_par_id(activites_gpx[2]).d_plus > 0
+        assert TraceDAO.exists(activites_gpx[2])
+
+        # Relancé, le recalcul n'a plus rien à faire
+        assert RetraitementService.retraiter()["traitees"] == 0
+
+    def test_retraiter_metriques_sans_pauses(self, activites_gpx):
+        """Les métriques de la version courante calculées avant l'ajout des pauses sont complétées"""
+        RetraitementService.retraiter()
+        db = SessionLocal()
+        db.query(MetriquesActivite).filter(MetriquesActivite.activite_id == activites_gpx[0]).update(
+            {"duree_pauses": None, "nb_pauses": None}
+        )
+        db.commit()
+        db.close()
+        assert MetriquesActiviteDAO.compter(VERSION_METRIQUES) == (2, 3)
+
+        assert RetraitementService.retraiter()["traitees"] == 1
+        metriques = MetriquesActiviteDAO.get(activites_gpx[0])
+        assert (metriques.duree_pauses, metriques.nb_pauses) == (0, 0)
+        assert MetriquesActiviteDAO.compter(VERSION_METRIQUES) == (3, 3)
+
+    def test_activite_supprimee_pendant_le_lot(self, activites_gpx, monkeypatch):
+        """Une activité supprimée pendant le calcul n'est ni comptée ni dotée d'une trace"""
+        lister = MetriquesActiviteDAO.lister_a_retraiter
+
+        def lister_puis_supprimer(*args):
+            activites = lister(*args)
+            ActiviteService.supprimer_activite(activites_gpx[2])
+            return activites
+
+        monkeypatch.setattr(MetriquesActiviteDAO, "lister_a_retraiter", staticmethod(lister_puis_supprimer))
+
+        rapport = RetraitementService.retraiter()
+
+        assert (rapport["traitees"], rapport["echecs"]) == (0, 0)
+        assert not TraceDAO.exists(activites_gpx[2])
+
+    def test_retraiter_meilleurs_efforts(self, setup_database, tmp_path, gpx, monkeypatch):
+        """Les meilleurs efforts et splits sont recalculés avec les métriques, sans doublon"""
+        utilisateur = UtilisateurService.creer_utilisateur(
+            nom="Martin", prenom="Sophie", age=28, pseudo="smartin_efforts",
+            mail="sophie.efforts@example.com", mdp="securepass"
+        )
+        chemin = tmp_path / "kilometre.gpx"
+        chemin.write_bytes(gpx([(48 + i * 0.001, -1.7, i * 30) for i in range(13)]))
+        activite = ActiviteService.creer_activite_depuis_gpx(str(chemin), utilisateur.id, "Kilomètre", "Course")
+        # Meilleurs efforts perdus, splits gardés : les uns sont recréés, les autres pas dédoublés
+        db = SessionLocal()
+        db.query(MeilleurEffort).delete()
+        db.commit()
+        db.close()
+        monkeypatch.setattr(retraitement_service, "VERSION_METRIQUES", VERSION_METRIQUES + 1)
+        monkeypatch.setattr("dao.metriques_activite_dao.VERSION_METRIQUES", VERSION_METRIQUES + 1)
+
+        assert RetraitementService.retraiter()["traitees"] == 1
+
+        db = SessionLocal()
+        efforts = db.query(MeilleurEffort).filter(MeilleurEffort.activite_id == activite.id).all()
+        assert [effort.nom for effort in efforts] == ["1km"]
+        assert db.query(Split).filter(Split.activite_id == activite.id).count() == 1
+        db.close()
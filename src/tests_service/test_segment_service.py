@@ -0,0 +1,90 @@
+"""
+Tests pour les segments : rapprochement à l'import, rattachement par lots, classements
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from service.activite_service import ActiviteService
+from service.segment_service import SegmentService
+from service.utilisateur_service import UtilisateurService
+
+METRES_PAR_DEGRE = 111319.49
+
+
+def montee(secondes_par_100m):
+    """Sortie plein nord depuis (48, -1.7) avec un point tous les 100 m"""
+    points = []
+    temps = 0
+    for i, duree in enumerate([0] + secondes_par_100m):
+        temps += duree
+        points.append((48 + i * 100 / METRES_PAR_DEGRE, -1.7, temps))
+    return points
+
+
+@pytest.fixture
+def utilisateurs(setup_database):
+    return [
+        UtilisateurService.creer_utilisateur(
+            nom="Martin", prenom="Sophie", age=28, pseudo=f"grimpeur_{i}",
+            mail=f"grimpeur{i}@example.com", mdp="securepass"
+        )
+        for i in range(2)
+    ]
+
+
+def creer_sortie(gpx, utilisateur, tmp_path, nom, secondes_par_100m):
+    chemin = tmp_path / f"{nom}.gpx"
+    chemin.write_bytes(gpx(montee(secondes_par_100m)))
+    return ActiviteService.creer_activite_depuis_gpx(str(chemin), utilisateur.id, nom, "Course")
+
+
+class TestSegmentService:
+    """Tests du cycle de vie d'un segment"""
+
+    def test_rattachement_et_import(self, utilisateurs, tmp_path, gpx):
+        """Les activités existantes sont rattachées par lots, les nouvelles à l'import"""
+        premiere = creer_sortie(gpx, utilisateurs[0], tmp_path, "premiere", [30] * 10)
+        creer_sortie(gpx, utilisateurs[1], tmp_path, "lente", [40] * 10)
+
+        # Segment : du 2e au 7e point de la première sortie (500 m)
+        segment = SegmentService.creer_segment_depuis_activite("Montée", utilisateurs[0].id, premiere.id, 2, 7)
+        assert segment.distance == pytest.approx(500, abs=1)
+
+        rapport = SegmentService.rattacher_activites(segment.id, taille_lot=1)
+        assert rapport == {"nb_activites": 2, "nb_efforts": 2}
+        # Relancé, le rattachement n'a plus rien à faire
+        assert SegmentService.rattacher_activites(segment.id)["nb_activites"] == 0
+
+        # Importée après la création du segment : rapprochée à l'import
+        rapide = creer_sortie(gpx, utilisateurs[1], tmp_path, "rapide", [20] * 10)
+        efforts = SegmentService.obtenir_efforts_activite(rapide.id)
+        assert [(effort["segment"], effort["duree"]) for effort in efforts] == [("Montée", 100)]
+
+        # Classement : meilleur temps de chaque utilisateur
+        classement = SegmentService.obtenir_classement(segment.id)
+        assert [(ligne["pseudo"], ligne["duree"]) for ligne in classement] == [
+            ("grimpeur_1", 100), ("grimpeur_0", 150)
+        ]
+
+    def test_changement_de_sport(self, utilisateurs, tmp_path, gpx):
+        """Changer le sport d'une activité met à jour ses passages sur les segments réservés à un sport"""
+        sortie = creer_sortie(gpx, utilisateurs[0], tmp_path, "sortie", [30] * 10)
+        segment = SegmentService.creer_segment_depuis_activite("Col", utilisateurs[0].id, sortie.id, 2, 7, "Vélo")
+        assert SegmentService.rattacher_activites(segment.id)["nb_efforts"] == 0
+
+        ActiviteService.modifier_activite(sortie.id, type_sport="Vélo")
+        assert [effort["segment"] for effort in SegmentService.obtenir_efforts_activite(sortie.id)] == ["Col"]
+
+        ActiviteService.modifier_activite(sortie.id, type_sport="Course")
+        assert SegmentService.obtenir_efforts_activite(sortie.id) == []
+
+    def test_creer_segment_invalide(self, utilisateurs, tmp_path, gpx):
+        """Portion hors de la trace ou activité sans trace"""
+        sortie = creer_sortie(gpx, utilisateurs[0], tmp_path, "sortie", [30] * 5)
+
+        assert SegmentService.creer_segment_depuis_activite("X", utilisateurs[0].id, sortie.id, 3, 10) is None
+        assert SegmentService.creer_segment_depuis_activite("X", utilisateurs[0].id, 9999, 0, 1) is None
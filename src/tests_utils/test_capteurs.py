@@ -0,0 +1,51 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.capteurs import fc_max_theorique, resume_capteurs, temps_zones_fc
+from utils.trace import Trace
+
+
+def trace_cardio(fc, segment=None):
+    """Trace immobile, un point toutes les 10 secondes, aux fréquences données"""
+    n = len(fc)
+    return Trace(
+        segment=np.zeros(n) if segment is None else segment,
+        lat=np.full(n, 48.0),
+        lon=np.full(n, -1.7),
+        ele=np.full(n, np.nan),
+        temps=1_700_000_000.0 + 10.0 * np.arange(n),
+        fc=fc,
+    )
+
+
+# Test 1 : Chaque intervalle compte dans la zone de la FC de son premier point
+def test_temps_zones_fc():
+    # FC max 200 : zones à 120, 140, 160, 180 bpm
+    trace = trace_cardio([100, 130, 150, 150, 170, 190, 190])
+
+    assert temps_zones_fc(trace, 200) == [10.0, 10.0, 20.0, 10.0, 10.0]
+
+
+# Test 2 : Les mesures absentes et les changements de segment sont ignorés
+def test_temps_zones_fc_trous():
+    trace = trace_cardio([130, np.nan, 130, 130], segment=[0, 0, 1, 1])
+
+    assert temps_zones_fc(trace, 200) == [0.0, 20.0, 0.0, 0.0, 0.0]
+
+
+# Test 3 : Résumé des capteurs, None sans aucune donnée
+def test_resume_capteurs():
+    resume = resume_capteurs(trace_cardio([120, 140, np.nan]), fc_max_theorique(30))
+
+    assert resume['fc_moyenne'] == pytest.approx(130)
+    assert resume['fc_max'] == 140
+    assert resume['fc_reference'] == 190
+    assert resume['cadence_moyenne'] is None
+    assert sum(resume['zones_fc']) == 20
+
+    assert resume_capteurs(trace_cardio([np.nan] * 3), 190) is None
@@ -0,0 +1,103 @@
+import io
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.fit_parser import EPOQUE_FIT, iterer_points_fit, lire_trace_fit
+
+DEBUT = 1_735_725_600 - EPOQUE_FIT  # 2025-01-01T10:00:00Z en temps FIT
+
+
+def definition(local, message, champs, gros_boutiste=False):
+    """Message de définition : champs = [(numéro, taille, type de base)]"""
+    ordre = ">" if gros_boutiste else "<"
+    contenu = struct.pack(ordre + "BBHB", 0, int(gros_boutiste), message, len(champs))
+    return bytes([0x40 | local]) + contenu + b"".join(bytes(champ) for champ in champs)
+
+
+def fichier_fit(messages):
+    """Assemble un fichier FIT (en-tête de 14 octets, CRC non vérifié)"""
+    donnees = b"".join(messages)
+    return struct.pack("<BBHI4sH", 14, 0x20, 2100, len(donnees), b".FIT", 0) + donnees + b"\0\0"
+
+
+def semicercles(degres):
+    return round(degres * 2 ** 31 / 180)
+
+
+# Record : horodatage, lat, lon, distance (non décodée), altitude étendue, FC, cadence
+CHAMPS_RECORD = [(253, 4, 0x86), (0, 4, 0x85), (1, 4, 0x85), (5, 4, 0x86), (78, 4, 0x86), (3, 1, 0x02), (4, 1, 0x02)]
+FORMAT_RECORD = "<BIiiIIBB"
+
+
+def record(secondes, lat, fc=140, altitude=10.0):
+    return struct.pack(FORMAT_RECORD, 0, DEBUT + secondes, semicercles(lat), semicercles(-1.7),
+                       12345, round((altitude + 500) * 5), fc, 85)
+
+
+def evenement(secondes, type_evenement):
+    return struct.pack("<BIBB", 1, DEBUT + secondes, 0, type_evenement)
+
+
+# Test 1 : Décodage des enregistrements, champs inconnus sautés
+def test_iterer_points_fit():
+    contenu = fichier_fit([
+        definition(0, 20, CHAMPS_RECORD),
+        record(0, 48.0),
+        record(60, 48.001, fc=0xFF),
+    ])
+
+    premier, second = next(iterer_points_fit(contenu))
+
+    assert premier[0] == 0
+    assert premier[1] == pytest.approx(48.0, abs=1e-7)
+    assert premier[2] == pytest.approx(-1.7, abs=1e-7)
+    assert premier[3] == pytest.approx(10.0)
+    assert premier[4] == 1_735_725_600
+    assert premier[5:] == (140, 85, None, None)
+    # Valeur invalide (0xFF) : mesure absente
+    assert second[4] == 1_735_725_660 and second[5] is None
+
+
+# Test 2 : Reprise du chronomètre après un arrêt = nouveau segment
+def test_segments_evenements_chrono():
+    contenu = fichier_fit([
+        definition(0, 20, CHAMPS_RECORD),
+        definition(1, 21, [(253, 4, 0x86), (0, 1, 0x00), (1, 1, 0x00)]),
+        evenement(0, 0),
+        record(0, 48.0),
+        record(10, 48.001),
+        evenement(20, 4),
+        evenement(100, 0),
+        record(100, 48.002),
+    ])
+
+    trace = lire_trace_fit(io.BytesIO(contenu))
+
+    assert list(trace.segment) == [0, 0, 1]
+
+
+# Test 3 : Horodatages compressés et architecture gros-boutiste
+def test_horodatage_compresse_gros_boutiste():
+    contenu = fichier_fit([
+        definition(0, 20, [(253, 4, 0x86), (0, 4, 0x85), (1, 4, 0x85)], gros_boutiste=True),
+        definition(2, 20, [(0, 4, 0x85), (1, 4, 0x85)], gros_boutiste=True),
+        struct.pack(">BIii", 0, DEBUT + 25, semicercles(48.0), semicercles(-1.7)),
+        # En-tête compressé : type local 2, 5 bits de poids faible du nouvel horodatage
+        # (45 & 0x1F < 25 & 0x1F : passage au cycle de 32 s suivant)
+        bytes([0x80 | 2 << 5 | (DEBUT + 45) & 0x1F]) + struct.pack(">ii", semicercles(48.001), semicercles(-1.7)),
+    ])
+
+    trace = lire_trace_fit(io.BytesIO(contenu))
+
+    assert list(trace.temps - trace.temps[0]) == [0, 20]
+    assert trace.lat[1] == pytest.approx(48.001, abs=1e-7)
+
+
+# Test 4 : Fichier qui n'est pas un FIT
+def test_lire_trace_fit_invalide():
+    assert lire_trace_fit(io.BytesIO(b"<gpx></gpx>" * 2)) is None
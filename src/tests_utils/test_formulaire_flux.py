@@ -0,0 +1,84 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.formulaire_flux import FormulaireInvalide, lire_formulaire
+from utils.stockage_gpx import EnregistrementGPX
+from utils.validation_trace import TraceRefusee, ValidateurTrace
+
+FRONTIERE = "frontiere-test"
+TYPE_CONTENU = f"multipart/form-data; boundary={FRONTIERE}"
+
+
+def corps(champs, fichier=None):
+    parties = [
+        f'--{FRONTIERE}\r\nContent-Disposition: form-data; name="{nom}"\r\n\r\n{valeur}\r\n'.encode()
+        for nom, valeur in champs.items()
+    ]
+    if fichier is not None:
+        parties.append(
+            f'--{FRONTIERE}\r\nContent-Disposition: form-data; name="gpx"; filename="trace.gpx"\r\n'
+            f'Content-Type: application/gpx+xml\r\n\r\n'.encode() + fichier + b"\r\n"
+        )
+    return b"".join(parties) + f"--{FRONTIERE}--\r\n".encode()
+
+
+class Flux:
+    """Corps de requête reçu par morceaux, qui compte les morceaux lus"""
+    def __init__(self, contenu: bytes, taille: int):
+        self.morceaux = [contenu[i:i + taille] for i in range(0, len(contenu), taille)]
+        self.lus = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.lus == len(self.morceaux):
+            raise StopAsyncIteration
+        self.lus += 1
+        return self.morceaux[self.lus - 1]
+
+
+def lire(flux, ecrire, type_contenu=TYPE_CONTENU):
+    async def ecrire_async(morceau):
+        ecrire(morceau)
+    return asyncio.run(lire_formulaire(flux, type_contenu, "gpx", ecrire_async))
+
+
+# Test 1 : Champs texte et fichier sont séparés, le fichier arrive par morceaux
+def test_lire_formulaire():
+    fichier = b"<gpx>" + b"x" * 5000 + b"</gpx>"
+    recus = []
+
+    champs = lire(Flux(corps({"nom": "Footing", "type_sport": "Course"}, fichier), 1000), recus.append)
+
+    assert champs == {"nom": "Footing", "type_sport": "Course"}
+    assert b"".join(recus) == fichier
+    assert len(recus) > 1
+
+
+# Test 2 : Une trace refusée interrompt la lecture du corps, sans rien laisser sur le disque
+def test_trace_refusee_avant_la_fin(tmp_path):
+    flux = Flux(corps({"nom": "Page"}, b"<html>" + b"x" * 100_000 + b"</html>"), 1000)
+
+    with pytest.raises(TraceRefusee):
+        with EnregistrementGPX(str(tmp_path), ValidateurTrace()) as enregistrement:
+            lire(flux, enregistrement.ecrire)
+
+    assert flux.lus < len(flux.morceaux) // 10
+    assert list(tmp_path.iterdir()) == []
+
+
+# Test 3 : Corps qui n'est pas un formulaire multipart, ou sans fichier
+@pytest.mark.parametrize("contenu, type_contenu", [
+    (b"nom=Footing", "application/x-www-form-urlencoded"),
+    (corps({"nom": "Footing"}), TYPE_CONTENU),
+    (corps({"nom": "Footing"}, b"<gpx></gpx>")[:-30], TYPE_CONTENU),
+])
+def test_formulaire_invalide(contenu, type_contenu):
+    with pytest.raises(FormulaireInvalide):
+        lire(Flux(contenu, 100), lambda morceau: None, type_contenu)
@@ -0,0 +1,89 @@
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.gpx_parser import analyser_gpx, iterer_points_gpx
+
+DOSSIER_GPX = Path(__file__).resolve().parents[2] / "uploads" / "gpx"
+
+GPX_SIMPLE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1">
+  <trk>
+    <trkseg>
+      <trkpt lat="48.0" lon="-1.7"><ele>10</ele><time>2025-01-01T10:00:00Z</time></trkpt>
+      <trkpt lat="48.001" lon="-1.7"><ele>20</ele><time>2025-01-01T10:01:00Z</time></trkpt>
+      <trkpt lat="48.002" lon="-1.7"><ele>15</ele><time>2025-01-01T10:02:00Z</time></trkpt>
+    </trkseg>
+    <trkseg>
+      <trkpt lat="48.1" lon="-1.7"><ele>30</ele><time>2025-01-01T11:00:00Z</time></trkpt>
+      <trkpt lat="48.101" lon="-1.7"><ele>40</ele><time>2025-01-01T11:00:30Z</time></trkpt>
+    </trkseg>
+  </trk>
+</gpx>
+"""
+
+GPX_CAPTEURS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1"
+     xmlns:gpxtpx="http://www.garmin.com/xmlschemas/TrackPointExtension/v1">
+  <trk><trkseg>
+    <trkpt lat="48.0" lon="-1.7"><ele>10</ele><time>2025-01-01T10:00:00Z</time>
+      <extensions><power>250</power><gpxtpx:TrackPointExtension>
+        <gpxtpx:atemp>18.5</gpxtpx:atemp><gpxtpx:hr>140</gpxtpx:hr><gpxtpx:cad>85</gpxtpx:cad>
+      </gpxtpx:TrackPointExtension></extensions>
+    </trkpt>
+    <trkpt lat="48.001" lon="-1.7"><ele>20</ele><time>2025-01-01T10:01:00Z</time></trkpt>
+  </trkseg></trk>
+</gpx>
+"""
+
+
+# Test 1 : Les points sont émis par blocs avec leur numéro de segment
+def test_iterer_points_par_blocs():
+    blocs = list(iterer_points_gpx(io.BytesIO(GPX_SIMPLE), taille_bloc=2))
+
+    assert [len(bloc) for bloc in blocs] == [2, 2, 1]
+    points = [point for bloc in blocs for point in bloc]
+    assert [point[0] for point in points] == [0, 0, 0, 1, 1]
+    assert points[0][1:4] == (48.0, -1.7, 10.0)
+
+
+# Test 2 : Les métriques sont calculées segment par segment
+def test_analyser_gpx_segments():
+    resultat = analyser_gpx(io.BytesIO(GPX_SIMPLE))
+
+    assert resultat['duree_secondes'] == 150
+    assert resultat['date_debut'].isoformat() == "2025-01-01T10:00:00+00:00"
+    # Environ 111 m entre deux points, les segments ne sont pas reliés
+    assert resultat['distance'] == pytest.approx(0.334, abs=0.001)
+
+
+# Test 3 : Fichier invalide
+def test_analyser_gpx_invalide():
+    assert analyser_gpx(io.BytesIO(b"<gpx><trk>")) is None
+
+
+# Test 4 : Mêmes résultats que gpxpy sur un fichier réel
+def test_analyser_gpx_identique_gpxpy():
+    gpxpy = pytest.importorskip("gpxpy")
+    chemin = DOSSIER_GPX / "7_Course_à_pied_Lunch_Run.gpx"
+
+    with open(chemin, "r") as f:
+        gpx = gpxpy.parse(f)
+    resultat = analyser_gpx(str(chemin))
+
+    assert resultat['distance'] == pytest.approx(gpx.length_2d() / 1000)
+    assert resultat['duree_secondes'] == gpx.get_duration()
+    assert resultat['denivele_positif'] == pytest.approx(gpx.get_uphill_downhill().uphill)
+    assert resultat['date_debut'] == gpx.get_time_bounds().start_time
+
+
+# Test 5 : Les extensions capteurs sont lues dans la même passe que les coordonnées
+def test_iterer_points_capteurs():
+    premier, second = next(iterer_points_gpx(io.BytesIO(GPX_CAPTEURS)))
+
+    assert premier[5:] == (140.0, 85.0, 250.0, 18.5)
+    assert second[5:] == (None, None, None, None)
@@ -0,0 +1,85 @@
+import io
+import sys
+from pathlib import Path
+
+import matplotlib.image
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.heatmap import (
+    TAILLE_TUILE, densite, limites_tuile, pixels_mercator, pixels_traverses, rendre_png, tuiles_touchees
+)
+
+
+def depuis_pixels(px, py, zoom):
+    """Inverse de pixels_mercator : (lat, lon) de coordonnées en pixels"""
+    echelle = TAILLE_TUILE * 2 ** zoom
+    lon = np.asarray(px, dtype=float) / echelle * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * np.asarray(py, dtype=float) / echelle))))
+    return lat, lon
+
+
+# Test 1 : Projection web mercator et limites des tuiles
+def test_pixels_mercator():
+    px, py = pixels_mercator([0.0], [0.0], 0)
+    assert (px[0], py[0]) == pytest.approx((128, 128))
+
+    lat_min, lon_min, lat_max, lon_max = limites_tuile(1, 1, 0)
+    assert (lat_min, lon_min, lon_max) == pytest.approx((0, 0, 180))
+    assert lat_max == pytest.approx(85.0511, abs=1e-4)
+
+
+# Test 2 : Une ligne droite donne une rangée continue de pixels, coupée au bord de la tuile
+def test_pixels_traverses():
+    zoom, x, y = 12, 2000, 1400
+    lat, lon = depuis_pixels([x * 256 + 10.5, x * 256 + 300.5], [y * 256 + 40.5] * 2, zoom)
+
+    pixels = pixels_traverses(lat, lon, np.zeros(2), zoom, x, y)
+
+    lignes, colonnes = np.divmod(pixels, TAILLE_TUILE)
+    assert set(lignes.tolist()) == {40}
+    assert colonnes.tolist() == list(range(10, 256))
+
+
+# Test 3 : Deux segments GPX ne sont pas reliés ; la densité compte les traces
+def test_densite_et_segments():
+    zoom, x, y = 12, 2000, 1400
+    lat, lon = depuis_pixels(
+        [x * 256 + 10.5, x * 256 + 20.5, x * 256 + 200.5, x * 256 + 210.5],
+        [y * 256 + 40.5] * 4, zoom
+    )
+
+    pixels = pixels_traverses(lat, lon, np.array([0, 0, 1, 1]), zoom, x, y)
+    assert len(pixels) == 22
+
+    comptes = densite([pixels, pixels_traverses(lat[:2], lon[:2], np.zeros(2), zoom, x, y)])
+    assert comptes.shape == (TAILLE_TUILE, TAILLE_TUILE)
+    assert comptes[40, 15] == 2
+    assert comptes[40, 205] == 1
+    assert comptes[40, 100] == 0
+
+
+# Test 4 : Tuiles traversées par une trace, à chaque zoom
+def test_tuiles_touchees():
+    zoom = 10
+    lat, lon = depuis_pixels([300 * 256 + 200.0, 301 * 256 + 100.0], [500 * 256 + 10.0] * 2, zoom)
+
+    assert tuiles_touchees(lat, lon, np.zeros(2), zoom) == {(300, 500), (301, 500)}
+    assert tuiles_touchees(lat, lon, np.zeros(2), 0) == {(0, 0)}
+    assert tuiles_touchees(np.empty(0), np.empty(0), np.empty(0), zoom) == set()
+
+
+# Test 5 : PNG transparent hors des passages
+def test_rendre_png():
+    comptes = np.zeros((TAILLE_TUILE, TAILLE_TUILE), dtype=np.int64)
+    comptes[10, 20] = 3
+    png = rendre_png(comptes)
+
+    assert png[:8] == b"\x89PNG\r\n\x1a\n"
+    image = matplotlib.image.imread(io.BytesIO(png))
+    assert image.shape == (TAILLE_TUILE, TAILLE_TUILE, 4)
+    assert image[10, 20, 3] > 0
+    assert image[0, 0, 3] == 0
+
@@ -0,0 +1,87 @@
+import gzip
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.lecteur_trace import analyser_trace, detecter_format, lire_trace
+
+from tests_utils.test_fit_parser import CHAMPS_RECORD, definition, fichier_fit, record
+
+GPX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1"
+     xmlns:gpxtpx="http://www.garmin.com/xmlschemas/TrackPointExtension/v1">
+  <trk><trkseg>
+    <trkpt lat="48.0" lon="-1.7"><ele>10</ele><time>2025-01-01T10:00:00Z</time>
+      <extensions><gpxtpx:TrackPointExtension><gpxtpx:hr>140</gpxtpx:hr></gpxtpx:TrackPointExtension></extensions></trkpt>
+    <trkpt lat="48.001" lon="-1.7"><ele>20</ele><time>2025-01-01T10:01:00Z</time>
+      <extensions><gpxtpx:TrackPointExtension><gpxtpx:hr>140</gpxtpx:hr></gpxtpx:TrackPointExtension></extensions></trkpt>
+    <trkpt lat="48.002" lon="-1.7"><ele>15</ele><time>2025-01-01T10:02:00Z</time>
+      <extensions><gpxtpx:TrackPointExtension><gpxtpx:hr>140</gpxtpx:hr></gpxtpx:TrackPointExtension></extensions></trkpt>
+  </trkseg></trk>
+</gpx>
+"""
+
+TCX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">
+  <Activities><Activity Sport="Running"><Id>2025-01-01T10:00:00Z</Id>
+    <Lap StartTime="2025-01-01T10:00:00Z"><AverageHeartRateBpm><Value>140</Value></AverageHeartRateBpm><Track>
+      <Trackpoint><Time>2025-01-01T10:00:00Z</Time>
+        <Position><LatitudeDegrees>48.0</LatitudeDegrees><LongitudeDegrees>-1.7</LongitudeDegrees></Position>
+        <AltitudeMeters>10</AltitudeMeters><HeartRateBpm><Value>140</Value></HeartRateBpm></Trackpoint>
+      <Trackpoint><Time>2025-01-01T10:00:30Z</Time><HeartRateBpm><Value>150</Value></HeartRateBpm></Trackpoint>
+      <Trackpoint><Time>2025-01-01T10:01:00Z</Time>
+        <Position><LatitudeDegrees>48.001</LatitudeDegrees><LongitudeDegrees>-1.7</LongitudeDegrees></Position>
+        <AltitudeMeters>20</AltitudeMeters><HeartRateBpm><Value>140</Value></HeartRateBpm></Trackpoint>
+      <Trackpoint><Time>2025-01-01T10:02:00Z</Time>
+        <Position><LatitudeDegrees>48.002</LatitudeDegrees><LongitudeDegrees>-1.7</LongitudeDegrees></Position>
+        <AltitudeMeters>15</AltitudeMeters><HeartRateBpm><Value>140</Value></HeartRateBpm></Trackpoint>
+    </Track></Lap>
+  </Activity></Activities>
+</TrainingCenterDatabase>
+"""
+
+FIT = fichier_fit([
+    definition(0, 20, CHAMPS_RECORD),
+    record(0, 48.0, altitude=10.0),
+    record(60, 48.001, altitude=20.0),
+    record(120, 48.002, altitude=15.0),
+])
+
+
+# Test 1 : Le format est reconnu au contenu
+def test_detecter_format():
+    assert detecter_format(GPX) == "gpx"
+    assert detecter_format(TCX) == "tcx"
+    assert detecter_format(FIT) == "fit"
+    assert detecter_format(b"pas une trace") is None
+
+
+# Test 2 : Les trois formats donnent la même trace et les mêmes métriques
+@pytest.mark.parametrize("contenu", [TCX, FIT], ids=["tcx", "fit"])
+def test_memes_metriques_que_gpx(contenu):
+    trace_gpx, metriques_gpx = analyser_trace(io.BytesIO(GPX))
+    trace, metriques = analyser_trace(io.BytesIO(contenu))
+
+    # Le point TCX sans position est ignoré
+    assert len(trace) == 3
+    assert list(trace.fc) == [140, 140, 140]
+    assert metriques['date_debut'] == metriques_gpx['date_debut']
+    # Positions FIT en semi-cercles : précision de l'ordre du centimètre
+    for cle in ('distance', 'duree_secondes', 'denivele_positif'):
+        assert metriques[cle] == pytest.approx(metriques_gpx[cle], abs=1e-3)
+
+
+# Test 3 : Fichier compressé en gzip et format inconnu
+def test_lire_trace_fichier(tmp_path):
+    chemin = tmp_path / "trace.gz"
+    chemin.write_bytes(gzip.compress(FIT))
+    inconnu = tmp_path / "inconnu.bin"
+    inconnu.write_bytes(b"\0" * 100)
+
+    assert len(lire_trace(str(chemin))) == 3
+    assert lire_trace(str(inconnu)) is None
+    assert lire_trace(str(tmp_path / "absent.fit")) is None
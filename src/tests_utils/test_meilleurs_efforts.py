@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.meilleurs_efforts import meilleurs_efforts, splits
+from utils.trace import Trace
+
+METRES_PAR_DEGRE = 6378137.0 * np.pi / 180
+
+
+def trace_vitesses(vitesses, lat0=0.0):
+    """Trace plein nord, un point par seconde, aux vitesses données (m/s)"""
+    cumul = np.concatenate(([0.0], np.cumsum(vitesses)))
+    n = len(cumul)
+    return Trace(
+        segment=np.zeros(n),
+        lat=lat0 + cumul / METRES_PAR_DEGRE,
+        lon=np.zeros(n),
+        ele=np.full(n, np.nan),
+        temps=1_700_000_000.0 + np.arange(n),
+    )
+
+
+# Test 1 : La fenêtre la plus rapide est trouvée au milieu de la trace
+def test_meilleur_effort_fenetre_rapide():
+    # 1500 m à 2.5 m/s, 1000 m à 5 m/s, 1500 m à 2.5 m/s
+    trace = trace_vitesses([2.5] * 600 + [5.0] * 200 + [2.5] * 600)
+
+    efforts = meilleurs_efforts(trace, {"1km": 1000.0, "5km": 5000.0})
+
+    assert "5km" not in efforts
+    assert efforts["1km"]["duree"] == pytest.approx(200, abs=1)
+    assert efforts["1km"]["indice_debut"] == pytest.approx(600, abs=1)
+
+
+# Test 2 : Les points sans horodatage sont ignorés
+def test_meilleur_effort_sans_temps():
+    trace = trace_vitesses([4.0] * 300)
+    trace.temps[:] = np.nan
+
+    assert meilleurs_efforts(trace) == {}
+    assert splits(trace) == []
+
+
+# Test 3 : Un split par kilomètre complet
+def test_splits():
+    trace = trace_vitesses([4.0] * 250 + [2.0] * 500 + [5.0] * 100)
+
+    durees = splits(trace)
+
+    assert len(durees) == 2
+    assert durees == pytest.approx([250, 500], abs=1)
@@ -0,0 +1,55 @@
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import polyline
+
+
+# Test 1 : Exemple de la documentation de Google
+def test_exemple_google():
+    texte = polyline.encoder_coordonnees([38.5, 40.7, 43.252], [-120.2, -120.95, -126.453])
+
+    assert texte == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    lat, lon = polyline.decoder_coordonnees(texte)
+    np.testing.assert_allclose(lat, [38.5, 40.7, 43.252])
+    np.testing.assert_allclose(lon, [-120.2, -120.95, -126.453])
+    assert polyline.encoder_coordonnees([], []) == ""
+
+
+# Test 2 : Aller-retour sur une trace réelle, à la précision près, et gain de taille
+def test_aller_retour_trace():
+    rng = np.random.default_rng(0)
+    n = 10000
+    lat = 48.1 + np.cumsum(rng.normal(0, 2e-5, n))
+    lon = -1.7 + np.cumsum(rng.normal(0, 2e-5, n))
+    ele = 50 + np.cumsum(rng.normal(0, 0.3, n))
+    temps = np.arange(n) + rng.integers(0, 2, n).cumsum()
+
+    texte = polyline.encoder_coordonnees(lat, lon)
+    lat_lue, lon_lue = polyline.decoder_coordonnees(texte)
+    assert np.abs(lat_lue - lat).max() <= 0.5e-5 + 1e-12
+    assert np.abs(lon_lue - lon).max() <= 0.5e-5 + 1e-12
+    np.testing.assert_allclose(polyline.decoder(polyline.encoder(ele, 1), 1), np.round(ele, 1))
+    np.testing.assert_array_equal(polyline.decoder(polyline.encoder(temps, 0), 0), temps)
+
+    points = json.dumps(np.column_stack((lat, lon)).tolist())
+    assert len(texte) * 8 < len(points)
+
+
+# Test 3 : Grands écarts (saut de plusieurs degrés, entiers sur 32 bits)
+def test_grands_ecarts():
+    valeurs = np.array([0, 2**31 - 1, -(2**31), 1, -1, 0, 16, -16, 17])
+
+    np.testing.assert_array_equal(polyline.decoder(polyline.encoder(valeurs, 0), 0), valeurs)
+
+
+# Test 4 : Les valeurs absentes reprennent la dernière valeur connue
+def test_combler():
+    valeurs = np.array([np.nan, 10.0, np.nan, np.nan, 12.0, np.nan])
+
+    np.testing.assert_array_equal(polyline.combler(valeurs, np.isnan(valeurs)), [10, 10, 10, 10, 12, 12])
+    assert polyline.combler(np.full(3, np.nan), np.ones(3, dtype=bool)) is None
@@ -0,0 +1,74 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.segments import longueur, simplifier_segment, trouver_efforts
+from utils.trace import Trace
+
+METRES_PAR_DEGRE = 6378137.0 * np.pi / 180
+
+
+def trace_points(nord, est, secondes_par_point=10.0):
+    """Trace à partir de décalages en mètres (nord, est) autour de (48, -1.7)"""
+    nord, est = np.asarray(nord, dtype=float), np.asarray(est, dtype=float)
+    n = len(nord)
+    return Trace(
+        segment=np.zeros(n),
+        lat=48.0 + nord / METRES_PAR_DEGRE,
+        lon=-1.7 + est / (METRES_PAR_DEGRE * np.cos(np.radians(48.0))),
+        ele=np.full(n, np.nan),
+        temps=1_700_000_000.0 + secondes_par_point * np.arange(n),
+    )
+
+
+# Segment : 500 m plein nord de (48, -1.7), un point tous les 50 m
+SEGMENT = trace_points(np.arange(0, 501, 50), np.zeros(11))
+
+
+# Test 1 : Passage trouvé au milieu d'une sortie, bornes au plus près du départ et de l'arrivée
+def test_trouver_efforts():
+    # Approche par l'ouest, 1 km plein nord en décalage de 5 m, puis départ vers l'est
+    nord = np.concatenate((np.zeros(10), np.arange(0, 1001, 20), np.full(10, 1000)))
+    est = np.concatenate((np.arange(-500, 0, 50), np.full(51, 5.0), np.arange(50, 501, 50)))
+    trace = trace_points(nord, est)
+
+    efforts = trouver_efforts(trace, SEGMENT.lat, SEGMENT.lon)
+
+    assert len(efforts) == 1
+    assert efforts[0]['indice_debut'] == 10
+    assert efforts[0]['indice_fin'] == 35
+    assert efforts[0]['duree'] == 250
+
+
+# Test 2 : Parcours dans le mauvais sens ou trop loin du segment
+def test_sens_et_ecart():
+    retour = trace_points(np.arange(500, -1, -20), np.zeros(26))
+    decale = trace_points(np.arange(0, 501, 20), np.full(26, 60.0))
+
+    assert trouver_efforts(retour, SEGMENT.lat, SEGMENT.lon) == []
+    assert trouver_efforts(decale, SEGMENT.lat, SEGMENT.lon) == []
+
+
+# Test 3 : Deux tours d'une boucle donnent deux passages
+def test_plusieurs_passages():
+    aller = np.arange(0, 501, 20)
+    # Aller-retour par l'est (à 200 m), deux fois
+    tour_nord = np.concatenate((aller, np.full(5, 500), aller[::-1]))
+    tour_est = np.concatenate((np.zeros(26), np.linspace(0, 200, 5), np.full(26, 200)))
+    trace = trace_points(np.tile(tour_nord, 2), np.tile(tour_est, 2))
+
+    efforts = trouver_efforts(trace, SEGMENT.lat, SEGMENT.lon)
+
+    assert [effort['duree'] for effort in efforts] == [250, 250]
+
+
+# Test 4 : Simplification d'un segment rectiligne et longueur
+def test_simplifier_segment():
+    lat, lon = simplifier_segment(SEGMENT.lat, SEGMENT.lon)
+
+    assert len(lat) == 2
+    assert longueur(lat, lon) == pytest.approx(500, abs=0.1)
@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.signature_parcours import (
+    NB_BANDES, NB_PERMUTATIONS, cles_lsh, geohash, sequence_cellules, signature, similarite
+)
+from utils.trace import Trace
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+METRES_PAR_DEGRE = 6378137.0 * np.pi / 180
+
+
+def boucle(pas_m=10.0, bruit_m=0.0, sens=1, graine=0):
+    """Boucle de 4 km autour de (48.11, -1.68) : 1 km à l'est, 1 km au nord, retour"""
+    rng = np.random.default_rng(graine)
+    distances = np.arange(0, 4000 + pas_m / 2, pas_m)
+    if sens < 0:
+        distances = (4000 - distances) % 4000
+    est = np.clip(distances, 0, 1000) - np.clip(distances - 2000, 0, 1000)
+    nord = np.clip(distances - 1000, 0, 1000) - np.clip(distances - 3000, 0, 1000)
+    est, nord = est + rng.normal(0, bruit_m, len(est)), nord + rng.normal(0, bruit_m, len(nord))
+    return trace_metres(nord, est)
+
+
+def trace_metres(nord, est, lat0=48.11, lon0=-1.68):
+    n = len(nord)
+    return Trace(
+        segment=np.zeros(n),
+        lat=lat0 + np.asarray(nord) / METRES_PAR_DEGRE,
+        lon=lon0 + np.asarray(est) / (METRES_PAR_DEGRE * np.cos(np.radians(lat0))),
+        ele=np.full(n, np.nan),
+        temps=1_700_000_000.0 + np.arange(n),
+    )
+
+
+# Test 1 : L'entier geohash s'écrit en base 32 comme le geohash textuel
+def test_geohash():
+    code = int(geohash(np.array([57.64911]), np.array([10.40744]), 7)[0])
+    texte = "".join(BASE32[(code >> (5 * (6 - i))) & 31] for i in range(7))
+    assert texte == "u4pruyd"
+
+
+# Test 2 : Une trace peu échantillonnée ne saute aucune cellule
+def test_sequence_cellules_densifiee():
+    dense = sequence_cellules(boucle(pas_m=5.0))
+    clairsemee = sequence_cellules(boucle(pas_m=500.0))
+
+    assert np.array_equal(dense, clairsemee)
+    assert len(dense) > 20
+
+
+# Test 3 : Même parcours (autre échantillonnage, bruit GPS) similaire, autre parcours ou sens non
+def test_similarite():
+    reference = signature(boucle())
+    assert reference.dtype == np.uint32 and len(reference) == NB_PERMUTATIONS
+
+    assert similarite(reference, signature(boucle(pas_m=3.0, bruit_m=5.0, graine=1))) > 0.9
+    assert similarite(reference, signature(boucle(sens=-1))) < 0.2
+
+    ailleurs = signature(trace_metres(np.arange(0, 4000, 10.0), np.zeros(400), lat0=47.2))
+    assert similarite(reference, ailleurs) < 0.1
+
+
+# Test 4 : Clés LSH égales pour des signatures égales, une par bande
+def test_cles_lsh():
+    cles = cles_lsh(signature(boucle()))
+
+    assert cles.shape == (NB_BANDES,) and cles.dtype == np.int64
+    assert (cles >= 0).all()
+    assert np.array_equal(cles, cles_lsh(signature(boucle())))
+    assert signature(Trace.depuis_blocs([])) is None
@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.simplification import (
+    PLEINE_RESOLUTION, TOLERANCES, calculer_niveaux, choisir_niveau, importances
+)
+from utils.trace import Trace
+
+
+def trace_de(lat, lon, segment=None):
+    n = len(lat)
+    return Trace(
+        segment=np.zeros(n) if segment is None else segment,
+        lat=lat,
+        lon=lon,
+        ele=np.full(n, np.nan),
+        temps=np.full(n, np.nan),
+    )
+
+
+# Test 1 : Une ligne droite se réduit à ses extrémités
+def test_ligne_droite():
+    lat = np.linspace(48.0, 48.1, 500)
+    niveaux = calculer_niveaux(trace_de(lat, np.full(500, -1.7)))
+
+    assert niveaux[0] == niveaux[-1] == len(TOLERANCES) - 1
+    assert np.all(niveaux[1:-1] == PLEINE_RESOLUTION)
+
+
+# Test 2 : Les niveaux sont emboîtés et les extrémités de segment conservées
+def test_niveaux_emboites():
+    n = 2000
+    lat = 48.0 + np.linspace(0, 0.05, n)
+    lon = -1.7 + 0.01 * np.sin(np.linspace(0, 20, n)) + 1e-5 * np.random.default_rng(0).standard_normal(n)
+    segment = np.repeat([0, 1], n // 2)
+
+    imp = importances(lat, lon, segment)
+    niveaux = calculer_niveaux(trace_de(lat, lon, segment))
+
+    assert np.isinf(imp[[0, n // 2 - 1, n // 2, n - 1]]).all()
+    comptes = [int((niveaux >= k).sum()) for k in range(len(TOLERANCES))]
+    assert comptes == sorted(comptes, reverse=True)
+    assert comptes[-1] < comptes[0] < n
+
+
+# Test 3 : Choix du niveau par budget de points ou par zoom
+def test_choisir_niveau():
+    niveaux = np.array([4, -1, -1, 0, -1, 1, -1, 2, -1, 4], dtype=np.int8)
+
+    assert choisir_niveau(niveaux, pixels=100) == PLEINE_RESOLUTION
+    assert choisir_niveau(niveaux, pixels=5) == 0
+    assert choisir_niveau(niveaux, pixels=3) == 2
+    assert choisir_niveau(niveaux, pixels=1) == len(TOLERANCES) - 1
+    # Zoom élevé : pleine résolution ; vue du monde entier : niveau le plus grossier
+    assert choisir_niveau(niveaux, zoom=20, latitude=48) == PLEINE_RESOLUTION
+    assert choisir_niveau(niveaux, zoom=2, latitude=48) == len(TOLERANCES) - 1
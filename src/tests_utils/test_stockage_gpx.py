@@ -0,0 +1,71 @@
+import asyncio
+import gzip
+import hashlib
+import io
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.stockage_gpx import compresser_fichier, enregistrer_upload, est_compresse, ouvrir_gpx
+
+
+class MockUpload:
+    """Mock très simple d'un UploadFile (lecture asynchrone par morceaux)"""
+    def __init__(self, contenu: bytes):
+        self._flux = io.BytesIO(contenu)
+
+    async def read(self, taille: int = -1) -> bytes:
+        return self._flux.read(taille)
+
+
+# Test 1 : Le fichier est stocké compressé sous l'empreinte de son contenu
+def test_enregistrer_upload(tmp_path):
+    contenu = b"<gpx>contenu</gpx>"
+
+    chemin, empreinte, taille = asyncio.run(enregistrer_upload(MockUpload(contenu), str(tmp_path)))
+
+    assert empreinte == hashlib.sha256(contenu).hexdigest()
+    assert taille == len(contenu)
+    assert Path(chemin) == tmp_path / f"{empreinte}.gpx.gz"
+    assert gzip.decompress(Path(chemin).read_bytes()) == contenu
+
+
+# Test 2 : Un contenu identique n'est stocké qu'une fois
+def test_enregistrer_upload_doublon(tmp_path):
+    contenu = b"<gpx>doublon</gpx>"
+
+    chemin1, _, _ = asyncio.run(enregistrer_upload(MockUpload(contenu), str(tmp_path)))
+    chemin2, _, _ = asyncio.run(enregistrer_upload(MockUpload(contenu), str(tmp_path)))
+
+    assert chemin1 == chemin2
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+# Test 3 : Un fichier en clair est compressé et se relit à l'identique
+def test_compresser_et_ouvrir(tmp_path):
+    chemin = tmp_path / "ancien.gpx"
+    chemin.write_bytes(b"<gpx>ancien</gpx>" * 100)
+
+    with ouvrir_gpx(str(chemin)) as f:
+        assert f.read() == chemin.read_bytes()
+
+    compresse = compresser_fichier(str(chemin))
+
+    assert compresse == str(chemin) + ".gz"
+    assert est_compresse(compresse) and not est_compresse(str(chemin))
+    assert Path(compresse).stat().st_size < chemin.stat().st_size
+    with ouvrir_gpx(compresse) as f:
+        assert f.read() == chemin.read_bytes()
+
+
+# Test 4 : Un contenu déjà stocké en clair (avant compression) est réutilisé
+def test_enregistrer_upload_ancien_fichier(tmp_path):
+    contenu = b"<gpx>ancien</gpx>"
+    ancien = tmp_path / f"{hashlib.sha256(contenu).hexdigest()}.gpx"
+    ancien.write_bytes(contenu)
+
+    chemin, _, _ = asyncio.run(enregistrer_upload(MockUpload(contenu), str(tmp_path)))
+
+    assert Path(chemin) == ancien
+    assert len(list(tmp_path.iterdir())) == 1
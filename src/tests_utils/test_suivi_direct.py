@@ -0,0 +1,97 @@
+import io
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.ecriture_gpx import ecrire_gpx
+from utils.gpx_parser import lire_trace_gpx
+from utils.suivi_direct import EtatDirect
+from utils.trace import Trace
+from utils.track_metrics import calculer_metriques
+
+METRES_PAR_DEGRE = 6378137.0 * np.pi / 180
+
+
+def sortie(n=3000, seed=0) -> Trace:
+    """Course à 3 m/s avec un arrêt de 10 min, un second segment et des altitudes manquantes"""
+    rng = np.random.default_rng(seed)
+    indices = np.arange(n)
+    pas = np.where((indices > 1000) & (indices < 1600), rng.normal(0, 0.05, n), 3.0)
+    ele = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    ele[rng.random(n) < 0.1] = np.nan
+    return Trace(
+        segment=(indices >= 2000).astype(int),
+        lat=48 + np.cumsum(pas) / METRES_PAR_DEGRE,
+        lon=np.full(n, -1.7),
+        ele=ele,
+        temps=1.7e9 + indices.astype(float),
+        fc=np.full(n, 140.0),
+    )
+
+
+def par_lots(trace: Trace, seed=1):
+    """Découpe une trace en lots de taille aléatoire, sans chevaucher deux segments"""
+    rng = np.random.default_rng(seed)
+    debut = 0
+    while debut < len(trace):
+        fin = min(len(trace), debut + int(rng.integers(1, 50)))
+        changements = np.flatnonzero(trace.segment[debut:fin] != trace.segment[debut])
+        if len(changements):
+            fin = debut + int(changements[0])
+        nouveau_segment = debut > 0 and trace.segment[debut] != trace.segment[debut - 1]
+        yield Trace(*(getattr(trace, c)[debut:fin] for c in Trace.COLONNES)), nouveau_segment
+        debut = fin
+
+
+# Test 1 : Les métriques prolongées lot par lot sont celles de la trace complète
+def test_incremental_egal_au_calcul_complet():
+    trace = sortie()
+    etat = EtatDirect()
+    for lot, nouveau_segment in par_lots(trace):
+        etat.ajouter(lot, nouveau_segment)
+        # L'état passe par la base entre deux lots
+        etat = EtatDirect.depuis_dict(json.loads(json.dumps(etat.vers_dict())))
+
+    resume = etat.resume()
+    metriques = calculer_metriques(trace)
+    assert resume["nb_points"] == len(trace)
+    assert resume["distance"] == pytest.approx(metriques["distance"])
+    assert resume["denivele_positif"] == pytest.approx(metriques["denivele_positif"])
+    assert resume["duree_ecoulee"] == pytest.approx(metriques["duree_secondes"])
+    assert resume["duree_mouvement"] == pytest.approx(metriques["duree_mouvement"])
+    assert resume["allure"] == pytest.approx(1000 / 3.0)
+
+
+# Test 2 : Un lot renvoyé est ignoré et l'allure disparaît à l'arrêt
+def test_lot_renvoye_et_arret():
+    trace = sortie()
+    lots = [Trace(*(getattr(trace, c)[i:i + 100] for c in Trace.COLONNES)) for i in range(0, 1200, 100)]
+    etat = EtatDirect()
+    for lot in lots[:11]:
+        etat.ajouter(lot)
+    distance = etat.resume()["distance"]
+
+    assert not etat.ajouter(lots[10]).any()
+    assert etat.resume()["distance"] == distance
+
+    # 100 s immobile : allure inconnue, l'arrêt compte déjà comme pause
+    etat.ajouter(lots[11])
+    assert etat.resume()["allure"] is None
+    assert etat.resume()["duree_mouvement"] < etat.resume()["duree_ecoulee"] - 90
+
+
+# Test 3 : Une trace écrite en GPX se relit à l'identique
+def test_ecrire_gpx():
+    trace = sortie(n=50)
+    relue = lire_trace_gpx(io.BytesIO(ecrire_gpx(trace, "Sortie & retour")))
+
+    assert np.array_equal(relue.segment, trace.segment)
+    assert np.allclose(relue.lat, trace.lat, atol=1e-7)
+    assert np.allclose(relue.ele, trace.ele, atol=0.05, equal_nan=True)
+    assert np.array_equal(relue.temps, trace.temps)
+    assert np.array_equal(relue.fc, trace.fc)
@@ -0,0 +1,103 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.trace import Trace
+from utils.track_metrics import (
+    calculer_metriques, denivele, distances_haversine, durees, distances_segments, lisser_altitudes
+)
+
+METRES_PAR_DEGRE = 6378137.0 * np.pi / 180
+
+
+def trace_nord(positions, temps):
+    """Trace plein nord depuis (48, -1.7) à partir de positions en mètres"""
+    n = len(positions)
+    return Trace(
+        segment=np.zeros(n),
+        lat=48.0 + np.asarray(positions, dtype=float) / METRES_PAR_DEGRE,
+        lon=np.full(n, -1.7),
+        ele=np.full(n, np.nan),
+        temps=np.asarray(temps, dtype=float),
+    )
+
+
+@pytest.fixture
+def trace_test():
+    """Deux segments : 3 points espacés de 60 s, puis 2 points (dont une pause)"""
+    return Trace(
+        segment=[0, 0, 0, 1, 1],
+        lat=[48.0, 48.001, 48.002, 48.1, 48.1],
+        lon=[-1.7, -1.7, -1.7, -1.7, -1.7],
+        ele=[10.0, 20.0, 15.0, 30.0, np.nan],
+        temps=[0.0, 60.0, 120.0, 3600.0, 3900.0],
+    )
+
+
+# Test 1 : Distance haversine d'un millième de degré de latitude
+def test_distances_haversine():
+    distances = distances_haversine(np.array([48.0, 48.001]), np.array([-1.7, -1.7]))
+    assert distances[0] == pytest.approx(111.3, abs=0.1)
+
+
+# Test 2 : Les extrémités de segment ne sont pas lissées
+def test_lisser_altitudes():
+    lissees = lisser_altitudes(np.array([10.0, 20.0, 15.0, 30.0]), np.array([0, 0, 0, 1]))
+    assert list(lissees) == pytest.approx([10.0, 15.5, 15.0, 30.0])
+
+
+# Test 3 : Le dénivelé ignore les altitudes manquantes et les sauts de segment
+def test_denivele(trace_test):
+    d_plus, d_moins = denivele(trace_test)
+    assert d_plus == pytest.approx(5.5)
+    assert d_moins == pytest.approx(0.5)
+
+
+# Test 4 : La pause du second segment compte dans la durée, pas dans le mouvement
+def test_calculer_metriques(trace_test):
+    metriques = calculer_metriques(trace_test)
+
+    assert metriques['distance'] == pytest.approx(0.2226, abs=1e-3)
+    assert metriques['duree_secondes'] == 420.0
+    assert metriques['duree_mouvement'] == 120.0
+    assert metriques['vitesse_moyenne'] == pytest.approx(6.68, abs=0.01)
+    assert metriques['date_debut'].year == 1970
+
+
+# Test 5 : Trace vide
+def test_calculer_metriques_trace_vide():
+    metriques = calculer_metriques(Trace.depuis_blocs([]))
+    assert metriques['distance'] == 0
+    assert metriques['duree_secondes'] == 0
+    assert metriques['date_debut'] is None
+
+
+# Test 6 : Pause café avec dérive du GPS, arrêt au feu et montée lente
+def test_detecter_pauses():
+    rng = np.random.default_rng(0)
+    # 300 s à 3 m/s, 600 s d'arrêt (dérive lente et un sursaut de 15 m), 300 s à 3 m/s
+    aller = 3.0 * np.arange(300)
+    arret = aller[-1] + np.cumsum(rng.normal(0, 0.1, 600))
+    arret[300:303] += 15.0
+    retour = aller[-1] + 3.0 * np.arange(1, 301)
+    positions = np.concatenate((aller, arret, retour))
+    trace = trace_nord(positions, np.arange(len(positions)))
+
+    temps = durees(trace, distances_segments(trace))
+    assert temps['nb_pauses'] == 1
+    assert temps['duree_pauses'] == pytest.approx(600, abs=5)
+    assert temps['duree_secondes'] == len(positions) - 1
+    assert temps['duree_mouvement'] == pytest.approx(600, abs=5)
+
+    # Arrêt de 5 s au feu : trop court pour une pause
+    positions = np.concatenate((3.0 * np.arange(100), np.full(5, 297.0), 297 + 3.0 * np.arange(1, 100)))
+    trace = trace_nord(positions, np.arange(len(positions)))
+    assert durees(trace, distances_segments(trace))['nb_pauses'] == 0
+
+    # Montée très raide à 0,4 m/s pendant 10 min : lente, mais l'athlète avance
+    trace = trace_nord(0.4 * np.arange(600), np.arange(600))
+    assert durees(trace, distances_segments(trace))['duree_mouvement'] == 599
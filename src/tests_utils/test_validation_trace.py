@@ -0,0 +1,104 @@
+import asyncio
+import io
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.stockage_gpx import enregistrer_upload
+from utils.validation_trace import TraceRefusee, ValidateurTrace
+
+ESPACE_GPX = "http://www.topografix.com/GPX/1/1"
+
+
+def gpx(nb_points: int, espace: str = ESPACE_GPX) -> bytes:
+    points = "".join(f'<trkpt lat="48.{i:04d}" lon="-1.7"/>' for i in range(nb_points))
+    return f'<?xml version="1.0"?><gpx version="1.1" xmlns="{espace}"><trk><trkseg>{points}</trkseg></trk></gpx>'.encode()
+
+
+def valider(contenu: bytes, taille_morceau: int = 7, **limites) -> ValidateurTrace:
+    """Valide un contenu découpé en petits morceaux (coupures au milieu des balises)"""
+    validateur = ValidateurTrace(**limites)
+    for debut in range(0, len(contenu), taille_morceau):
+        validateur.alimenter(contenu[debut:debut + taille_morceau])
+    validateur.terminer()
+    return validateur
+
+
+class MockUpload:
+    """Mock d'un UploadFile qui compte les morceaux lus"""
+    def __init__(self, contenu: bytes, taille_morceau: int):
+        self._flux = io.BytesIO(contenu)
+        self.taille_morceau = taille_morceau
+        self.nb_lectures = 0
+
+    async def read(self, taille: int = -1) -> bytes:
+        self.nb_lectures += 1
+        return self._flux.read(self.taille_morceau)
+
+
+# Test 1 : GPX, TCX et FIT valides, même découpés au milieu des balises
+def test_traces_valides():
+    validateur = valider(gpx(100))
+    assert validateur.format == "gpx" and validateur.nb_points == 100
+
+    tcx = (
+        b'<TrainingCenterDatabase xmlns="http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2">'
+        b'<Activities><Activity><Lap><Track><Trackpoint/><Trackpoint/></Track></Lap></Activity></Activities>'
+        b'</TrainingCenterDatabase>'
+    )
+    validateur = valider(tcx)
+    assert validateur.format == "tcx" and validateur.nb_points == 2
+
+    fit = struct.pack("<BBHI4s", 12, 0x10, 2000, 4, b".FIT") + b"\x00" * 6
+    assert valider(fit).format == "fit"
+
+
+# Test 2 : Racine, espace de noms, XML tronqué et DOCTYPE sont refusés (400)
+@pytest.mark.parametrize("contenu", [
+    b"<html><body>pas une trace</body></html>",
+    gpx(3, espace="http://example.com/autre"),
+    b"<gpx><trk>",
+    gpx(3)[:-10],
+    b'<?xml version="1.0"?><!DOCTYPE gpx [<!ENTITY a "aaaa">]><gpx xmlns="' + ESPACE_GPX.encode() + b'"/>',
+    b"",
+])
+def test_traces_invalides(contenu):
+    with pytest.raises(TraceRefusee) as erreur:
+        valider(contenu)
+    assert erreur.value.statut == 400
+
+
+# Test 3 : Trop de points ou trop d'octets : refus (413) dès le morceau fautif
+def test_limites():
+    validateur = ValidateurTrace(nb_points_max=10)
+    contenu = gpx(1000)
+    with pytest.raises(TraceRefusee) as erreur:
+        for debut in range(0, len(contenu), 100):
+            validateur.alimenter(contenu[debut:debut + 100])
+    assert erreur.value.statut == 413
+    assert validateur.taille < len(contenu) // 10
+
+    with pytest.raises(TraceRefusee) as erreur:
+        valider(gpx(1000), taille_morceau=1000, taille_max=5000)
+    assert erreur.value.statut == 413
+
+    # FIT : la taille annoncée dans l'en-tête suffit
+    fit = struct.pack("<BBHI4s", 12, 0x10, 2000, 10 ** 9, b".FIT")
+    with pytest.raises(TraceRefusee) as erreur:
+        ValidateurTrace().alimenter(fit)
+    assert erreur.value.statut == 413
+
+
+# Test 4 : Un envoi refusé s'arrête au morceau fautif et ne laisse rien sur le disque
+def test_enregistrer_upload_refuse(tmp_path):
+    upload = MockUpload(b"<html>" + b"x" * 100_000 + b"</html>", taille_morceau=1000)
+
+    with pytest.raises(TraceRefusee):
+        asyncio.run(enregistrer_upload(upload, str(tmp_path), ValidateurTrace()))
+
+    assert upload.nb_lectures == 1
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,88 @@
+"""
+Données des capteurs d'une trace : fréquence cardiaque, cadence, puissance, température
+
+Les valeurs sont lues par le parseur GPX (extensions Garmin TrackPointExtension)
+dans les colonnes de la Trace, alignées sur les points : les moyennes et les
+temps passés dans chaque zone cardiaque se calculent en quelques opérations
+NumPy, sans reparcourir le XML.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.trace import Trace
+
+FC_MAX_DEFAUT = 190             # bpm, quand l'âge de l'utilisateur est inconnu
+# Bornes basses des zones 2 à 5, en fraction de la FC max
+# (zone 1 : < 60 %, zone 2 : 60-70 %, ..., zone 5 : >= 90 %)
+SEUILS_ZONES_FC = (0.6, 0.7, 0.8, 0.9)
+NB_ZONES_FC = len(SEUILS_ZONES_FC) + 1
+
+
+def fc_max_theorique(age: Optional[int]) -> float:
+    """FC max estimée par la formule 220 - âge"""
+    if not age or age <= 0:
+        return float(FC_MAX_DEFAUT)
+    return float(220 - age)
+
+
+def temps_zones_fc(trace: Trace, fc_max: float) -> List[float]:
+    """
+    Calcule le temps passé dans chaque zone de fréquence cardiaque
+
+    Chaque intervalle entre deux points horodatés consécutifs d'un même
+    segment est attribué à la zone de la fréquence mesurée au premier point.
+
+    Args:
+        trace: Trace analysée
+        fc_max: Fréquence cardiaque maximale de référence (bpm)
+
+    Returns:
+        Durées en secondes des zones 1 à 5
+    """
+    horodates = ~np.isnan(trace.temps)
+    temps = trace.temps[horodates]
+    if len(temps) < 2:
+        return [0.0] * NB_ZONES_FC
+
+    segment = trace.segment[horodates]
+    dt = np.where(np.diff(segment) == 0, np.diff(temps), 0.0)
+    dt = np.maximum(dt, 0.0)
+
+    fc = trace.fc[horodates][:-1]
+    mesurees = ~np.isnan(fc)
+    zones = np.searchsorted(np.array(SEUILS_ZONES_FC) * fc_max, fc[mesurees], side='right')
+    return np.bincount(zones, weights=dt[mesurees], minlength=NB_ZONES_FC).tolist()
+
+
+def _moyenne(valeurs: np.ndarray) -> Optional[float]:
+    mesurees = valeurs[~np.isnan(valeurs)]
+    return float(mesurees.mean()) if len(mesurees) else None
+
+
+def resume_capteurs(trace: Trace, fc_max: float) -> Optional[Dict]:
+    """
+    Résume les données des capteurs d'une trace
+
+    Args:
+        trace: Trace analysée
+        fc_max: Fréquence cardiaque maximale de référence (bpm)
+
+    Returns:
+        Dictionnaire {'fc_moyenne', 'fc_max', 'cadence_moyenne',
+        'puissance_moyenne', 'temperature_moyenne', 'fc_reference', 'zones_fc'}
+        (None pour un capteur absent), ou None si la trace n'a aucune donnée capteur
+    """
+    if all(np.isnan(getattr(trace, nom)).all() for nom in Trace.CAPTEURS):
+        return None
+
+    fc = trace.fc[~np.isnan(trace.fc)]
+    return {
+        'fc_moyenne': _moyenne(trace.fc),
+        'fc_max': float(fc.max()) if len(fc) else None,
+        'cadence_moyenne': _moyenne(trace.cadence),
+        'puissance_moyenne': _moyenne(trace.puissance),
+        'temperature_moyenne': _moyenne(trace.temperature),
+        'fc_reference': fc_max,
+        'zones_fc': temps_zones_fc(trace, fc_max) if len(fc) else None,
+    }
@@ -0,0 +1,77 @@
+"""
+Écriture d'une Trace au format GPX 1.1
+
+Sert à stocker comme un fichier GPX ordinaire une trace qui n'a pas été
+envoyée sous forme de fichier (session en direct) : elle suit ensuite le
+même chemin que les imports (stockage par empreinte, retraitement...).
+Les capteurs sont écrits dans l'extension Garmin TrackPointExtension,
+relue par utils.gpx_parser.
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+
+from utils.trace import Trace
+
+ESPACE_GPX = "http://www.topografix.com/GPX/1/1"
+ESPACE_EXTENSION = "http://www.garmin.com/xmlschemas/TrackPointExtension/v1"
+
+# Attribut de la Trace -> balise de l'extension
+BALISES_CAPTEURS = {
+    "fc": "gpxtpx:hr",
+    "cadence": "gpxtpx:cad",
+    "puissance": "gpxtpx:power",
+    "temperature": "gpxtpx:atemp",
+}
+
+
+def _horodatage(temps: float) -> str:
+    date = datetime.fromtimestamp(temps, tz=timezone.utc)
+    return date.isoformat(timespec="milliseconds" if temps % 1 else "seconds").replace("+00:00", "Z")
+
+
+def _point(trace: Trace, i: int) -> str:
+    balises = []
+    if not np.isnan(trace.ele[i]):
+        balises.append(f"<ele>{trace.ele[i]:.1f}</ele>")
+    if not np.isnan(trace.temps[i]):
+        balises.append(f"<time>{_horodatage(trace.temps[i])}</time>")
+    capteurs = "".join(
+        f"<{balise}>{getattr(trace, attribut)[i]:g}</{balise}>"
+        for attribut, balise in BALISES_CAPTEURS.items()
+        if not np.isnan(getattr(trace, attribut)[i])
+    )
+    if capteurs:
+        balises.append(f"<extensions><gpxtpx:TrackPointExtension>{capteurs}</gpxtpx:TrackPointExtension></extensions>")
+    return f'<trkpt lat="{trace.lat[i]:.7f}" lon="{trace.lon[i]:.7f}">{"".join(balises)}</trkpt>'
+
+
+def ecrire_gpx(trace: Trace, nom: str = "") -> bytes:
+    """
+    Écrit une trace en GPX 1.1 (un <trkseg> par segment)
+
+    Args:
+        trace: Trace à écrire
+        nom: Nom de la trace (<name>)
+
+    Returns:
+        Le document GPX encodé en UTF-8
+    """
+    morceaux = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        f'<gpx version="1.1" creator="Application Sportive" xmlns="{ESPACE_GPX}" xmlns:gpxtpx="{ESPACE_EXTENSION}">',
+        "<trk>",
+    ]
+    if nom:
+        nom_xml = nom.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+        morceaux.append(f"<name>{nom_xml}</name>")
+
+    # Bornes des segments : un <trkseg> par suite de points de même numéro
+    bornes = np.concatenate(([0], np.flatnonzero(np.diff(trace.segment)) + 1, [len(trace)]))
+    for debut, fin in zip(bornes[:-1], bornes[1:]):
+        morceaux.append("<trkseg>")
+        morceaux.extend(_point(trace, i) for i in range(debut, fin))
+        morceaux.append("</trkseg>")
+
+    morceaux.append("</trk></gpx>\n")
+    return "".join(morceaux).encode("utf-8")
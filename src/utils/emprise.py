@@ -0,0 +1,55 @@
+"""
+Emprise géographique d'une trace : rectangle englobant, points de départ et d'arrivée
+
+L'emprise est calculée à l'import et indexée en base (R*Tree sous SQLite) :
+les recherches « dans cette vue de carte » ou « autour de ce point » ne
+relisent jamais les fichiers GPX.
+"""
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from utils.trace import Trace
+
+METRES_PAR_DEGRE = 6378137.0 * math.pi / 180  # Un degré de latitude, en mètres
+
+
+def calculer_emprise(trace: Trace) -> Optional[Dict[str, float]]:
+    """
+    Calcule l'emprise d'une trace
+
+    Returns:
+        Dictionnaire {'lat_min', 'lat_max', 'lon_min', 'lon_max', 'lat_depart',
+        'lon_depart', 'lat_arrivee', 'lon_arrivee'} en degrés, ou None si
+        la trace n'a aucun point
+    """
+    if len(trace) == 0:
+        return None
+
+    return {
+        'lat_min': float(np.min(trace.lat)),
+        'lat_max': float(np.max(trace.lat)),
+        'lon_min': float(np.min(trace.lon)),
+        'lon_max': float(np.max(trace.lon)),
+        'lat_depart': float(trace.lat[0]),
+        'lon_depart': float(trace.lon[0]),
+        'lat_arrivee': float(trace.lat[-1]),
+        'lon_arrivee': float(trace.lon[-1]),
+    }
+
+
+def rectangle_autour(lat: float, lon: float, rayon: float) -> Tuple[float, float, float, float]:
+    """
+    Rectangle englobant un cercle, pour préfiltrer une recherche par rayon
+
+    Args:
+        lat, lon: Centre du cercle (degrés)
+        rayon: Rayon en mètres
+
+    Returns:
+        (lat_min, lon_min, lat_max, lon_max)
+    """
+    d_lat = rayon / METRES_PAR_DEGRE
+    d_lon = d_lat / max(math.cos(math.radians(lat)), 1e-6)
+    return lat - d_lat, lon - d_lon, lat + d_lat, lon + d_lon
@@ -0,0 +1,213 @@
+"""
+Décodeur de fichiers FIT (format binaire Garmin) avec le module struct
+
+Seuls les messages utiles à la trace sont décodés : enregistrements (record)
+et événements du chronomètre (event). À chaque message de définition, un
+struct.Struct est compilé pour toute la ligne de données : les champs inutiles
+y sont de simples octets sautés, un message se décode donc en un seul appel
+à unpack_from, sans boucle Python sur ses champs.
+
+Référence : FIT SDK, « Flexible and Interoperable Data Transfer Protocol »
+"""
+import struct
+from typing import Dict, Iterator, List, Optional
+
+from utils.trace import Trace
+
+TAILLE_BLOC = 1000           # Points émis par bloc
+
+# Les horodatages FIT comptent les secondes depuis le 31/12/1989 00:00 UTC
+EPOQUE_FIT = 631065600
+SEMICERCLES_EN_DEGRES = 180 / 2 ** 31
+
+MESSAGE_RECORD = 20
+MESSAGE_EVENT = 21
+CHAMP_HORODATAGE = 253
+
+# Champs décodés, par message : numéro de champ -> nom
+CHAMPS = {
+    MESSAGE_RECORD: {
+        0: 'lat', 1: 'lon', 2: 'altitude', 78: 'altitude_etendue',
+        3: 'fc', 4: 'cadence', 7: 'puissance', 13: 'temperature',
+    },
+    MESSAGE_EVENT: {0: 'evenement', 1: 'type_evenement'},
+}
+
+# Types de base FIT : numéro -> (format struct, valeur invalide)
+TYPES_BASE = {
+    0x00: ('B', 0xFF), 0x01: ('b', 0x7F), 0x02: ('B', 0xFF),
+    0x83: ('h', 0x7FFF), 0x84: ('H', 0xFFFF), 0x85: ('i', 0x7FFFFFFF),
+    0x86: ('I', 0xFFFFFFFF), 0x0A: ('B', 0x00), 0x8B: ('H', 0x0000),
+    0x8C: ('I', 0x00000000),
+}
+
+EVENEMENT_CHRONO = 0
+DEMARRAGE, ARRET, ARRET_TOTAL = 0, 1, 4
+
+
+class Definition:
+    """Message de définition compilé : structure de la ligne et champs décodés"""
+
+    __slots__ = ('message', 'structure', 'champs')
+
+    def __init__(self, message: int, structure: struct.Struct, champs: List[tuple]):
+        self.message = message
+        self.structure = structure
+        self.champs = champs  # (nom, valeur invalide) dans l'ordre du struct
+
+
+def _lire_definition(donnees: memoryview, position: int, avec_developpeur: bool):
+    """Compile un message de définition ; renvoie (Definition, position suivante)"""
+    gros_boutiste = donnees[position + 1] == 1
+    message = struct.unpack_from('>H' if gros_boutiste else '<H', donnees, position + 2)[0]
+    nb_champs = donnees[position + 4]
+    position += 5
+
+    voulus = CHAMPS.get(message, {})
+    format_ligne = ['>' if gros_boutiste else '<']
+    champs = []
+    for _ in range(nb_champs):
+        numero, taille, type_base = donnees[position:position + 3]
+        position += 3
+        nom = 'horodatage' if numero == CHAMP_HORODATAGE else voulus.get(numero)
+        format_type, invalide = TYPES_BASE.get(type_base, (None, None))
+        if nom and format_type and struct.calcsize(format_type) == taille:
+            format_ligne.append(format_type)
+            champs.append((nom, invalide))
+        else:
+            format_ligne.append(f'{taille}x')
+
+    if avec_developpeur:
+        nb_champs_dev = donnees[position]
+        position += 1
+        taille_dev = sum(donnees[position + 3 * i + 1] for i in range(nb_champs_dev))
+        position += 3 * nb_champs_dev
+        format_ligne.append(f'{taille_dev}x')
+
+    return Definition(message, struct.Struct(''.join(format_ligne)), champs), position
+
+
+def _point(valeurs: Dict, segment: int) -> Optional[tuple]:
+    """Convertit un message record en point (None sans position)"""
+    if 'lat' not in valeurs or 'lon' not in valeurs:
+        return None
+
+    altitude = valeurs.get('altitude_etendue', valeurs.get('altitude'))
+    horodatage = valeurs.get('horodatage')
+    return (
+        segment,
+        valeurs['lat'] * SEMICERCLES_EN_DEGRES,
+        valeurs['lon'] * SEMICERCLES_EN_DEGRES,
+        altitude / 5 - 500 if altitude is not None else None,
+        horodatage + EPOQUE_FIT if horodatage is not None else None,
+        valeurs.get('fc'),
+        valeurs.get('cadence'),
+        valeurs.get('puissance'),
+        valeurs.get('temperature'),
+    )
+
+
+def iterer_points_fit(donnees: bytes, taille_bloc: int = TAILLE_BLOC) -> Iterator[List[tuple]]:
+    """
+    Parcourt les points d'un fichier FIT par blocs
+
+    Un nouveau segment commence à chaque reprise du chronomètre après un
+    arrêt (comme un <trkseg> GPX).
+
+    Args:
+        donnees: Contenu du fichier FIT
+        taille_bloc: Nombre maximum de points par bloc
+
+    Yields:
+        Listes de points (segment, lat, lon, altitude, horodatage POSIX,
+        fréquence cardiaque, cadence, puissance, température)
+    """
+    donnees = memoryview(donnees)
+    taille_en_tete = donnees[0]
+    if len(donnees) < 12 or bytes(donnees[8:12]) != b'.FIT':
+        raise ValueError("En-tête FIT invalide")
+    fin = taille_en_tete + struct.unpack_from('<I', donnees, 4)[0]
+
+    definitions: Dict[int, Definition] = {}
+    position = taille_en_tete
+    dernier_horodatage = None
+    segment = 0
+    points_segment = 0
+    arrete = False
+    bloc = []
+
+    while position < fin:
+        en_tete = donnees[position]
+        position += 1
+        horodatage_compresse = None
+
+        if en_tete & 0x80:
+            # En-tête à horodatage compressé : décalage de 5 bits sur le dernier horodatage
+            type_local = (en_tete >> 5) & 0x03
+            if dernier_horodatage is not None:
+                decalage = en_tete & 0x1F
+                horodatage_compresse = (dernier_horodatage & ~0x1F) + decalage
+                if decalage < dernier_horodatage & 0x1F:
+                    horodatage_compresse += 0x20
+        elif en_tete & 0x40:
+            definitions[en_tete & 0x0F], position = _lire_definition(
+                donnees, position, bool(en_tete & 0x20)
+            )
+            continue
+        else:
+            type_local = en_tete & 0x0F
+
+        definition = definitions.get(type_local)
+        if definition is None:
+            raise ValueError(f"Message FIT sans définition (type local {type_local})")
+        brut = definition.structure.unpack_from(donnees, position)
+        position += definition.structure.size
+
+        valeurs = {
+            nom: valeur
+            for (nom, invalide), valeur in zip(definition.champs, brut)
+            if valeur != invalide
+        }
+        if horodatage_compresse is not None:
+            valeurs['horodatage'] = horodatage_compresse
+        if 'horodatage' in valeurs:
+            dernier_horodatage = valeurs['horodatage']
+
+        if definition.message == MESSAGE_RECORD:
+            point = _point(valeurs, segment)
+            if point is not None:
+                bloc.append(point)
+                points_segment += 1
+                if len(bloc) >= taille_bloc:
+                    yield bloc
+                    bloc = []
+
+        elif definition.message == MESSAGE_EVENT and valeurs.get('evenement') == EVENEMENT_CHRONO:
+            type_evenement = valeurs.get('type_evenement')
+            if type_evenement in (ARRET, ARRET_TOTAL):
+                arrete = True
+            elif type_evenement == DEMARRAGE and arrete:
+                arrete = False
+                if points_segment:
+                    segment += 1
+                    points_segment = 0
+
+    if bloc:
+        yield bloc
+
+
+def lire_trace_fit(fichier) -> Optional[Trace]:
+    """
+    Décode un fichier FIT en colonnes NumPy
+
+    Args:
+        fichier: Objet fichier ouvert en binaire
+
+    Returns:
+        La trace, ou None si le fichier est illisible
+    """
+    try:
+        return Trace.depuis_blocs(iterer_points_fit(fichier.read()))
+    except Exception as e:
+        print(f"❌ Erreur de lecture FIT : {e}")
+        return None
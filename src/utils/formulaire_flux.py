@@ -0,0 +1,110 @@
+"""
+Lecture en flux d'un formulaire multipart contenant un fichier
+
+FastAPI lit tout le formulaire (et le copie sur le disque) avant d'appeler
+la route : une trace invalide n'est refusée qu'une fois entièrement reçue.
+Ici le corps de la requête est découpé au fil de sa réception par le
+parseur incrémental de python-multipart, et le contenu du fichier est
+transmis morceau par morceau à l'appelant (validation, écriture) : une
+exception levée sur un morceau interrompt la lecture du corps.
+"""
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+
+class FormulaireInvalide(ValueError):
+    """Formulaire multipart illisible ou incomplet"""
+
+
+async def lire_formulaire(
+    flux: AsyncIterator[bytes],
+    type_contenu: str,
+    champ_fichier: str,
+    ecrire_fichier: Callable[[bytes], Awaitable[None]],
+) -> Dict[str, str]:
+    """
+    Lit un formulaire multipart en flux
+
+    Args:
+        flux: Corps de la requête, morceau par morceau (request.stream())
+        type_contenu: En-tête Content-Type de la requête
+        champ_fichier: Nom du champ qui contient le fichier
+        ecrire_fichier: Reçoit chaque morceau du fichier, dès sa réception
+
+    Returns:
+        Champs texte du formulaire {nom: valeur}
+
+    Raises:
+        FormulaireInvalide: Corps qui n'est pas un formulaire multipart lisible,
+            ou sans le champ fichier
+    """
+    type_mime, options = parse_options_header(type_contenu)
+    frontiere = options.get(b"boundary")
+    if type_mime != b"multipart/form-data" or not frontiere:
+        raise FormulaireInvalide("Formulaire multipart/form-data attendu")
+
+    champs: Dict[str, str] = {}
+    fichier_recu = False
+    # Partie en cours : en-têtes, nom du champ et données de la partie
+    en_tete: List[bytes] = []
+    valeur: List[bytes] = []
+    en_tetes: Dict[bytes, bytes] = {}
+    partie = {"nom": None, "fichier": False}
+    donnees: List[bytes] = []
+    a_ecrire: List[bytes] = []
+
+    def debut_partie():
+        en_tetes.clear()
+        donnees.clear()
+        partie["nom"], partie["fichier"] = None, False
+
+    def fin_en_tete():
+        en_tetes[b"".join(en_tete).lower()] = b"".join(valeur)
+        en_tete.clear()
+        valeur.clear()
+
+    def fin_en_tetes():
+        _, disposition = parse_options_header(en_tetes.get(b"content-disposition", b""))
+        nom: Optional[bytes] = disposition.get(b"name")
+        partie["nom"] = nom.decode("utf-8", "replace") if nom is not None else None
+        partie["fichier"] = partie["nom"] == champ_fichier
+
+    def donnees_partie(data: bytes, debut: int, fin: int):
+        (a_ecrire if partie["fichier"] else donnees).append(data[debut:fin])
+
+    def fin_partie():
+        nonlocal fichier_recu
+        if partie["fichier"]:
+            fichier_recu = True
+        elif partie["nom"] is not None:
+            champs[partie["nom"]] = b"".join(donnees).decode("utf-8", "replace")
+
+    parseur = MultipartParser(frontiere, {
+        "on_part_begin": debut_partie,
+        "on_header_field": lambda data, debut, fin: en_tete.append(data[debut:fin]),
+        "on_header_value": lambda data, debut, fin: valeur.append(data[debut:fin]),
+        "on_header_end": fin_en_tete,
+        "on_headers_finished": fin_en_tetes,
+        "on_part_data": donnees_partie,
+        "on_part_end": fin_partie,
+    })
+
+    async for morceau in flux:
+        try:
+            parseur.write(morceau)
+        except Exception as e:
+            raise FormulaireInvalide(f"Formulaire multipart illisible : {e}")
+        # Le fichier est transmis à chaque morceau reçu, sans attendre la fin du corps
+        if a_ecrire:
+            contenu = b"".join(a_ecrire)
+            a_ecrire.clear()
+            await ecrire_fichier(contenu)
+
+    try:
+        parseur.finalize()
+    except Exception as e:
+        raise FormulaireInvalide(f"Formulaire multipart illisible : {e}")
+    if not fichier_recu:
+        raise FormulaireInvalide(f"Champ fichier « {champ_fichier} » manquant")
+    return champs
@@ -1,36 +1,263 @@
-import gpxpy
-import gpxpy.gpx
-from datetime import timedelta, datetime
+"""
+Parseur GPX en flux (streaming)
+
+Le fichier est lu par morceaux et analysé de façon incrémentale
+(xml.etree.ElementTree.XMLPullParser) : aucun arbre complet n'est construit,
+les points de trace sont émis par blocs et libérés aussitôt traités.
+La mémoire consommée reste donc constante quelle que soit la taille du fichier.
+"""
+import math
 import os
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import XMLPullParser
 
-def analyser_gpx(chemin_fichier):
-    """Analyse un fichier GPX et retourne la durée, la distance et le dénivelé."""
+from utils.stockage_gpx import ouvrir_gpx
+from utils.trace import Trace
+
+# Constantes identiques à celles de gpxpy pour conserver les mêmes résultats
+RAYON_TERRE = 6378.137 * 1000
+UN_DEGRE = (2 * math.pi * RAYON_TERRE) / 360
+
+TAILLE_LECTURE = 64 * 1024   # Octets lus à chaque itération
+TAILLE_BLOC = 1000           # Points émis par bloc
+
+# Un point : (numéro de segment, latitude, longitude, altitude, horodatage POSIX,
+#             fréquence cardiaque, cadence, puissance, température)
+Point = Tuple[int, float, float, Optional[float], Optional[float],
+              Optional[float], Optional[float], Optional[float], Optional[float]]
+
+# Balises des extensions capteurs (Garmin TrackPointExtension, Strava, Wahoo...)
+# et leur position dans le point
+CAPTEURS = {
+    'hr': 5, 'heartrate': 5,
+    'cad': 6, 'cadence': 6,
+    'power': 7, 'PowerInWatts': 7, 'watts': 7,
+    'atemp': 8, 'temp': 8,
+}
+
+
+def _nom_local(tag: str) -> str:
+    """Retire l'espace de noms d'une balise XML ('{ns}trkpt' -> 'trkpt')"""
+    return tag.rpartition('}')[2]
+
+
+def _lire_horodatage(texte: Optional[str]) -> Optional[float]:
+    """Convertit une date ISO 8601 du GPX en horodatage POSIX (None si illisible)"""
+    if not texte:
+        return None
+    try:
+        date = datetime.fromisoformat(texte.strip())
+    except ValueError:
+        return None
+    # Les dates GPX sans fuseau sont en UTC
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date.timestamp()
+
+
+def _lire_point(element, segment: int) -> Point:
+    """Extrait un point d'un élément <trkpt>, avec ses extensions capteurs"""
+    point = [segment, float(element.get('lat')), float(element.get('lon')),
+             None, None, None, None, None, None]
+    for enfant in element:
+        nom = _nom_local(enfant.tag)
+        if nom == 'ele' and enfant.text:
+            point[3] = float(enfant.text)
+        elif nom == 'time':
+            point[4] = _lire_horodatage(enfant.text)
+        elif nom == 'extensions':
+            for valeur in enfant.iter():
+                position = CAPTEURS.get(_nom_local(valeur.tag))
+                if position is not None and valeur.text:
+                    try:
+                        point[position] = float(valeur.text)
+                    except ValueError:
+                        pass
+
+    return tuple(point)
+
+
+def iterer_points_gpx(source, taille_bloc: int = TAILLE_BLOC) -> Iterator[List[Point]]:
+    """
+    Parcourt les points de trace d'un fichier GPX par blocs
+
+    Args:
+        source: Chemin du fichier (compressé en gzip ou non) ou objet
+            fichier ouvert en binaire
+        taille_bloc: Nombre maximum de points par bloc
+
+    Yields:
+        Listes de points (segment, lat, lon, altitude, horodatage POSIX,
+        fréquence cardiaque, cadence, puissance, température)
+    """
+    fichier = ouvrir_gpx(source) if isinstance(source, (str, os.PathLike)) else source
+    parser = XMLPullParser(events=('start', 'end'))
+    segment = -1
+    element_segment = None
+    bloc: List[Point] = []
+
+    try:
+        while True:
+            donnees = fichier.read(TAILLE_LECTURE)
+            if donnees:
+                parser.feed(donnees)
+            else:
+                parser.close()
+
+            for evenement, element in parser.read_events():
+                nom = _nom_local(element.tag)
+                if evenement == 'start':
+                    if nom == 'trkseg':
+                        segment += 1
+                        element_segment = element
+                elif nom == 'trkpt':
+                    bloc.append(_lire_point(element, segment))
+                    element.clear()
+                    if len(bloc) >= taille_bloc:
+                        yield bloc
+                        bloc = []
+
+            # Libère les points déjà traités : l'arbre ne grossit pas
+            if element_segment is not None:
+                del element_segment[:]
+
+            if not donnees:
+                break
+
+        if bloc:
+            yield bloc
+    finally:
+        if fichier is not source:
+            fichier.close()
+
+
+def lire_trace_gpx(source) -> Optional[Trace]:
+    """
+    Lit un fichier GPX en flux et le convertit en colonnes NumPy
+
+    Args:
+        source: Chemin du fichier ou objet fichier ouvert en binaire
+
+    Returns:
+        La trace, ou None si le fichier est illisible
+    """
     try:
-        with open(chemin_fichier, 'r') as gpx_file:
-            gpx = gpxpy.parse(gpx_file)
+        return Trace.depuis_blocs(iterer_points_gpx(source))
     except Exception as e:
         print(f"❌ Erreur de lecture GPX : {e}")
         return None
 
-    # Calcul de la distance
-    distance_2d = gpx.length_2d() # Distance en mètres
-    distance_km = distance_2d / 1000
 
-    # Calcul de la durée
-    duree = gpx.get_duration() # Durée en secondes
+def analyser_trace_gpx(source) -> Optional[Tuple[Trace, Dict]]:
+    """
+    Lit un fichier GPX et calcule ses métriques vectorisées
+
+    Fonction de module sans état : elle peut être exécutée dans un
+    processus séparé (pool d'ingestion).
 
-    # Calcul du dénivelé positif
-    up, down = gpx.get_elevation_extremes() # Dénivelé n'est pas toujours fiable/simple
+    Returns:
+        (trace, métriques), ou None si le fichier est illisible
+    """
+    from utils.track_metrics import calculer_metriques
 
-    # Méthode plus robuste pour le dénivelé positif (somme des montées)
-    denivele_positif = gpx.get_uphill_downhill().uphill
+    trace = lire_trace_gpx(source)
+    if trace is None:
+        return None
+    return trace, calculer_metriques(trace)
+
+
+def _distance_2d(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distance 2D en mètres entre deux points (même formule que gpxpy)"""
+    if abs(lat1 - lat2) > .2 or abs(lon1 - lon2) > .2:
+        d_lon = math.radians(lon1 - lon2)
+        phi1 = math.radians(lat1)
+        phi2 = math.radians(lat2)
+        a = math.sin((phi1 - phi2) / 2) ** 2 + \
+            math.sin(d_lon / 2) ** 2 * math.cos(phi1) * math.cos(phi2)
+        return RAYON_TERRE * 2 * math.asin(math.sqrt(a))
+
+    coef = math.cos(math.radians(lat1))
+    x = lat1 - lat2
+    y = (lon1 - lon2) * coef
+    return math.sqrt(x * x + y * y) * UN_DEGRE
+
+
+def analyser_gpx(chemin_fichier):
+    """
+    Analyse un fichier GPX et retourne la durée, la distance et le dénivelé.
 
-    # Point de départ (date et heure)
-    start_time = gpx.get_time_bounds().start_time
+    Les métriques sont calculées en une seule passe sur le flux de points,
+    avec les mêmes formules que gpxpy (length_2d, get_duration,
+    get_uphill_downhill, get_time_bounds).
+    """
+    distance = 0.0
+    duree = 0.0
+    denivele_positif = 0.0
+    date_debut = None
+
+    # État du segment courant
+    segment = None
+    precedent = None          # (lat, lon) du point précédent
+    debut_segment = None      # Premier horodatage du segment
+    fin_segment = None        # Dernier horodatage du segment
+    altitudes = []            # Fenêtre glissante des 3 dernières altitudes
+    lissee_precedente = None  # Dernière altitude lissée
+
+    def cloturer_segment():
+        nonlocal duree, denivele_positif
+        if debut_segment is not None and fin_segment is not None and fin_segment > debut_segment:
+            duree += fin_segment - debut_segment
+        # La dernière altitude n'est pas lissée (comme gpxpy)
+        if len(altitudes) >= 2:
+            denivele_positif += max(altitudes[-1] - lissee_precedente, 0)
+
+    try:
+        for bloc in iterer_points_gpx(chemin_fichier):
+            for seg, lat, lon, ele, horodatage, *_ in bloc:
+                if seg != segment:
+                    if segment is not None:
+                        cloturer_segment()
+                    segment = seg
+                    precedent = None
+                    debut_segment = fin_segment = None
+                    altitudes = []
+                    lissee_precedente = None
+
+                # Distance
+                if precedent is not None:
+                    distance += _distance_2d(lat, lon, precedent[0], precedent[1])
+                precedent = (lat, lon)
+
+                # Durée
+                if horodatage is not None:
+                    if debut_segment is None:
+                        debut_segment = horodatage
+                    fin_segment = horodatage
+                    if date_debut is None:
+                        date_debut = datetime.fromtimestamp(horodatage, tz=timezone.utc)
+
+                # Dénivelé positif : lissage 0.3 / 0.4 / 0.3 sur trois points
+                if ele is not None:
+                    altitudes.append(ele)
+                    if len(altitudes) == 1:
+                        lissee_precedente = ele
+                    elif len(altitudes) >= 3:
+                        altitudes = altitudes[-3:]
+                        lissee = altitudes[0] * .3 + altitudes[1] * .4 + altitudes[2] * .3
+                        denivele_positif += max(lissee - lissee_precedente, 0)
+                        lissee_precedente = lissee
+
+        if segment is not None:
+            cloturer_segment()
+
+    except Exception as e:
+        print(f"❌ Erreur de lecture GPX : {e}")
+        return None
 
     return {
-        'distance': distance_km,
+        'distance': distance / 1000,
         'duree_secondes': duree,
         'denivele_positif': denivele_positif,
-        'date_debut': start_time
-    }
\ No newline at end of file
+        'date_debut': date_debut
+    }
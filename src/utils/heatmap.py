@@ -0,0 +1,162 @@
+"""
+Carte de chaleur des traces d'un utilisateur, découpée en tuiles XYZ (web mercator)
+
+Chaque trace est découpée en petits tronçons d'au plus un pixel, dont les
+extrémités sont comptées dans une grille par np.bincount : pas de tracé de
+ligne point par point. Une trace ajoute au plus 1 à chaque pixel qu'elle
+traverse, la densité d'un pixel est donc le nombre de passages.
+"""
+import io
+import math
+from typing import Set, Tuple
+
+import matplotlib
+import matplotlib.image
+import numpy as np
+
+TAILLE_TUILE = 256
+ZOOM_MAX = 16
+SATURATION = 50        # Passages au-delà desquels la couleur ne change plus
+PALETTE = "inferno"
+LATITUDE_MAX = 85.05112878  # Limite de la projection web mercator
+
+
+def pixels_mercator(lat, lon, zoom: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Coordonnées en pixels (web mercator) au zoom donné, origine au coin nord-ouest"""
+    echelle = TAILLE_TUILE * 2 ** zoom
+    phi = np.radians(np.clip(np.asarray(lat, dtype=np.float64), -LATITUDE_MAX, LATITUDE_MAX))
+    px = (np.asarray(lon, dtype=np.float64) + 180.0) / 360.0 * echelle
+    py = (1.0 - np.log(np.tan(phi) + 1.0 / np.cos(phi)) / math.pi) / 2.0 * echelle
+    return px, py
+
+
+def limites_tuile(zoom: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """Rectangle couvert par une tuile : (lat_min, lon_min, lat_max, lon_max) en degrés"""
+    n = 2 ** zoom
+
+    def latitude(ligne):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ligne / n))))
+
+    return latitude(y + 1), x / n * 360.0 - 180.0, latitude(y), (x + 1) / n * 360.0 - 180.0
+
+
+def _aretes(px: np.ndarray, py: np.ndarray, segment: np.ndarray):
+    """
+    Arêtes de la trace (ax, ay, bx, by), sans relier deux segments GPX.
+    Chaque point donne aussi une arête de longueur nulle : un segment
+    d'un seul point reste visible.
+    """
+    continues = np.flatnonzero(np.diff(segment) == 0)
+    ax = np.concatenate((px[continues], px))
+    ay = np.concatenate((py[continues], py))
+    bx = np.concatenate((px[continues + 1], px))
+    by = np.concatenate((py[continues + 1], py))
+    return ax, ay, bx, by
+
+
+def _sous_aretes(ax, ay, bx, by, pas: float):
+    """Découpe chaque arête en tronçons d'au plus `pas` sur chaque axe"""
+    nombres = np.maximum(1, np.ceil(np.maximum(np.abs(bx - ax), np.abs(by - ay)) / pas)).astype(np.int64)
+    arete = np.repeat(np.arange(len(ax)), nombres)
+    rang = np.arange(nombres.sum()) - np.repeat(np.cumsum(nombres) - nombres, nombres)
+    t0 = rang / nombres[arete]
+    t1 = (rang + 1) / nombres[arete]
+    dx, dy = (bx - ax)[arete], (by - ay)[arete]
+    return (
+        ax[arete] + t0 * dx, ay[arete] + t0 * dy,
+        ax[arete] + t1 * dx, ay[arete] + t1 * dy,
+    )
+
+
+def _decouper(ax, ay, bx, by, x0: float, y0: float, x1: float, y1: float):
+    """Garde la partie de chaque arête comprise dans le rectangle (Liang-Barsky vectorisé)"""
+    debut = np.zeros(len(ax))
+    fin = np.ones(len(ax))
+    for a, b, borne_min, borne_max in ((ax, bx, x0, x1), (ay, by, y0, y1)):
+        d = b - a
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_min = (borne_min - a) / d
+            t_max = (borne_max - a) / d
+        immobile = d == 0
+        dedans = (a >= borne_min) & (a <= borne_max)
+        debut = np.maximum(debut, np.where(immobile, np.where(dedans, 0.0, np.inf), np.minimum(t_min, t_max)))
+        fin = np.minimum(fin, np.where(immobile, np.where(dedans, 1.0, -np.inf), np.maximum(t_min, t_max)))
+
+    gardees = debut <= fin
+    debut, fin = debut[gardees], fin[gardees]
+    ax, ay, bx, by = ax[gardees], ay[gardees], bx[gardees], by[gardees]
+    return (
+        ax + debut * (bx - ax), ay + debut * (by - ay),
+        ax + fin * (bx - ax), ay + fin * (by - ay),
+    )
+
+
+def pixels_traverses(lat, lon, segment, zoom: int, x: int, y: int) -> np.ndarray:
+    """
+    Pixels d'une tuile traversés par une trace
+
+    Returns:
+        Indices (ligne * TAILLE_TUILE + colonne) distincts, à compter avec np.bincount
+    """
+    if len(lat) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    px, py = pixels_mercator(lat, lon, zoom)
+    x0, y0 = x * TAILLE_TUILE, y * TAILLE_TUILE
+    ax, ay, bx, by = _decouper(
+        *_aretes(px, py, np.asarray(segment)), x0, y0, x0 + TAILLE_TUILE, y0 + TAILLE_TUILE
+    )
+    ax, ay, bx, by = _sous_aretes(ax, ay, bx, by, 1.0)
+
+    colonnes = np.floor(np.concatenate((ax, bx)) - x0).astype(np.int64)
+    lignes = np.floor(np.concatenate((ay, by)) - y0).astype(np.int64)
+    dans_tuile = (colonnes >= 0) & (colonnes < TAILLE_TUILE) & (lignes >= 0) & (lignes < TAILLE_TUILE)
+    return np.unique(lignes[dans_tuile] * TAILLE_TUILE + colonnes[dans_tuile])
+
+
+def tuiles_touchees(lat, lon, segment, zoom: int) -> Set[Tuple[int, int]]:
+    """
+    Tuiles (x, y) traversées par une trace au zoom donné
+
+    L'ensemble est large : un tronçon d'au plus une tuile compte toutes les
+    tuiles de son rectangle, y compris celles qu'il ne fait qu'effleurer.
+    """
+    if len(lat) == 0:
+        return set()
+
+    px, py = pixels_mercator(lat, lon, zoom)
+    ax, ay, bx, by = _sous_aretes(
+        *_aretes(px / TAILLE_TUILE, py / TAILLE_TUILE, np.asarray(segment)), 1.0
+    )
+    n = 2 ** zoom
+    xa, ya = np.floor(ax).astype(np.int64), np.floor(ay).astype(np.int64)
+    xb, yb = np.floor(bx).astype(np.int64), np.floor(by).astype(np.int64)
+    xs = np.clip(np.concatenate((xa, xb, xa, xb)), 0, n - 1)
+    ys = np.clip(np.concatenate((ya, yb, yb, ya)), 0, n - 1)
+    codes = np.unique(xs * n + ys)
+    return set(zip((codes // n).tolist(), (codes % n).tolist()))
+
+
+def densite(pixels_par_trace) -> np.ndarray:
+    """Nombre de traces passées par chaque pixel (tableau TAILLE_TUILE x TAILLE_TUILE)"""
+    pixels = [p for p in pixels_par_trace if len(p)]
+    if not pixels:
+        return np.zeros((TAILLE_TUILE, TAILLE_TUILE), dtype=np.int64)
+    comptes = np.bincount(np.concatenate(pixels), minlength=TAILLE_TUILE * TAILLE_TUILE)
+    return comptes.reshape(TAILLE_TUILE, TAILLE_TUILE)
+
+
+def rendre_png(comptes: np.ndarray) -> bytes:
+    """
+    Colore une grille de passages et l'encode en PNG transparent
+
+    L'échelle est logarithmique et commune à toutes les tuiles, pour que les
+    couleurs se raccordent d'une tuile à l'autre.
+    """
+    intensite = np.clip(np.log1p(comptes) / math.log1p(SATURATION), 0.0, 1.0)
+    couleurs = matplotlib.colormaps[PALETTE](0.25 + 0.75 * intensite)
+    couleurs[..., 3] = np.where(comptes > 0, 0.4 + 0.6 * intensite, 0.0)
+
+    sortie = io.BytesIO()
+    matplotlib.image.imsave(sortie, couleurs, format="png")
+    return sortie.getvalue()
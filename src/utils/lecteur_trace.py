@@ -0,0 +1,102 @@
+"""
+Lecture d'une trace quel que soit son format (GPX, TCX ou FIT)
+
+Le format est reconnu au contenu du fichier, pas à son extension : les
+fichiers sont stockés sous leur empreinte et les utilisateurs renomment
+volontiers leurs exports. Les trois parseurs produisent la même Trace en
+colonnes, les métriques se calculent ensuite de la même façon.
+"""
+import os
+from typing import Dict, Optional, Tuple
+
+from utils.fit_parser import lire_trace_fit
+from utils.gpx_parser import lire_trace_gpx
+from utils.stockage_gpx import ouvrir_gpx
+from utils.tcx_parser import lire_trace_tcx
+from utils.trace import Trace
+
+TAILLE_EN_TETE = 4096  # Octets lus pour reconnaître le format
+
+EXTENSIONS_TRACE = (".gpx", ".tcx", ".fit")
+
+LECTEURS = {
+    "gpx": lire_trace_gpx,
+    "tcx": lire_trace_tcx,
+    "fit": lire_trace_fit,
+}
+
+
+def detecter_format(en_tete: bytes) -> Optional[str]:
+    """
+    Reconnaît le format d'une trace à ses premiers octets
+
+    Returns:
+        'gpx', 'tcx', 'fit' ou None si le format est inconnu
+    """
+    if len(en_tete) >= 12 and en_tete[8:12] == b".FIT":
+        return "fit"
+    if b"<TrainingCenterDatabase" in en_tete:
+        return "tcx"
+    if b"<gpx" in en_tete:
+        return "gpx"
+    return None
+
+
+def detecter_format_fichier(chemin: str) -> Optional[str]:
+    """Reconnaît le format d'une trace stockée (compressée en gzip ou non)"""
+    try:
+        with ouvrir_gpx(chemin) as fichier:
+            return detecter_format(fichier.read(TAILLE_EN_TETE))
+    except OSError:
+        return None
+
+
+def lire_trace(source) -> Optional[Trace]:
+    """
+    Lit une trace GPX, TCX ou FIT en colonnes NumPy
+
+    Args:
+        source: Chemin du fichier (compressé en gzip ou non) ou objet
+            fichier binaire repositionnable
+
+    Returns:
+        La trace, ou None si le fichier est illisible ou d'un format inconnu
+    """
+    try:
+        fichier = ouvrir_gpx(source) if isinstance(source, (str, os.PathLike)) else source
+    except OSError as e:
+        print(f"❌ Erreur de lecture de la trace : {e}")
+        return None
+
+    try:
+        en_tete = fichier.read(TAILLE_EN_TETE)
+        fichier.seek(0)
+        format_trace = detecter_format(en_tete)
+        if format_trace is None:
+            print("❌ Format de trace inconnu (GPX, TCX ou FIT attendu)")
+            return None
+        return LECTEURS[format_trace](fichier)
+    except OSError as e:
+        print(f"❌ Erreur de lecture de la trace : {e}")
+        return None
+    finally:
+        if fichier is not source:
+            fichier.close()
+
+
+def analyser_trace(source) -> Optional[Tuple[Trace, Dict]]:
+    """
+    Lit une trace GPX, TCX ou FIT et calcule ses métriques vectorisées
+
+    Fonction de module sans état : elle peut être exécutée dans un
+    processus séparé (pool d'ingestion).
+
+    Returns:
+        (trace, métriques), ou None si le fichier est illisible
+    """
+    from utils.track_metrics import calculer_metriques
+
+    trace = lire_trace(source)
+    if trace is None:
+        return None
+    return trace, calculer_metriques(trace)
@@ -0,0 +1,94 @@
+"""
+Meilleurs efforts et temps intermédiaires (splits) d'une trace
+
+Le meilleur effort sur une distance D est la fenêtre de points la plus
+rapide couvrant au moins D mètres. Les deux bornes de la fenêtre ne font
+qu'avancer le long des tableaux cumulés de distance et de temps : la
+borne gauche de chaque fenêtre est trouvée en une passe vectorisée
+(np.searchsorted), équivalente à la fenêtre glissante à deux pointeurs.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from utils.trace import Trace
+from utils.track_metrics import distances_segments
+
+# Distances des records (m)
+DISTANCES_EFFORTS = {
+    "1km": 1000.0,
+    "5km": 5000.0,
+    "10km": 10000.0,
+    "semi_marathon": 21097.5,
+}
+
+LONGUEUR_SPLIT = 1000.0  # m
+
+
+def cumuls(trace: Trace) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Distance et temps cumulés des points horodatés
+
+    Returns:
+        (indices des points dans la trace, distance cumulée en m, temps en s)
+    """
+    distances = distances_segments(trace)
+    cumul = np.concatenate(([0.0], np.cumsum(distances)))
+    horodates = np.flatnonzero(~np.isnan(trace.temps))
+    temps = trace.temps[horodates]
+    # Un horodatage qui recule (GPS) ne doit pas créer de fenêtre de durée négative
+    temps = np.maximum.accumulate(temps) if len(temps) else temps
+    return horodates, cumul[horodates], temps
+
+
+def meilleurs_efforts(trace: Trace, distances: Dict[str, float] = DISTANCES_EFFORTS) -> Dict[str, Dict]:
+    """
+    Calcule le meilleur temps de la trace sur chaque distance
+
+    Returns:
+        {nom: {'distance', 'duree', 'indice_debut', 'indice_fin'}} pour les
+        distances couvertes par la trace (durée en s)
+    """
+    indices, cumul, temps = cumuls(trace)
+    efforts = {}
+    if len(cumul) < 2:
+        return efforts
+
+    for nom, distance in distances.items():
+        if cumul[-1] - cumul[0] < distance:
+            continue
+        # Pour chaque fin j : dernier début i tel que cumul[j] - cumul[i] >= distance
+        debuts = np.searchsorted(cumul, cumul - distance, side="right") - 1
+        fins = np.flatnonzero(debuts >= 0)
+        debuts = debuts[fins]
+        durees = temps[fins] - temps[debuts]
+        k = int(np.argmin(durees))
+        efforts[nom] = {
+            "distance": distance,
+            "duree": float(durees[k]),
+            "indice_debut": int(indices[debuts[k]]),
+            "indice_fin": int(indices[fins[k]]),
+        }
+    return efforts
+
+
+def splits(trace: Trace, longueur: float = LONGUEUR_SPLIT) -> List[float]:
+    """
+    Temps de chaque tranche complète de `longueur` mètres (s)
+
+    Le passage à chaque borne est interpolé entre les deux points qui l'encadrent.
+    """
+    _, cumul, temps = cumuls(trace)
+    if len(cumul) < 2:
+        return []
+
+    bornes = np.arange(cumul[0] + longueur, cumul[-1] + 1e-9, longueur)
+    if len(bornes) == 0:
+        return []
+    passages = np.interp(bornes, cumul, temps)
+    return np.diff(np.concatenate(([temps[0]], passages))).tolist()
+
+
+def efforts_et_splits(trace: Trace) -> Tuple[Dict[str, Dict], List[float]]:
+    """meilleurs_efforts et splits de la trace, en un appel (pool de processus)"""
+    return meilleurs_efforts(trace), splits(trace)
@@ -0,0 +1,95 @@
+"""
+Encodage des traces en polyligne (format « encoded polyline » de Google)
+
+Chaque valeur est arrondie à une précision fixe, remplacée par son écart
+à la précédente, puis écrite en base 64 par paquets de 5 bits (varint) en
+caractères ASCII imprimables. Une trace GPS, dont les points sont proches,
+tient ainsi en 3 à 6 caractères par coordonnée au lieu d'une vingtaine en
+JSON. L'encodage et le décodage sont vectorisés (aucune boucle par point).
+
+Les coordonnées sont entrelacées (lat, lon) comme dans le format de Google ;
+les canaux optionnels (altitude, temps) sont encodés à part de la même façon.
+"""
+from typing import List
+
+import numpy as np
+
+PRECISION_COORDONNEES = 5  # Décimales : environ 1 m
+PRECISION_ALTITUDE = 1     # Décimètre
+PRECISION_TEMPS = 0        # Seconde
+
+_NB_PAQUETS_MAX = 7        # Paquets de 5 bits d'un entier zigzag sur 35 bits
+
+
+def _encoder_entiers(valeurs: np.ndarray) -> str:
+    """Encode une suite d'entiers (déjà en écarts) en varints ASCII"""
+    valeurs = np.asarray(valeurs, dtype=np.int64)
+    # Zigzag : le signe passe dans le bit de poids faible
+    zigzag = np.where(valeurs < 0, ~(valeurs << 1), valeurs << 1)
+
+    decalages = 5 * np.arange(_NB_PAQUETS_MAX)
+    decales = zigzag[:, None] >> decalages
+    paquets = decales & 0x1F
+    # Nombre de paquets utiles de chaque valeur (au moins un)
+    nb_paquets = np.maximum(1, (decales != 0).sum(axis=1))
+    utiles = np.arange(_NB_PAQUETS_MAX) < nb_paquets[:, None]
+    # Bit de continuation sur tous les paquets sauf le dernier de chaque valeur
+    suite = np.arange(_NB_PAQUETS_MAX) < (nb_paquets - 1)[:, None]
+    caracteres = (paquets | np.where(suite, 0x20, 0)) + 63
+    return caracteres[utiles].astype(np.uint8).tobytes().decode("ascii")
+
+
+def _decoder_entiers(texte: str) -> np.ndarray:
+    """Décode des varints ASCII en entiers (écarts)"""
+    octets = np.frombuffer(texte.encode("ascii"), dtype=np.uint8).astype(np.int64) - 63
+    if len(octets) == 0:
+        return np.zeros(0, dtype=np.int64)
+    fins = (octets & 0x20) == 0
+    # Rang de chaque paquet dans sa valeur
+    debuts = np.concatenate(([0], np.flatnonzero(fins)[:-1] + 1))
+    rangs = np.arange(len(octets)) - np.repeat(debuts, np.diff(np.append(debuts, len(octets))))
+    zigzag = np.add.reduceat((octets & 0x1F) << (5 * rangs), debuts)
+    return np.where(zigzag & 1, ~(zigzag >> 1), zigzag >> 1)
+
+
+def _ecarts(valeurs: np.ndarray, precision: int) -> np.ndarray:
+    entiers = np.rint(np.asarray(valeurs, dtype=np.float64) * 10 ** precision).astype(np.int64)
+    return np.diff(entiers, prepend=0)
+
+
+def encoder(valeurs: np.ndarray, precision: int) -> str:
+    """Encode un canal (altitudes, temps...) en polyligne à une dimension"""
+    return _encoder_entiers(_ecarts(valeurs, precision))
+
+
+def decoder(texte: str, precision: int) -> np.ndarray:
+    """Décode un canal encodé par encoder"""
+    return np.cumsum(_decoder_entiers(texte)) / 10 ** precision
+
+
+def encoder_coordonnees(lat: np.ndarray, lon: np.ndarray, precision: int = PRECISION_COORDONNEES) -> str:
+    """Encode des points (lat, lon) en polyligne, compatible avec les décodeurs de Google"""
+    ecarts = np.column_stack((_ecarts(lat, precision), _ecarts(lon, precision)))
+    return _encoder_entiers(ecarts.ravel())
+
+
+def decoder_coordonnees(texte: str, precision: int = PRECISION_COORDONNEES) -> List[np.ndarray]:
+    """Décode une polyligne en [latitudes, longitudes]"""
+    valeurs = np.cumsum(_decoder_entiers(texte).reshape(-1, 2), axis=0) / 10 ** precision
+    return [valeurs[:, 0], valeurs[:, 1]]
+
+
+def combler(valeurs: np.ndarray, absent: np.ndarray) -> np.ndarray:
+    """
+    Remplace les valeurs absentes par la dernière valeur connue (la première
+    valeur connue en début de trace), pour qu'un canal encodé n'ait pas de trou
+
+    Returns:
+        Les valeurs comblées, ou None si aucune n'est connue
+    """
+    connues = np.flatnonzero(~absent)
+    if len(connues) == 0:
+        return None
+    indices = np.maximum.accumulate(np.where(absent, 0, np.arange(len(valeurs))))
+    indices[:connues[0]] = connues[0]
+    return np.asarray(valeurs, dtype=np.float64)[indices]
@@ -0,0 +1,132 @@
+"""
+Recherche des passages d'une trace sur un segment (une montée, une boucle...)
+
+Un segment est une polyligne. Une trace le parcourt si elle passe près de
+son départ puis de son arrivée, en restant près de chacun de ses points et
+dans le bon sens. Tous les calculs se font sur des tableaux NumPy, dans une
+projection locale en mètres : pas de boucle Python sur les points.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from utils.simplification import TOLERANCES, importances
+from utils.trace import Trace
+
+RAYON_TERRE = 6378137.0
+TOLERANCE_SEGMENT = 25.0      # m : écart maximal entre la trace et le segment
+LONGUEUR_MAX = 1.5            # Longueur parcourue / longueur du segment au-delà de laquelle on rejette
+SENS_MIN = 0.9                # Part minimale des points du segment rencontrés dans l'ordre
+TAILLE_BLOC_DISTANCES = 1_000_000  # Couples (point, arête) calculés à la fois
+
+
+def _projeter(lat, lon, lat0: float, lon0: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Projection équirectangulaire en mètres autour de (lat0, lon0)"""
+    x = RAYON_TERRE * np.radians(np.asarray(lon) - lon0) * np.cos(np.radians(lat0))
+    y = RAYON_TERRE * np.radians(np.asarray(lat) - lat0)
+    return x, y
+
+
+def simplifier_segment(lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Garde les points du segment utiles à la plus fine tolérance de Douglas-Peucker"""
+    gardes = importances(lat, lon, np.zeros(len(lat), dtype=np.int32)) >= TOLERANCES[0]
+    return lat[gardes], lon[gardes]
+
+
+def longueur(lat: np.ndarray, lon: np.ndarray) -> float:
+    """Longueur d'une polyligne en mètres"""
+    x, y = _projeter(lat, lon, float(lat[0]), float(lon[0]))
+    return float(np.hypot(np.diff(x), np.diff(y)).sum())
+
+
+def _distances_aux_aretes(px, py, x, y) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Distance de chaque point (px, py) à la polyligne (x, y) et indice de l'arête la plus proche
+    """
+    ax, ay = x[:-1], y[:-1]
+    dx, dy = np.diff(x), np.diff(y)
+    longueur2 = np.maximum(dx * dx + dy * dy, 1e-12)
+
+    distances = np.empty(len(px))
+    aretes = np.empty(len(px), dtype=np.int64)
+    pas = max(1, TAILLE_BLOC_DISTANCES // max(len(ax), 1))
+    for debut in range(0, len(px), pas):
+        qx = px[debut:debut + pas, None]
+        qy = py[debut:debut + pas, None]
+        t = np.clip(((qx - ax) * dx + (qy - ay) * dy) / longueur2, 0.0, 1.0)
+        d2 = (ax + t * dx - qx) ** 2 + (ay + t * dy - qy) ** 2
+        plus_proches = np.argmin(d2, axis=1)
+        aretes[debut:debut + pas] = plus_proches
+        distances[debut:debut + pas] = np.sqrt(d2[np.arange(len(d2)), plus_proches])
+    return distances, aretes
+
+
+def _passages(distances: np.ndarray, tolerance: float) -> np.ndarray:
+    """Indice du point le plus proche de chaque passage continu à moins de `tolerance`"""
+    proches = distances <= tolerance
+    bords = np.diff(np.concatenate(([False], proches, [False])).astype(np.int8))
+    debuts, fins = np.flatnonzero(bords == 1), np.flatnonzero(bords == -1)
+    return np.array([debut + np.argmin(distances[debut:fin]) for debut, fin in zip(debuts, fins)], dtype=np.int64)
+
+
+def trouver_efforts(
+    trace: Trace,
+    lat_segment: np.ndarray,
+    lon_segment: np.ndarray,
+    tolerance: float = TOLERANCE_SEGMENT
+) -> List[Dict]:
+    """
+    Trouve les passages d'une trace sur un segment
+
+    Args:
+        trace: Trace analysée
+        lat_segment, lon_segment: Points du segment, dans le sens de parcours
+        tolerance: Écart maximal accepté (m)
+
+    Returns:
+        Liste de {'indice_debut', 'indice_fin', 'duree'} (indices dans la
+        trace, durée en secondes), dans l'ordre de la trace
+    """
+    horodates = np.flatnonzero(~np.isnan(trace.temps))
+    if len(horodates) < 2 or len(lat_segment) < 2:
+        return []
+
+    lat0, lon0 = float(lat_segment[0]), float(lon_segment[0])
+    x, y = _projeter(trace.lat[horodates], trace.lon[horodates], lat0, lon0)
+    sx, sy = _projeter(lat_segment, lon_segment, lat0, lon0)
+    temps = trace.temps[horodates]
+    cumul = np.concatenate(([0.0], np.cumsum(np.hypot(np.diff(x), np.diff(y)))))
+    longueur_segment = float(np.hypot(np.diff(sx), np.diff(sy)).sum())
+
+    # Passages près du départ et de l'arrivée du segment
+    departs = _passages(np.hypot(x - sx[0], y - sy[0]), tolerance)
+    arrivees = _passages(np.hypot(x - sx[-1], y - sy[-1]), tolerance)
+
+    efforts = []
+    fin_precedente = -1
+    for debut in departs:
+        if debut <= fin_precedente:
+            continue
+        suivantes = arrivees[arrivees > debut]
+        if not len(suivantes):
+            break
+        fin = int(suivantes[0])
+
+        # Pas de détour : la distance parcourue reste proche de la longueur du segment
+        if cumul[fin] - cumul[debut] > LONGUEUR_MAX * longueur_segment + 2 * tolerance:
+            continue
+
+        # Chaque point du segment est longé, et dans l'ordre du segment
+        distances, aretes = _distances_aux_aretes(sx, sy, x[debut:fin + 1], y[debut:fin + 1])
+        dans_l_ordre = np.mean(np.diff(aretes) >= 0) if len(aretes) > 1 else 1.0
+        if distances.max() > tolerance or dans_l_ordre < SENS_MIN:
+            continue
+
+        efforts.append({
+            'indice_debut': int(horodates[debut]),
+            'indice_fin': int(horodates[fin]),
+            'duree': float(temps[fin] - temps[debut]),
+        })
+        fin_precedente = fin
+
+    return efforts
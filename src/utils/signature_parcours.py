@@ -0,0 +1,126 @@
+"""
+Signature compacte du parcours d'une trace, pour retrouver les doublons et les parcours répétés
+
+La trace devient la suite des cellules geohash qu'elle traverse ; ses
+couples de cellules consécutives (qui portent aussi le sens de parcours)
+sont résumés par une signature MinHash : la part de valeurs égales entre
+deux signatures estime la similarité de Jaccard des deux parcours. La
+signature est découpée en bandes (LSH) : deux parcours similaires ont très
+probablement une bande identique, ce qui permet de chercher les candidats
+par index plutôt qu'en comparant toutes les traces stockées.
+"""
+from typing import Optional
+
+import numpy as np
+
+from utils.simplification import TOLERANCES, importances
+from utils.trace import Trace
+
+PRECISION_GEOHASH = 7      # Caractères : cellules d'environ 150 m x 150 m
+NB_PERMUTATIONS = 64
+NB_BANDES = 16             # 16 bandes de 4 valeurs : seuil LSH autour de 0,5
+LIGNES_PAR_BANDE = NB_PERMUTATIONS // NB_BANDES
+SEUIL_MEME_PARCOURS = 0.5  # Similarité au-delà de laquelle deux sorties suivent le même parcours
+SEUIL_DOUBLON = 0.9        # ... et au-delà de laquelle, le même jour, c'est la même sortie
+TOLERANCE_LISSAGE = TOLERANCES[2]  # m : le bruit GPS ne fait pas osciller la trace entre deux cellules
+
+
+def _melanger(x: np.ndarray) -> np.ndarray:
+    """Hachage 64 bits (finaliseur splitmix64), vectorisé et déterministe"""
+    x = np.asarray(x, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+# Une graine par permutation : h_i(x) = _melanger(x ^ graine_i)
+_GRAINES = _melanger(np.arange(NB_PERMUTATIONS, dtype=np.uint64))
+
+
+def geohash(lat, lon, precision: int = PRECISION_GEOHASH) -> np.ndarray:
+    """
+    Code geohash de chaque point, sous forme d'entier (5 bits par caractère)
+
+    Les bits de longitude et de latitude sont entrelacés comme dans le
+    geohash textuel : l'entier s'écrit en base 32 en ce même geohash.
+    """
+    nb_bits = 5 * precision
+    bits_lon, bits_lat = (nb_bits + 1) // 2, nb_bits // 2
+    lon_q = np.clip(((np.asarray(lon) + 180.0) / 360.0 * 2 ** bits_lon).astype(np.int64), 0, 2 ** bits_lon - 1)
+    lat_q = np.clip(((np.asarray(lat) + 90.0) / 180.0 * 2 ** bits_lat).astype(np.int64), 0, 2 ** bits_lat - 1)
+
+    codes = np.zeros(len(lon_q), dtype=np.int64)
+    for k in range(bits_lon):
+        codes |= ((lon_q >> (bits_lon - 1 - k)) & 1) << (nb_bits - 1 - 2 * k)
+    for k in range(bits_lat):
+        codes |= ((lat_q >> (bits_lat - 1 - k)) & 1) << (nb_bits - 2 - 2 * k)
+    return codes
+
+
+def sequence_cellules(trace: Trace, precision: int = PRECISION_GEOHASH) -> np.ndarray:
+    """
+    Cellules geohash traversées par la trace, dans l'ordre, sans répétition consécutive
+
+    La trace est d'abord simplifiée (Douglas-Peucker) pour effacer le bruit
+    GPS, puis densifiée (au moins deux points par cellule) pour qu'une trace
+    peu échantillonnée ne saute pas de cellule.
+    """
+    if len(trace) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    gardes = importances(trace.lat, trace.lon, trace.segment) >= TOLERANCE_LISSAGE
+    lat, lon, segment = trace.lat[gardes], trace.lon[gardes], trace.segment[gardes]
+
+    pas_lon = 360.0 / 2 ** ((5 * precision + 1) // 2) / 2
+    pas_lat = 180.0 / 2 ** (5 * precision // 2) / 2
+    continues = np.diff(segment) == 0
+    nombres = np.where(
+        continues,
+        np.maximum(1, np.ceil(np.maximum(np.abs(np.diff(lat)) / pas_lat, np.abs(np.diff(lon)) / pas_lon))),
+        1
+    ).astype(np.int64)
+
+    # Points intermédiaires de chaque arête : départ + t * (arrivée - départ), t dans [0, 1[
+    arete = np.repeat(np.arange(len(nombres)), nombres)
+    t = (np.arange(len(arete)) - np.repeat(np.cumsum(nombres) - nombres, nombres)) / nombres[arete]
+    lat_dense = np.append(lat[arete] + t * np.diff(lat)[arete], lat[-1])
+    lon_dense = np.append(lon[arete] + t * np.diff(lon)[arete], lon[-1])
+
+    cellules = geohash(lat_dense, lon_dense, precision)
+    return cellules[np.concatenate(([True], cellules[1:] != cellules[:-1]))]
+
+
+def signature(trace: Trace) -> Optional[np.ndarray]:
+    """
+    Signature MinHash du parcours (NB_PERMUTATIONS valeurs uint32)
+
+    Returns:
+        La signature, ou None si la trace n'a aucun point
+    """
+    cellules = sequence_cellules(trace)
+    if len(cellules) == 0:
+        return None
+
+    # Couples de cellules consécutives (une seule cellule : la cellule elle-même)
+    if len(cellules) == 1:
+        elements = _melanger(cellules)
+    else:
+        elements = _melanger(cellules[:-1]) ^ cellules[1:].astype(np.uint64)
+    elements = np.unique(elements)
+
+    minimums = _melanger(elements[None, :] ^ _GRAINES[:, None]).min(axis=1)
+    return (minimums >> np.uint64(32)).astype(np.uint32)
+
+
+def cles_lsh(signature_parcours: np.ndarray) -> np.ndarray:
+    """Clé de chaque bande de la signature (NB_BANDES entiers 63 bits, stockables en base)"""
+    bandes = signature_parcours.reshape(NB_BANDES, LIGNES_PAR_BANDE).astype(np.uint64)
+    cles = np.arange(NB_BANDES, dtype=np.uint64)
+    for ligne in range(LIGNES_PAR_BANDE):
+        cles = _melanger(cles ^ bandes[:, ligne])
+    return (cles >> np.uint64(1)).astype(np.int64)
+
+
+def similarite(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    """Similarité de Jaccard estimée entre deux parcours (0 à 1)"""
+    return float(np.mean(signature_a == signature_b))
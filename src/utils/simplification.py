@@ -0,0 +1,135 @@
+"""
+Simplification multi-résolution des traces (Douglas-Peucker)
+
+Un seul passage de Douglas-Peucker attribue à chaque point la tolérance
+jusqu'à laquelle il est conservé. On en déduit un niveau par point :
+le niveau k garde les points dont le niveau est >= k, ce qui donne des
+polylignes emboîtées, de la plus fine à la plus grossière.
+"""
+import math
+from typing import Optional
+
+import numpy as np
+
+RAYON_TERRE = 6378137.0  # Rayon équatorial WGS84 (m)
+
+# Tolérance (m) de chaque niveau, du plus fin au plus grossier
+TOLERANCES = (2.0, 8.0, 30.0, 120.0, 500.0)
+
+# Niveau des points qui ne sont gardés qu'en pleine résolution
+PLEINE_RESOLUTION = -1
+
+# Mètres par pixel au zoom 0 à l'équateur (tuiles web mercator de 256 px)
+METRES_PAR_PIXEL_ZOOM_0 = 2 * math.pi * RAYON_TERRE / 256
+
+
+def _projeter(lat: np.ndarray, lon: np.ndarray):
+    """Projection équirectangulaire locale en mètres"""
+    lat0 = np.radians(np.nanmean(lat)) if len(lat) else 0.0
+    x = RAYON_TERRE * np.radians(lon) * np.cos(lat0)
+    y = RAYON_TERRE * np.radians(lat)
+    return x, y
+
+
+def _distances_au_segment(x, y, debut: int, fin: int) -> np.ndarray:
+    """Distances des points strictement entre debut et fin au segment [debut, fin]"""
+    px, py = x[debut + 1:fin], y[debut + 1:fin]
+    dx, dy = x[fin] - x[debut], y[fin] - y[debut]
+    longueur2 = dx * dx + dy * dy
+    if longueur2 == 0:
+        return np.hypot(px - x[debut], py - y[debut])
+    t = np.clip(((px - x[debut]) * dx + (py - y[debut]) * dy) / longueur2, 0.0, 1.0)
+    return np.hypot(px - (x[debut] + t * dx), py - (y[debut] + t * dy))
+
+
+def importances(lat: np.ndarray, lon: np.ndarray, segment: np.ndarray) -> np.ndarray:
+    """
+    Tolérance maximale (m) à laquelle chaque point est conservé par Douglas-Peucker
+
+    Les extrémités de chaque segment sont toujours conservées (inf). La
+    récursion s'arrête sous la plus petite tolérance : ces points valent 0.
+    """
+    n = len(lat)
+    resultat = np.zeros(n)
+    if n == 0:
+        return resultat
+
+    x, y = _projeter(lat, lon)
+    coupures = np.flatnonzero(np.diff(segment)) + 1
+    debuts = np.concatenate(([0], coupures))
+    fins = np.concatenate((coupures, [n])) - 1
+    resultat[debuts] = np.inf
+    resultat[fins] = np.inf
+
+    # Pile de (début, fin, importance du point parent)
+    pile = [(d, f, np.inf) for d, f in zip(debuts, fins) if f - d > 1]
+    while pile:
+        debut, fin, parent = pile.pop()
+        distances = _distances_au_segment(x, y, debut, fin)
+        k = int(np.argmax(distances))
+        dmax = distances[k]
+        if dmax < TOLERANCES[0]:
+            continue
+        milieu = debut + 1 + k
+        # Un point n'est jamais plus important que celui qui a découpé son intervalle
+        resultat[milieu] = min(dmax, parent)
+        if milieu - debut > 1:
+            pile.append((debut, milieu, resultat[milieu]))
+        if fin - milieu > 1:
+            pile.append((milieu, fin, resultat[milieu]))
+
+    return resultat
+
+
+def calculer_niveaux(trace) -> np.ndarray:
+    """
+    Niveau de simplification de chaque point d'une trace (int8)
+
+    Returns:
+        Pour chaque point, l'indice du niveau le plus grossier qui le conserve
+        (PLEINE_RESOLUTION s'il n'apparaît dans aucun niveau)
+    """
+    niveaux = np.searchsorted(TOLERANCES, importances(trace.lat, trace.lon, trace.segment), side="right") - 1
+    return niveaux.astype(np.int8)
+
+
+def choisir_niveau(
+    niveaux: np.ndarray,
+    zoom: Optional[float] = None,
+    pixels: Optional[int] = None,
+    latitude: float = 0.0
+) -> int:
+    """
+    Choisit le niveau adapté à l'affichage
+
+    Args:
+        niveaux: Niveau de chaque point (calculer_niveaux)
+        zoom: Niveau de zoom de la carte (web mercator) : on prend le niveau
+            le plus grossier dont l'erreur reste sous un pixel
+        pixels: Budget de points : on prend le niveau le plus fin qui tient
+            dans ce budget
+        latitude: Latitude de la trace (échelle de la carte au zoom donné)
+
+    Returns:
+        Indice du niveau, PLEINE_RESOLUTION pour tous les points
+    """
+    if zoom is not None:
+        metres_par_pixel = METRES_PAR_PIXEL_ZOOM_0 * math.cos(math.radians(latitude)) / 2 ** zoom
+        niveau = PLEINE_RESOLUTION
+        for k, tolerance in enumerate(TOLERANCES):
+            if tolerance <= metres_par_pixel:
+                niveau = k
+        return niveau
+
+    if pixels is not None:
+        if len(niveaux) <= pixels:
+            return PLEINE_RESOLUTION
+        comptes = np.bincount(niveaux.astype(np.int64) - PLEINE_RESOLUTION, minlength=len(TOLERANCES) + 1)
+        # Nombre de points conservés à chaque niveau (cumul depuis le plus grossier)
+        conserves = np.cumsum(comptes[::-1])[::-1][1:]
+        for k, nombre in enumerate(conserves):
+            if nombre <= pixels:
+                return k
+        return len(TOLERANCES) - 1
+
+    return PLEINE_RESOLUTION
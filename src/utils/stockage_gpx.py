@@ -0,0 +1,207 @@
+"""
+Stockage adressé par contenu des fichiers GPX
+
+Chaque fichier est enregistré une seule fois sous l'empreinte SHA-256 de son
+contenu : un même fichier envoyé plusieurs fois n'occupe qu'une place sur le
+disque et n'est analysé qu'une fois.
+
+Les fichiers sont compressés en gzip (le XML GPX se compresse environ 10 fois)
+et relus en flux par ouvrir_gpx, sans fichier temporaire.
+
+Un ValidateurTrace peut vérifier chaque morceau avant son écriture : une
+trace refusée interrompt la lecture et sa copie temporaire est supprimée.
+"""
+import asyncio
+import gzip
+import hashlib
+import os
+import shutil
+import uuid
+from typing import BinaryIO, Optional, Tuple
+
+from utils.validation_trace import ValidateurTrace
+
+TAILLE_MORCEAU = 1024 * 1024  # Octets lus à chaque itération
+NIVEAU_COMPRESSION = 6        # Compromis taille / vitesse de gzip
+MAGIC_GZIP = b"\x1f\x8b"
+
+
+def chemin_par_empreinte(dossier: str, empreinte: str) -> str:
+    """Chemin de stockage d'un fichier GPX à partir de son empreinte"""
+    return os.path.join(dossier, f"{empreinte}.gpx.gz")
+
+
+def est_compresse(chemin: str) -> bool:
+    """Vérifie si un fichier stocké est compressé (gzip)"""
+    with open(chemin, "rb") as f:
+        return f.read(2) == MAGIC_GZIP
+
+
+def ouvrir_gpx(chemin: str) -> BinaryIO:
+    """
+    Ouvre un fichier GPX stocké en lecture binaire, compressé ou non
+
+    La décompression se fait en flux, au fil des lectures.
+    """
+    if est_compresse(chemin):
+        return gzip.open(chemin, "rb")
+    return open(chemin, "rb")
+
+
+def _ecrivain_compresse(f: BinaryIO) -> gzip.GzipFile:
+    # mtime=0 : un même contenu donne toujours le même fichier compressé
+    return gzip.GzipFile(fileobj=f, mode="wb", compresslevel=NIVEAU_COMPRESSION, mtime=0)
+
+
+def compresser_fichier(chemin: str) -> str:
+    """
+    Compresse un fichier GPX stocké en clair
+
+    Le fichier compressé est écrit à côté (suffixe .gz) puis l'original
+    est conservé : c'est à l'appelant de le supprimer une fois les
+    références mises à jour.
+
+    Returns:
+        Chemin du fichier compressé
+    """
+    compresse = chemin + ".gz"
+    temporaire = compresse + f".{uuid.uuid4().hex}.part"
+    try:
+        with open(chemin, "rb") as source, open(temporaire, "wb") as f, _ecrivain_compresse(f) as gz:
+            shutil.copyfileobj(source, gz, TAILLE_MORCEAU)
+    except Exception:
+        os.remove(temporaire)
+        raise
+    os.replace(temporaire, compresse)
+    return compresse
+
+
+class EnregistrementGPX:
+    """
+    Enregistrement d'un fichier alimenté morceau par morceau
+
+    Chaque morceau est haché, validé puis compressé dans un fichier
+    temporaire ; terminer() le range sous son empreinte. Utilisé comme
+    gestionnaire de contexte, la copie temporaire est supprimée si une
+    exception (trace refusée, envoi interrompu...) sort du bloc.
+
+    Args:
+        dossier: Dossier de stockage
+        validateur: ValidateurTrace optionnel, alimenté à chaque morceau puis terminé
+    """
+
+    def __init__(self, dossier: str, validateur: Optional[ValidateurTrace] = None):
+        self.dossier = dossier
+        self.validateur = validateur
+        self.taille = 0
+        self._empreinte = hashlib.sha256()
+        self._temporaire = os.path.join(dossier, f".{uuid.uuid4().hex}.part")
+        self._fichier = open(self._temporaire, "wb")
+        self._gz = _ecrivain_compresse(self._fichier)
+
+    def ecrire(self, morceau: bytes) -> None:
+        """
+        Ajoute un morceau au fichier
+
+        Raises:
+            TraceRefusee: Si le validateur refuse la trace
+        """
+        self._empreinte.update(morceau)
+        self.taille += len(morceau)
+        _valider_et_ecrire(self.validateur, self._gz, morceau)
+
+    def terminer(self) -> Tuple[str, str, int]:
+        """
+        Termine la validation et range le fichier sous son empreinte
+
+        Returns:
+            (chemin, empreinte SHA-256, taille en octets avant compression)
+        """
+        if self.validateur is not None:
+            self.validateur.terminer()
+        self._fermer()
+        empreinte = self._empreinte.hexdigest()
+        return _ranger(self._temporaire, self.dossier, empreinte), empreinte, self.taille
+
+    def abandonner(self) -> None:
+        """Supprime la copie temporaire (rien n'est stocké)"""
+        self._fermer()
+        if os.path.exists(self._temporaire):
+            os.remove(self._temporaire)
+
+    def _fermer(self) -> None:
+        if not self._fichier.closed:
+            self._gz.close()
+            self._fichier.close()
+
+    def __enter__(self) -> "EnregistrementGPX":
+        return self
+
+    def __exit__(self, type_exception, exception, trace) -> None:
+        if type_exception is not None:
+            self.abandonner()
+
+
+async def enregistrer_upload(upload, dossier: str, validateur: Optional[ValidateurTrace] = None) -> Tuple[str, str, int]:
+    """
+    Enregistre un fichier envoyé en le hachant au fil de la lecture
+
+    Le contenu est compressé par morceaux dans un fichier temporaire, puis
+    renommé sous son empreinte (calculée sur le contenu non compressé).
+    S'il existe déjà, la copie temporaire est supprimée.
+
+    Args:
+        upload: Fichier envoyé (UploadFile ou tout objet avec une méthode async read)
+        dossier: Dossier de stockage
+        validateur: ValidateurTrace optionnel, alimenté à chaque morceau puis terminé
+
+    Returns:
+        (chemin, empreinte SHA-256, taille en octets avant compression)
+
+    Raises:
+        TraceRefusee: Si le validateur refuse la trace (rien n'est stocké)
+    """
+    with EnregistrementGPX(dossier, validateur) as enregistrement:
+        while True:
+            morceau = await upload.read(TAILLE_MORCEAU)
+            if not morceau:
+                break
+            # Validation et écriture dans un thread : la boucle d'événements reste libre
+            await asyncio.to_thread(enregistrement.ecrire, morceau)
+        return enregistrement.terminer()
+
+
+def enregistrer_flux(flux: BinaryIO, dossier: str, validateur: Optional[ValidateurTrace] = None) -> Tuple[str, str, int]:
+    """
+    Version synchrone de enregistrer_upload pour un flux binaire
+    (membre d'une archive, fichier local...)
+
+    Returns:
+        (chemin, empreinte SHA-256, taille en octets avant compression)
+    """
+    with EnregistrementGPX(dossier, validateur) as enregistrement:
+        while True:
+            morceau = flux.read(TAILLE_MORCEAU)
+            if not morceau:
+                break
+            enregistrement.ecrire(morceau)
+        return enregistrement.terminer()
+
+
+def _valider_et_ecrire(validateur: Optional[ValidateurTrace], gz: gzip.GzipFile, morceau: bytes) -> None:
+    """Valide un morceau (si un validateur est donné) avant de l'écrire"""
+    if validateur is not None:
+        validateur.alimenter(morceau)
+    gz.write(morceau)
+
+
+def _ranger(temporaire: str, dossier: str, empreinte: str) -> str:
+    """Renomme la copie temporaire sous son empreinte (ou la supprime si déjà stockée)"""
+    chemin = chemin_par_empreinte(dossier, empreinte)
+    # Un fichier stocké en clair avant la compression reste utilisable
+    for existant in (chemin, chemin[:-len(".gz")]):
+        if os.path.exists(existant):
+            os.remove(temporaire)
+            return existant
+    os.replace(temporaire, chemin)
+    return chemin
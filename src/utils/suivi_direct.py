@@ -0,0 +1,227 @@
+"""
+Métriques d'une activité en direct, mises à jour lot par lot
+
+L'état ne garde que ce qu'il faut pour prolonger les calculs : les cumuls,
+le dernier point, les deux dernières altitudes (lissage 0.3 / 0.4 / 0.3),
+la plage lente en cours et une courte fenêtre pour l'allure. Chaque lot de
+points est traité en O(taille du lot), sans jamais relire la trace.
+
+La distance et le dénivelé positif sont ceux de calculer_metriques sur les
+points reçus. Le temps en mouvement est provisoire : les sursauts du GPS
+pendant un arrêt ne sont pas rattachés à la pause (cela demande de
+connaître la suite) ; les métriques exactes sont recalculées sur la trace
+complète à la fin de la session.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+from utils.trace import Trace
+from utils.track_metrics import (
+    DISTANCE_MAX_PAUSE, DUREE_MIN_PAUSE, FENETRE_VITESSE, VITESSE_MIN_MOUVEMENT,
+    _plages, distances_haversine
+)
+
+
+def _distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    return float(distances_haversine(np.array([lat1, lat2]), np.array([lon1, lon2]))[0])
+
+
+class EtatDirect:
+    """
+    État incrémental des métriques d'une session en direct
+
+    Utilisation : ajouter(lot) pour chaque lot de points reçus, resume()
+    pour les métriques courantes ; vers_dict / depuis_dict pour le stocker.
+    """
+
+    CHAMPS = (
+        'nb_points', 'segment', 'distance', 'd_plus', 'duree_ecoulee', 'duree_pauses', 'nb_pauses',
+        'dernier_lat', 'dernier_lon', 'dernier_temps',
+        'altitudes', 'nb_altitudes', 'lissee',
+        'lent_duree', 'lent_lat', 'lent_lon',
+        'fenetre_temps', 'fenetre_distance',
+    )
+
+    def __init__(self):
+        self.nb_points = 0
+        self.segment = 0
+        self.distance = 0.0        # m
+        self.d_plus = 0.0          # m, entre altitudes lissées définitives
+        self.duree_ecoulee = 0.0   # s
+        self.duree_pauses = 0.0    # s, pauses terminées
+        self.nb_pauses = 0
+        # Dernier point reçu (None avant le premier point)
+        self.dernier_lat: Optional[float] = None
+        self.dernier_lon: Optional[float] = None
+        self.dernier_temps: Optional[float] = None
+        # Dénivelé : deux dernières altitudes connues du segment et dernière altitude lissée définitive
+        self.altitudes: list = []
+        self.nb_altitudes = 0
+        self.lissee: Optional[float] = None
+        # Plage lente en cours (None si le dernier intervalle n'est pas lent)
+        self.lent_duree: Optional[float] = None
+        self.lent_lat: Optional[float] = None
+        self.lent_lon: Optional[float] = None
+        # Derniers points (temps, distance cumulée) du segment, pour l'allure
+        self.fenetre_temps: list = []
+        self.fenetre_distance: list = []
+
+    @classmethod
+    def depuis_dict(cls, donnees: Dict) -> "EtatDirect":
+        etat = cls()
+        for champ in cls.CHAMPS:
+            setattr(etat, champ, donnees[champ])
+        return etat
+
+    def vers_dict(self) -> Dict:
+        return {champ: getattr(self, champ) for champ in self.CHAMPS}
+
+    def ajouter(self, lot: Trace, nouveau_segment: bool = False) -> np.ndarray:
+        """
+        Prolonge les métriques avec un lot de points horodatés
+
+        Les points qui ne sont pas postérieurs au dernier point reçu (lot
+        renvoyé après une coupure réseau, désordre) sont ignorés.
+
+        Args:
+            lot: Points reçus (la colonne segment est ignorée)
+            nouveau_segment: Le lot commence un nouveau segment (reprise après arrêt du chrono)
+
+        Returns:
+            Masque des points retenus (à stocker)
+        """
+        # Seuls les points horodatés, dans l'ordre et après le dernier point, sont retenus
+        temps = lot.temps
+        depart = -np.inf if self.dernier_temps is None else self.dernier_temps
+        precedents = np.fmax.accumulate(np.concatenate(([depart], temps)))[:-1]
+        retenus = ~np.isnan(temps) & (temps > precedents)
+        if not retenus.any():
+            return retenus
+
+        lat, lon, ele, temps = lot.lat[retenus], lot.lon[retenus], lot.ele[retenus], temps[retenus]
+        if nouveau_segment and self.nb_points > 0:
+            self._clore_segment()
+            self.segment += 1
+
+        # Le dernier point du segment est repris pour les intervalles à la jonction
+        suite = self.dernier_lat is not None
+        if suite:
+            lat = np.concatenate(([self.dernier_lat], lat))
+            lon = np.concatenate(([self.dernier_lon], lon))
+            temps = np.concatenate(([self.dernier_temps], temps))
+
+        dd = distances_haversine(lat, lon)
+        dt = np.diff(temps)
+        cumul = self.distance + np.concatenate(([0.0], np.cumsum(dd)))
+        self.distance = float(cumul[-1])
+        self.duree_ecoulee += float(dt.sum())
+        self._ajouter_altitudes(ele[~np.isnan(ele)])
+        self._ajouter_intervalles(lat, lon, dt, dd)
+
+        self.fenetre_temps = (self.fenetre_temps + temps[int(suite):].tolist())[-(FENETRE_VITESSE + 1):]
+        self.fenetre_distance = (self.fenetre_distance + cumul[int(suite):].tolist())[-(FENETRE_VITESSE + 1):]
+
+        self.nb_points += int(retenus.sum())
+        self.dernier_lat, self.dernier_lon, self.dernier_temps = float(lat[-1]), float(lon[-1]), float(temps[-1])
+        return retenus
+
+    def _clore_segment(self) -> None:
+        """Termine le segment en cours : ses dernières valeurs deviennent définitives"""
+        self.d_plus += self._gain_en_attente()
+        if self.lent_duree is not None:
+            self._terminer_plage_lente(self.dernier_lat, self.dernier_lon)
+        self.altitudes, self.nb_altitudes, self.lissee = [], 0, None
+        self.dernier_lat = self.dernier_lon = self.dernier_temps = None
+        self.fenetre_temps, self.fenetre_distance = [], []
+
+    def _gain_en_attente(self) -> float:
+        # La dernière altitude du segment n'est pas lissée (comme lisser_altitudes)
+        if self.nb_altitudes < 2:
+            return 0.0
+        return max(0.0, self.altitudes[-1] - self.lissee)
+
+    def _ajouter_altitudes(self, nouvelles: np.ndarray) -> None:
+        """Lissage 0.3 / 0.4 / 0.3 : une altitude est définitive quand la suivante est connue"""
+        if len(nouvelles) == 0:
+            return
+        ele = np.concatenate((self.altitudes, nouvelles))
+        # Avec moins de deux altitudes connues, ele[0] est le début du segment (non lissé)
+        debut = [ele[0]] if self.nb_altitudes <= 1 and len(ele) >= 2 else []
+        definitives = np.concatenate((
+            [] if self.lissee is None else [self.lissee],
+            debut,
+            0.3 * ele[:-2] + 0.4 * ele[1:-1] + 0.3 * ele[2:]
+        ))
+        ecarts = np.diff(definitives)
+        self.d_plus += float(ecarts[ecarts > 0].sum())
+        if len(definitives):
+            self.lissee = float(definitives[-1])
+        self.altitudes = ele[-2:].tolist()
+        self.nb_altitudes += len(nouvelles)
+
+    def _plage_lente_est_pause(self, lat: float, lon: float) -> bool:
+        return (
+            self.lent_duree >= DUREE_MIN_PAUSE
+            and _distance(self.lent_lat, self.lent_lon, lat, lon) <= DISTANCE_MAX_PAUSE
+        )
+
+    def _terminer_plage_lente(self, lat: float, lon: float) -> None:
+        """La plage lente en cours s'arrête au point (lat, lon) : c'est une pause ou non"""
+        if self._plage_lente_est_pause(lat, lon):
+            self.duree_pauses += self.lent_duree
+            self.nb_pauses += 1
+        self.lent_duree = self.lent_lat = self.lent_lon = None
+
+    def _ajouter_intervalles(self, lat, lon, dt, dd) -> None:
+        """Prolonge la détection des pauses (mêmes seuils que detecter_pauses)"""
+        if len(dt) == 0:
+            return
+        lent = dd < VITESSE_MIN_MOUVEMENT * dt
+        cumul_dt = np.concatenate(([0.0], np.cumsum(dt)))
+
+        # La plage lente du lot précédent s'arrête au premier intervalle rapide
+        if self.lent_duree is not None and not lent[0]:
+            self._terminer_plage_lente(float(lat[0]), float(lon[0]))
+
+        debuts, fins = _plages(lent)
+        for debut, fin in zip(debuts, fins):
+            duree = float(cumul_dt[fin] - cumul_dt[debut])
+            if self.lent_duree is not None:
+                # Première plage du lot : elle prolonge celle du lot précédent
+                self.lent_duree += duree
+            else:
+                self.lent_duree, self.lent_lat, self.lent_lon = duree, float(lat[debut]), float(lon[debut])
+            if fin < len(lent):
+                self._terminer_plage_lente(float(lat[fin]), float(lon[fin]))
+
+    def resume(self) -> Dict:
+        """
+        Métriques courantes de la session
+
+        Returns:
+            Dictionnaire avec nb_points, distance (km), denivele_positif (m),
+            duree_ecoulee, duree_mouvement (s), allure (s/km, None à l'arrêt)
+            et la dernière position
+        """
+        duree_pauses = self.duree_pauses
+        if self.lent_duree is not None and self._plage_lente_est_pause(self.dernier_lat, self.dernier_lon):
+            duree_pauses += self.lent_duree
+
+        allure = None
+        if len(self.fenetre_temps) >= 2:
+            distance = self.fenetre_distance[-1] - self.fenetre_distance[0]
+            duree = self.fenetre_temps[-1] - self.fenetre_temps[0]
+            if distance > 0 and distance >= VITESSE_MIN_MOUVEMENT * duree:
+                allure = duree / distance * 1000
+
+        return {
+            'nb_points': self.nb_points,
+            'distance': self.distance / 1000,
+            'denivele_positif': self.d_plus + self._gain_en_attente(),
+            'duree_ecoulee': self.duree_ecoulee,
+            'duree_mouvement': self.duree_ecoulee - duree_pauses,
+            'allure': allure,
+            'lat': self.dernier_lat,
+            'lon': self.dernier_lon,
+        }
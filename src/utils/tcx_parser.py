@@ -0,0 +1,114 @@
+"""
+Parseur TCX (Garmin Training Center) en flux
+
+Même principe que le parseur GPX : le XML est analysé de façon incrémentale
+et les points sont émis par blocs, dans la même représentation.
+Chaque <Track> du fichier devient un segment.
+"""
+import os
+from typing import Iterator, List, Optional
+from xml.etree.ElementTree import XMLPullParser
+
+from utils.gpx_parser import TAILLE_BLOC, TAILLE_LECTURE, Point, _lire_horodatage, _nom_local
+from utils.stockage_gpx import ouvrir_gpx
+from utils.trace import Trace
+
+# Balises d'un <Trackpoint> et leur position dans le point
+# (Value n'apparaît que dans <HeartRateBpm>, Watts dans l'extension TPX)
+CHAMPS = {
+    'LatitudeDegrees': 1, 'LongitudeDegrees': 2, 'AltitudeMeters': 3,
+    'Value': 5, 'Cadence': 6, 'RunCadence': 6, 'Watts': 7,
+}
+
+
+def _lire_point(element, segment: int) -> Optional[Point]:
+    """Extrait un point d'un élément <Trackpoint> (None sans position)"""
+    point = [segment, None, None, None, None, None, None, None, None]
+    for enfant in element.iter():
+        nom = _nom_local(enfant.tag)
+        if nom == 'Time':
+            point[4] = _lire_horodatage(enfant.text)
+            continue
+        position = CHAMPS.get(nom)
+        if position is not None and enfant.text:
+            try:
+                point[position] = float(enfant.text)
+            except ValueError:
+                pass
+
+    if point[1] is None or point[2] is None:
+        return None
+    return tuple(point)
+
+
+def iterer_points_tcx(source, taille_bloc: int = TAILLE_BLOC) -> Iterator[List[Point]]:
+    """
+    Parcourt les points d'un fichier TCX par blocs
+
+    Args:
+        source: Chemin du fichier (compressé en gzip ou non) ou objet
+            fichier ouvert en binaire
+        taille_bloc: Nombre maximum de points par bloc
+
+    Yields:
+        Listes de points (segment, lat, lon, altitude, horodatage POSIX,
+        fréquence cardiaque, cadence, puissance, température)
+    """
+    fichier = ouvrir_gpx(source) if isinstance(source, (str, os.PathLike)) else source
+    parser = XMLPullParser(events=('start', 'end'))
+    segment = -1
+    element_piste = None
+    bloc: List[Point] = []
+
+    try:
+        while True:
+            donnees = fichier.read(TAILLE_LECTURE)
+            if donnees:
+                parser.feed(donnees)
+            else:
+                parser.close()
+
+            for evenement, element in parser.read_events():
+                nom = _nom_local(element.tag)
+                if evenement == 'start':
+                    if nom == 'Track':
+                        segment += 1
+                        element_piste = element
+                elif nom == 'Trackpoint':
+                    point = _lire_point(element, segment)
+                    element.clear()
+                    if point is not None:
+                        bloc.append(point)
+                        if len(bloc) >= taille_bloc:
+                            yield bloc
+                            bloc = []
+
+            # Libère les points déjà traités : l'arbre ne grossit pas
+            if element_piste is not None:
+                del element_piste[:]
+
+            if not donnees:
+                break
+
+        if bloc:
+            yield bloc
+    finally:
+        if fichier is not source:
+            fichier.close()
+
+
+def lire_trace_tcx(source) -> Optional[Trace]:
+    """
+    Lit un fichier TCX en flux et le convertit en colonnes NumPy
+
+    Args:
+        source: Chemin du fichier ou objet fichier ouvert en binaire
+
+    Returns:
+        La trace, ou None si le fichier est illisible
+    """
+    try:
+        return Trace.depuis_blocs(iterer_points_tcx(source))
+    except Exception as e:
+        print(f"❌ Erreur de lecture TCX : {e}")
+        return None
@@ -0,0 +1,75 @@
+"""
+Représentation en colonnes d'une trace GPS
+
+Chaque grandeur (latitude, longitude, altitude, temps, capteurs) est stockée
+dans un tableau NumPy contigu : les calculs de métriques se font par
+opérations vectorisées plutôt que point par point.
+"""
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+
+class Trace:
+    """
+    Trace GPS sous forme de colonnes alignées
+
+    Attributs:
+        segment (int32): Numéro du segment de chaque point
+        lat, lon (float64): Coordonnées en degrés
+        ele (float64): Altitude en mètres (NaN si absente)
+        temps (float64): Horodatage POSIX en secondes (NaN si absent)
+        fc, cadence, puissance, temperature (float64): Données des capteurs
+            (bpm, tours/min, W, °C), NaN si absentes
+    """
+
+    COLONNES = ('segment', 'lat', 'lon', 'ele', 'temps', 'fc', 'cadence', 'puissance', 'temperature')
+    CAPTEURS = ('fc', 'cadence', 'puissance', 'temperature')
+
+    def __init__(
+        self,
+        segment: np.ndarray,
+        lat: np.ndarray,
+        lon: np.ndarray,
+        ele: np.ndarray,
+        temps: np.ndarray,
+        fc: Optional[np.ndarray] = None,
+        cadence: Optional[np.ndarray] = None,
+        puissance: Optional[np.ndarray] = None,
+        temperature: Optional[np.ndarray] = None
+    ):
+        self.segment = np.asarray(segment, dtype=np.int32)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.ele = np.asarray(ele, dtype=np.float64)
+        self.temps = np.asarray(temps, dtype=np.float64)
+        # Capteur absent : colonne de NaN
+        absent = np.full(len(self.lat), np.nan)
+        self.fc = absent if fc is None else np.asarray(fc, dtype=np.float64)
+        self.cadence = absent if cadence is None else np.asarray(cadence, dtype=np.float64)
+        self.puissance = absent if puissance is None else np.asarray(puissance, dtype=np.float64)
+        self.temperature = absent if temperature is None else np.asarray(temperature, dtype=np.float64)
+
+    @classmethod
+    def depuis_blocs(cls, blocs: Iterable[List[tuple]]) -> "Trace":
+        """
+        Construit une trace à partir de blocs de points (segment, lat, lon,
+        altitude, horodatage, fc, cadence, puissance, température),
+        les None devenant NaN
+        """
+        nb = len(cls.COLONNES)
+        tableaux = [np.array(bloc, dtype=np.float64).reshape(-1, nb) for bloc in blocs]
+        donnees = np.concatenate(tableaux) if tableaux else np.empty((0, nb))
+        return cls(*donnees.T)
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    @property
+    def date_debut(self) -> Optional[datetime]:
+        """Date du premier point horodaté (None si la trace n'a pas de temps)"""
+        horodates = self.temps[~np.isnan(self.temps)]
+        if len(horodates) == 0:
+            return None
+        return datetime.fromtimestamp(horodates[0], tz=timezone.utc)
@@ -0,0 +1,229 @@
+"""
+Moteur de métriques vectorisé pour les traces GPS
+
+Toutes les métriques (distance, dénivelé, pauses, temps en mouvement,
+vitesses) sont calculées par opérations NumPy sur les colonnes d'une
+Trace, sans boucle Python par point.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+from utils.trace import Trace
+
+RAYON_TERRE = 6378.137 * 1000   # Mètres (même valeur que gpxpy)
+VITESSE_MIN_MOUVEMENT = 0.5     # m/s : en dessous, l'athlète est considéré à l'arrêt
+DUREE_MIN_PAUSE = 10.0          # s : un arrêt plus court (feu, virage serré) reste du mouvement
+DISTANCE_MAX_PAUSE = 50.0       # m : déplacement maximal entre le début et la fin d'une pause
+DUREE_MAX_DERIVE = 10.0         # s : sursaut du GPS à l'arrêt, rattaché à la pause qui l'entoure
+FENETRE_VITESSE = 10            # Points utilisés pour lisser la vitesse maximale
+
+# Version de l'algorithme : à incrémenter à chaque changement d'un calcul,
+# les métriques des activités existantes sont alors recalculées en arrière-plan
+# (2 : temps en mouvement calculé à partir des pauses détectées)
+VERSION_METRIQUES = 2
+
+
+def distances_haversine(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """
+    Distances haversine en mètres entre points consécutifs
+
+    Returns:
+        Tableau de taille n-1
+    """
+    phi = np.radians(lat)
+    d_phi = np.diff(phi)
+    d_lambda = np.diff(np.radians(lon))
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi[:-1]) * np.cos(phi[1:]) * np.sin(d_lambda / 2) ** 2
+    return 2 * RAYON_TERRE * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def distances_segments(trace: Trace) -> np.ndarray:
+    """Distances entre points consécutifs, nulles entre deux segments"""
+    if len(trace) < 2:
+        return np.zeros(0)
+    distances = distances_haversine(trace.lat, trace.lon)
+    distances[np.diff(trace.segment) != 0] = 0.0
+    return distances
+
+
+def lisser_altitudes(ele: np.ndarray, segment: np.ndarray) -> np.ndarray:
+    """
+    Lisse les altitudes par une moyenne pondérée 0.3 / 0.4 / 0.3
+
+    Les extrémités de chaque segment ne sont pas lissées (comme gpxpy).
+    Les altitudes manquantes (NaN) doivent avoir été retirées.
+    """
+    if len(ele) < 3:
+        return ele.copy()
+
+    lissees = ele.copy()
+    lissees[1:-1] = 0.3 * ele[:-2] + 0.4 * ele[1:-1] + 0.3 * ele[2:]
+
+    # Les points en bordure de segment gardent leur altitude brute
+    bordures = np.flatnonzero(np.diff(segment) != 0)
+    lissees[bordures] = ele[bordures]
+    lissees[bordures + 1] = ele[bordures + 1]
+    return lissees
+
+
+def denivele(trace: Trace) -> Tuple[float, float]:
+    """
+    Calcule le dénivelé positif et négatif à partir des altitudes lissées
+
+    Returns:
+        (dénivelé positif, dénivelé négatif) en mètres
+    """
+    connues = ~np.isnan(trace.ele)
+    ele = trace.ele[connues]
+    segment = trace.segment[connues]
+    if len(ele) < 2:
+        return 0.0, 0.0
+
+    ecarts = np.diff(lisser_altitudes(ele, segment))
+    ecarts[np.diff(segment) != 0] = 0.0
+    return float(ecarts[ecarts > 0].sum()), float(-ecarts[ecarts < 0].sum())
+
+
+def _plages(masque: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Début (inclus) et fin (exclue) de chaque plage consécutive de True"""
+    bords = np.diff(np.concatenate(([False], masque, [False])).astype(np.int8))
+    return np.flatnonzero(bords == 1), np.flatnonzero(bords == -1)
+
+
+def detecter_pauses(
+    lat: np.ndarray,
+    lon: np.ndarray,
+    dt: np.ndarray,
+    dd: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Détecte les pauses d'une trace horodatée
+
+    Un intervalle est lent si sa vitesse est sous VITESSE_MIN_MOUVEMENT.
+    Les sursauts du GPS à l'arrêt (courtes plages rapides entre deux plages
+    lentes, sans déplacement réel) sont rattachés à la pause. Une plage lente
+    est une pause si elle dure au moins DUREE_MIN_PAUSE et que l'athlète n'a
+    pas bougé de plus de DISTANCE_MAX_PAUSE entre son début et sa fin.
+
+    Args:
+        lat, lon: Positions des points horodatés
+        dt: Durée de chaque intervalle (nulle entre deux segments)
+        dd: Distance de chaque intervalle (nulle entre deux segments)
+
+    Returns:
+        (debuts, fins) : indices des points qui bornent chaque pause
+    """
+    lent = dd < VITESSE_MIN_MOUVEMENT * dt
+    cumul_dt = np.concatenate(([0.0], np.cumsum(dt)))
+    cumul_dd = np.concatenate(([0.0], np.cumsum(dd)))
+
+    # Sursauts : plages rapides courtes, encadrées de plages lentes
+    debuts, fins = _plages(~lent)
+    encadrees = (debuts > 0) & (fins < len(lent))
+    sursauts = encadrees & (cumul_dt[fins] - cumul_dt[debuts] <= DUREE_MAX_DERIVE) & (
+        cumul_dd[fins] - cumul_dd[debuts] <= DISTANCE_MAX_PAUSE
+    )
+    if sursauts.any():
+        # Plages disjointes : +1 à leur début, -1 à leur fin, puis somme cumulée
+        rattaches = np.zeros(len(lent) + 1, dtype=np.int64)
+        rattaches[debuts[sursauts]] = 1
+        rattaches[fins[sursauts]] = -1
+        lent = lent | (np.cumsum(rattaches)[:-1] > 0)
+
+    debuts, fins = _plages(lent)
+    durees_plages = cumul_dt[fins] - cumul_dt[debuts]
+    deplacements = np.zeros(len(debuts))
+    if len(debuts):
+        # Points (début, fin) de chaque plage à la suite : une distance sur deux
+        deplacements = distances_haversine(
+            np.column_stack((lat[debuts], lat[fins])).ravel(),
+            np.column_stack((lon[debuts], lon[fins])).ravel()
+        )[::2]
+    pauses = (durees_plages >= DUREE_MIN_PAUSE) & (deplacements <= DISTANCE_MAX_PAUSE)
+    return debuts[pauses], fins[pauses]
+
+
+def durees(trace: Trace, distances: np.ndarray) -> Dict[str, float]:
+    """
+    Calcule la durée écoulée, les pauses, le temps en mouvement et la vitesse maximale
+
+    Args:
+        trace: Trace analysée
+        distances: Distances entre points consécutifs (distances_segments)
+
+    Returns:
+        Dictionnaire {'duree_secondes', 'duree_mouvement', 'duree_pauses',
+        'nb_pauses', 'vitesse_max'} (vitesse en m/s)
+    """
+    horodates = ~np.isnan(trace.temps)
+    temps = trace.temps[horodates]
+    segment = trace.segment[horodates]
+    if len(temps) < 2:
+        return {
+            'duree_secondes': 0.0, 'duree_mouvement': 0.0, 'duree_pauses': 0.0,
+            'nb_pauses': 0, 'vitesse_max': 0.0
+        }
+
+    # Distance cumulée restreinte aux points horodatés
+    cumul = np.concatenate(([0.0], np.cumsum(distances)))[horodates]
+
+    meme_segment = np.diff(segment) == 0
+    dt = np.where(meme_segment, np.diff(temps), 0.0)
+    dt = np.maximum(dt, 0.0)
+    dd = np.where(meme_segment, np.diff(cumul), 0.0)
+
+    # Temps en mouvement : durée écoulée moins les pauses détectées
+    cumul_dt = np.concatenate(([0.0], np.cumsum(dt)))
+    debuts, fins = detecter_pauses(trace.lat[horodates], trace.lon[horodates], dt, dd)
+    duree_pauses = float((cumul_dt[fins] - cumul_dt[debuts]).sum())
+
+    # Vitesse maximale sur une fenêtre glissante, pour ne pas garder un pic GPS
+    vitesse_max = 0.0
+    fenetre = min(FENETRE_VITESSE, len(temps) - 1)
+    cumul_dd = np.concatenate(([0.0], np.cumsum(dd)))
+    duree_fenetre = cumul_dt[fenetre:] - cumul_dt[:-fenetre]
+    distance_fenetre = cumul_dd[fenetre:] - cumul_dd[:-fenetre]
+    valides = duree_fenetre > 0
+    if valides.any():
+        vitesse_max = float((distance_fenetre[valides] / duree_fenetre[valides]).max())
+
+    return {
+        'duree_secondes': float(cumul_dt[-1]),
+        'duree_mouvement': float(cumul_dt[-1]) - duree_pauses,
+        'duree_pauses': duree_pauses,
+        'nb_pauses': int(len(debuts)),
+        'vitesse_max': vitesse_max
+    }
+
+
+def calculer_metriques(trace: Trace) -> Dict:
+    """
+    Calcule toutes les métriques d'une trace
+
+    Le dictionnaire reprend les clés d'analyser_gpx ('distance',
+    'duree_secondes', 'denivele_positif', 'date_debut') complétées par
+    le dénivelé négatif, le temps en mouvement et en pause, les vitesses
+    (km/h) et la version de l'algorithme.
+    """
+    distances = distances_segments(trace)
+    distance = float(distances.sum())
+    d_plus, d_moins = denivele(trace)
+    temps = durees(trace, distances)
+
+    duree_mouvement = temps['duree_mouvement']
+    vitesse_moyenne = distance / duree_mouvement if duree_mouvement > 0 else 0.0
+
+    return {
+        'distance': distance / 1000,
+        'duree_secondes': temps['duree_secondes'],
+        'duree_mouvement': duree_mouvement,
+        'duree_pauses': temps['duree_pauses'],
+        'nb_pauses': temps['nb_pauses'],
+        'denivele_positif': d_plus,
+        'denivele_negatif': d_moins,
+        'vitesse_max': temps['vitesse_max'] * 3.6,
+        'vitesse_moyenne': vitesse_moyenne * 3.6,
+        'date_debut': trace.date_debut,
+        'version': VERSION_METRIQUES
+    }
@@ -0,0 +1,129 @@
+"""
+Validation d'une trace pendant son envoi, avant toute analyse
+
+Le validateur reçoit les morceaux au fil de la lecture de l'upload : un
+fichier trop gros, avec trop de points, mal formé ou qui n'est pas une
+trace est refusé dès le morceau fautif, sans attendre la fin de l'envoi ni
+occuper un processus d'analyse. Le XML est vérifié par expat en flux
+(mémoire constante) ; les déclarations DOCTYPE, inutiles dans une trace et
+porteuses d'expansions d'entités, sont refusées.
+"""
+import struct
+from typing import Optional
+from xml.parsers import expat
+
+TAILLE_MAX_TRACE = 50 * 1024 * 1024   # Octets (une sortie de 24 h à 1 Hz fait environ 20 Mo en GPX)
+NB_POINTS_MAX = 250_000               # Points de trace par fichier
+
+# Racines acceptées : (espace de noms, balise) -> (format, balise des points)
+RACINES = {
+    ("http://www.topografix.com/GPX/1/1", "gpx"): ("gpx", "trkpt"),
+    ("http://www.topografix.com/GPX/1/0", "gpx"): ("gpx", "trkpt"),
+    ("http://www.garmin.com/xmlschemas/TrainingCenterDatabase/v2", "TrainingCenterDatabase"): ("tcx", "Trackpoint"),
+}
+
+TAILLE_EN_TETE_FIT = 12  # Octets nécessaires pour reconnaître un FIT et lire sa taille
+
+
+class TraceRefusee(ValueError):
+    """Trace refusée par la validation, avec le code HTTP à renvoyer"""
+
+    def __init__(self, message: str, statut: int = 400):
+        super().__init__(message)
+        self.statut = statut
+
+
+class ValidateurTrace:
+    """
+    Valide une trace GPX, TCX ou FIT morceau par morceau
+
+    Utilisation : alimenter(morceau) pour chaque morceau lu, puis terminer().
+    Les deux lèvent TraceRefusee dès que la trace est invalide.
+    """
+
+    def __init__(self, taille_max: int = TAILLE_MAX_TRACE, nb_points_max: int = NB_POINTS_MAX):
+        self.taille_max = taille_max
+        self.nb_points_max = nb_points_max
+        self.taille = 0
+        self.nb_points = 0
+        self.format: Optional[str] = None
+        self._en_tete = b""
+        self._balise_point: Optional[str] = None
+        self._analyseur = None
+
+    def alimenter(self, morceau: bytes) -> None:
+        """Valide un morceau de la trace, à la suite des précédents"""
+        self.taille += len(morceau)
+        if self.taille > self.taille_max:
+            raise TraceRefusee(f"Fichier trop volumineux (maximum {self.taille_max // (1024 * 1024)} Mo)", 413)
+
+        if self._analyseur is None and self.format is None:
+            # Le format se décide sur les premiers octets
+            self._en_tete += morceau
+            if len(self._en_tete) < TAILLE_EN_TETE_FIT:
+                return
+            morceau, self._en_tete = self._en_tete, b""
+            if morceau[8:12] == b".FIT":
+                self._valider_en_tete_fit(morceau)
+                return
+            self._analyseur = self._creer_analyseur()
+
+        if self._analyseur is not None:
+            self._analyser(morceau, final=False)
+
+    def terminer(self) -> str:
+        """
+        Termine la validation une fois tout le fichier reçu
+
+        Returns:
+            Le format de la trace ('gpx', 'tcx' ou 'fit')
+        """
+        if self._analyseur is None and self.format is None:
+            # Fichier plus court que l'en-tête FIT : forcément du XML
+            self._analyseur = self._creer_analyseur()
+            self._analyser(self._en_tete, final=False)
+        if self._analyseur is not None:
+            self._analyser(b"", final=True)
+        if self.format is None:
+            raise TraceRefusee("Le fichier doit être une trace GPX, TCX ou FIT")
+        return self.format
+
+    def _valider_en_tete_fit(self, en_tete: bytes) -> None:
+        taille_en_tete = en_tete[0]
+        if taille_en_tete not in (12, 14):
+            raise TraceRefusee("En-tête FIT invalide")
+        # Taille annoncée : en-tête, données puis CRC de 2 octets
+        taille_annoncee = taille_en_tete + struct.unpack_from("<I", en_tete, 4)[0] + 2
+        if taille_annoncee > self.taille_max:
+            raise TraceRefusee(f"Fichier trop volumineux (maximum {self.taille_max // (1024 * 1024)} Mo)", 413)
+        self.format = "fit"
+
+    def _creer_analyseur(self):
+        analyseur = expat.ParserCreate(namespace_separator=" ")
+        analyseur.StartElementHandler = self._debut_element
+        analyseur.StartDoctypeDeclHandler = self._doctype
+        analyseur.EntityDeclHandler = self._doctype
+        return analyseur
+
+    def _analyser(self, morceau: bytes, final: bool) -> None:
+        try:
+            self._analyseur.Parse(morceau, final)
+        except expat.ExpatError as e:
+            raise TraceRefusee(f"XML mal formé (ligne {e.lineno}) : {expat.ErrorString(e.code)}")
+
+    def _doctype(self, *args) -> None:
+        raise TraceRefusee("Les déclarations DOCTYPE ne sont pas acceptées")
+
+    def _debut_element(self, balise: str, attributs) -> None:
+        espace, _, nom = balise.rpartition(" ")
+        if self.format is None:
+            if (espace, nom) not in RACINES:
+                raise TraceRefusee(
+                    f"Racine XML inattendue : <{nom}> ({espace or 'sans espace de noms'}), "
+                    "trace GPX ou TCX attendue"
+                )
+            self.format, self._balise_point = RACINES[(espace, nom)]
+        elif nom == self._balise_point:
+            self.nb_points += 1
+            if self.nb_points > self.nb_points_max:
+                raise TraceRefusee(f"Trop de points dans la trace (maximum {self.nb_points_max})", 413)